@@ -0,0 +1,127 @@
+"""Offline end-to-end ingestion throughput, with no API calls.
+
+Usage:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.bench_ingestion --ticks 100000 --symbols 8
+
+Generates random-walk prices with SyntheticSource, records them to a Parquet
+file and then measures rows per second for each stage of the ingestion path:
+generating ticks, replaying the file, bulk-loading into the database and
+running the same rows through IngestionDaemon's poll/batch/write loop.
+Finally it compares fetching with a simulated --latency per request one
+request at a time against ingest_async(), which overlaps the requests with
+each other and with the database writes.
+"""
+import math
+import time
+import asyncio
+import logging
+import argparse
+import datetime
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import delete
+
+from src.data_ingestion.async_ingest import ingest_async
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.data_ingestion.sources import ReplaySource, SyntheticSource, write_replay_file
+from src.db_operations.aggregates import refresh_after_write
+from src.db_operations.db_connection import init_db, session_scope
+from src.db_operations.models import PreciousMetalPrice
+from src.service.daemon import IngestionDaemon
+
+
+def clear_prices(symbols: list[str]) -> None:
+    """Deletes the benchmark's rows so every stage starts from the same table."""
+    with session_scope() as session:
+        session.execute(delete(PreciousMetalPrice).where(PreciousMetalPrice.metal.in_(symbols)))
+
+
+def report(stage: str, rows: int, seconds: float) -> None:
+    """Prints one result line."""
+    print(f"{stage:<10} {rows:>10} {seconds:>9.2f} {rows / seconds if seconds else 0:>12,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=100_000, help="Ticks per symbol.")
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--bases", default="EUR", help="Comma-separated base currencies.")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=50, help="Simulated API requests for the fetch stages.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds each simulated request takes.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight for the async stage.")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    init_db()
+
+    symbols = [f"S{i:03d}" for i in range(args.symbols)]
+
+    def synthetic(ticks_per_fetch: int) -> SyntheticSource:
+        return SyntheticSource(
+            symbols,
+            base_currencies=args.bases.split(","),
+            start=datetime.datetime(2024, 1, 1),
+            ticks_per_fetch=ticks_per_fetch,
+            total_ticks=args.ticks,
+        )
+
+    series = synthetic(1).series
+    print(f"{'stage':<10} {'rows':>10} {'seconds':>9} {'rows/s':>12}")
+
+    started = time.perf_counter()
+    rows = sum(1 for _ in synthetic(10_000).iter_rows())
+    report("generate", rows, time.perf_counter() - started)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ticks.parquet"
+        write_replay_file(synthetic(10_000).iter_rows(), path)
+
+        started = time.perf_counter()
+        rows = sum(1 for _ in ReplaySource(path, batch_size=args.batch_size).iter_rows())
+        report("replay", rows, time.perf_counter() - started)
+
+        clear_prices(series)
+        stats = bulk_load_prices(ReplaySource(path, batch_size=args.batch_size).iter_rows(), args.batch_size)
+        report("bulk_load", stats.inserted, stats.seconds)
+
+    clear_prices(series)
+    source = synthetic(max(args.batch_size // len(series), 1))
+    daemon = IngestionDaemon(
+        source=source, interval=0.0, batch_size=args.batch_size, flush_interval=0.0, train_interval=None
+    )
+    started = time.perf_counter()
+    daemon.start()
+    while source.remaining:
+        daemon.step()
+    stats = daemon.shutdown()
+    report("daemon", stats.rows_written, time.perf_counter() - started)
+    clear_prices(series)
+
+    ticks_per_request = math.ceil(args.ticks / args.requests)
+
+    source = synthetic(ticks_per_request)
+    started = time.perf_counter()
+    rows = 0
+    for _ in range(args.requests):
+        time.sleep(args.latency)
+        rows += bulk_load_prices(source.fetch(), args.batch_size).rows
+    refresh_after_write()
+    report("sequential", rows, time.perf_counter() - started)
+    clear_prices(series)
+
+    source = synthetic(ticks_per_request)
+
+    async def fetch() -> list:
+        await asyncio.sleep(args.latency)
+        return source.fetch()
+
+    stats = asyncio.run(
+        ingest_async([fetch] * args.requests, concurrency=args.concurrency, batch_size=args.batch_size)
+    )
+    report("async", stats.rows, stats.seconds)
+    clear_prices(series)
+
+
+if __name__ == "__main__":
+    main()
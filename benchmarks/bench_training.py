@@ -0,0 +1,58 @@
+"""Wall-clock scaling of Model.fit_models from 1 to N worker processes.
+
+Usage:
+    python -m benchmarks.bench_training --tickers 32 --points 500
+
+Fits the same synthetic random-walk series with n_jobs = 1, 2, 4, ... up to
+the CPU count and prints seconds and speedup relative to the serial run.
+"""
+import os
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.models.model import Model
+
+
+def synthetic_prices(n_tickers: int, n_points: int, seed: int = 0) -> pd.DataFrame:
+    """Builds a wide frame of random-walk prices with one column per ticker."""
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+    return pd.DataFrame(
+        {ticker: 100 + rng.normal(0, 1, n_points).cumsum() for ticker in tickers},
+        index=pd.date_range("2024-01-01", periods=n_points, freq="h"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=32)
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    data = synthetic_prices(args.tickers, args.points)
+    job_counts = sorted({1, args.max_jobs, *(2 ** i for i in range(args.max_jobs.bit_length()))})
+
+    # Warm up imports and compiled code paths so the serial baseline is not penalized
+    Model(list(data.columns[:1])).fit_models({data.columns[0]: data.iloc[:, 0].values})
+
+    baseline = None
+    print(f"{'n_jobs':>6} {'seconds':>9} {'speedup':>8}")
+    for n_jobs in job_counts:
+        model = Model(list(data.columns), n_jobs=n_jobs)
+        datasets = model.prepare_datasets(data)
+        started = time.perf_counter()
+        errors = model.fit_models(datasets)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{n_jobs:>6} {elapsed:>9.2f} {baseline / elapsed:>7.2f}x"
+              + (f"  ({len(errors)} failed)" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
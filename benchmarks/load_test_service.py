@@ -0,0 +1,69 @@
+"""Local load test for the forecast service.
+
+Usage:
+    python -m src.service.server --port 8080 &
+    python -m benchmarks.load_test_service --port 8080 --clients 50 --seconds 10 \
+        --path "/forecast?tickers=XAU,XAG&fh=1,2,3"
+
+Each client keeps one HTTP/1.1 connection open and issues GETs back to back;
+throughput and latency percentiles are printed at the end.
+"""
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+
+async def client(host: str, port: int, path: str, deadline: float, latencies: list[float]) -> int:
+    """Issues keep-alive GETs until the deadline and records each latency in ms."""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(
+                next(
+                    line.split(b":", 1)[1]
+                    for line in head.split(b"\r\n")
+                    if line.lower().startswith(b"content-length")
+                )
+            )
+            await reader.readexactly(length)
+            latencies.append(1000 * (time.perf_counter() - started))
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def run(host: str, port: int, path: str, clients: int, seconds: float) -> None:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    errors = await asyncio.gather(*[client(host, port, path, deadline, latencies) for _ in range(clients)])
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (0, 0, 0)
+    print(f"requests: {len(latencies)}  errors: {sum(errors)}  rps: {len(latencies) / elapsed:,.0f}")
+    print(f"latency ms  p50: {p50:.2f}  p95: {p95:.2f}  p99: {p99:.2f}  max: {max(latencies, default=0):.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.path, args.clients, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""Benchmark suite for ingestion, fetching, training, model loading and prediction.
+
+Usage:
+    python -m benchmarks.suite run --sizes 1k,100k --output results/HEAD.json
+    python -m benchmarks.suite run --sizes 1m --database-url postgresql+psycopg2://postgres@localhost/postgres
+    python -m benchmarks.suite compare results/base.json results/HEAD.json
+
+Each size is ROWSxTICKERS (e.g. 100000x20) or a preset: 1k (1,000 rows x 4
+tickers), 100k (x 20), 1m (x 50) and 10m (x 200). Synthetic random-walk
+prices spread over the model's lookback window are written to a throwaway
+database: a temporary SQLite file by default, or a scratch database created
+on (and dropped from) the given PostgreSQL server.
+
+Every stage is timed over --repeats runs and reported with throughput,
+latency percentiles and the peak Python heap of one extra run traced with
+tracemalloc. compare exits with status 1 when a stage got slower than
+--threshold, so it can gate a CI job.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import datetime
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+from sqlalchemy import create_engine, delete, text
+from sqlalchemy.engine import make_url
+
+STAGES = ("ingest_poll", "ingest", "fetch", "train", "load", "predict")
+PRESETS = {"1k": (1_000, 4), "100k": (100_000, 20), "1m": (1_000_000, 50), "10m": (10_000_000, 200)}
+SPAN = datetime.timedelta(hours=12)  # Time covered by the synthetic data
+HORIZONS = list(range(1, 25))
+
+
+@dataclass
+class StageResult:
+    """Timings of one stage at one data size."""
+
+    stage: str
+    rows: int
+    tickers: int
+    unit: str  # What throughput counts: rows, models or forecasts
+    items: int  # Units processed per timed run
+    samples_ms: list[float] = field(default_factory=list)
+    peak_memory_mb: Optional[float] = None
+
+    def summary(self) -> dict:
+        """Returns the result with throughput and latency percentiles, as stored in the JSON file."""
+        samples = np.asarray(self.samples_ms)
+        total_seconds = samples.sum() / 1000
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            **asdict(self),
+            "throughput": self.items * len(samples) / total_seconds if total_seconds else 0.0,
+            "mean_ms": float(samples.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(samples.max()),
+        }
+
+
+def parse_size(size: str) -> tuple[int, int]:
+    """Parses a preset name or ROWSxTICKERS into (rows, tickers)."""
+    if size.lower() in PRESETS:
+        return PRESETS[size.lower()]
+    rows, _, tickers = size.lower().partition("x")
+    return int(rows), int(tickers or 4)
+
+
+def measure(
+    stage: StageResult,
+    run: Callable[[], object],
+    repeats: int,
+    setup: Optional[Callable[[], object]] = None,
+    trace_memory: bool = True,
+) -> StageResult:
+    """
+    Times run() repeatedly, then traces one more run's peak heap allocation.
+
+    Args:
+        stage (StageResult): The result to add the samples to.
+        run (Callable[[], object]): The operation being measured.
+        repeats (int): The number of timed runs.
+        setup (Optional[Callable[[], object]]): Untimed preparation before every run.
+        trace_memory (bool): Also record peak memory; tracing slows the run, so it is not timed.
+
+    Returns:
+        StageResult: The stage with its samples and peak memory filled in.
+    """
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        stage.samples_ms.append(1000 * (time.perf_counter() - started))
+
+    if trace_memory:
+        if setup is not None:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            stage.peak_memory_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+
+    summary = stage.summary()
+    print(
+        f"{stage.stage:<12} {stage.rows:>10} {stage.tickers:>7} {summary['throughput']:>14,.0f} {stage.unit:<9}"
+        f" {summary['p50_ms']:>10.1f} {summary['p95_ms']:>10.1f} {summary['p99_ms']:>10.1f}"
+        f" {stage.peak_memory_mb if stage.peak_memory_mb is not None else float('nan'):>9.1f}",
+        flush=True,
+    )
+    return stage
+
+
+def run_size(
+    rows: int,
+    n_tickers: int,
+    stages: tuple[str, ...] = STAGES,
+    repeats: int = 3,
+    polls: int = 50,
+    freq: Optional[str] = None,
+    trace_memory: bool = True,
+    workdir: Optional[Path] = None,
+) -> list[StageResult]:
+    """
+    Benchmarks the selected stages at one data size against the configured database.
+
+    Rows are written under tickers B000, B001, ... and deleted again
+    afterwards, so the suite can share a database with other data.
+
+    Args:
+        rows (int): Total price rows, spread evenly over the tickers.
+        n_tickers (int): The number of tickers.
+        stages (tuple[str, ...]): The stages to run, in STAGES order.
+        repeats (int): Timed runs per stage.
+        polls (int): Timed single-poll ingestions for 'ingest_poll'.
+        freq (Optional[str]): Resampling frequency for fetching and training; None uses raw ticks.
+        trace_memory (bool): Record peak memory per stage.
+        workdir (Optional[Path]): Where trained models are saved; a temporary directory if None.
+
+    Returns:
+        list[StageResult]: One result per stage run.
+    """
+    from src.data_ingestion.bulk_loader import bulk_load_prices
+    from src.data_ingestion.data_loader import load_data_into_db
+    from src.data_ingestion.sources import SyntheticSource
+    from src.db_operations.db_connection import session_scope
+    from src.db_operations.models import PreciousMetalPrice
+    from src.models.model import Model
+    from src.models.predictor import Predictor
+
+    tickers = [f"B{i:03d}" for i in range(n_tickers)]
+    ticks = max(rows // n_tickers, 2)
+    end = datetime.datetime.utcnow().replace(microsecond=0)
+    start = end - SPAN
+    step = SPAN / ticks
+    model_options = dict(lookback=SPAN + datetime.timedelta(hours=1), freq=freq)
+    results: list[StageResult] = []
+    state = {"loaded": False, "trained": False}
+
+    def clear() -> None:
+        with session_scope() as session:
+            session.execute(delete(PreciousMetalPrice).where(PreciousMetalPrice.metal.in_(tickers)))
+        state["loaded"] = False
+
+    def ingest() -> None:
+        source = SyntheticSource(tickers, start=start, step=step, ticks_per_fetch=10_000, total_ticks=ticks)
+        bulk_load_prices(source.iter_rows())
+        state["loaded"] = True
+
+    def ensure_data() -> None:
+        if not state["loaded"]:
+            clear()
+            ingest()
+
+    def train() -> None:
+        model = Model(tickers, **model_options)
+        model.train()
+        model.save(model_dir)
+        state["trained"] = True
+
+    def ensure_models() -> None:
+        if not state["trained"]:
+            ensure_data()
+            train()
+
+    def stage(name: str, unit: str, items: int) -> StageResult:
+        return StageResult(name, rows, n_tickers, unit, items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = Path(workdir or tmp) / "models"
+
+        if "ingest_poll" in stages:
+            clear()
+            source = SyntheticSource(tickers, start=end, step=step)
+            # One call per sample, as main.py and the daemon ingest one quote per run
+            results.append(measure(
+                stage("ingest_poll", "rows", n_tickers),
+                lambda: load_data_into_db(source),
+                polls,
+                trace_memory=trace_memory,
+            ))
+            clear()
+
+        if "ingest" in stages:
+            results.append(measure(stage("ingest", "rows", ticks * n_tickers), ingest, repeats, clear, trace_memory))
+
+        if "fetch" in stages:
+            ensure_data()
+            model = Model(tickers, **model_options)
+            results.append(measure(stage("fetch", "rows", ticks * n_tickers), model.fetch_data, repeats, None, trace_memory))
+
+        if "train" in stages:
+            ensure_data()
+            results.append(measure(stage("train", "rows", ticks * n_tickers), train, repeats, None, trace_memory))
+
+        if "load" in stages:
+            ensure_models()
+
+            def load_all() -> None:
+                predictor = Predictor(model_dir)
+                for ticker in tickers:
+                    predictor.get_model(ticker)
+
+            results.append(measure(stage("load", "models", n_tickers), load_all, repeats, None, trace_memory))
+
+        if "predict" in stages:
+            ensure_models()
+            predictors: list[Predictor] = []
+
+            def fresh_predictor() -> None:
+                # Models are loaded outside the timing, so only forecasting is measured
+                predictors[:] = [Predictor(model_dir)]
+                for ticker in tickers:
+                    predictors[0].get_model(ticker)
+
+            results.append(measure(
+                stage("predict", "forecasts", n_tickers * len(HORIZONS)),
+                lambda: predictors[0].predict(tickers, HORIZONS),
+                repeats,
+                fresh_predictor,
+                trace_memory,
+            ))
+
+        clear()
+    return results
+
+
+@contextmanager
+def throwaway_database(database_url: Optional[str] = None) -> Iterator[str]:
+    """
+    Provides an empty database for one suite run and removes it afterwards.
+
+    Args:
+        database_url (Optional[str]): A PostgreSQL server URL to create a scratch
+            database on, or a SQLite URL to use as-is; a temporary SQLite file if None.
+
+    Yields:
+        str: The URL of the database to benchmark against.
+    """
+    if database_url is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            yield f"sqlite:///{Path(tmp) / 'bench.db'}"
+        return
+
+    url = make_url(database_url)
+    if not url.get_backend_name().startswith("postgresql"):
+        yield database_url
+        return
+
+    name = f"metalytics_bench_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as connection:
+            connection.execute(text(f'CREATE DATABASE "{name}"'))
+        try:
+            yield url.set(database=name).render_as_string(hide_password=False)
+        finally:
+            from src.db_operations.db_connection import dispose_engine
+
+            dispose_engine()
+            with admin.connect() as connection:
+                connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+    finally:
+        admin.dispose()
+
+
+def environment(database_url: str) -> dict:
+    """Describes the commit, interpreter, machine and database a run was made with."""
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": make_url(database_url).get_backend_name(),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    """Runs the suite and writes the JSON results."""
+    stages = tuple(stage for stage in STAGES if stage in args.stages.split(","))
+    with throwaway_database(args.database_url) as database_url:
+        os.environ["DATABASE_URL"] = database_url
+        from src.db_operations.db_connection import init_db
+
+        logging.getLogger().setLevel(logging.WARNING)
+        warnings.simplefilter("ignore", FutureWarning)  # sktime deprecation notices on every fit
+        init_db()
+
+        print(
+            f"{'stage':<12} {'rows':>10} {'tickers':>7} {'throughput':>14} {'':<9}"
+            f" {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'peak MB':>9}"
+        )
+        results = []
+        for size in args.sizes.split(","):
+            rows, tickers = parse_size(size)
+            results += run_size(
+                rows, tickers, stages, args.repeats, args.polls, args.freq, not args.no_memory
+            )
+        report = {
+            "environment": environment(database_url),
+            "options": {"repeats": args.repeats, "polls": args.polls, "freq": args.freq},
+            "results": [result.summary() for result in results],
+        }
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Prints the change of every stage between two result files; returns 1 if any regressed."""
+    def load(path: str) -> dict:
+        report = json.loads(Path(path).read_text())
+        return {(r["stage"], r["rows"], r["tickers"]): r for r in report["results"]}
+
+    baseline, current = load(args.baseline), load(args.current)
+    regressions = 0
+    print(f"{'stage':<12} {'rows':>10} {'tickers':>7} {'p50 before':>11} {'p50 after':>10} {'change':>8}"
+          f" {'peak MB before':>15} {'after':>8}")
+    for key in sorted(baseline.keys() & current.keys(), key=lambda k: (k[1], k[2], STAGES.index(k[0]))):
+        before, after = baseline[key], current[key]
+        change = after["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0.0
+        regressed = change > args.threshold
+        regressions += regressed
+        print(
+            f"{key[0]:<12} {key[1]:>10} {key[2]:>7} {before['p50_ms']:>11.1f} {after['p50_ms']:>10.1f}"
+            f" {change:>+7.1%} {before['peak_memory_mb'] or 0:>15.1f} {after['peak_memory_mb'] or 0:>8.1f}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and save JSON results.")
+    run_parser.add_argument("--sizes", default="1k,100k", help="Comma-separated presets or ROWSxTICKERS.")
+    run_parser.add_argument("--stages", default=",".join(STAGES))
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--polls", type=int, default=50, help="Timed single polls for ingest_poll.")
+    run_parser.add_argument("--freq", help="Resample to this frequency (e.g. 5min) when fetching and training.")
+    run_parser.add_argument("--database-url", help="A PostgreSQL server to create a scratch database on.")
+    run_parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak-memory runs.")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression.")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
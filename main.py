@@ -1,20 +1,23 @@
+import os
 import logging
-from src.db_operations.db_connection import create_db_engine, init_db
+from datetime import datetime, timedelta
+from src.db_operations.db_connection import get_engine, init_db, dispose_engine, pool_stats
 from src.data_ingestion.data_loader import load_data_into_db
+from src.data_ingestion.symbols import SymbolRegistry
+from src.db_operations.storage import RetentionPolicy, maintain_storage
 from src.models.model import Model
+from src.config import load_config
 from src.log_info import setup_logging
+from src.metrics import run_summary, write_metrics
 
 
-def main() -> None:
-    """Main function to initialize the database, load data, train models, and save them."""
-    
-    setup_logging()
+def run_pipeline() -> None:
+    """Initializes the database, loads data, maintains storage, trains models, and saves them."""
 
     # Step 1: Initialize the database and create tables
     logging.info("Initializing database...")
     try:
-        engine = create_db_engine()
-        init_db(engine)
+        init_db(get_engine())
         logging.info("Database initialized successfully.")
     except Exception as e:
         logging.error(f"Error initializing the database: {e}")
@@ -22,16 +25,31 @@ def main() -> None:
 
     # Step 2: Load metal price data into the database
     logging.info("Loading metal prices into the database...")
+    registry = SymbolRegistry.load()
     try:
-        load_data_into_db()
+        load_data_into_db(symbols=registry)
         logging.info("Metal prices loaded successfully.")
     except Exception as e:
         logging.error(f"Error loading metal prices: {e}")
         return  # Exit if loading fails
 
-    # Step 3: Define metal tickers and train models
-    tickers = ["XAU", "XAG", "XPT", "XPD"]
-    model_instance = Model(tickers)
+    # Step 3: Prepare partitions, roll up complete buckets and expire old data
+    try:
+        maintain_storage(RetentionPolicy.from_env())
+    except Exception as e:
+        logging.error(f"Error maintaining storage: {e}")  # Not fatal; training can still proceed
+
+    # Step 4: Train a model per tracked series
+    model_instance = Model(
+        registry.tickers,
+        n_jobs=int(os.getenv("MODEL_N_JOBS", "1")),
+        fit_timeout=float(os.getenv("MODEL_FIT_TIMEOUT")) if os.getenv("MODEL_FIT_TIMEOUT") else None,
+        incremental=os.getenv("MODEL_INCREMENTAL", "").lower() in ("1", "true", "yes"),
+        model_dir="trained_models",
+        order_search=os.getenv("MODEL_ORDER_SEARCH", "").lower() in ("1", "true", "yes"),
+        search_budget=float(os.getenv("MODEL_SEARCH_BUDGET", "60")),
+        lookback=timedelta(hours=float(os.getenv("MODEL_LOOKBACK_HOURS", "12"))),
+    )
 
     logging.info("Training models...")
     try:
@@ -41,7 +59,7 @@ def main() -> None:
         logging.error(f"Error during model training: {e}")
         return  # Exit if training fails
 
-    # Step 4: Save the trained models
+    # Step 5: Save the trained models
     try:
         model_instance.save("trained_models")
         logging.info("Trained models saved successfully.")
@@ -51,5 +69,37 @@ def main() -> None:
     logging.info("Process completed successfully.")
 
 
+def export_run_metrics() -> None:
+    """Logs the run's stage timings and writes them as JSON (and Prometheus text if METRICS_PROM is set)."""
+    summary = run_summary()
+    stages = ", ".join(
+        f"{stage} {values['total_seconds']:.2f}s/{values['count']}" for stage, values in summary["stages"].items()
+    )
+    logging.info(f"Stage timings: {stages}")
+    logging.info(f"Connection pool stats: {pool_stats()}")
+    metrics_dir = os.getenv("METRICS_DIR", "logs")
+    write_metrics(
+        json_path=os.getenv("METRICS_JSON")
+        or os.path.join(metrics_dir, f"run_metrics_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"),
+        prometheus_path=os.getenv("METRICS_PROM"),
+    )
+
+
+def main() -> None:
+    """Main function to initialize the database, load data, train models, and save them."""
+    load_config()
+    # After load_config, so LOG_LEVEL and LOG_DIR from .env apply
+    setup_logging(os.getenv("LOG_LEVEL"))
+    try:
+        run_pipeline()
+    finally:
+        # Written on failure too, so a failed run shows which stage broke
+        try:
+            export_run_metrics()
+        except Exception as e:
+            logging.error(f"Error writing run metrics: {e}")
+        dispose_engine()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,346 @@
+"""Command-line entry point: python -m src.cli <command> [options].
+
+Commands:
+    ingest    Fetch the latest quote (or replay a file / generate synthetic ticks) into the database
+    backfill  Load historical daily prices for a date range
+    train     Train (or incrementally update) the forecasting models and save them
+    predict   Print forecasts from the saved models
+    backtest  Score model configurations by walk-forward forecasts over stored history
+    serve     Run the HTTP forecast service
+    daemon    Poll, write and retrain continuously
+    symbols   Show the symbol registry, or store it in the database
+
+Only this module and the configuration loader are imported up front; every
+command imports what it needs when it runs, so `ingest` never pays for
+pandas, NumPy or sktime.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import datetime
+from typing import List, Optional
+
+from src.config import load_config
+from src.log_info import setup_logging
+
+
+def _symbols(args: argparse.Namespace):
+    """Returns the symbol registry: --currencies/--base-currency if given, else the configured one."""
+    from src.data_ingestion.symbols import DEFAULT_BASE_CURRENCY, SymbolRegistry
+
+    if getattr(args, "currencies", None):
+        return SymbolRegistry.from_codes(args.currencies, getattr(args, "base_currency", None) or DEFAULT_BASE_CURRENCY)
+    return SymbolRegistry.load(args.symbols_file)
+
+
+def _tickers(args: argparse.Namespace) -> List[str]:
+    """Returns the --tickers list, or every series in the symbol registry."""
+    if args.tickers:
+        return [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()]
+    return _symbols(args).tickers
+
+
+def _date(value: str) -> datetime.date:
+    return datetime.date.fromisoformat(value)
+
+
+def ingest(args: argparse.Namespace) -> int:
+    """Loads the latest quotes from the API, or every row of a replay file or synthetic source."""
+    from src.data_ingestion.bulk_loader import bulk_load_prices
+    from src.data_ingestion.data_loader import ingest_registry
+    from src.db_operations.aggregates import refresh_after_write
+    from src.db_operations.db_connection import init_db
+
+    init_db()
+    if args.replay or args.synthetic:
+        from src.data_ingestion.sources import ReplaySource, SyntheticSource
+
+        if args.replay:
+            source = ReplaySource(args.replay)
+        else:
+            registry = _symbols(args)
+            source = SyntheticSource(
+                [symbol.symbol for symbol in registry], base_currencies=[args.base_currency or "EUR"],
+                ticks_per_fetch=10_000, total_ticks=max(args.rows // len(registry), 1),
+            )
+        with source:
+            stats = bulk_load_prices(source.iter_rows())
+        if stats.inserted:
+            refresh_after_write()
+    else:
+        stats = ingest_registry(_symbols(args), timeout=args.timeout, url=args.api_url, concurrency=args.concurrency)
+        if stats.requests_failed:
+            print(f"{stats.requests_failed} of {stats.requests} requests failed.")
+            return 1
+
+    print(f"{stats.inserted} rows inserted, {stats.skipped} skipped.")
+    return 0
+
+
+def backfill(args: argparse.Namespace) -> int:
+    """Backfills daily prices between two dates, per base currency; fails if any chunk could not be loaded."""
+    import asyncio
+
+    from src.data_ingestion.backfill import Backfiller
+    from src.db_operations.db_connection import init_db
+
+    init_db()
+    rows = chunks = failed = 0
+    for base_currency, symbols in _symbols(args).by_base().items():
+        result = asyncio.run(Backfiller(
+            base_currency=base_currency,
+            currencies=",".join(symbol.symbol for symbol in symbols),
+            max_workers=args.workers,
+            requests_per_second=args.requests_per_second,
+            timeout=args.timeout,
+        ).run_async(args.start, args.end))
+        rows, chunks, failed = rows + result.rows, chunks + result.chunks_fetched, failed + len(result.failed)
+    print(f"{rows} rows from {chunks} chunks, {failed} failed.")
+    return 1 if failed else 0
+
+
+def train(args: argparse.Namespace) -> int:
+    """Trains the models and saves them to the model directory."""
+    from src.db_operations.db_connection import init_db
+    from src.models.model import Model
+
+    init_db()
+    model = Model(
+        _tickers(args),
+        n_jobs=args.n_jobs,
+        incremental=args.incremental,
+        model_dir=args.model_dir,
+        order_search=args.order_search,
+        freq=args.freq,
+        lookback=datetime.timedelta(hours=args.lookback_hours),
+    )
+    model.train()
+    model.save(args.model_dir)
+    print(f"Saved models for {', '.join(model.models)} to {args.model_dir}.")
+    return 0
+
+
+def predict(args: argparse.Namespace) -> int:
+    """Prints forecasts for the requested tickers and horizons."""
+    from src.models.predictor import Predictor
+
+    horizons = [int(h) for h in args.fh.split(",")]
+    frame = Predictor(args.model_dir, backend=args.backend).predict(_tickers(args), horizons)
+    if args.json:
+        print(json.dumps({ticker: frame[ticker].tolist() for ticker in frame.columns}))
+    else:
+        print(frame.to_string())
+    return 0
+
+
+def backtest(args: argparse.Namespace) -> int:
+    """Backtests each --order on each ticker, stores the scores and prints them best first."""
+    from src.db_operations.db_connection import init_db
+    from src.models.backtest import BacktestConfig, run_backtests
+
+    init_db()
+    configs = [
+        BacktestConfig(
+            order=tuple(int(value) for value in order.split(",")),
+            horizon=args.horizon,
+            initial=args.initial,
+            step=args.step,
+            window=args.window,
+            window_size=args.window_size,
+            refit_every=args.refit_every,
+            coverage=args.coverage,
+            freq=args.freq,
+        )
+        for order in args.order or ["1,1,0"]
+    ]
+    start = datetime.datetime.combine(args.start, datetime.time()) if args.start else None
+    results = run_backtests(_tickers(args), configs, start=start, n_jobs=args.n_jobs, save=not args.no_save)
+    results.sort(key=lambda result: (result.ticker, result.metrics["rmse"] is None, result.metrics["rmse"] or 0.0))
+    rows = [
+        {"ticker": result.ticker, "order": list(result.config.order), "folds": result.folds, **result.metrics}
+        for result in results
+    ]
+    if args.json:
+        print(json.dumps(rows))
+    else:
+        for row in rows:
+            scores = "  ".join(
+                f"{name} {'-' if row[name] is None else format(row[name], '.4g')}"
+                for name in ("mae", "rmse", "mape", "coverage")
+            )
+            print(f"{row['ticker']:<10} {str(tuple(row['order'])):<10} {row['folds']:>6} folds  {scores}")
+    return 0 if results else 1
+
+
+def serve(args: argparse.Namespace) -> int:
+    """Runs the forecast service until interrupted."""
+    from src.service.server import run
+
+    run(args.host, args.port, args.model_dir, args.workers)
+    return 0
+
+
+def daemon(args: argparse.Namespace) -> int:
+    """Runs the ingestion daemon until SIGINT or SIGTERM."""
+    from src.service.daemon import run
+
+    source = None
+    if args.replay:
+        from src.data_ingestion.sources import ReplaySource
+
+        source = ReplaySource(args.replay, batch_size=args.rows_per_poll)
+    elif args.synthetic:
+        from src.data_ingestion.sources import SyntheticSource
+
+        tickers = _tickers(args)
+        source = SyntheticSource(tickers, ticks_per_fetch=max(args.rows_per_poll // len(tickers), 1))
+    else:
+        from src.data_ingestion.sources import MetalPriceAPISource
+
+        source = MetalPriceAPISource(symbols=_symbols(args))
+    run(args.interval, args.train_interval, args.batch_size, _tickers(args), args.model_dir, source)
+    return 0
+
+
+def symbols(args: argparse.Namespace) -> int:
+    """Prints the symbol registry and, with --sync, stores it in the 'tracked_symbols' table."""
+    from src.db_operations.db_connection import init_db
+
+    init_db()
+    registry = _symbols(args)
+    if args.sync:
+        registry.sync()
+    for base_currency, entries in registry.by_base().items():
+        print(f"{base_currency}: {', '.join(symbol.series for symbol in entries)}")
+    print(f"{len(registry)} symbols, {len(registry.batches())} API requests per poll.")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser with one subparser per command."""
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Metalytics price ingestion and forecasting.")
+    parser.add_argument("--env-file", help="Load settings from this file instead of the nearest .env.")
+    parser.add_argument("--log-level", help="DEBUG, INFO, WARNING or ERROR; defaults to LOG_LEVEL or INFO.")
+    parser.add_argument(
+        "--symbols-file", help="CSV symbol registry; defaults to SYMBOLS_FILE, then the 'tracked_symbols' table."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("ingest", help="Load the latest prices into the database.")
+    command.add_argument("--api-url", default="https://api.metalpriceapi.com/v1/latest")
+    command.add_argument("--base-currency", help="With --currencies, the currency to quote them in (EUR).")
+    command.add_argument("--currencies", help="Comma-separated codes to load instead of the symbol registry.")
+    command.add_argument("--timeout", type=float, default=30.0, help="Seconds each API request may take.")
+    command.add_argument("--concurrency", type=int, default=4, help="API requests in flight at once.")
+    command.add_argument("--replay", metavar="PATH", help="Load a CSV or Parquet file instead of calling the API.")
+    command.add_argument("--synthetic", action="store_true", help="Load random-walk prices instead of calling the API.")
+    command.add_argument("--rows", type=int, default=10_000, help="Rows to generate with --synthetic.")
+    command.set_defaults(func=ingest)
+
+    command = commands.add_parser("backfill", help="Load historical daily prices.")
+    command.add_argument("--start", type=_date, required=True, help="First day, YYYY-MM-DD.")
+    command.add_argument("--end", type=_date, default=datetime.date.today(), help="Last day, YYYY-MM-DD.")
+    command.add_argument("--currencies", help="Comma-separated EUR codes to load instead of the symbol registry.")
+    command.add_argument("--workers", type=int, default=4)
+    command.add_argument("--requests-per-second", type=float, default=2.0)
+    command.add_argument("--timeout", type=float, default=30.0, help="Seconds each API request may take.")
+    command.set_defaults(func=backfill)
+
+    command = commands.add_parser("train", help="Train and save the forecasting models.")
+    command.add_argument("--tickers", help="Comma-separated series; defaults to the symbol registry.")
+    command.add_argument("--model-dir", default="trained_models")
+    command.add_argument("--n-jobs", type=int, help="Worker processes; defaults to MODEL_N_JOBS, or 1.")
+    command.add_argument("--incremental", action="store_true")
+    command.add_argument("--order-search", action="store_true")
+    command.add_argument("--freq", help="Resample to this frequency (e.g. 5min) before fitting.")
+    command.add_argument("--lookback-hours", type=float, default=12.0)
+    command.set_defaults(func=train)
+
+    command = commands.add_parser("predict", help="Print forecasts from the saved models.")
+    command.add_argument("--tickers", help="Comma-separated series; defaults to the symbol registry.")
+    command.add_argument("--fh", default="1,2,3", help="Comma-separated forecast horizons.")
+    command.add_argument("--model-dir", default="trained_models")
+    command.add_argument("--json", action="store_true", help="Print JSON instead of a table.")
+    command.add_argument(
+        "--backend", choices=("auto", "state", "artifact"), default="auto",
+        help="Forecast from the exported state (no sktime) or from the pickled model.",
+    )
+    command.set_defaults(func=predict)
+
+    command = commands.add_parser("backtest", help="Score model configurations on stored history.")
+    command.add_argument("--tickers", help="Comma-separated series; defaults to the symbol registry.")
+    command.add_argument(
+        "--order", action="append", metavar="P,D,Q", help="ARIMA order to score; repeat to compare several (1,1,0)."
+    )
+    command.add_argument("--horizon", type=int, default=12, help="Steps forecast from each origin.")
+    command.add_argument("--initial", type=int, default=200, help="Observations before the first origin.")
+    command.add_argument("--step", type=int, default=1, help="Observations between origins.")
+    command.add_argument("--window", choices=("expanding", "rolling"), default="expanding")
+    command.add_argument("--window-size", type=int, help="Observations per rolling fit; defaults to --initial.")
+    command.add_argument("--refit-every", type=int, default=50, help="Origins per parameter refit.")
+    command.add_argument("--coverage", type=float, default=0.9, help="Prediction interval coverage to score.")
+    command.add_argument("--freq", help="Resample to this frequency (e.g. 1h) first.")
+    command.add_argument("--start", type=_date, help="Only use history from this day, YYYY-MM-DD.")
+    command.add_argument("--n-jobs", type=int, help="Worker processes; defaults to MODEL_N_JOBS, or 1.")
+    command.add_argument("--no-save", action="store_true", help="Do not store the scores.")
+    command.add_argument("--json", action="store_true", help="Print JSON instead of a table.")
+    command.set_defaults(func=backtest)
+
+    command = commands.add_parser("serve", help="Serve latest prices and forecasts over HTTP.")
+    command.add_argument("--host", default="127.0.0.1")
+    command.add_argument("--port", type=int, default=8080)
+    command.add_argument("--model-dir", default="trained_models")
+    command.add_argument("--workers", type=int, default=4)
+    command.set_defaults(func=serve)
+
+    command = commands.add_parser("daemon", help="Continuously ingest prices and retrain models.")
+    command.add_argument("--interval", type=float, default=60.0, help="Seconds between polls.")
+    command.add_argument("--train-interval", type=float, default=3600.0, help="Seconds between training runs.")
+    command.add_argument("--batch-size", type=int, default=500)
+    command.add_argument("--tickers", help="Comma-separated series; defaults to the symbol registry.")
+    command.add_argument("--model-dir", default="trained_models")
+    command.add_argument("--replay", metavar="PATH", help="Replay prices from a CSV or Parquet file instead of the API.")
+    command.add_argument("--synthetic", action="store_true", help="Generate random-walk prices instead of calling the API.")
+    command.add_argument("--rows-per-poll", type=int, default=1000)
+    command.set_defaults(func=daemon)
+
+    command = commands.add_parser("symbols", help="Show the symbol registry.")
+    command.add_argument("--sync", action="store_true", help="Store the registry in the 'tracked_symbols' table.")
+    command.set_defaults(func=symbols)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Parses the arguments, loads configuration once and runs the command.
+
+    Args:
+        argv (Optional[List[str]]): The arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: The process exit status.
+    """
+    args = build_parser().parse_args(argv)
+    load_config(args.env_file)
+    setup_logging(args.log_level)
+    # Environment defaults are resolved only now, so they can come from the .env file
+    if getattr(args, "n_jobs", 0) is None:
+        args.n_jobs = int(os.getenv("MODEL_N_JOBS", "1"))
+
+    try:
+        status = args.func(args)
+    except Exception as e:
+        logging.error(f"Command '{args.command}' failed: {e}")
+        status = 1
+
+    if os.getenv("METRICS_JSON") or os.getenv("METRICS_PROM"):
+        from src.metrics import write_metrics
+
+        write_metrics(os.getenv("METRICS_JSON"), os.getenv("METRICS_PROM"))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import os
+import logging
+from typing import Optional
+
+_loaded = False
+
+
+def load_config(env_file: Optional[str] = None, override: bool = False) -> None:
+    """Loads settings from a .env file into the environment.
+
+    Modules read their settings (``DATABASE_URL``, ``METALS_API_KEY``,
+    ``LOG_LEVEL``, ...) from the environment when they are used, not when
+    they are imported, so entry points call this once before doing any work.
+    Variables already set in the environment win unless override is True.
+
+    Args:
+        env_file (Optional[str]): The file to load; defaults to the nearest '.env'.
+            Once a file has been loaded, later calls without one do nothing.
+        override (bool): Let the file replace variables that are already set.
+    """
+    global _loaded
+    if _loaded and env_file is None:
+        return
+
+    from dotenv import find_dotenv, load_dotenv
+
+    path = env_file or find_dotenv(usecwd=True)
+    if path and not os.path.exists(path):
+        raise FileNotFoundError(f"Config file not found: {path}")
+    if path:
+        load_dotenv(path, override=override)
+        logging.debug(f"Loaded configuration from {path}.")
+    _loaded = True
@@ -0,0 +1,258 @@
+import ssl
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+from src.data_ingestion.bulk_loader import IngestStats, PriceRow, bulk_load_prices, notify_written
+from src.db_operations.aggregates import refresh_after_write
+from src.metrics import METRICS
+
+DEFAULT_TIMEOUT = 30.0  # Seconds an API request may take before it is abandoned
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BATCH_SIZE = 5_000
+DEFAULT_MAX_PENDING = 8  # Fetched results waiting for the writer before fetches pause
+MAX_RESPONSE_BYTES = 64 * 1024 * 1024
+
+Fetcher = Callable[[], Awaitable[List[PriceRow]]]
+
+_STOP = object()  # Tells the writer that every fetch has finished
+
+
+class HTTPStatusError(Exception):
+    """An HTTP response with an error status."""
+
+    def __init__(self, status: int, url: str) -> None:
+        """
+        Initializes the HTTPStatusError.
+
+        Args:
+            status (int): The response status code.
+            url (str): The requested URL, without its query string.
+        """
+        super().__init__(f"HTTP {status} from {url}")
+        self.status: int = status
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    """Reads a response body framed by chunked encoding, Content-Length or the end of the connection."""
+
+    def check(size: int) -> None:
+        if size > MAX_RESPONSE_BYTES:
+            raise ValueError(f"Response of {size} bytes exceeds {MAX_RESPONSE_BYTES}")
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        received = 0
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0], 16)
+            if size == 0:
+                await reader.readline()  # Trailers are not used, only the final CRLF is expected
+                return b"".join(chunks)
+            received += size
+            check(received)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        length = int(headers["content-length"])
+        check(length)
+        return await reader.readexactly(length)
+    chunks = []
+    received = 0
+    while chunk := await reader.read(64 * 1024):
+        received += len(chunk)
+        check(received)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _get(url: str, params: Optional[dict]) -> Any:
+    """Performs one GET over a fresh connection and decodes the JSON body."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    target = parts.path or "/"
+    query = "&".join(filter(None, [parts.query, urlencode(params or {})]))
+    if query:
+        target = f"{target}?{query}"
+
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+    )
+    try:
+        writer.write(
+            (
+                f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: application/json\r\n"
+                "Accept-Encoding: identity\r\nConnection: close\r\n\r\n"
+            ).encode()
+        )
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split(" ", 2)[1])
+        headers = {
+            name.strip().lower(): value.strip()
+            for name, _, value in (line.partition(":") for line in header_lines if line)
+        }
+        if status >= 400:
+            raise HTTPStatusError(status, f"{parts.scheme}://{parts.netloc}{parts.path}")
+        return json.loads(await _read_body(reader, headers))
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, ssl.SSLError):
+            pass  # The server may drop the connection first, which is fine with Connection: close
+
+
+async def get_json(url: str, params: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT) -> Any:
+    """
+    Fetches a JSON document with asyncio streams.
+
+    Each call opens its own HTTP/1.1 connection (TLS for https URLs) and
+    closes it afterwards; the timeout covers connecting, sending and
+    reading the whole body, and cancels the request when it expires.
+
+    Args:
+        url (str): The URL to fetch.
+        params (Optional[dict]): Query parameters to append.
+        timeout (float): Seconds the whole request may take.
+
+    Returns:
+        Any: The decoded JSON body.
+
+    Raises:
+        HTTPStatusError: If the server answers with a 4xx or 5xx status.
+        asyncio.TimeoutError: If the request does not finish in time.
+        OSError: If the connection fails.
+    """
+    return await asyncio.wait_for(_get(url, params), timeout)
+
+
+@dataclass
+class AsyncIngestStats:
+    """Summary of an ingest_async() run."""
+
+    requests: int = 0
+    requests_failed: int = 0
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the run; zero when nothing was written."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+async def ingest_async(
+    fetchers: Iterable[Fetcher],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_pending: int = DEFAULT_MAX_PENDING,
+    write: Callable[[List[PriceRow]], IngestStats] = bulk_load_prices,
+) -> AsyncIngestStats:
+    """
+    Runs fetches concurrently and writes their rows in batches while fetching continues.
+
+    Up to `concurrency` fetchers run at once. Their rows go through a
+    queue of at most `max_pending` results to one writer, which collects
+    them into batches of `batch_size` rows and writes each batch on its own
+    thread, so the event loop keeps fetching during database round trips.
+    When the writer falls behind, the queue fills up and fetches wait. A
+    failed fetch is logged and counted; a failed write stops the run.
+    Written batches are passed to the write listeners and the aggregates
+    are refreshed at the end.
+
+    Args:
+        fetchers (Iterable[Fetcher]): Coroutine functions that each return a list of rows.
+        concurrency (int): The most fetches in flight at once.
+        batch_size (int): Rows per database write.
+        max_pending (int): Fetched results that may wait for the writer.
+        write (Callable[[List[PriceRow]], IngestStats]): Writes one batch; defaults to bulk_load_prices.
+
+    Returns:
+        AsyncIngestStats: Requests made and failed, and rows written.
+
+    Raises:
+        ValueError: If concurrency, batch_size or max_pending is not positive.
+        Exception: If writing a batch fails.
+    """
+    if min(concurrency, batch_size, max_pending) <= 0:
+        raise ValueError("concurrency, batch_size and max_pending must be positive")
+
+    started = time.perf_counter()
+    stats = AsyncIngestStats()
+    results: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max_pending)
+    slots = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def fetch(fetcher: Fetcher) -> None:
+        async with slots:
+            stats.requests += 1
+            try:
+                with METRICS.timer("http_fetch"):
+                    rows = await fetcher()
+            except Exception as e:
+                stats.requests_failed += 1
+                METRICS.inc("api_errors")
+                logging.error(f"Fetch failed: {e!r}")
+                return
+        await results.put(rows)  # Waits while the writer is behind
+
+    def write_batch(batch: List[PriceRow]) -> IngestStats:
+        written = write(batch)
+        notify_written(batch)
+        return written
+
+    async def drain(executor: ThreadPoolExecutor) -> None:
+        pending: List[PriceRow] = []
+
+        async def flush() -> None:
+            written = await loop.run_in_executor(executor, write_batch, pending[:])
+            pending.clear()
+            stats.rows += written.rows
+            stats.inserted += written.inserted
+            stats.updated += written.updated
+            stats.batches += 1
+
+        while True:
+            rows = await results.get()
+            if rows is _STOP:
+                break
+            pending.extend(rows)
+            if len(pending) >= batch_size:
+                await flush()
+        if pending:
+            await flush()
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-writer") as executor:
+        writer = asyncio.ensure_future(drain(executor))
+        fetches = asyncio.gather(*(fetch(fetcher) for fetcher in fetchers))
+        await asyncio.wait({writer, fetches}, return_when=asyncio.FIRST_COMPLETED)
+        if writer.done():
+            fetches.cancel()
+            await asyncio.gather(fetches, return_exceptions=True)
+            writer.result()  # Raises the write error
+        await results.put(_STOP)
+        await writer
+
+        if stats.inserted:
+            await loop.run_in_executor(executor, refresh_after_write)
+
+    stats.skipped = stats.rows - stats.inserted - stats.updated
+    stats.seconds = time.perf_counter() - started
+    logging.info(
+        f"Async ingestion finished: {stats.requests} requests ({stats.requests_failed} failed), "
+        f"{stats.rows} rows in {stats.batches} batches, {stats.inserted} inserted "
+        f"({stats.rows_per_second:,.0f} rows/s)."
+    )
+    return stats
+
@@ -0,0 +1,401 @@
+import time
+import asyncio
+import logging
+import datetime
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import DateTime, bindparam, select, text
+
+from src.data_ingestion.async_ingest import HTTPStatusError, get_json, ingest_async
+from src.data_ingestion.bulk_loader import PriceRow
+from src.data_ingestion.data_loader import BASE_CURRENCY, CURRENCIES, get_api_key
+from src.data_ingestion.symbols import series_name
+from src.db_operations.db_connection import session_scope
+from src.db_operations.models import BackfillCheckpoint, PreciousMetalPrice
+from src.db_operations.storage import truncate_expression
+
+API_BASE_URL = "https://api.metalpriceapi.com/v1"
+MAX_CHUNK_DAYS = 365  # The timeframe endpoint accepts at most one year per request
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DateRange = Tuple[datetime.date, datetime.date]
+
+
+def split_date_range(
+    start: datetime.date, end: datetime.date, chunk_days: int
+) -> List[DateRange]:
+    """
+    Splits an inclusive date range into consecutive chunks.
+
+    Args:
+        start (datetime.date): The first day of the range.
+        end (datetime.date): The last day of the range (inclusive).
+        chunk_days (int): The maximum number of days per chunk.
+
+    Returns:
+        List[DateRange]: Inclusive (start, end) pairs covering the range in order.
+
+    Raises:
+        ValueError: If the range is reversed or chunk_days is not positive.
+    """
+    if end < start:
+        raise ValueError(f"End date {end} is before start date {start}")
+    if chunk_days <= 0:
+        raise ValueError("chunk_days must be positive")
+
+    chunks = []
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + datetime.timedelta(days=chunk_days - 1), end)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + datetime.timedelta(days=1)
+    return chunks
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls to at most `rate` per second."""
+
+    def __init__(self, rate: float) -> None:
+        """
+        Initializes the RateLimiter.
+
+        Args:
+            rate (float): The maximum number of calls per second; 0 disables limiting.
+        """
+        self.interval: float = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: float = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes the next free slot and returns the seconds until it starts."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot - now
+
+    def acquire(self) -> None:
+        """Blocks until the caller may issue its next request."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Waits, without blocking the event loop, until the caller may issue its next request."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class BackfillResult:
+    """Summary of a backfill run."""
+
+    chunks_total: int = 0
+    chunks_fetched: int = 0
+    chunks_skipped: int = 0
+    rows: int = 0
+    api_calls: int = 0
+    failed: List[DateRange] = field(default_factory=list)
+
+
+class Backfiller:
+    """Loads historical prices from the MetalPrice API timeframe endpoint."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = API_BASE_URL,
+        base_currency: str = BASE_CURRENCY,
+        currencies: str = CURRENCIES,
+        chunk_days: int = MAX_CHUNK_DAYS,
+        max_workers: int = 4,
+        requests_per_second: float = 2.0,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        Initializes the Backfiller.
+
+        Args:
+            api_key (Optional[str]): The MetalPrice API key; defaults to METALS_API_KEY.
+            base_url (str): The API root, e.g. a local stub server in tests.
+            base_currency (str): The currency prices are quoted in.
+            currencies (str): Comma-separated metal codes to fetch.
+            chunk_days (int): Days per timeframe request, at most 365.
+            max_workers (int): The number of concurrent fetches.
+            requests_per_second (float): The request rate limit across all workers.
+            max_retries (int): Retries per chunk after the first attempt.
+            backoff_seconds (float): The initial retry delay, doubled on each retry.
+            timeout (float): The HTTP timeout per request in seconds.
+        """
+        self.api_key = api_key or get_api_key()
+        self.base_url = base_url.rstrip("/")
+        self.base_currency = base_currency
+        self.currencies = currencies
+        self.metals: List[str] = currencies.split(",")
+        self.series: List[str] = [series_name(metal, base_currency) for metal in self.metals]
+        self.chunk_days = min(chunk_days, MAX_CHUNK_DAYS)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+        self._api_calls = 0
+        self._calls_lock = threading.Lock()
+
+    def fetch_chunk(self, start: datetime.date, end: datetime.date) -> List[PriceRow]:
+        """
+        Fetches one date range from the timeframe endpoint, retrying with backoff.
+
+        A blocking wrapper around fetch_chunk_async() for callers without an event loop.
+
+        Args:
+            start (datetime.date): The first day of the chunk.
+            end (datetime.date): The last day of the chunk (inclusive).
+
+        Returns:
+            List[PriceRow]: One row per metal and day returned by the API.
+
+        Raises:
+            Exception: If the API reports an error or all retries are exhausted.
+        """
+        return asyncio.run(self.fetch_chunk_async(start, end))
+
+    async def fetch_chunk_async(self, start: datetime.date, end: datetime.date) -> List[PriceRow]:
+        """
+        Fetches one date range from the timeframe endpoint, retrying with backoff.
+
+        Retryable statuses, connection errors and timeouts are retried;
+        other error statuses fail the chunk at once.
+
+        Args:
+            start (datetime.date): The first day of the chunk.
+            end (datetime.date): The last day of the chunk (inclusive).
+
+        Returns:
+            List[PriceRow]: One row per metal and day returned by the API.
+
+        Raises:
+            Exception: If the API reports an error or all retries are exhausted.
+        """
+        params = {
+            "api_key": self.api_key,
+            "base": self.base_currency,
+            "currencies": self.currencies,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+        }
+        delay = self.backoff_seconds
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            with self._calls_lock:
+                self._api_calls += 1
+            try:
+                data = await get_json(f"{self.base_url}/timeframe", params, self.timeout)
+            except (HTTPStatusError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                status = e.status if isinstance(e, HTTPStatusError) else None
+                if attempt == self.max_retries or (
+                    status is not None and status not in RETRYABLE_STATUS_CODES
+                ):
+                    logging.error(f"Backfill of {start}..{end} failed: {e!r}")
+                    raise
+                logging.warning(
+                    f"Backfill of {start}..{end} failed ({e!r}); retrying in {delay:.1f}s."
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+                continue
+
+            if not data.get("success"):
+                error_message = data.get("error", "Unknown error")
+                logging.error(f"API Error: {error_message}")
+                raise Exception(f"API Error: {error_message}")
+            return self.parse_rates(data.get("rates", {}))
+
+        return []  # Unreachable; the loop either returns or raises
+
+    def parse_rates(self, rates: Dict[str, Dict[str, float]]) -> List[PriceRow]:
+        """
+        Converts a timeframe payload into price rows.
+
+        Args:
+            rates (Dict[str, Dict[str, float]]): Rates keyed by 'YYYY-MM-DD', then by symbol.
+
+        Returns:
+            List[PriceRow]: (series, price, timestamp, base_currency) rows stamped at
+                midnight of each day, one per metal.
+        """
+        rows = []
+        for day, day_rates in sorted(rates.items()):
+            timestamp = datetime.datetime.combine(
+                datetime.date.fromisoformat(day), datetime.time()
+            )
+            for metal, series in zip(self.metals, self.series):
+                # Same convention as load_data_into_db: price of one unit in the base currency
+                price = day_rates.get(f"{self.base_currency}{metal}")
+                if price is not None:
+                    rows.append((series, price, timestamp, self.base_currency))
+        return rows
+
+    def completed_ranges(self) -> Set[DateRange]:
+        """
+        Returns the ranges already recorded in the checkpoint table.
+
+        Returns:
+            Set[DateRange]: (start, end) pairs for this base currency and symbol set.
+        """
+        with session_scope() as session:
+            rows = session.execute(
+                select(BackfillCheckpoint.start_date, BackfillCheckpoint.end_date).where(
+                    BackfillCheckpoint.base_currency == self.base_currency,
+                    BackfillCheckpoint.currencies == self.currencies,
+                )
+            ).all()
+        return {(start, end) for start, end in rows}
+
+    def stored_days(self, start: datetime.date, end: datetime.date) -> Set[datetime.date]:
+        """
+        Returns the days in a range for which every metal already has a price.
+
+        Args:
+            start (datetime.date): The first day of the range.
+            end (datetime.date): The last day of the range (inclusive).
+
+        Returns:
+            Set[datetime.date]: Days fully present in 'precious_metals_prices'.
+        """
+        with session_scope() as session:
+            day = truncate_expression(session.get_bind().dialect.name, "timestamp", "day")
+            days = session.execute(
+                text(
+                    f"SELECT {day} AS day FROM {PreciousMetalPrice.__tablename__} "
+                    "WHERE metal IN :metals AND timestamp >= :start AND timestamp < :end "
+                    f"GROUP BY {day} HAVING COUNT(DISTINCT metal) = :series"
+                )
+                .bindparams(
+                    bindparam("metals", expanding=True),
+                    bindparam("start", type_=DateTime),
+                    bindparam("end", type_=DateTime),
+                )
+                .columns(day=DateTime),
+                {
+                    "metals": list(self.series),
+                    "start": datetime.datetime.combine(start, datetime.time()),
+                    "end": datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time()),
+                    "series": len(set(self.series)),
+                },
+            ).scalars()
+            return {value.date() for value in days}
+
+    def pending_chunks(self, start: datetime.date, end: datetime.date) -> List[DateRange]:
+        """
+        Returns the chunks of a range that still need to be fetched.
+
+        A chunk is skipped when it is checkpointed or when every day in it is
+        already stored, so re-running a finished backfill costs no API calls.
+
+        Args:
+            start (datetime.date): The first day of the range.
+            end (datetime.date): The last day of the range (inclusive).
+
+        Returns:
+            List[DateRange]: The chunks to fetch, in date order.
+        """
+        done = self.completed_ranges()
+        stored = self.stored_days(start, end)
+        pending = []
+        for chunk_start, chunk_end in split_date_range(start, end, self.chunk_days):
+            if (chunk_start, chunk_end) in done:
+                continue
+            days = (chunk_end - chunk_start).days + 1
+            if all(chunk_start + datetime.timedelta(days=i) in stored for i in range(days)):
+                continue
+            pending.append((chunk_start, chunk_end))
+        return pending
+
+    def _record_checkpoint(self, start: datetime.date, end: datetime.date, rows: int) -> None:
+        """Marks a chunk as ingested."""
+        with session_scope() as session:
+            session.add(
+                BackfillCheckpoint(
+                    base_currency=self.base_currency,
+                    currencies=self.currencies,
+                    start_date=start,
+                    end_date=end,
+                    rows=rows,
+                    completed_at=datetime.datetime.utcnow(),
+                )
+            )
+
+    def run(self, start: datetime.date, end: datetime.date) -> BackfillResult:
+        """
+        Backfills prices for a date range.
+
+        A blocking wrapper around run_async() for callers without an event loop.
+
+        Args:
+            start (datetime.date): The first day to backfill.
+            end (datetime.date): The last day to backfill (inclusive).
+
+        Returns:
+            BackfillResult: Counts of fetched, skipped and failed chunks.
+        """
+        return asyncio.run(self.run_async(start, end))
+
+    async def run_async(self, start: datetime.date, end: datetime.date) -> BackfillResult:
+        """
+        Backfills prices for a date range with asyncio.
+
+        Chunks are fetched concurrently under the rate limit while ingest_async()
+        writes the rows already fetched, so network waits and database writes
+        overlap. Chunks are checkpointed once all rows are stored; a run that
+        fails part way is resumed from the days already in the table.
+
+        Args:
+            start (datetime.date): The first day to backfill.
+            end (datetime.date): The last day to backfill (inclusive).
+
+        Returns:
+            BackfillResult: Counts of fetched, skipped and failed chunks.
+        """
+        result = BackfillResult(chunks_total=len(split_date_range(start, end, self.chunk_days)))
+        pending = self.pending_chunks(start, end)
+        result.chunks_skipped = result.chunks_total - len(pending)
+        logging.info(
+            f"Backfilling {start}..{end}: {len(pending)} chunks to fetch, "
+            f"{result.chunks_skipped} already present."
+        )
+        calls_before = self._api_calls
+        fetched: Dict[DateRange, int] = {}
+
+        def fetcher(chunk_start: datetime.date, chunk_end: datetime.date):
+            async def fetch() -> List[PriceRow]:
+                rows = await self.fetch_chunk_async(chunk_start, chunk_end)
+                fetched[(chunk_start, chunk_end)] = len(rows)
+                return rows
+
+            return fetch
+
+        stats = await ingest_async(
+            [fetcher(chunk_start, chunk_end) for chunk_start, chunk_end in pending], concurrency=self.max_workers
+        )
+        for (chunk_start, chunk_end), rows in fetched.items():
+            self._record_checkpoint(chunk_start, chunk_end, rows)
+        result.failed = [chunk for chunk in pending if chunk not in fetched]
+        result.chunks_fetched = len(fetched)
+        result.rows = stats.rows
+
+        result.api_calls = self._api_calls - calls_before
+        logging.info(
+            f"Backfill finished: {result.rows} rows from {result.chunks_fetched} chunks, "
+            f"{len(result.failed)} failed, {result.api_calls} API calls."
+        )
+        return result
@@ -0,0 +1,359 @@
+import io
+import sys
+import csv
+import time
+import logging
+import datetime
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import Connection
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.db_operations.db_connection import connection_scope, get_engine
+from src.db_operations.models import PreciousMetalPrice
+from src.metrics import METRICS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_BATCH_SIZE = 50_000
+CONFLICT_ACTIONS = ("nothing", "update")
+STAGING_TABLE = "precious_metals_prices_staging"
+
+DEFAULT_BASE_CURRENCY = "EUR"  # The column's server default, for rows that do not name a currency
+
+# (metal, price, timestamp) or (metal, price, timestamp, base_currency)
+PriceRow = Union[Tuple[str, float, datetime.datetime], Tuple[str, float, datetime.datetime, str]]
+
+_write_listeners: List[Callable[[List[PriceRow]], None]] = []
+
+
+def add_write_listener(listener: Callable[[List[PriceRow]], None]) -> None:
+    """
+    Registers a function to call with the rows ingestion has just written.
+
+    Lets in-process consumers such as the price cache see new prices
+    without this module importing them.
+
+    Args:
+        listener (Callable[[List[PriceRow]], None]): Called by notify_written().
+    """
+    _write_listeners.append(listener)
+
+
+def notify_written(rows: List[PriceRow]) -> None:
+    """
+    Passes rows that were just written to every registered listener.
+
+    A failing listener is logged and does not affect the write or the other listeners.
+
+    Args:
+        rows (List[PriceRow]): The rows written.
+    """
+    for listener in list(_write_listeners):
+        try:
+            listener(rows)
+        except Exception as e:
+            logging.error(f"Write listener {listener} failed: {e}")
+
+
+@dataclass
+class IngestStats:
+    """Summary of a bulk ingestion run."""
+
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0  # Existing rows whose price on_conflict='update' changed
+    skipped: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the run; zero when nothing was written."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def to_naive_utc(timestamp: datetime.datetime) -> datetime.datetime:
+    """Converts an aware timestamp to naive UTC, the way the TIMESTAMP column stores it; naive ones pass through."""
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def iter_price_rows(data: Union["pd.DataFrame", Iterable[Any]]) -> Iterator[PriceRow]:
+    """
+    Normalizes the supported inputs into (metal, price, timestamp, base_currency) tuples.
+
+    Timezone-aware timestamps are converted to naive UTC, so COPY, which
+    would drop the offset, and INSERT store the same instant.
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[Any]]): A DataFrame with 'metal', 'price'
+            and 'timestamp' columns, or an iterable of tuples or dicts with those keys;
+            'base_currency' is optional everywhere and defaults to EUR.
+
+    Yields:
+        PriceRow: One (metal, price, timestamp, base_currency) tuple per input row.
+    """
+    # Only callers that already imported pandas can pass a DataFrame, so ingest-only runs never import it
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(data, pd.DataFrame):
+        frame = data[["metal", "price", "timestamp"]]
+        bases = data["base_currency"] if "base_currency" in data.columns else [DEFAULT_BASE_CURRENCY] * len(data)
+        for (metal, price, timestamp), base in zip(frame.itertuples(index=False, name=None), bases):
+            yield metal, float(price), to_naive_utc(pd.Timestamp(timestamp).to_pydatetime()), base
+        return
+
+    for row in data:
+        if isinstance(row, dict):
+            yield (
+                row["metal"], float(row["price"]), to_naive_utc(row["timestamp"]),
+                row.get("base_currency", DEFAULT_BASE_CURRENCY),
+            )
+        elif len(row) == 3:
+            metal, price, timestamp = row
+            yield metal, float(price), to_naive_utc(timestamp), DEFAULT_BASE_CURRENCY
+        else:
+            metal, price, timestamp, base = row
+            yield metal, float(price), to_naive_utc(timestamp), base
+
+
+def iter_batches(rows: Iterable[PriceRow], batch_size: int) -> Iterator[List[PriceRow]]:
+    """
+    Splits a row stream into lists of at most batch_size rows.
+
+    Args:
+        rows (Iterable[PriceRow]): The rows to split.
+        batch_size (int): The maximum number of rows per batch.
+
+    Yields:
+        List[PriceRow]: The next batch of rows.
+    """
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def rows_to_csv(batch: List[PriceRow], buffer: io.StringIO) -> io.StringIO:
+    """
+    Serializes a batch into CSV suitable for PostgreSQL ``COPY ... FROM STDIN``.
+
+    Args:
+        batch (List[PriceRow]): The rows to serialize.
+        buffer (io.StringIO): A buffer that is cleared and reused between batches.
+
+    Returns:
+        io.StringIO: The buffer, rewound to the start.
+    """
+    buffer.seek(0)
+    buffer.truncate()
+    writer = csv.writer(buffer)
+    for row in batch:
+        base = row[3] if len(row) > 3 else DEFAULT_BASE_CURRENCY
+        writer.writerow((row[0], repr(row[1]), row[2].isoformat(sep=" "), base))
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_batches(
+    batches: Iterable[List[PriceRow]], stats: IngestStats, on_conflict: str
+) -> None:
+    """
+    Streams batches into PostgreSQL with COPY FROM STDIN over one pooled connection.
+
+    COPY cannot resolve conflicts itself, so each batch is copied into a
+    temporary staging table and merged with INSERT ... ON CONFLICT DO
+    NOTHING. With on_conflict='update' the rows the merge skipped then get
+    their changed prices in a separate UPDATE, so inserts and updates are
+    counted apart. As with upsert_batch(), the first of several rows with
+    the same key in a batch is inserted and the last one is the update.
+    """
+    table = PreciousMetalPrice.__tablename__
+    copy_sql = f"COPY {STAGING_TABLE} (metal, price, timestamp, base_currency) FROM STDIN WITH (FORMAT csv)"
+    staged = (
+        f"SELECT DISTINCT ON (metal, timestamp) metal, price, timestamp, base_currency FROM {STAGING_TABLE} "
+        "ORDER BY metal, timestamp, seq {order}"
+    )
+    merge_sql = f"""
+        INSERT INTO {table} (metal, price, timestamp, base_currency)
+        {staged.format(order="ASC")}
+        ON CONFLICT (metal, timestamp) DO NOTHING
+    """
+    update_sql = f"""
+        UPDATE {table} SET price = s.price FROM ({staged.format(order="DESC")}) s
+        WHERE {table}.metal = s.metal AND {table}.timestamp = s.timestamp
+            AND {table}.price IS DISTINCT FROM s.price
+    """
+    buffer = io.StringIO()
+
+    raw_connection = get_engine().raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (metal VARCHAR(10), price DOUBLE PRECISION, "
+            "timestamp TIMESTAMP, base_currency VARCHAR(3), seq BIGSERIAL)"  # seq keeps the input order
+        )
+        for batch in batches:
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+            cursor.copy_expert(copy_sql, rows_to_csv(batch, buffer))
+            cursor.execute(merge_sql)
+            stats.inserted += cursor.rowcount
+            if on_conflict == "update":
+                cursor.execute(update_sql)
+                stats.updated += cursor.rowcount
+            stats.rows += len(batch)
+            stats.batches += 1
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        raw_connection.commit()
+        cursor.close()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+
+
+def upsert_batch(
+    connection: Connection, batch: List[PriceRow], on_conflict: str = "nothing"
+) -> Tuple[int, int]:
+    """
+    Writes one batch with INSERT ... ON CONFLICT on the (metal, timestamp) key.
+
+    The batch is inserted with DO NOTHING first; with on_conflict='update'
+    the rows that were skipped are then written again with DO UPDATE, so
+    inserts and updates are counted apart on every dialect.
+
+    Args:
+        connection (Connection): The connection to write through.
+        batch (List[PriceRow]): The rows to write.
+        on_conflict (str): 'nothing' keeps existing rows; 'update' overwrites changed prices.
+
+    Returns:
+        Tuple[int, int]: The number of rows inserted and the number updated.
+    """
+    if not batch:
+        return 0, 0
+
+    table = PreciousMetalPrice.__table__
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on '{dialect}'")
+
+    records = [
+        {"metal": metal, "price": price, "timestamp": timestamp, "base_currency": base}
+        for metal, price, timestamp, base in batch
+    ]
+    # RETURNING yields exactly the rows that were written, skipped ones return nothing
+    written = {
+        (row.metal, row.timestamp)
+        for row in connection.execute(
+            insert(table).on_conflict_do_nothing(index_elements=["metal", "timestamp"])
+            .returning(table.c.metal, table.c.timestamp),
+            records,
+        )
+    }
+    if on_conflict != "update" or len(written) == len(records):
+        return len(written), 0
+
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["metal", "timestamp"],
+        set_={"price": statement.excluded.price},
+        where=table.c.price != statement.excluded.price,
+    )
+    # One row per key: DO UPDATE cannot change the same row twice in a statement
+    existing = {
+        (record["metal"], record["timestamp"]): record
+        for record in records
+        if (record["metal"], record["timestamp"]) not in written
+    }
+    updated = connection.execute(statement.returning(table.c.id), list(existing.values())).all()
+    return len(written), len(updated)
+
+
+def _insert_batches(
+    batches: Iterable[List[PriceRow]], stats: IngestStats, on_conflict: str
+) -> None:
+    """Writes batches with multi-row INSERT ... ON CONFLICT statements."""
+    with connection_scope() as connection:
+        for batch in batches:
+            inserted, updated = upsert_batch(connection, batch, on_conflict)
+            stats.inserted += inserted
+            stats.updated += updated
+            stats.rows += len(batch)
+            stats.batches += 1
+
+
+def bulk_load_prices(
+    data: Union["pd.DataFrame", Iterable[Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_conflict: str = "nothing",
+    use_copy: Optional[bool] = None,
+) -> IngestStats:
+    """
+    Streams price rows into the 'precious_metals_prices' table in batches.
+
+    Rows that collide with an existing (metal, timestamp) are skipped, or
+    have their price overwritten with on_conflict='update', so re-running an
+    ingestion never creates duplicates. PostgreSQL uses ``COPY FROM STDIN``
+    through psycopg2; other dialects fall back to batched inserts. Only one
+    batch is held in memory at a time, so generators of arbitrary length are
+    safe to pass in.
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[Any]]): The rows to load; see iter_price_rows().
+        batch_size (int): The number of rows written per round trip.
+        on_conflict (str): 'nothing' (default) or 'update'.
+        use_copy (Optional[bool]): Force COPY on or off; defaults to on for PostgreSQL.
+
+    Returns:
+        IngestStats: Rows received, inserted, updated and skipped, with the achieved
+            throughput.
+
+    Raises:
+        ValueError: If batch_size is not positive or on_conflict is unknown.
+        Exception: If writing a batch fails; the whole load is rolled back.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    if on_conflict not in CONFLICT_ACTIONS:
+        raise ValueError(f"on_conflict must be one of {CONFLICT_ACTIONS}")
+
+    stats = IngestStats()
+    batches = iter_batches(iter_price_rows(data), batch_size)
+    started = time.perf_counter()
+
+    if use_copy is None:
+        use_copy = get_engine().dialect.name == "postgresql"
+
+    try:
+        if use_copy:
+            _copy_batches(batches, stats, on_conflict)
+        else:
+            _insert_batches(batches, stats, on_conflict)
+    except Exception as e:
+        METRICS.observe("db_write", time.perf_counter() - started, error=True)
+        logging.error(f"Bulk load failed after {stats.rows} rows: {e}")
+        raise
+
+    stats.skipped = stats.rows - stats.inserted - stats.updated
+    stats.seconds = time.perf_counter() - started
+    METRICS.observe("db_write", stats.seconds)
+    METRICS.add_rows("db_write", stats.rows)
+    METRICS.inc("duplicate_rows", stats.skipped)
+    logging.info(
+        f"Bulk loaded {stats.rows} rows in {stats.batches} batches: "
+        f"{stats.inserted} inserted, {stats.updated} updated, {stats.skipped} skipped "
+        f"({stats.rows_per_second:,.0f} rows/s)."
+    )
+    return stats
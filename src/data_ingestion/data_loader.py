@@ -1,108 +1,349 @@
-import requests
+import asyncio
 import datetime
 import os
 import logging
-from typing import Dict
+from typing import Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from src.data_ingestion.async_ingest import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_TIMEOUT,
+    AsyncIngestStats,
+    Fetcher,
+    HTTPStatusError,
+    get_json,
+    ingest_async,
+)
+from src.data_ingestion.bulk_loader import IngestStats, PriceRow, bulk_load_prices, notify_written
+from src.data_ingestion.symbols import (
+    DEFAULT_BASE_CURRENCY,
+    DEFAULT_SYMBOLS,
+    MAX_SYMBOLS_PER_REQUEST,
+    SymbolRegistry,
+    series_name,
+)
+from src.db_operations.aggregates import refresh_after_write
+from src.metrics import METRICS
 
-from src.db_operations.db_connection import create_db_engine
-from src.db_operations.models import PreciousMetalPrice
-from src.log_info import setup_logging
+API_URL = "https://api.metalpriceapi.com/v1/latest"
+BASE_CURRENCY = DEFAULT_BASE_CURRENCY
+CURRENCIES = ",".join(DEFAULT_SYMBOLS)
 
-setup_logging()
-load_dotenv()
 
-API_KEY = os.getenv("METALS_API_KEY")
-API_URL = "https://api.metalpriceapi.com/v1/latest"
-BASE_CURRENCY = "EUR"
-CURRENCIES = "XAU,XAG,XPT,XPD"
+def get_api_key() -> Optional[str]:
+    """Returns the MetalPrice API key from ``METALS_API_KEY``, read at call time so config can load first."""
+    return os.getenv("METALS_API_KEY")
 
 
-def fetch_metal_prices() -> Dict[str, float]:
+async def fetch_snapshot(
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    api_key: Optional[str] = None,
+    url: str = API_URL,
+    base_currency: str = BASE_CURRENCY,
+    currencies: str = CURRENCIES,
+) -> Tuple[Dict[str, float], datetime.datetime]:
     """
-    Fetches the latest metal prices from the MetalPrice API.
+    Fetches the latest metal prices and their quote time from the MetalPrice API.
+
+    Args:
+        timeout (Optional[float]): The HTTP timeout in seconds; None waits indefinitely.
+        api_key (Optional[str]): The API key; defaults to METALS_API_KEY.
+        url (str): The latest-prices endpoint.
+        base_currency (str): The currency prices are quoted in.
+        currencies (str): Comma-separated metal codes to fetch.
 
     Returns:
-        Dict[str, float]: A dictionary with metal codes (e.g., 'XAU', 'XAG') 
-                          as keys and their respective prices as values.
+        Tuple[Dict[str, float], datetime.datetime]: The rates keyed by symbol, and
+            the API's quote timestamp as a naive UTC datetime (the request time
+            if the response carries none).
 
     Raises:
         Exception: If there is an error in fetching the data or an issue 
                    with the API response.
     """
     params = {
-        "api_key": API_KEY,
-        "base": BASE_CURRENCY,
-        "currencies": CURRENCIES,
+        "api_key": api_key or get_api_key(),
+        "base": base_currency,
+        "currencies": currencies,
     }
 
-    logging.info(f"Sending request to {API_URL} with params: {params}")
+    # The API key is a secret, so only the query itself is logged
+    logging.info(f"Requesting {currencies} in {base_currency} from {url}")
 
     try:
-        # Send the request and log response status and content
-        response = requests.get(API_URL, params=params)
-        response.raise_for_status()  # Raises an HTTPError for bad responses
-        logging.info(f"Received response status: {response.status_code}")
-
-        # Log the response JSON data
-        data = response.json()
-        logging.info(f"Response data: {data}")
-
-        if data.get("success"):
-            logging.info("Successfully fetched metal prices.")
-            return data.get("rates")
-        else:
-            error_message = data.get("error", "Unknown error")
-            logging.error(f"API Error: {error_message}")
-            raise Exception(f"API Error: {error_message}")
-    except requests.exceptions.RequestException as e:
-        logging.error(f"HTTP Error: {e}")
+        data = await get_json(url, params, timeout)
+    except (HTTPStatusError, OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+        logging.error(f"HTTP Error: {e!r}")
         raise  # Re-raise the exception to stop execution
+    return parse_snapshot(data)
+
+
+def fetch_latest_snapshot(
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    api_key: Optional[str] = None,
+    url: str = API_URL,
+    base_currency: str = BASE_CURRENCY,
+    currencies: str = CURRENCIES,
+) -> Tuple[Dict[str, float], datetime.datetime]:
+    """
+    Blocking wrapper around fetch_snapshot() for callers without an event loop.
+
+    Args:
+        timeout (Optional[float]): The HTTP timeout in seconds; None waits indefinitely.
+        api_key (Optional[str]): The API key; defaults to METALS_API_KEY.
+        url (str): The latest-prices endpoint.
+        base_currency (str): The currency prices are quoted in.
+        currencies (str): Comma-separated metal codes to fetch.
+
+    Returns:
+        Tuple[Dict[str, float], datetime.datetime]: The rates and quote timestamp, see fetch_snapshot().
+    """
+    with METRICS.timer("http_fetch"):
+        return asyncio.run(fetch_snapshot(timeout, api_key, url, base_currency, currencies))
+
+
+def parse_snapshot(data: dict) -> Tuple[Dict[str, float], datetime.datetime]:
+    """
+    Extracts the rates and quote time from a latest-prices payload.
+
+    Args:
+        data (dict): The decoded API response.
+
+    Returns:
+        Tuple[Dict[str, float], datetime.datetime]: The rates keyed by symbol, and
+            the quote timestamp as a naive UTC datetime (now if the payload has none).
+
+    Raises:
+        Exception: If the API reports an error.
+    """
+    # Payloads are only formatted when debug logging is on
+    logging.debug("Response data: %s", data)
+
+    if data.get("success"):
+        rates = data.get("rates")
+        logging.info(f"Successfully fetched {len(rates)} metal prices.")
+        METRICS.add_rows("http_fetch", len(rates))
+        quoted_at = data.get("timestamp")
+        if quoted_at is not None:
+            timestamp = datetime.datetime.fromtimestamp(
+                quoted_at, datetime.timezone.utc
+            ).replace(tzinfo=None)
+        else:
+            timestamp = datetime.datetime.utcnow()
+        return rates, timestamp
+    else:
+        error_message = data.get("error", "Unknown error")
+        logging.error(f"API Error: {error_message}")
+        METRICS.inc("api_errors")
+        raise Exception(f"API Error: {error_message}")
+
+
+def fetch_metal_prices() -> Dict[str, float]:
+    """
+    Fetches the latest metal prices from the MetalPrice API.
+
+    Returns:
+        Dict[str, float]: A dictionary with metal codes (e.g., 'XAU', 'XAG') 
+                          as keys and their respective prices as values.
+
+    Raises:
+        Exception: If there is an error in fetching the data or an issue 
+                   with the API response.
+    """
+    rates, _ = fetch_latest_snapshot()
+    return rates
+
+
+def snapshot_rows(
+    rates: Dict[str, float],
+    timestamp: datetime.datetime,
+    base_currency: str = BASE_CURRENCY,
+    metals: Optional[List[str]] = None,
+) -> List[PriceRow]:
+    """
+    Converts a latest-prices payload into price rows.
+
+    Args:
+        rates (Dict[str, float]): Rates keyed by symbol, e.g. 'EURXAU'.
+        timestamp (datetime.datetime): The quote time every row is stamped with.
+        base_currency (str): The currency prefix of the rate keys.
+        metals (Optional[List[str]]): The metal codes to keep; defaults to CURRENCIES.
+
+    Returns:
+        List[PriceRow]: One (series, price, timestamp, base_currency) row per metal present
+            in the rates; the series is the bare code in EUR (e.g. 'XAU'), see series_name().
+    """
+    rows = []
+    # '<base><metal>' keys hold the price of one unit of the metal in the base currency
+    for metal in metals or CURRENCIES.split(","):
+        price = rates.get(f"{base_currency}{metal}")
+        if price is not None:
+            rows.append((series_name(metal, base_currency), price, timestamp, base_currency))
+    return rows
+
+
+def registry_fetchers(
+    symbols: SymbolRegistry,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    api_key: Optional[str] = None,
+    url: str = API_URL,
+    max_symbols: int = MAX_SYMBOLS_PER_REQUEST,
+) -> List[Fetcher]:
+    """
+    Builds one latest-quote fetcher per API request a registry needs.
+
+    One request is made per base currency and max_symbols symbols, so
+    hundreds of symbols cost a handful of calls rather than one each.
+
+    Args:
+        symbols (SymbolRegistry): The symbols to fetch.
+        timeout (Optional[float]): Seconds each request may take.
+        api_key (Optional[str]): The API key; defaults to METALS_API_KEY.
+        url (str): The latest-prices endpoint.
+        max_symbols (int): The most symbols requested at once.
+
+    Returns:
+        List[Fetcher]: Fetchers in registry order, see ingest_async().
+    """
+    api_key = api_key or get_api_key()
+
+    def fetcher(base_currency: str, codes: List[str]) -> Fetcher:
+        async def fetch() -> List[PriceRow]:
+            rates, timestamp = await fetch_snapshot(timeout, api_key, url, base_currency, ",".join(codes))
+            return snapshot_rows(rates, timestamp, base_currency, codes)
+
+        return fetch
+
+    return [
+        fetcher(base_currency, [symbol.symbol for symbol in batch])
+        for base_currency, batch in symbols.batches(max_symbols)
+    ]
+
+
+def fetch_registry_rows(
+    symbols: SymbolRegistry,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    api_key: Optional[str] = None,
+    url: str = API_URL,
+    max_symbols: int = MAX_SYMBOLS_PER_REQUEST,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[PriceRow]:
+    """
+    Fetches the latest quote of every symbol in a registry, without storing it.
+
+    Runs the registry_fetchers() requests concurrently on a private event loop.
+
+    Args:
+        symbols (SymbolRegistry): The symbols to fetch.
+        timeout (Optional[float]): The HTTP timeout per request in seconds.
+        api_key (Optional[str]): The API key; defaults to METALS_API_KEY.
+        url (str): The latest-prices endpoint.
+        max_symbols (int): The most symbols requested at once.
+        concurrency (int): The most requests in flight at once.
 
+    Returns:
+        List[PriceRow]: The rows of every batch, in registry order.
 
-def load_data_into_db() -> None:
+    Raises:
+        Exception: If any request fails or the API reports an error.
+    """
+    fetchers = registry_fetchers(symbols, timeout, api_key, url, max_symbols)
+
+    async def fetch_all() -> List[List[PriceRow]]:
+        slots = asyncio.Semaphore(concurrency)
+
+        async def fetch(fetcher: Fetcher) -> List[PriceRow]:
+            async with slots:
+                return await fetcher()
+
+        return await asyncio.gather(*(fetch(fetcher) for fetcher in fetchers))
+
+    with METRICS.timer("http_fetch"):
+        results = asyncio.run(fetch_all())
+    rows = [row for result in results for row in result]
+    logging.info(f"Fetched {len(rows)} prices for {len(symbols)} symbols in {len(fetchers)} requests.")
+    return rows
+
+
+def ingest_registry(
+    symbols: SymbolRegistry,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    api_key: Optional[str] = None,
+    url: str = API_URL,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    write: Callable[[List[PriceRow]], IngestStats] = bulk_load_prices,
+) -> AsyncIngestStats:
+    """
+    Fetches and stores the latest quote of every symbol in a registry.
+
+    A blocking wrapper around ingest_async() for callers without an event loop.
+
+    Args:
+        symbols (SymbolRegistry): The symbols to fetch.
+        timeout (Optional[float]): Seconds each request may take.
+        api_key (Optional[str]): The API key; defaults to METALS_API_KEY.
+        url (str): The latest-prices endpoint.
+        concurrency (int): The most requests in flight at once.
+        write (Callable[[List[PriceRow]], IngestStats]): Writes one batch; defaults to bulk_load_prices.
+
+    Returns:
+        AsyncIngestStats: Requests made and failed, and rows written.
+    """
+    return asyncio.run(
+        ingest_async(registry_fetchers(symbols, timeout, api_key, url), concurrency=concurrency, write=write)
+    )
+
+
+def load_data_into_db(
+    source: Optional[Callable[[], List[PriceRow]]] = None, symbols: Optional[SymbolRegistry] = None
+) -> IngestStats:
     """
     Fetches metal prices and loads them into the database.
 
-    This function connects to the database, retrieves the metal prices using 
-    the fetch_metal_prices function, and inserts the data into the 
-    'PreciousMetalPrice' table.
+    API requests go through ingest_registry(), so each base currency is
+    fetched concurrently and written as its response arrives; rows from the
+    requests that succeeded are kept when another one fails. Prices are
+    stamped with the API's quote timestamp and written with
+    INSERT ... ON CONFLICT DO NOTHING on (metal, timestamp), so retrying a run
+    or fetching the same quote twice does not create duplicate rows. The
+    latest-price, rollup and rolling-statistics tables are refreshed after
+    new rows are stored, and the rows are passed to the write listeners
+    (such as the in-process price cache).
+
+    Args:
+        source (Optional[Callable[[], List[PriceRow]]]): A PriceSource (see
+            src.data_ingestion.sources) to take one batch from instead of the API.
+        symbols (Optional[SymbolRegistry]): The symbols to fetch from the API; defaults
+            to SymbolRegistry.load().
+
+    Returns:
+        IngestStats: How many rows were inserted and how many were skipped as duplicates.
 
     Raises:
-        Exception: If there is an issue saving data to the database.
+        Exception: If an API request fails or there is an issue saving data to the database.
     """
     try:
-        rates = fetch_metal_prices()
-
-        # Prepare the database connection
-        engine = create_db_engine()
-        Session = sessionmaker(bind=engine)
-        session = Session()
-
-        # Iterate over the desired metals and store only the metal code (e.g., 'XAU')
-        for metal in ["EURXAU", "EURXAG", "EURXPT", "EURXPD"]:
-            price = rates.get(metal)
-            if price is not None:
-                # Strip the 'EUR' prefix from the metal code
-                metal_code = metal.replace("EUR", "")
-
-                # Create a new PreciousMetalPrice entry
-                metal_price = PreciousMetalPrice(
-                    metal=metal_code,
-                    price=price,
-                    timestamp=datetime.datetime.utcnow(),
-                )
-                session.add(metal_price)
-
-        # Commit the transaction
-        session.commit()
-        logging.info("Metal prices saved to database successfully.")
+        if source is None:
+            result = ingest_registry(
+                symbols or SymbolRegistry.load(), write=lambda rows: bulk_load_prices(rows, use_copy=False)
+            )
+            if result.requests_failed:
+                raise Exception(f"{result.requests_failed} of {result.requests} API requests failed")
+            return IngestStats(
+                rows=result.rows, inserted=result.inserted, updated=result.updated, skipped=result.skipped,
+                batches=result.batches, seconds=result.seconds,
+            )
+
+        rows = source()
+        stats = bulk_load_prices(rows, use_copy=False)
+        notify_written(rows)
+        logging.info(
+            f"Metal prices saved to database successfully "
+            f"({stats.inserted} inserted, {stats.skipped} skipped)."
+        )
+        if stats.inserted:
+            refresh_after_write()
+        return stats
 
     except Exception as e:
         logging.error(f"Failed to save metal prices: {e}")
         raise  # Re-raise the exception to stop execution
-    finally:
-        # Close the session
-        session.close()
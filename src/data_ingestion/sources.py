@@ -0,0 +1,369 @@
+import time
+import logging
+import datetime
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from src.data_ingestion.bulk_loader import PriceRow
+from src.data_ingestion.data_loader import API_URL, BASE_CURRENCY, CURRENCIES, DEFAULT_TIMEOUT, fetch_registry_rows
+from src.data_ingestion.symbols import SymbolRegistry, series_name
+
+DEFAULT_SYMBOLS = tuple(CURRENCIES.split(","))
+DEFAULT_INITIAL_PRICES = {"XAU": 2400.0, "XAG": 29.0, "XPT": 950.0, "XPD": 1000.0}
+
+
+class PriceSource(ABC):
+    """Produces (metal, price, timestamp[, base_currency]) rows for ingestion.
+
+    fetch() returns the next batch: the latest quote for a live API, the
+    next rows of a file for a replay, the next ticks of a simulation. An
+    empty batch means a finite source is exhausted. Sources are callable, so
+    one can be passed wherever a poll function is expected, such as
+    IngestionDaemon(source=...).
+    """
+
+    @abstractmethod
+    def fetch(self) -> List[PriceRow]:
+        """
+        Returns the next batch of rows.
+
+        Returns:
+            List[PriceRow]: The rows, empty once a finite source is exhausted.
+        """
+
+    def __call__(self) -> List[PriceRow]:
+        return self.fetch()
+
+    def iter_rows(self) -> Iterator[PriceRow]:
+        """
+        Yields rows until the source is exhausted, for bulk_load_prices().
+
+        Yields:
+            PriceRow: The next row.
+        """
+        while True:
+            batch = self.fetch()
+            if not batch:
+                return
+            yield from batch
+
+    def close(self) -> None:
+        """Releases connections or open files; the default has none."""
+
+    def __enter__(self) -> "PriceSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class Pacer:
+    """Throttles a producer to at most `rate` rows per second on average."""
+
+    def __init__(self, rate: Optional[float]) -> None:
+        """
+        Initializes the Pacer.
+
+        Args:
+            rate (Optional[float]): Rows per second; None or 0 disables throttling.
+        """
+        self.rate = rate
+        self._started: Optional[float] = None
+        self._emitted = 0
+
+    def wait(self, rows: int) -> None:
+        """Sleeps until emitting the given number of further rows keeps within the rate."""
+        if not self.rate:
+            return
+        if self._started is None:
+            self._started = time.monotonic()
+        self._emitted += rows
+        delay = self._started + self._emitted / self.rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class MetalPriceAPISource(PriceSource):
+    """The latest quotes of a symbol registry from the MetalPrice API, requested concurrently."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        url: str = API_URL,
+        base_currency: Optional[str] = None,
+        currencies: Optional[str] = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        symbols: Optional[SymbolRegistry] = None,
+        max_workers: int = 4,
+    ) -> None:
+        """
+        Initializes the MetalPriceAPISource.
+
+        Args:
+            api_key (Optional[str]): The MetalPrice API key; defaults to METALS_API_KEY.
+            url (str): The latest-prices endpoint, e.g. a local stub server in tests.
+            base_currency (Optional[str]): With currencies, fetch just these codes in this
+                currency (EUR if None) instead of a registry.
+            currencies (Optional[str]): Comma-separated metal codes to fetch.
+            timeout (Optional[float]): The HTTP timeout per request in seconds.
+            symbols (Optional[SymbolRegistry]): The symbols to fetch; defaults to
+                SymbolRegistry.load() on the first fetch, unless base_currency or
+                currencies is given.
+            max_workers (int): The most requests in flight when the registry spans
+                several base currencies.
+        """
+        if symbols is None and (base_currency or currencies):
+            symbols = SymbolRegistry.from_codes(currencies or CURRENCIES, base_currency or BASE_CURRENCY)
+        self.symbols = symbols
+        self.api_key = api_key
+        self.url = url
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+    def fetch(self) -> List[PriceRow]:
+        """
+        Fetches the latest quotes, one row per symbol, in as few requests as the registry allows.
+
+        Returns:
+            List[PriceRow]: The rows, stamped with the API's quote time.
+
+        Raises:
+            Exception: If a request fails or the API reports an error.
+        """
+        if self.symbols is None:
+            # Loaded on first use, after the entry point has initialized the database
+            self.symbols = SymbolRegistry.load()
+        return fetch_registry_rows(
+            self.symbols,
+            timeout=self.timeout,
+            api_key=self.api_key,
+            url=self.url,
+            concurrency=self.max_workers,
+        )
+
+
+class ReplaySource(PriceSource):
+    """Replays recorded prices from a CSV or Parquet file with 'metal', 'price' and 'timestamp' columns.
+
+    An optional 'base_currency' column is replayed too; rows without one are in EUR.
+
+    The file is read in record batches, so files larger than memory can be
+    replayed; rows are returned in file order.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        batch_size: int = 10_000,
+        rate: Optional[float] = None,
+        loop: bool = False,
+    ) -> None:
+        """
+        Initializes the ReplaySource.
+
+        Args:
+            path (str | Path): A '.csv' or '.parquet' file.
+            batch_size (int): The maximum number of rows per fetch().
+            rate (Optional[float]): Rows per second to replay at; None replays as fast as possible.
+            loop (bool): Start over at the end of the file instead of stopping.
+
+        Raises:
+            ValueError: If the file type is not supported.
+        """
+        self.path = Path(path)
+        if self.path.suffix.lower() not in (".csv", ".parquet"):
+            raise ValueError(f"Unsupported replay file type: '{self.path.suffix}'")
+        self.batch_size = batch_size
+        self.loop = loop
+        self.pacer = Pacer(rate)
+        self._batches: Optional[Iterator[pa.RecordBatch]] = None
+        self._pending: List[PriceRow] = []
+
+    def _open(self) -> Iterator[pa.RecordBatch]:
+        """Opens the file as a stream of record batches of the price columns."""
+        columns = ["metal", "price", "timestamp", "base_currency"]
+        if self.path.suffix.lower() == ".parquet":
+            file = pq.ParquetFile(self.path)
+            present = [column for column in columns if column in file.schema_arrow.names]
+            return file.iter_batches(batch_size=self.batch_size, columns=present)
+        reader = pa_csv.open_csv(
+            self.path,
+            read_options=pa_csv.ReadOptions(block_size=1 << 20),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                include_missing_columns=True,
+                column_types={
+                    "metal": pa.string(), "price": pa.float64(),
+                    "timestamp": pa.timestamp("us"), "base_currency": pa.string(),
+                },
+            ),
+        )
+        return iter(reader)
+
+    def fetch(self) -> List[PriceRow]:
+        """
+        Returns the next rows of the file.
+
+        Returns:
+            List[PriceRow]: Up to batch_size rows, empty at the end of a non-looping replay.
+        """
+        if self._batches is None:
+            self._batches = self._open()
+
+        while len(self._pending) < self.batch_size:
+            batch = next(self._batches, None)
+            if batch is None:
+                if not self.loop:
+                    break
+                self._batches = self._open()
+                batch = next(self._batches, None)
+                if batch is None:  # Empty file
+                    break
+            metals = batch.column("metal").to_pylist()
+            prices = batch.column("price").to_pylist()
+            timestamps = batch.column("timestamp").cast(pa.timestamp("us")).to_pylist()
+            if "base_currency" in batch.schema.names:
+                bases = [base or BASE_CURRENCY for base in batch.column("base_currency").to_pylist()]
+            else:
+                bases = [BASE_CURRENCY] * len(metals)
+            self._pending.extend(zip(metals, prices, timestamps, bases))
+
+        rows, self._pending = self._pending[: self.batch_size], self._pending[self.batch_size:]
+        self.pacer.wait(len(rows))
+        return rows
+
+
+class SyntheticSource(PriceSource):
+    """Geometric random-walk prices for any number of symbols and base currencies.
+
+    Every fetch() advances all series by ticks_per_fetch steps and is
+    generated with vectorized NumPy, so millions of rows per second are
+    possible; rate throttles the output for soak tests. Series are named as
+    the symbol registry names them: the bare symbol in EUR, '<base><symbol>'
+    (e.g. 'USDXAU') in any other base currency.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str] = DEFAULT_SYMBOLS,
+        base_currencies: Sequence[str] = (BASE_CURRENCY,),
+        start: Optional[datetime.datetime] = None,
+        step: datetime.timedelta = datetime.timedelta(seconds=1),
+        ticks_per_fetch: int = 1,
+        total_ticks: Optional[int] = None,
+        rate: Optional[float] = None,
+        volatility: float = 1e-4,
+        initial_prices: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = 0,
+    ) -> None:
+        """
+        Initializes the SyntheticSource.
+
+        Args:
+            symbols (Sequence[str]): The symbols to simulate.
+            base_currencies (Sequence[str]): The currencies each symbol is quoted in.
+            start (Optional[datetime.datetime]): The first tick's timestamp; defaults to now (UTC).
+            step (datetime.timedelta): The time between consecutive ticks of a series.
+            ticks_per_fetch (int): Ticks per series returned by each fetch().
+            total_ticks (Optional[int]): Ticks per series after which the source is
+                exhausted; None never stops.
+            rate (Optional[float]): Rows per second to emit at; None is unthrottled.
+            volatility (float): The standard deviation of each tick's log return.
+            initial_prices (Optional[Dict[str, float]]): Starting price per symbol; unknown
+                symbols start at 100.
+            seed (Optional[int]): The random seed, for reproducible runs.
+        """
+        self.series: List[str] = [series_name(symbol, base) for base in base_currencies for symbol in symbols]
+        self.bases: List[str] = [base for base in base_currencies for _ in symbols]
+        initial_prices = {**DEFAULT_INITIAL_PRICES, **(initial_prices or {})}
+        self.prices = np.array(
+            [initial_prices.get(symbol, 100.0) for _ in base_currencies for symbol in symbols], dtype=float
+        )
+        self.next_timestamp = np.datetime64(start or datetime.datetime.utcnow().replace(microsecond=0), "us")
+        self.step = np.timedelta64(step, "us")
+        self.ticks_per_fetch = ticks_per_fetch
+        self.remaining = total_ticks
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self.pacer = Pacer(rate)
+
+    def fetch(self) -> List[PriceRow]:
+        """
+        Advances every series and returns the new ticks, ordered by timestamp.
+
+        Returns:
+            List[PriceRow]: ticks_per_fetch (series, price, timestamp, base_currency) rows per
+                series, empty once total_ticks is reached.
+        """
+        ticks = self.ticks_per_fetch if self.remaining is None else min(self.ticks_per_fetch, self.remaining)
+        if ticks <= 0:
+            return []
+
+        returns = self.rng.normal(0.0, self.volatility, size=(ticks, len(self.series)))
+        paths = self.prices * np.exp(np.cumsum(returns, axis=0))
+        self.prices = paths[-1]
+        timestamps = self.next_timestamp + self.step * np.arange(ticks)
+        self.next_timestamp = timestamps[-1] + self.step
+        if self.remaining is not None:
+            self.remaining -= ticks
+
+        rows = list(
+            zip(
+                np.tile(self.series, ticks).tolist(),
+                paths.ravel().tolist(),
+                np.repeat(timestamps, len(self.series)).astype("datetime64[us]").tolist(),
+                self.bases * ticks,
+            )
+        )
+        self.pacer.wait(len(rows))
+        return rows
+
+
+def write_replay_file(rows: Iterable[PriceRow], path: str | Path, batch_size: int = 100_000) -> int:
+    """
+    Records rows, e.g. from a SyntheticSource, as a file a ReplaySource can replay.
+
+    Args:
+        rows (Iterable[PriceRow]): The rows to write.
+        path (str | Path): A '.csv' or '.parquet' file.
+        batch_size (int): Rows converted and written at a time.
+
+    Returns:
+        int: The number of rows written.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in (".csv", ".parquet"):
+        raise ValueError(f"Unsupported replay file type: '{path.suffix}'")
+
+    schema = pa.schema([
+        ("metal", pa.string()), ("price", pa.float64()),
+        ("timestamp", pa.timestamp("us")), ("base_currency", pa.string()),
+    ])
+    writer = pq.ParquetWriter(path, schema) if suffix == ".parquet" else pa_csv.CSVWriter(path, schema)
+    written = 0
+    iterator = iter(rows)
+    try:
+        while True:
+            chunk = [row for _, row in zip(range(batch_size), iterator)]
+            if not chunk:
+                break
+            metals, prices, timestamps, bases = zip(*(row if len(row) == 4 else (*row, BASE_CURRENCY) for row in chunk))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(metals), pa.array(prices), pa.array(timestamps, pa.timestamp("us")), pa.array(bases)],
+                schema=schema,
+            ))
+            written += len(chunk)
+    finally:
+        writer.close()
+    logging.info(f"Wrote {written} rows to {path}.")
+    return written
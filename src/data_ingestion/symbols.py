@@ -0,0 +1,239 @@
+import os
+import csv
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from src.db_operations.db_connection import session_scope
+from src.db_operations.models import TrackedSymbol
+
+DEFAULT_BASE_CURRENCY = "EUR"
+DEFAULT_SYMBOLS = ("XAU", "XAG", "XPT", "XPD")
+MAX_SYMBOLS_PER_REQUEST = 100  # Keeps the 'currencies' query parameter well under URL length limits
+SERIES_NAME_LENGTH = 10  # Width of precious_metals_prices.metal
+
+
+def series_name(symbol: str, base_currency: str) -> str:
+    """
+    Returns the name a symbol's prices are stored and modelled under.
+
+    Prices in the default base currency keep the bare symbol, as they always
+    have; other bases use the MetalPrice API's own '<base><symbol>' key,
+    e.g. 'USDXAU', so one symbol can be tracked in several currencies.
+
+    Args:
+        symbol (str): The API code, e.g. 'XAU'.
+        base_currency (str): The currency the symbol is quoted in.
+
+    Returns:
+        str: The series name.
+    """
+    return symbol if base_currency == DEFAULT_BASE_CURRENCY else f"{base_currency}{symbol}"
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """One symbol quoted in one base currency."""
+
+    symbol: str
+    base_currency: str = DEFAULT_BASE_CURRENCY
+    name: Optional[str] = None
+
+    @property
+    def series(self) -> str:
+        """The series name the symbol's prices are stored under."""
+        return series_name(self.symbol, self.base_currency)
+
+
+class SymbolRegistry:
+    """The symbols to ingest and model, grouped by base currency for batched API calls.
+
+    The registry is read from a CSV file (columns 'symbol', 'base_currency'
+    and optionally 'name' and 'enabled'), from the 'tracked_symbols' table,
+    or falls back to the four precious metals in EUR; see load(). Adding a
+    symbol is a line in the file, not a code change, and the MetalPrice API
+    is called once per base currency and MAX_SYMBOLS_PER_REQUEST symbols,
+    however many symbols there are.
+    """
+
+    def __init__(self, symbols: Iterable[Symbol]) -> None:
+        """
+        Initializes the SymbolRegistry.
+
+        Args:
+            symbols (Iterable[Symbol]): The symbols; duplicates are dropped, order is kept.
+
+        Raises:
+            ValueError: If a symbol or base currency is malformed or a series name is too long.
+        """
+        self.symbols: List[Symbol] = []
+        seen = set()
+        for entry in symbols:
+            symbol = Symbol(entry.symbol.strip().upper(), entry.base_currency.strip().upper(), entry.name)
+            if not symbol.symbol.isalnum() or len(symbol.base_currency) != 3 or not symbol.base_currency.isalpha():
+                raise ValueError(f"Invalid symbol '{entry.symbol}' in base currency '{entry.base_currency}'")
+            if len(symbol.series) > SERIES_NAME_LENGTH:
+                raise ValueError(f"Series name '{symbol.series}' is longer than {SERIES_NAME_LENGTH} characters")
+            if symbol.series not in seen:
+                seen.add(symbol.series)
+                self.symbols.append(symbol)
+
+    def __iter__(self) -> Iterator[Symbol]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def tickers(self) -> List[str]:
+        """The series names, in registry order; what Model trains on."""
+        return [symbol.series for symbol in self.symbols]
+
+    def by_base(self) -> Dict[str, List[Symbol]]:
+        """
+        Groups the symbols by base currency.
+
+        Returns:
+            Dict[str, List[Symbol]]: The symbols per base currency, in registry order.
+        """
+        groups: Dict[str, List[Symbol]] = {}
+        for symbol in self.symbols:
+            groups.setdefault(symbol.base_currency, []).append(symbol)
+        return groups
+
+    def batches(self, max_symbols: int = MAX_SYMBOLS_PER_REQUEST) -> List[Tuple[str, List[Symbol]]]:
+        """
+        Splits the registry into the fewest API requests.
+
+        Args:
+            max_symbols (int): The most symbols one request may ask for.
+
+        Returns:
+            List[Tuple[str, List[Symbol]]]: (base currency, symbols) per request.
+        """
+        return [
+            (base, symbols[start:start + max_symbols])
+            for base, symbols in self.by_base().items()
+            for start in range(0, len(symbols), max_symbols)
+        ]
+
+    @classmethod
+    def from_codes(cls, currencies: str, base_currency: str = DEFAULT_BASE_CURRENCY) -> "SymbolRegistry":
+        """
+        Builds a registry from a comma-separated list of codes in one base currency.
+
+        Args:
+            currencies (str): e.g. 'XAU,XAG'.
+            base_currency (str): The currency every symbol is quoted in.
+
+        Returns:
+            SymbolRegistry: The registry.
+        """
+        return cls(Symbol(code, base_currency) for code in currencies.split(",") if code.strip())
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "SymbolRegistry":
+        """
+        Reads a registry from a CSV file.
+
+        Args:
+            path (str | Path): A CSV file with a header row; 'base_currency' defaults
+                to EUR and rows with 'enabled' set to 0/false/no are skipped.
+
+        Returns:
+            SymbolRegistry: The registry.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If a row is malformed.
+        """
+        with open(path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        return cls(
+            Symbol(row["symbol"], row.get("base_currency") or DEFAULT_BASE_CURRENCY, row.get("name") or None)
+            for row in rows
+            if (row.get("enabled") or "true").strip().lower() not in ("0", "false", "no")
+        )
+
+    @classmethod
+    def from_db(cls) -> "SymbolRegistry":
+        """
+        Reads the enabled symbols from the 'tracked_symbols' table.
+
+        Returns:
+            SymbolRegistry: The registry, empty if the table has no enabled rows.
+        """
+        with session_scope() as session:
+            rows = session.execute(
+                select(TrackedSymbol.symbol, TrackedSymbol.base_currency, TrackedSymbol.name)
+                .where(TrackedSymbol.enabled.is_(True))
+                .order_by(TrackedSymbol.id)
+            ).all()
+        return cls(Symbol(symbol, base, name) for symbol, base, name in rows)
+
+    @classmethod
+    def default(cls) -> "SymbolRegistry":
+        """Returns the four precious metals in EUR, the registry used before any is configured."""
+        return cls(Symbol(code) for code in DEFAULT_SYMBOLS)
+
+    @classmethod
+    def load(cls, path: Optional[str | Path] = None) -> "SymbolRegistry":
+        """
+        Loads the configured registry.
+
+        The first of these wins: the given file, the file named by
+        SYMBOLS_FILE, the enabled rows of 'tracked_symbols', the defaults.
+
+        Args:
+            path (Optional[str | Path]): A CSV file to read.
+
+        Returns:
+            SymbolRegistry: The registry.
+        """
+        path = path or os.getenv("SYMBOLS_FILE")
+        if path:
+            registry = cls.from_file(path)
+            source = str(path)
+        else:
+            try:
+                registry = cls.from_db()
+                source = "'tracked_symbols'"
+            except Exception as e:
+                # The table does not exist until init_db() has run
+                logging.debug(f"Could not read 'tracked_symbols': {e}")
+                registry = cls([])
+            if not registry:
+                registry = cls.default()
+                source = "defaults"
+        logging.info(f"Loaded {len(registry)} symbols in {len(registry.by_base())} base currencies from {source}.")
+        return registry
+
+    def sync(self) -> int:
+        """
+        Makes the 'tracked_symbols' table match this registry.
+
+        Symbols missing from the table are added, listed ones are enabled and
+        the rest are disabled rather than deleted.
+
+        Returns:
+            int: The number of rows added.
+        """
+        wanted = {(symbol.symbol, symbol.base_currency): symbol for symbol in self.symbols}
+        added = 0
+        with session_scope() as session:
+            for row in session.scalars(select(TrackedSymbol)):
+                symbol = wanted.pop((row.symbol, row.base_currency), None)
+                row.enabled = symbol is not None
+                if symbol is not None and symbol.name:
+                    row.name = symbol.name
+            for symbol in self.symbols:
+                if (symbol.symbol, symbol.base_currency) in wanted:
+                    session.add(TrackedSymbol(
+                        symbol=symbol.symbol, base_currency=symbol.base_currency, name=symbol.name, enabled=True
+                    ))
+                    added += 1
+        logging.info(f"Synced {len(self)} symbols to 'tracked_symbols' ({added} added).")
+        return added
@@ -0,0 +1,307 @@
+import math
+import time
+import logging
+import datetime
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Connection, DateTime, Engine, Integer, String, bindparam, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.db_operations.db_connection import get_engine, read_id_horizon, settle_id
+from src.db_operations.models import (
+    AggregateWatermark,
+    LatestPrice,
+    PreciousMetalPrice,
+    PriceRollingStats,
+    PriceRollupDaily,
+    PriceRollupHourly,
+)
+from src.db_operations.storage import rollup_prices, truncate
+from src.metrics import METRICS
+
+WATERMARK = "prices"
+ROLLING_WINDOW = 24  # Hourly closes per rolling window
+MAX_CLAIM_ATTEMPTS = 3
+
+
+@dataclass
+class RefreshStats:
+    """What one refresh_aggregates() run did."""
+
+    rows: int = 0  # Price rows processed, counting unsettled ones read again
+    metals: int = 0
+    latest: int = 0  # Latest-price rows written
+    hourly: int = 0  # Buckets written per tier
+    daily: int = 0
+    rolling: int = 0
+    last_id: int = 0  # The high-water mark after the run
+    seconds: float = 0.0
+
+
+def _insert(connection: Connection, table):
+    """Returns the dialect's INSERT, which supports ON CONFLICT."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Aggregates are not supported on '{dialect}'")
+
+
+def _claim(connection: Connection) -> Tuple[bool, int, int]:
+    """
+    Moves the high-water mark to the newest price id inside the caller's transaction.
+
+    The UPDATE only matches the mark this run read, so of two concurrent
+    refreshes only one claims a range of ids; the other changes no row. The
+    range starts at the settled id rather than the last id seen, so rows that
+    committed late below the previous mark are processed too, see settle_id().
+
+    Returns:
+        Tuple[bool, int, int]: Whether the range is this run's, the id after which
+            it starts and the id it ends at; the two are equal if nothing is new.
+    """
+    stored = connection.execute(
+        select(AggregateWatermark.last_id, AggregateWatermark.settled_id, AggregateWatermark.pending_xid).where(
+            AggregateWatermark.name == WATERMARK
+        )
+    ).one()
+    max_id, horizon = read_id_horizon(connection, PreciousMetalPrice.id)
+    if max_id == stored.last_id == stored.settled_id:
+        return True, max_id, max_id
+    settled_id, pending_xid = settle_id(max_id, horizon, stored.last_id, stored.settled_id, stored.pending_xid)
+    start_id = stored.settled_id
+    if max_id < stored.last_id:
+        logging.warning(f"Price ids restarted below the high-water mark {stored.last_id}; refreshing from scratch.")
+        start_id = settled_id = 0
+    claimed = connection.execute(
+        update(AggregateWatermark)
+        .where(
+            AggregateWatermark.name == WATERMARK,
+            AggregateWatermark.last_id == stored.last_id,
+            AggregateWatermark.settled_id == stored.settled_id,
+        )
+        .values(
+            last_id=max_id, settled_id=settled_id, pending_xid=pending_xid, refreshed_at=datetime.datetime.utcnow()
+        )
+    ).rowcount
+    return bool(claimed), start_id, max_id
+
+
+def refresh_aggregates(
+    since: Optional[datetime.datetime] = None, window: int = ROLLING_WINDOW, engine: Engine = None
+) -> RefreshStats:
+    """
+    Brings the materialized aggregates up to date with the prices written since the last run.
+
+    Price ids only grow, so a high-water mark is kept in 'aggregate_watermarks'
+    and each run reads only the rows above it. Ids become visible at commit,
+    not in order, so the mark covers two ids: the newest one seen, and the
+    settled one below which no transaction can still commit rows. Rows
+    between the two are read again until they settle, which costs a few
+    extra rows per run while another writer's transaction is open. For the
+    metals the rows belong to, it then updates, in one transaction:
+
+    - 'precious_metals_prices_latest', the newest price per metal;
+    - the hourly and daily OHLC rollups, from the hour (day) of the oldest
+      new row on, including the current, still filling bucket;
+    - 'precious_metals_prices_rolling', the rolling mean of the last `window`
+      hourly closes and the standard deviation of their hourly returns.
+
+    A run with no new or unsettled rows costs two indexed lookups, so
+    ingestion can call it after every write. Prices changed in place (bulk_load_prices with
+    on_conflict='update') or deleted keep their id and are only picked up by
+    passing `since`.
+
+    Args:
+        since (Optional[datetime.datetime]): Also recompute from every row at or
+            after this time, e.g. after correcting prices.
+        window (int): Hourly closes per rolling window.
+        engine (Engine): The engine to use. Defaults to the shared engine.
+
+    Returns:
+        RefreshStats: What was refreshed.
+    """
+    started = time.perf_counter()
+    engine = engine or get_engine()
+    stats = RefreshStats()
+
+    with engine.begin() as connection:
+        connection.execute(
+            _insert(connection, AggregateWatermark.__table__)
+            .values(name=WATERMARK, last_id=0, refreshed_at=datetime.datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+
+    for _ in range(MAX_CLAIM_ATTEMPTS):
+        with engine.begin() as connection:
+            claimed, last_id, max_id = _claim(connection)
+            if not claimed:
+                continue  # Another refresh took these rows; look for newer ones
+            stats.last_id = max_id
+            if max_id > last_id or since is not None:
+                changed = "p.id > :last_id AND p.id <= :max_id"
+                params = {"last_id": last_id, "max_id": max_id}
+                if since is not None:
+                    changed = f"({changed} OR p.timestamp >= :since)"
+                    params["since"] = since
+                _refresh_range(connection, changed, params, window, stats)
+            break
+
+    stats.seconds = time.perf_counter() - started
+    if stats.rows:
+        METRICS.observe("aggregate", stats.seconds)
+        METRICS.add_rows("aggregate", stats.rows)
+        logging.info(
+            f"Refreshed aggregates for {stats.rows} new rows of {stats.metals} metals in {stats.seconds:.3f}s "
+            f"({stats.hourly} hourly, {stats.daily} daily, {stats.rolling} rolling buckets)."
+        )
+    return stats
+
+
+def refresh_after_write() -> Optional[RefreshStats]:
+    """
+    Refreshes the aggregates after ingestion has committed new prices.
+
+    The prices are already stored, and the next refresh picks them up from
+    the high-water mark, so a failure is logged rather than raised.
+
+    Returns:
+        Optional[RefreshStats]: What was refreshed, or None if the refresh failed.
+    """
+    try:
+        return refresh_aggregates()
+    except Exception as e:
+        logging.error(f"Failed to refresh aggregates: {e}")
+        return None
+
+
+def clear_aggregates(engine: Engine = None) -> None:
+    """
+    Empties every aggregate table and resets the high-water mark.
+
+    Needed after the prices themselves are truncated: SQLite hands out ids
+    from the largest remaining one, so new rows could reuse ids below the mark.
+
+    Args:
+        engine (Engine): The engine to use. Defaults to the shared engine.
+    """
+    engine = engine or get_engine()
+    with engine.begin() as connection:
+        for model in (LatestPrice, PriceRollingStats, PriceRollupHourly, PriceRollupDaily, AggregateWatermark):
+            connection.execute(model.__table__.delete())
+    logging.info("Cleared the aggregate tables.")
+
+
+def _refresh_range(connection: Connection, changed: str, params: dict, window: int, stats: RefreshStats) -> None:
+    """Updates every aggregate for the price rows matching `changed`."""
+    prices = PreciousMetalPrice.__tablename__
+    typed = [bindparam(name, type_=DateTime) for name in params if name == "since"]
+    dirty = connection.execute(
+        text(
+            f"SELECT p.metal, MIN(p.timestamp) AS start, COUNT(*) AS new_rows FROM {prices} p "
+            f"WHERE {changed} GROUP BY p.metal"
+        ).bindparams(*typed).columns(metal=String, start=DateTime, new_rows=Integer),
+        params,
+    ).all()
+    if not dirty:
+        return
+    stats.rows += sum(row.new_rows for row in dirty)
+    stats.metals += len(dirty)
+
+    latest = LatestPrice.__tablename__
+    stats.latest += connection.execute(
+        text(
+            f"""
+            INSERT INTO {latest} (metal, base_currency, price, timestamp, price_id)
+            SELECT p.metal, p.base_currency, p.price, p.timestamp, p.id
+            FROM {prices} p
+            JOIN (
+                SELECT p.metal, MAX(p.timestamp) AS newest FROM {prices} p WHERE {changed} GROUP BY p.metal
+            ) m ON p.metal = m.metal AND p.timestamp = m.newest
+            WHERE true
+            ON CONFLICT (metal) DO UPDATE SET
+                base_currency = excluded.base_currency, price = excluded.price,
+                timestamp = excluded.timestamp, price_id = excluded.price_id
+            WHERE {latest}.timestamp <= excluded.timestamp
+            """
+        ).bindparams(*typed),
+        params,
+    ).rowcount
+
+    # Metals whose new rows start in the same hour (usually all of them) share one rollup query
+    for tier, unit in (("hourly", "hour"), ("daily", "day")):
+        starts: Dict[datetime.datetime, List[str]] = {}
+        for row in dirty:
+            starts.setdefault(truncate(row.start, unit), []).append(row.metal)
+        for start, metals in starts.items():
+            written = rollup_prices(tier, start, metals=metals, complete_only=False, connection=connection)
+            setattr(stats, tier, getattr(stats, tier) + written)
+
+    for row in dirty:
+        stats.rolling += _refresh_rolling(connection, row.metal, truncate(row.start, "hour"), window)
+
+
+def rolling_statistics(closes: List[float], window: int, first: int = 0) -> List[Tuple[float, Optional[float], int]]:
+    """
+    Computes the rolling mean and return volatility of a close series.
+
+    Args:
+        closes (List[float]): Consecutive closes, oldest first.
+        window (int): Closes per window.
+        first (int): The first position to compute; earlier closes only fill windows.
+
+    Returns:
+        List[Tuple[float, Optional[float], int]]: (mean, volatility, samples) for each
+            position from first on. Volatility is the sample standard deviation of
+            the simple returns within the window, None with fewer than two.
+    """
+    statistics = []
+    for i in range(first, len(closes)):
+        values = closes[max(i - window + 1, 0):i + 1]
+        returns = [
+            closes[j] / closes[j - 1] - 1 for j in range(max(i - window + 2, 1), i + 1) if closes[j - 1]
+        ]
+        volatility = None
+        if len(returns) >= 2:
+            mean_return = sum(returns) / len(returns)
+            volatility = math.sqrt(sum((r - mean_return) ** 2 for r in returns) / (len(returns) - 1))
+        statistics.append((sum(values) / len(values), volatility, len(values)))
+    return statistics
+
+
+def _refresh_rolling(connection: Connection, metal: str, start: datetime.datetime, window: int) -> int:
+    """Recomputes a metal's rolling statistics from the hourly bucket at start on."""
+    hourly = PriceRollupHourly
+    # The window of the first recomputed bucket reaches `window` buckets back
+    lower = connection.execute(
+        select(hourly.bucket)
+        .where(hourly.metal == metal, hourly.bucket < start)
+        .order_by(hourly.bucket.desc())
+        .offset(window)
+        .limit(1)
+    ).scalar()
+    query = select(hourly.bucket, hourly.close).where(hourly.metal == metal).order_by(hourly.bucket)
+    if lower is not None:
+        query = query.where(hourly.bucket >= lower)
+    rows = connection.execute(query).all()
+
+    first = next((i for i, row in enumerate(rows) if row.bucket >= start), len(rows))
+    closes = [row.close for row in rows]
+    records = [
+        {"metal": metal, "bucket": row.bucket, "close": row.close, "mean": mean, "volatility": volatility,
+         "samples": samples}
+        for row, (mean, volatility, samples) in zip(rows[first:], rolling_statistics(closes, window, first))
+    ]
+    if not records:
+        return 0
+    statement = _insert(connection, PriceRollingStats.__table__)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=["metal", "bucket"],
+            set_={name: statement.excluded[name] for name in ("close", "mean", "volatility", "samples")},
+        ),
+        records,
+    )
+    return len(records)
@@ -1,30 +1,130 @@
 import os
 import sys
+import time
 import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
 
-from sqlalchemy import create_engine, text, Engine
+from sqlalchemy import create_engine, event, func, select, text, Engine, Connection
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import OperationalError
-from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 
-from models import Base
-from src.log_info import setup_logging
+from src.db_operations.models import Base
 
-# Load environment variables
-load_dotenv()
-setup_logging()
+# Process-wide engine, built lazily on first use by get_engine()
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_engine_lock = threading.Lock()
 
 
-def create_db_engine() -> 'Engine':
+class PoolStats:
+    """Collects checkout counters and connection hold latencies for the shared pool."""
+
+    def __init__(self) -> None:
+        """Initializes all counters to zero."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Resets all counters to zero."""
+        with self._lock:
+            self.connects: int = 0
+            self.checkouts: int = 0
+            self.checkins: int = 0
+            self.invalidations: int = 0
+            self.checked_out: int = 0
+            self.max_checked_out: int = 0
+            self.total_hold_seconds: float = 0.0
+            self.max_hold_seconds: float = 0.0
+            self.total_acquire_seconds: float = 0.0
+            self.max_acquire_seconds: float = 0.0
+            self.acquires: int = 0
+
+    def on_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def on_checkin(self, held_seconds: Optional[float]) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+            if held_seconds is not None:
+                self.total_hold_seconds += held_seconds
+                self.max_hold_seconds = max(self.max_hold_seconds, held_seconds)
+
+    def on_invalidate(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def on_acquire(self, seconds: float) -> None:
+        with self._lock:
+            self.acquires += 1
+            self.total_acquire_seconds += seconds
+            self.max_acquire_seconds = max(self.max_acquire_seconds, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a point-in-time copy of the counters.
+
+        Returns:
+            Dict[str, Any]: Counters plus mean/max hold and acquire latencies in milliseconds.
+        """
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "acquires": self.acquires,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "mean_hold_ms": (
+                    1000 * self.total_hold_seconds / self.checkins if self.checkins else 0.0
+                ),
+                "max_hold_ms": 1000 * self.max_hold_seconds,
+                "mean_acquire_ms": (
+                    1000 * self.total_acquire_seconds / self.acquires if self.acquires else 0.0
+                ),
+                "max_acquire_ms": 1000 * self.max_acquire_seconds,
+            }
+
+
+POOL_STATS = PoolStats()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Reads a boolean flag such as '1', 'true' or 'yes' from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_database_url() -> str:
     """
-    Sets up the database engine using environment variables.
+    Builds the database URL from environment variables.
+
+    ``DATABASE_URL`` takes precedence when set (e.g. ``sqlite:///metalytics.db``
+    for local runs and tests); otherwise the PostgreSQL URL is assembled from
+    the ``DB_*`` variables.
 
     Returns:
-        Engine: A SQLAlchemy engine instance connected to the database.
+        str: The SQLAlchemy database URL.
 
     Raises:
-        SystemExit: If required database credentials are missing or if the connection fails.
+        SystemExit: If required database credentials are missing.
     """
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return database_url
+
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -37,68 +137,328 @@ def create_db_engine() -> 'Engine':
         )
         sys.exit("Missing required database credentials in environment variables.")
 
-    DATABASE_URL = (
-        f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    return f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+def get_engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Returns the engine and pool options for the given database URL.
+
+    Pool settings are read from ``DB_POOL_SIZE`` (default 5), ``DB_MAX_OVERFLOW``
+    (default 10), ``DB_POOL_TIMEOUT`` (default 30 s), ``DB_POOL_RECYCLE``
+    (default 1800 s) and ``DB_POOL_PRE_PING`` (default on). SQL echo is off
+    unless ``DB_ECHO`` is set.
+
+    Args:
+        database_url (str): The SQLAlchemy database URL.
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for ``sqlalchemy.create_engine``.
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "echo": _env_bool("DB_ECHO", False),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # A single shared connection keeps the in-memory database alive across threads
+            options["poolclass"] = StaticPool
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
     )
-    logging.info(f"Connecting to database at: {DATABASE_URL}")
+    return options
 
-    try:
-        engine = create_engine(DATABASE_URL, echo=True)
-        engine.connect()
-        logging.info("Database connection successful.")
-        return engine
-    except OperationalError as e:
-        logging.critical(f"Database connection failed: {e}")
-        sys.exit(f"Database connection failed: {e}")
 
+def _attach_pool_listeners(engine: Engine) -> None:
+    """Registers pool event listeners that feed POOL_STATS."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_STATS.on_connect()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_time"] = time.perf_counter()
+        POOL_STATS.on_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_time", None)
+        POOL_STATS.on_checkin(
+            time.perf_counter() - started if started is not None else None
+        )
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_STATS.on_invalidate()
+
+
+def get_engine() -> Engine:
+    """
+    Returns the process-wide SQLAlchemy engine, creating it on first use.
+
+    Returns:
+        Engine: The shared engine backed by a connection pool.
 
-def create_session(engine) -> 'Session':
+    Raises:
+        SystemExit: If required database credentials are missing.
+    """
+    global _engine, _session_factory
+
+    if _engine is not None:
+        return _engine
+
+    with _engine_lock:
+        if _engine is None:
+            database_url = get_database_url()
+            options = get_engine_options(database_url)
+            logging.info(
+                f"Creating database engine for: {make_url(database_url).render_as_string(hide_password=True)}"
+            )
+            engine = create_engine(database_url, **options)
+            _attach_pool_listeners(engine)
+            _session_factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=engine
+            )
+            _engine = engine
+    return _engine
+
+
+def dispose_engine() -> None:
+    """
+    Closes all pooled connections and drops the shared engine.
+
+    The next call to get_engine() builds a fresh engine, which makes this the
+    hook to call after forking or when the database settings change.
+    """
+    global _engine, _session_factory
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            logging.info("Database engine disposed.")
+        _engine = None
+        _session_factory = None
+    POOL_STATS.reset()
+
+
+def create_db_engine() -> 'Engine':
+    """
+    Returns the shared database engine.
+
+    Kept for backwards compatibility; equivalent to get_engine().
+
+    Returns:
+        Engine: A SQLAlchemy engine instance connected to the database.
+
+    Raises:
+        SystemExit: If required database credentials are missing.
+    """
+    return get_engine()
+
+
+def create_session(engine=None) -> 'Session':
     """
     Creates a new SQLAlchemy session.
 
     Args:
-        engine: The SQLAlchemy engine to bind the session to.
+        engine: The SQLAlchemy engine to bind the session to. Defaults to the shared engine.
 
     Returns:
         Session: A new SQLAlchemy session instance.
     """
-    logging.info("Creating a new database session.")
+    shared = get_engine()  # Creates the engine and its session factory on first use
+    if engine is None or engine is shared:
+        return _session_factory()
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
 
 
-def init_db(engine) -> None:
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Provides a transactional session from the shared pool.
+
+    The session is committed when the block exits normally, rolled back on
+    error and always closed, returning its connection to the pool.
+
+    Yields:
+        Session: A SQLAlchemy session bound to the shared engine.
+    """
+    session = create_session()
+    try:
+        # Check the connection out up front so the pool wait is measured here,
+        # as in connection_scope, rather than at the session's first query
+        started = time.perf_counter()
+        session.connection()
+        POOL_STATS.on_acquire(time.perf_counter() - started)
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@contextmanager
+def connection_scope() -> Iterator[Connection]:
+    """
+    Provides a pooled connection wrapped in a transaction.
+
+    The transaction is committed when the block exits normally and rolled
+    back on error.
+
+    Yields:
+        Connection: A SQLAlchemy connection checked out from the shared pool.
+    """
+    engine = get_engine()
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        POOL_STATS.on_acquire(time.perf_counter() - started)
+        yield connection
+
+
+def read_id_horizon(connection: Connection, column) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """
+    Reads the largest value of an id column together with the transactions still in flight.
+
+    Ids are handed out when rows are inserted but only become visible at
+    commit, so a long transaction can commit ids below ones already read.
+    On PostgreSQL the (xmin, xmax) of the same snapshot is returned: every
+    transaction that could still commit an id at or below the maximum has an
+    xid below xmax, and has ended once a later snapshot's xmin reaches it.
+    Other databases serialize writers, so no lower id can appear later.
+
+    Args:
+        connection (Connection): The connection to read with.
+        column: The id column, e.g. PreciousMetalPrice.id.
+
+    Returns:
+        Tuple[int, Optional[Tuple[int, int]]]: The largest id (0 for an empty
+            table) and the snapshot's (xmin, xmax), or None if writers are serialized.
+    """
+    if connection.dialect.name != "postgresql":
+        return connection.execute(select(func.max(column))).scalar() or 0, None
+    snapshot = func.txid_current_snapshot()
+    max_id, xmin, xmax = connection.execute(
+        select(func.max(column), func.txid_snapshot_xmin(snapshot), func.txid_snapshot_xmax(snapshot))
+    ).one()
+    return max_id or 0, (xmin, xmax)
+
+
+def settle_id(
+    max_id: int,
+    horizon: Optional[Tuple[int, int]],
+    last_id: int,
+    settled_id: int,
+    pending_xid: Optional[int],
+) -> Tuple[int, Optional[int]]:
+    """
+    Advances the id up to which no more rows can appear, see read_id_horizon().
+
+    Readers keep the id they settled, the newest id they saw (last_id) and the
+    xmax it was read under (pending_xid). Ids up to last_id are settled once
+    every transaction in flight at that read has ended; with nothing in flight
+    now, everything up to max_id is. Rows above the settled id must be read
+    again on the next run, since late commits may still add to them.
+
+    Args:
+        max_id (int): The largest id now, from read_id_horizon().
+        horizon (Optional[Tuple[int, int]]): The (xmin, xmax) read with it.
+        last_id (int): The largest id seen by the previous run.
+        settled_id (int): The id settled by the previous run.
+        pending_xid (Optional[int]): The xmax the previous run read last_id under.
+
+    Returns:
+        Tuple[int, Optional[int]]: The settled id, and the xid to store as pending_xid
+            (None once everything up to max_id is settled).
+    """
+    if horizon is None or horizon[0] == horizon[1]:
+        return max_id, None
+    xmin, xmax = horizon
+    if pending_xid is not None and xmin >= pending_xid:
+        settled_id = max(settled_id, min(last_id, max_id))
+    return settled_id, xmax
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Returns connection pool statistics for the shared engine.
+
+    Returns:
+        Dict[str, Any]: Checkout counters and latencies, plus the pool's own status line.
+    """
+    stats = POOL_STATS.snapshot()
+    stats["pool_status"] = _engine.pool.status() if _engine is not None else None
+    return stats
+
+
+def init_db(engine=None) -> None:
     """
     Initializes the database by creating all tables.
 
     Args:
-        engine: The SQLAlchemy engine to use for creating the tables.
+        engine: The SQLAlchemy engine to use for creating the tables. Defaults to the shared engine.
     """
+    engine = engine or get_engine()
     logging.info("Creating database tables.")
     Base.metadata.create_all(bind=engine)
     logging.info("Database tables created successfully.")
 
+    # Tables created by older versions may lack newer columns and the unique keys
+    from src.db_operations.migrations import (
+        add_missing_columns,
+        ensure_model_version_unique_key,
+        ensure_price_unique_key,
+    )
+    from src.db_operations.storage import convert_prices_to_partitioned, ensure_partitions
+
+    add_missing_columns(engine)
+    ensure_price_unique_key(engine)
+    ensure_model_version_unique_key(engine)
+    # On PostgreSQL, prices are range-partitioned by month (a no-op elsewhere)
+    convert_prices_to_partitioned(engine)
+    ensure_partitions(engine)
+
     # Create the view after creating the tables
     create_view(engine)
 
 
-def create_view(engine) -> None:
+def create_view(engine=None) -> None:
     """
     Creates a view in the database if it doesn't already exist.
 
     Args:
-        engine: The SQLAlchemy engine to use for executing the SQL command.
+        engine: The SQLAlchemy engine to use for executing the SQL command. Defaults to the shared engine.
 
     Raises:
         Exception: If the SQL command to create the view fails.
     """
+    engine = engine or get_engine()
     with engine.connect() as connection:
-        create_view_sql = """
-            CREATE OR REPLACE VIEW precious_metals_prices_view AS
-            SELECT metal, price, timestamp
-            FROM precious_metals_prices;
+        select_sql = """
+            SELECT metal, price, timestamp, base_currency
+            FROM precious_metals_prices
         """
         try:
-            connection.execute(text(create_view_sql))
+            if engine.dialect.name == "sqlite":
+                # SQLite has no CREATE OR REPLACE VIEW
+                connection.execute(text("DROP VIEW IF EXISTS precious_metals_prices_view"))
+                connection.execute(
+                    text(f"CREATE VIEW precious_metals_prices_view AS {select_sql}")
+                )
+            else:
+                connection.execute(
+                    text(f"CREATE OR REPLACE VIEW precious_metals_prices_view AS {select_sql}")
+                )
             connection.commit()
             logging.info("View 'precious_metals_prices_view' created successfully.")
         except Exception as e:
@@ -0,0 +1,184 @@
+import logging
+
+from sqlalchemy import inspect, text, Engine
+
+from src.db_operations.db_connection import get_engine
+from src.db_operations.models import Base, ModelMetadata, PreciousMetalPrice
+
+PRICE_UNIQUE_INDEX = "uq_precious_metals_prices_metal_timestamp"
+MODEL_VERSION_UNIQUE_INDEX = "uq_model_training_metadata_metal_version"
+LEGACY_MODEL_VERSION_INDEX = "ix_model_training_metadata_metal_version"  # The non-unique index it replaces
+
+
+def has_price_unique_key(engine: Engine) -> bool:
+    """
+    Checks whether 'precious_metals_prices' already enforces one row per (metal, timestamp).
+
+    Args:
+        engine (Engine): The engine to inspect.
+
+    Returns:
+        bool: True if the unique index or constraint exists.
+    """
+    table = PreciousMetalPrice.__tablename__
+    inspector = inspect(engine)
+    if PRICE_UNIQUE_INDEX in {index["name"] for index in inspector.get_indexes(table)}:
+        return True
+    return any(
+        set(constraint["column_names"]) == {"metal", "timestamp"}
+        for constraint in inspector.get_unique_constraints(table)
+    )
+
+
+def deduplicate_prices(engine: Engine = None) -> int:
+    """
+    Deletes duplicate (metal, timestamp) rows, keeping the earliest inserted one.
+
+    Args:
+        engine (Engine): The engine to run against. Defaults to the shared engine.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    engine = engine or get_engine()
+    table = PreciousMetalPrice.__tablename__
+    with engine.begin() as connection:
+        result = connection.execute(
+            text(
+                f"""
+                DELETE FROM {table}
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM {table} GROUP BY metal, timestamp
+                )
+                """
+            )
+        )
+    logging.info(f"Removed {result.rowcount} duplicate rows from '{table}'.")
+    return result.rowcount
+
+
+def ensure_price_unique_key(engine: Engine = None) -> None:
+    """
+    Migrates an existing prices table to the (metal, timestamp) unique key.
+
+    Tables created before the key existed are deduplicated and then given the
+    unique index; tables that already have it are left untouched.
+
+    Args:
+        engine (Engine): The engine to migrate. Defaults to the shared engine.
+
+    Raises:
+        Exception: If deduplication or index creation fails.
+    """
+    engine = engine or get_engine()
+    if has_price_unique_key(engine):
+        return
+
+    logging.info("Adding (metal, timestamp) unique key to 'precious_metals_prices'.")
+    try:
+        deduplicate_prices(engine)
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {PRICE_UNIQUE_INDEX} "
+                    f"ON {PreciousMetalPrice.__tablename__} (metal, timestamp)"
+                )
+            )
+        logging.info("Unique key added successfully.")
+    except Exception as e:
+        logging.error(f"Failed to add unique key: {e}")
+        raise
+
+
+def ensure_model_version_unique_key(engine: Engine = None) -> None:
+    """
+    Migrates an existing model metadata table to the unique (metal, version) index.
+
+    Registrations that raced before the index existed may have recorded the
+    same version twice; every row after the first of such a pair is
+    renumbered past the ticker's newest version before the index is built.
+
+    Args:
+        engine (Engine): The engine to migrate. Defaults to the shared engine.
+
+    Raises:
+        Exception: If renumbering or index creation fails.
+    """
+    engine = engine or get_engine()
+    table = ModelMetadata.__tablename__
+    inspector = inspect(engine)
+    if table not in inspector.get_table_names():
+        return
+    if MODEL_VERSION_UNIQUE_INDEX in {index["name"] for index in inspector.get_indexes(table)}:
+        return
+
+    logging.info(f"Adding (metal, version) unique key to '{table}'.")
+    try:
+        with engine.begin() as connection:
+            duplicates = connection.execute(
+                text(
+                    f"""
+                    SELECT t.id, t.metal FROM {table} t
+                    WHERE t.version IS NOT NULL AND t.id > (
+                        SELECT MIN(d.id) FROM {table} d WHERE d.metal = t.metal AND d.version = t.version
+                    )
+                    ORDER BY t.id
+                    """
+                )
+            ).all()
+            for row in duplicates:
+                connection.execute(
+                    text(f"UPDATE {table} SET version = (SELECT MAX(version) + 1 FROM {table} WHERE metal = :metal) "
+                         "WHERE id = :id"),
+                    {"metal": row.metal, "id": row.id},
+                )
+            connection.execute(text(f"DROP INDEX IF EXISTS {LEGACY_MODEL_VERSION_INDEX}"))
+            connection.execute(
+                text(f"CREATE UNIQUE INDEX IF NOT EXISTS {MODEL_VERSION_UNIQUE_INDEX} ON {table} (metal, version)")
+            )
+        logging.info(f"Unique key added successfully; renumbered {len(duplicates)} duplicate versions.")
+    except Exception as e:
+        logging.error(f"Failed to add unique key: {e}")
+        raise
+
+
+def add_missing_columns(engine: Engine = None) -> list[str]:
+    """
+    Adds columns declared on the ORM models but missing from existing tables.
+
+    ``create_all`` only creates absent tables, so columns added to a model
+    later are applied here with ``ALTER TABLE ... ADD COLUMN``. New columns
+    must be nullable or have a server default, which existing rows receive.
+
+    Args:
+        engine (Engine): The engine to migrate. Defaults to the shared engine.
+
+    Returns:
+        list[str]: The columns that were added, as 'table.column'.
+    """
+    engine = engine or get_engine()
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                definition = f"{column.name} {column_type}"
+                if column.server_default is not None:
+                    # Existing rows take the default, so the column can be NOT NULL straight away
+                    default = column.server_default.arg
+                    default = default.text if hasattr(default, "text") else "'" + str(default).replace("'", "''") + "'"
+                    definition += f" DEFAULT {default}" + ("" if column.nullable else " NOT NULL")
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+                added.append(f"{table.name}.{column.name}")
+
+    if added:
+        logging.info(f"Added missing columns: {', '.join(added)}")
+    return added
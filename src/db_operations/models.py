@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, Integer, String, Float, Date, DateTime, JSON, true
 from sqlalchemy.orm import declarative_base
 import datetime
 
@@ -9,10 +9,17 @@ class PreciousMetalPrice(Base):
     """Represents the price of a precious metal at a given timestamp."""
     
     __tablename__ = "precious_metals_prices"
+    __table_args__ = (
+        # One price per metal and source timestamp; the key that upserts conflict on
+        Index(
+            "uq_precious_metals_prices_metal_timestamp", "metal", "timestamp", unique=True
+        ),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
-    metal: str = Column(String(10), nullable=False, index=True)
+    metal: str = Column(String(10), nullable=False, index=True)  # Series name; see data_ingestion.symbols
     price: float = Column(Float, nullable=False)
+    base_currency: str = Column(String(3), nullable=False, server_default="EUR")  # The currency the price is quoted in
     timestamp: datetime.datetime = Column(
         DateTime,
         default=lambda: datetime.datetime.now(datetime.timezone.utc),
@@ -22,23 +29,244 @@ class PreciousMetalPrice(Base):
 
     def __repr__(self) -> str:
         """Returns a string representation of the PreciousMetalPrice instance."""
-        return f"<PreciousMetalPrice(metal='{self.metal}', price={self.price}, timestamp={self.timestamp})>"
+        return (f"<PreciousMetalPrice(metal='{self.metal}', price={self.price}, "
+                f"base_currency='{self.base_currency}', timestamp={self.timestamp})>")
+
+
+class TrackedSymbol(Base):
+    """A symbol to ingest and model, quoted in one base currency; the symbol registry's table."""
+
+    __tablename__ = "tracked_symbols"
+    __table_args__ = (
+        Index("uq_tracked_symbols_symbol_base_currency", "symbol", "base_currency", unique=True),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    symbol: str = Column(String(10), nullable=False)  # API code, e.g. 'XAU'
+    base_currency: str = Column(String(3), nullable=False)
+    name: str = Column(String, nullable=True)
+    enabled: bool = Column(Boolean, nullable=False, server_default=true())
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the TrackedSymbol instance."""
+        return (f"<TrackedSymbol(symbol='{self.symbol}', base_currency='{self.base_currency}', "
+                f"enabled={self.enabled})>")
 
 
 class ModelMetadata(Base):
     """Stores metadata for model training, including hyperparameters and parameters."""
     
     __tablename__ = "model_training_metadata"
+    __table_args__ = (
+        # The registry's latest-version lookup; unique so concurrent registrations cannot share a version
+        Index("uq_model_training_metadata_metal_version", "metal", "version", unique=True),
+    )
 
     id: int = Column(Integer, primary_key=True)
     metal: str = Column(String, nullable=False)
     hyperparameters: dict = Column(JSON, nullable=False)  # Using dict for JSON
     parameters: dict = Column(JSON, nullable=False)  # Using dict for JSON
     timestamp: datetime.datetime = Column(DateTime, nullable=False)
+    data_cutoff: datetime.datetime = Column(DateTime, nullable=True)  # Newest observation the model has seen
+    fit_mode: str = Column(String(16), nullable=True)  # 'full' or 'update'
+    last_full_fit: datetime.datetime = Column(DateTime, nullable=True)
+    metrics: dict = Column(JSON, nullable=True)  # In-sample fit statistics (aic, bic, sigma2, n_obs)
+    # Set when the model is registered; artifact columns are cleared once it is garbage-collected
+    version: int = Column(Integer, nullable=True)
+    artifact_path: str = Column(String, nullable=True)
+    artifact_sha256: str = Column(String(64), nullable=True)
+    artifact_bytes: int = Column(Integer, nullable=True)
+    forecast_state: dict = Column(JSON, nullable=True)  # statespace.ArimaState, for forecasting without sktime
 
     def __repr__(self) -> str:
         """Returns a string representation of the ModelMetadata instance."""
         return (f"<ModelMetadata(metal='{self.metal}', "
+                f"version={self.version}, "
                 f"hyperparameters={self.hyperparameters}, "
                 f"parameters={self.parameters}, "
+                f"data_cutoff={self.data_cutoff}, "
+                f"fit_mode='{self.fit_mode}', "
                 f"timestamp={self.timestamp})>")
+
+
+class BackfillCheckpoint(Base):
+    """Records a date range that the historical backfill has fully ingested."""
+
+    __tablename__ = "backfill_checkpoints"
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    base_currency: str = Column(String(10), nullable=False)
+    currencies: str = Column(String, nullable=False)
+    start_date: datetime.date = Column(Date, nullable=False, index=True)
+    end_date: datetime.date = Column(Date, nullable=False)
+    rows: int = Column(Integer, nullable=False, default=0)
+    completed_at: datetime.datetime = Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the BackfillCheckpoint instance."""
+        return (f"<BackfillCheckpoint(base_currency='{self.base_currency}', "
+                f"start_date={self.start_date}, end_date={self.end_date}, "
+                f"rows={self.rows})>")
+
+
+class ArimaCandidateScore(Base):
+    """Caches the information criteria of one ARIMA order fitted to one exact series."""
+
+    __tablename__ = "arima_candidate_scores"
+    __table_args__ = (
+        Index("uq_arima_candidate_scores_fingerprint_order", "fingerprint", "p", "d", "q", unique=True),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    fingerprint: str = Column(String(64), nullable=False)  # SHA-256 of the series values
+    p: int = Column(Integer, nullable=False)
+    d: int = Column(Integer, nullable=False)
+    q: int = Column(Integer, nullable=False)
+    aic: float = Column(Float, nullable=True)  # NULL when the fit failed
+    bic: float = Column(Float, nullable=True)
+    error: str = Column(String, nullable=True)
+    created_at: datetime.datetime = Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the ArimaCandidateScore instance."""
+        return (f"<ArimaCandidateScore(fingerprint='{self.fingerprint[:8]}', "
+                f"order=({self.p}, {self.d}, {self.q}), aic={self.aic}, bic={self.bic})>")
+
+
+class BacktestScore(Base):
+    """Out-of-sample forecast errors of one model configuration, from one walk-forward backtest of one metal."""
+
+    __tablename__ = "backtest_scores"
+    __table_args__ = (
+        Index("ix_backtest_scores_metal_config", "metal", "config_key"),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    metal: str = Column(String(10), nullable=False)
+    config_key: str = Column(String(64), nullable=False)  # SHA-256 of the configuration
+    config: dict = Column(JSON, nullable=False)
+    data_start: datetime.datetime = Column(DateTime, nullable=True)  # Oldest observation used
+    data_end: datetime.datetime = Column(DateTime, nullable=True)  # Newest observation used
+    observations: int = Column(Integer, nullable=False)
+    folds: int = Column(Integer, nullable=False)
+    refits: int = Column(Integer, nullable=False)
+    failed_refits: int = Column(Integer, nullable=False)
+    mae: float = Column(Float, nullable=True)  # NULL when no fold could be scored
+    rmse: float = Column(Float, nullable=True)
+    mape: float = Column(Float, nullable=True)  # Percent
+    coverage: float = Column(Float, nullable=True)  # Share of actuals inside the prediction interval
+    by_horizon: dict = Column(JSON, nullable=False)  # Metric name -> one value per horizon
+    seconds: float = Column(Float, nullable=False)
+    created_at: datetime.datetime = Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the BacktestScore instance."""
+        return (f"<BacktestScore(metal='{self.metal}', config_key='{self.config_key[:8]}', "
+                f"folds={self.folds}, rmse={self.rmse}, coverage={self.coverage})>")
+
+
+class PriceRollupHourly(Base):
+    """Hourly open/high/low/close summary of 'precious_metals_prices', kept after raw ticks expire."""
+
+    __tablename__ = "precious_metals_prices_hourly"
+    __table_args__ = (
+        Index("uq_precious_metals_prices_hourly_metal_bucket", "metal", "bucket", unique=True),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    metal: str = Column(String(10), nullable=False)
+    bucket: datetime.datetime = Column(DateTime, nullable=False)  # Start of the hour
+    open: float = Column(Float, nullable=False)
+    high: float = Column(Float, nullable=False)
+    low: float = Column(Float, nullable=False)
+    close: float = Column(Float, nullable=False)
+    mean: float = Column(Float, nullable=False)
+    samples: int = Column(Integer, nullable=False)  # Raw ticks summarized
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the PriceRollupHourly instance."""
+        return (f"<PriceRollupHourly(metal='{self.metal}', bucket={self.bucket}, "
+                f"close={self.close}, samples={self.samples})>")
+
+
+class PriceRollupDaily(Base):
+    """Daily open/high/low/close summary, aggregated from the hourly rollup."""
+
+    __tablename__ = "precious_metals_prices_daily"
+    __table_args__ = (
+        Index("uq_precious_metals_prices_daily_metal_bucket", "metal", "bucket", unique=True),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    metal: str = Column(String(10), nullable=False)
+    bucket: datetime.datetime = Column(DateTime, nullable=False)  # Start of the day
+    open: float = Column(Float, nullable=False)
+    high: float = Column(Float, nullable=False)
+    low: float = Column(Float, nullable=False)
+    close: float = Column(Float, nullable=False)
+    mean: float = Column(Float, nullable=False)
+    samples: int = Column(Integer, nullable=False)  # Raw ticks summarized
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the PriceRollupDaily instance."""
+        return (f"<PriceRollupDaily(metal='{self.metal}', bucket={self.bucket}, "
+                f"close={self.close}, samples={self.samples})>")
+
+
+class LatestPrice(Base):
+    """The newest price of each metal, maintained by aggregates.refresh_aggregates()."""
+
+    __tablename__ = "precious_metals_prices_latest"
+    __table_args__ = (
+        Index("uq_precious_metals_prices_latest_metal", "metal", unique=True),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    metal: str = Column(String(10), nullable=False)
+    base_currency: str = Column(String(3), nullable=False, server_default="EUR")
+    price: float = Column(Float, nullable=False)
+    timestamp: datetime.datetime = Column(DateTime, nullable=False)
+    price_id: int = Column(Integer, nullable=False)  # The 'precious_metals_prices' row it was taken from
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the LatestPrice instance."""
+        return f"<LatestPrice(metal='{self.metal}', price={self.price}, timestamp={self.timestamp})>"
+
+
+class PriceRollingStats(Base):
+    """Rolling mean and volatility of each metal's hourly closes, maintained by aggregates.refresh_aggregates()."""
+
+    __tablename__ = "precious_metals_prices_rolling"
+    __table_args__ = (
+        Index("uq_precious_metals_prices_rolling_metal_bucket", "metal", "bucket", unique=True),
+    )
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    metal: str = Column(String(10), nullable=False)
+    bucket: datetime.datetime = Column(DateTime, nullable=False)  # Start of the hour
+    close: float = Column(Float, nullable=False)
+    mean: float = Column(Float, nullable=False)  # Mean close of the window ending at this bucket
+    volatility: float = Column(Float, nullable=True)  # Standard deviation of hourly returns; NULL below two returns
+    samples: int = Column(Integer, nullable=False)  # Closes in the window, at most its size
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the PriceRollingStats instance."""
+        return (f"<PriceRollingStats(metal='{self.metal}', bucket={self.bucket}, "
+                f"mean={self.mean}, volatility={self.volatility})>")
+
+
+class AggregateWatermark(Base):
+    """The newest 'precious_metals_prices' id an incremental refresh has processed."""
+
+    __tablename__ = "aggregate_watermarks"
+
+    name: str = Column(String(50), primary_key=True)
+    last_id: int = Column(Integer, nullable=False)
+    # Ids up to settled_id can no longer gain rows; above it they are re-read until pending_xid has ended
+    settled_id: int = Column(Integer, nullable=False, server_default="0")
+    pending_xid: int = Column(BigInteger, nullable=True)
+    refreshed_at: datetime.datetime = Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the AggregateWatermark instance."""
+        return f"<AggregateWatermark(name='{self.name}', last_id={self.last_id}, refreshed_at={self.refreshed_at})>"
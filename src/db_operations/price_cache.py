@@ -0,0 +1,369 @@
+import os
+import time
+import logging
+import datetime
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.data_ingestion.bulk_loader import PriceRow, add_write_listener
+from src.db_operations.queries import iter_price_series
+
+DEFAULT_DEPTH = 4096  # Prices kept per metal, 64 KiB of arrays
+DEFAULT_TTL = 30.0  # Seconds before a metal is checked against the database for newer rows
+DEFAULT_LOOKBACK = datetime.timedelta(hours=12)  # Model's default training window
+
+_cache: Optional["PriceCache"] = None
+_cache_lock = threading.Lock()
+
+
+class RingBuffer:
+    """Fixed-capacity series of (timestamp, price) pairs in two preallocated NumPy arrays.
+
+    Appending newer prices writes them into the slots after the newest one,
+    wrapping around and overwriting the oldest once the buffer is full, so
+    memory never grows past `capacity` entries. Prices older than the newest
+    one (late or corrected quotes) are merged in by timestamp instead.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initializes the RingBuffer.
+
+        Args:
+            capacity (int): The most prices kept.
+
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity: int = capacity
+        self.timestamps: np.ndarray = np.empty(capacity, dtype="datetime64[us]")
+        self.prices: np.ndarray = np.empty(capacity, dtype=np.float64)
+        self.size: int = 0
+        self.head: int = 0  # The slot the next price is written to
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the arrays, independent of how full they are."""
+        return self.timestamps.nbytes + self.prices.nbytes
+
+    @property
+    def oldest(self) -> Optional[np.datetime64]:
+        """The timestamp of the oldest price kept, or None if empty."""
+        if not self.size:
+            return None
+        return self.timestamps[(self.head - self.size) % self.capacity]
+
+    @property
+    def newest(self) -> Optional[Tuple[np.datetime64, float]]:
+        """The newest (timestamp, price) pair, or None if empty."""
+        if not self.size:
+            return None
+        slot = (self.head - 1) % self.capacity
+        return self.timestamps[slot], float(self.prices[slot])
+
+    def arrays(self, start: Optional[np.datetime64] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the kept prices in timestamp order.
+
+        Args:
+            start (Optional[np.datetime64]): Drop prices before this time.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Copies of the timestamps and prices.
+        """
+        if self.size < self.capacity:
+            timestamps, prices = self.timestamps[:self.size], self.prices[:self.size]
+        else:
+            timestamps, prices = np.roll(self.timestamps, -self.head), np.roll(self.prices, -self.head)
+        first = int(np.searchsorted(timestamps, start)) if start is not None else 0
+        return timestamps[first:].copy(), prices[first:].copy()
+
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray) -> int:
+        """
+        Adds prices, overwriting the oldest ones beyond capacity.
+
+        Args:
+            timestamps (np.ndarray): datetime64[us] timestamps.
+            prices (np.ndarray): The prices at those timestamps.
+
+        Returns:
+            int: How many prices were evicted.
+        """
+        if not len(timestamps):
+            return 0
+        newest = self.newest
+        if (newest is None or timestamps[0] > newest[0]) and np.all(timestamps[1:] > timestamps[:-1]):
+            evicted = max(self.size + len(timestamps) - self.capacity, 0)
+            timestamps, prices = timestamps[-self.capacity:], prices[-self.capacity:]
+            slots = (self.head + np.arange(len(timestamps))) % self.capacity
+            self.timestamps[slots] = timestamps
+            self.prices[slots] = prices
+            self.head = (self.head + len(timestamps)) % self.capacity
+            self.size = min(self.size + len(timestamps), self.capacity)
+            return evicted
+
+        # Out of order: sort everything, keeping the last price written per timestamp
+        kept_timestamps, kept_prices = self.arrays()
+        all_timestamps = np.concatenate([kept_timestamps, timestamps])
+        all_prices = np.concatenate([kept_prices, prices])
+        order = np.argsort(all_timestamps, kind="stable")
+        all_timestamps, all_prices = all_timestamps[order], all_prices[order]
+        last = np.append(all_timestamps[1:] != all_timestamps[:-1], True)
+        all_timestamps, all_prices = all_timestamps[last], all_prices[last]
+
+        evicted = max(len(all_timestamps) - self.capacity, 0)
+        self.size = min(len(all_timestamps), self.capacity)
+        self.timestamps[:self.size] = all_timestamps[-self.size:]
+        self.prices[:self.size] = all_prices[-self.size:]
+        self.head = self.size % self.capacity
+        return evicted
+
+
+class PriceCache:
+    """In-process cache of each metal's recent prices, one RingBuffer per metal.
+
+    Ingestion in the same process adds the prices it writes through a
+    bulk_loader write listener, reads that miss load the metal's window from
+    the database and keep it, and warm() preloads metals on startup. A
+    metal's buffer is complete from some time on (the start of the window
+    loaded from the database, or the oldest price still kept after
+    evictions); series() reads starting earlier are misses. Other processes
+    write to the database too, so a metal not checked for `ttl` seconds is
+    topped up with the rows newer than its newest cached one before it is
+    served. Rows deleted, or backfilled behind the newest cached one, by
+    another process are not seen until the metal is loaded again.
+    """
+
+    def __init__(self, depth: int = DEFAULT_DEPTH, ttl: Optional[float] = DEFAULT_TTL) -> None:
+        """
+        Initializes the PriceCache.
+
+        Args:
+            depth (int): Prices kept per metal; memory is 16 bytes per price and metal.
+            ttl (Optional[float]): Seconds after which a metal is checked for newer rows
+                before it is served; None trusts the cache indefinitely, e.g. when this
+                process is the only writer.
+        """
+        self.depth: int = depth
+        self.ttl: Optional[float] = ttl
+        self._buffers: Dict[str, RingBuffer] = {}
+        self._complete_from: Dict[str, np.datetime64] = {}
+        self._synced: Dict[str, float] = {}  # time.monotonic() of the last database check per metal
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "syncs": 0, "evictions": 0}
+
+    @classmethod
+    def from_env(cls) -> "PriceCache":
+        """Builds a cache configured by PRICE_CACHE_DEPTH and PRICE_CACHE_TTL ('none' disables expiry)."""
+        ttl = os.getenv("PRICE_CACHE_TTL", str(DEFAULT_TTL))
+        return cls(
+            depth=int(os.getenv("PRICE_CACHE_DEPTH", str(DEFAULT_DEPTH))),
+            ttl=None if ttl.strip().lower() == "none" else float(ttl),
+        )
+
+    def _extend(self, metal: str, timestamps: np.ndarray, prices: np.ndarray) -> None:
+        """Adds prices to a metal's buffer; the caller holds the lock."""
+        buffer = self._buffers.get(metal)
+        if buffer is None:
+            buffer = self._buffers[metal] = RingBuffer(self.depth)
+        self._stats["evictions"] += buffer.extend(timestamps, prices)
+        if metal in self._complete_from and buffer.size == buffer.capacity:
+            self._complete_from[metal] = max(self._complete_from[metal], buffer.oldest)
+
+    def record(self, rows: Iterable[PriceRow]) -> None:
+        """
+        Adds prices that were just written to the database.
+
+        Args:
+            rows (Iterable[PriceRow]): (metal, price, timestamp[, base_currency]) rows.
+        """
+        by_metal: Dict[str, List[Tuple[datetime.datetime, float]]] = {}
+        for row in rows:
+            by_metal.setdefault(row[0], []).append((row[2], row[1]))
+        with self._lock:
+            for metal, values in by_metal.items():
+                values.sort(key=lambda value: value[0])
+                self._extend(
+                    metal,
+                    np.array([timestamp for timestamp, _ in values], dtype="datetime64[us]"),
+                    np.array([price for _, price in values], dtype=np.float64),
+                )
+
+    def store(self, metal: str, timestamps: np.ndarray, prices: np.ndarray, start: datetime.datetime) -> None:
+        """
+        Keeps the result of a database read that returned every price of a metal from start on.
+
+        Args:
+            metal (str): The metal code.
+            timestamps (np.ndarray): The timestamps read, ascending.
+            prices (np.ndarray): The prices read.
+            start (datetime.datetime): The inclusive start of the read.
+        """
+        with self._lock:
+            complete_from = np.datetime64(start, "us")
+            if metal in self._complete_from:
+                complete_from = min(complete_from, self._complete_from[metal])
+            self._complete_from[metal] = complete_from
+            self._extend(metal, np.asarray(timestamps, dtype="datetime64[us]"), np.asarray(prices, dtype=np.float64))
+            self._synced[metal] = time.monotonic()
+
+    def warm(self, metals: Iterable[str], lookback: datetime.timedelta = DEFAULT_LOOKBACK) -> int:
+        """
+        Loads the recent prices of metals from the database.
+
+        Args:
+            metals (Iterable[str]): The metal codes to load.
+            lookback (datetime.timedelta): How far back from now to load.
+
+        Returns:
+            int: The number of prices loaded.
+        """
+        start = datetime.datetime.utcnow() - lookback
+        metals = list(metals)
+        loaded = 0
+        for series in iter_price_series(metals, start):
+            self.store(series.metal, series.timestamps, series.prices, start)
+            loaded += len(series)
+        for metal in metals:
+            # Metals without recent prices are complete too; their buffers are empty
+            with self._lock:
+                if metal not in self._complete_from:
+                    self._complete_from[metal] = np.datetime64(start, "us")
+                    self._synced[metal] = time.monotonic()
+        logging.info(f"Warmed the price cache with {loaded} prices of {len(metals)} metals.")
+        return loaded
+
+    def _sync(self, metals: List[str]) -> None:
+        """Tops up the metals not checked for ttl seconds with the rows newer than their newest cached one."""
+        if self.ttl is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            stale = [metal for metal in metals if now - self._synced.get(metal, float("-inf")) > self.ttl]
+            newest = {metal: self._buffers[metal].newest for metal in stale if metal in self._buffers}
+        for metal in stale:
+            after = newest.get(metal)
+            start = (
+                (after[0] + np.timedelta64(1, "us")).astype(datetime.datetime)
+                if after is not None
+                else self._complete_from[metal].astype(datetime.datetime)
+            )
+            series = next(iter_price_series([metal], start), None)
+            with self._lock:
+                if series is not None:
+                    self._extend(metal, series.timestamps, series.prices)
+                self._synced[metal] = now
+                self._stats["syncs"] += 1
+
+    def series(self, metal: str, start: datetime.datetime) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Returns a metal's prices from start on, if the cache holds all of them.
+
+        Args:
+            metal (str): The metal code.
+            start (datetime.datetime): Inclusive lower timestamp bound.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: datetime64[us] timestamps and float64
+                prices, possibly empty, or None on a miss.
+        """
+        start = np.datetime64(start, "us")
+        with self._lock:
+            hit = metal in self._complete_from and self._complete_from[metal] <= start
+            self._stats["hits" if hit else "misses"] += 1
+        if not hit:
+            return None
+        try:
+            self._sync([metal])
+        except Exception as e:
+            logging.warning(f"Could not check the price cache against the database: {e}")
+        with self._lock:
+            buffer = self._buffers.get(metal)
+            if buffer is None:
+                return np.empty(0, dtype="datetime64[us]"), np.empty(0, dtype=np.float64)
+            return buffer.arrays(start)
+
+    def latest(self, metals: Iterable[str]) -> Optional[List[dict]]:
+        """
+        Returns the newest cached price of each metal, if the cache has loaded all of them.
+
+        Args:
+            metals (Iterable[str]): The metal codes to look up.
+
+        Returns:
+            Optional[List[dict]]: One {'metal', 'price', 'timestamp'} record per metal with
+                prices, ordered by metal, or None on a miss.
+        """
+        metals = sorted(set(metals))
+        with self._lock:
+            hit = bool(metals) and all(metal in self._complete_from for metal in metals)
+            self._stats["hits" if hit else "misses"] += 1
+        if not hit:
+            return None
+        try:
+            self._sync(metals)
+        except Exception as e:
+            logging.warning(f"Could not check the price cache against the database: {e}")
+        records = []
+        with self._lock:
+            for metal in metals:
+                buffer = self._buffers.get(metal)
+                newest = buffer.newest if buffer is not None else None
+                if newest is not None:
+                    records.append(
+                        {"metal": metal, "price": newest[1], "timestamp": newest[0].astype(datetime.datetime)}
+                    )
+        return records
+
+    def clear(self) -> None:
+        """Drops every cached price; counters are kept."""
+        with self._lock:
+            self._buffers.clear()
+            self._complete_from.clear()
+            self._synced.clear()
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns hit and memory statistics.
+
+        Returns:
+            dict[str, float]: Hit, miss, sync and eviction counts, the hit rate, and the
+                metals, prices and bytes held.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["metals"] = len(self._buffers)
+            stats["prices"] = sum(len(buffer) for buffer in self._buffers.values())
+            stats["bytes"] = sum(buffer.nbytes for buffer in self._buffers.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+def get_price_cache() -> Optional[PriceCache]:
+    """
+    Returns the process-wide price cache, creating it on first use.
+
+    The cache is configured by PriceCache.from_env() and subscribes to the
+    rows ingestion writes in this process. PRICE_CACHE_DEPTH=0 disables it.
+
+    Returns:
+        Optional[PriceCache]: The cache, or None if disabled.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cache = PriceCache.from_env()
+            if cache.depth <= 0:
+                return None
+            add_write_listener(cache.record)
+            _cache = cache
+            logging.info(f"Price cache enabled: {cache.depth} prices per metal, ttl {cache.ttl}s.")
+        return _cache
@@ -0,0 +1,362 @@
+import time
+import logging
+import datetime
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import DateTime, Float, String, TextClause, bindparam, text
+
+from src.db_operations.db_connection import connection_scope
+from src.db_operations.models import LatestPrice, PriceRollingStats, PriceRollupDaily, PriceRollupHourly
+from src.metrics import METRICS
+
+DEFAULT_CHUNK_SIZE = 50_000
+# Bucket widths in seconds that are read from the rollups aggregates.refresh_aggregates() maintains
+ROLLUP_TABLES = {3600: PriceRollupHourly.__tablename__, 86400: PriceRollupDaily.__tablename__}
+
+
+@dataclass
+class PriceChunk:
+    """A run of consecutive prices of one metal, as typed NumPy arrays."""
+
+    metal: str
+    timestamps: np.ndarray  # datetime64[us], ascending
+    prices: np.ndarray  # float64
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+def fetch_latest_prices(metals: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Fetches the most recent price of each metal.
+
+    Reads the one row per metal that aggregates.refresh_aggregates() keeps in
+    'precious_metals_prices_latest', so the cost does not grow with the
+    number of stored ticks.
+
+    Args:
+        metals (Optional[Iterable[str]]): The metal codes to look up; all metals if None.
+
+    Returns:
+        list[dict]: One {'metal', 'price', 'timestamp'} record per metal, ordered by metal.
+    """
+    metal_filter = "WHERE metal IN :metals" if metals is not None else ""
+    query = text(
+        f"""
+        SELECT metal, price, timestamp
+        FROM {LatestPrice.__tablename__}
+        {metal_filter}
+        ORDER BY metal
+        """
+    ).columns(metal=String, price=Float, timestamp=DateTime)
+    params = {}
+    if metals is not None:
+        query = query.bindparams(bindparam("metals", expanding=True))
+        params["metals"] = list(metals)
+
+    with METRICS.timer("query"), connection_scope() as connection:
+        rows = connection.execute(query, params).all()
+    METRICS.add_rows("query", len(rows))
+
+    logging.debug(f"Fetched latest prices for {len(rows)} metals.")
+    return [{"metal": row.metal, "price": row.price, "timestamp": row.timestamp} for row in rows]
+
+
+def fetch_rolling_stats(metals: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Fetches the newest rolling statistics of each metal from 'precious_metals_prices_rolling'.
+
+    Args:
+        metals (Optional[Iterable[str]]): The metal codes to look up; all metals if None.
+
+    Returns:
+        list[dict]: One {'metal', 'bucket', 'close', 'mean', 'volatility', 'samples'}
+            record per metal, ordered by metal.
+    """
+    rolling = PriceRollingStats.__tablename__
+    metal_filter = "WHERE metal IN :metals" if metals is not None else ""
+    query = text(
+        f"""
+        SELECT r.metal, r.bucket, r.close, r.mean, r.volatility, r.samples
+        FROM {rolling} r
+        JOIN (
+            SELECT metal, MAX(bucket) AS newest
+            FROM {rolling}
+            {metal_filter}
+            GROUP BY metal
+        ) m ON r.metal = m.metal AND r.bucket = m.newest
+        ORDER BY r.metal
+        """
+    ).columns(bucket=DateTime)
+    params = {}
+    if metals is not None:
+        query = query.bindparams(bindparam("metals", expanding=True))
+        params["metals"] = list(metals)
+
+    with METRICS.timer("query"), connection_scope() as connection:
+        rows = connection.execute(query, params).all()
+    METRICS.add_rows("query", len(rows))
+
+    logging.debug(f"Fetched rolling statistics for {len(rows)} metals.")
+    return [dict(row._mapping) for row in rows]
+
+
+def bucket_expression(dialect: str) -> str:
+    """
+    Returns SQL that truncates 'timestamp' to the start of its :seconds-wide bucket, as epoch seconds.
+
+    Args:
+        dialect (str): The SQLAlchemy dialect name.
+
+    Returns:
+        str: A SQL expression using the :seconds bind parameter.
+
+    Raises:
+        NotImplementedError: For dialects other than PostgreSQL and SQLite.
+    """
+    if dialect == "postgresql":
+        return "FLOOR(EXTRACT(EPOCH FROM timestamp) / :seconds)::BIGINT * :seconds"
+    if dialect == "sqlite":
+        return "(CAST(STRFTIME('%s', timestamp) AS INTEGER) / :seconds) * :seconds"
+    raise NotImplementedError(f"Resampling is not supported on '{dialect}'")
+
+
+def _resample_query(dialect: str) -> TextClause:
+    """Returns the query reducing the ticks in [:start, :end) to OHLC per (metal, :seconds-wide bucket)."""
+    return text(
+        f"""
+        WITH bucketed AS (
+            SELECT metal, price, timestamp, {bucket_expression(dialect)} AS bucket
+            FROM precious_metals_prices_view
+            WHERE metal IN :metals AND timestamp >= :start AND timestamp < :end
+        ),
+        ranked AS (
+            SELECT metal, bucket, price,
+                ROW_NUMBER() OVER (PARTITION BY metal, bucket ORDER BY timestamp) AS first_rank,
+                ROW_NUMBER() OVER (PARTITION BY metal, bucket ORDER BY timestamp DESC) AS last_rank
+            FROM bucketed
+        )
+        SELECT metal, bucket,
+            MAX(CASE WHEN first_rank = 1 THEN price END) AS open,
+            MAX(price) AS high,
+            MIN(price) AS low,
+            MAX(CASE WHEN last_rank = 1 THEN price END) AS close
+        FROM ranked
+        GROUP BY metal, bucket
+        ORDER BY metal, bucket
+        """
+    ).bindparams(bindparam("metals", expanding=True))
+
+
+def fetch_resampled_prices(
+    metals: Iterable[str],
+    start: datetime.datetime,
+    end: Optional[datetime.datetime] = None,
+    freq: str = "1h",
+    how: str = "last",
+    fill: Optional[str] = "ffill",
+) -> pd.DataFrame:
+    """
+    Resamples prices to a regular frequency inside the database.
+
+    Each (metal, bucket) is reduced to one row by the query, so only one row
+    per bucket crosses the wire instead of every tick. Hourly and daily
+    buckets are read from the rollup tables aggregates.refresh_aggregates()
+    maintains instead of being computed from the ticks; those cover whole
+    buckets, including the one start falls in. The result is pivoted wide and
+    reindexed onto the full bucket range, leaving no duplicate or missing
+    timestamps.
+
+    Args:
+        metals (Iterable[str]): The metal codes to fetch.
+        start (datetime.datetime): Inclusive lower timestamp bound.
+        end (Optional[datetime.datetime]): Exclusive upper bound; defaults to now (UTC).
+        freq (str): A fixed pandas frequency such as '5min' or '1h'.
+        how (str): 'last' for the closing price per bucket, or 'ohlc' for
+            open/high/low/close columns.
+        fill (Optional[str]): 'ffill' carries the last price into empty buckets;
+            None leaves them NaN.
+
+    Returns:
+        pd.DataFrame: A frame indexed by bucket start with the given frequency.
+            Columns are metals for 'last', and (field, metal) pairs for 'ohlc'.
+
+    Raises:
+        ValueError: If how or fill is unknown, or freq is not a fixed frequency.
+    """
+    if how not in ("last", "ohlc"):
+        raise ValueError("how must be 'last' or 'ohlc'")
+    if fill not in ("ffill", None):
+        raise ValueError("fill must be 'ffill' or None")
+    offset = pd.tseries.frequencies.to_offset(freq)
+    try:
+        seconds = int(pd.Timedelta(offset).total_seconds())
+    except ValueError:
+        raise ValueError(f"freq must be a fixed frequency, got '{freq}'")
+    if seconds <= 0:
+        raise ValueError(f"freq must be a fixed frequency, got '{freq}'")
+
+    end = end or datetime.datetime.utcnow()
+    metals = list(metals)
+    fields = ["open", "high", "low", "close"] if how == "ohlc" else ["close"]
+
+    with connection_scope() as connection:
+        if seconds in ROLLUP_TABLES:
+            query = text(
+                f"""
+                SELECT metal, bucket, open, high, low, close
+                FROM {ROLLUP_TABLES[seconds]}
+                WHERE metal IN :metals AND bucket >= :start AND bucket < :end
+                ORDER BY metal, bucket
+                """
+            ).bindparams(
+                bindparam("metals", expanding=True),
+                bindparam("start", type_=DateTime),
+                bindparam("end", type_=DateTime),
+            ).columns(bucket=DateTime)
+            start = pd.Timestamp(start).floor(offset).to_pydatetime()
+        else:
+            query = _resample_query(connection.dialect.name)
+        with METRICS.timer("query"):
+            rows = connection.execute(
+                query, {"metals": metals, "start": start, "end": end, "seconds": seconds}
+            ).all()
+    METRICS.add_rows("query", len(rows))
+
+    if not rows:
+        return pd.DataFrame()
+
+    with METRICS.timer("pivot"):
+        data = pd.DataFrame(rows, columns=["metal", "bucket", "open", "high", "low", "close"])
+        if seconds in ROLLUP_TABLES:
+            data["bucket"] = pd.to_datetime(data["bucket"])
+        else:
+            data["bucket"] = pd.to_datetime(data["bucket"].astype("int64"), unit="s")
+        # One row per (metal, bucket) is guaranteed by the GROUP BY, so pivot cannot raise
+        wide = data.pivot(index="bucket", columns="metal", values=fields)
+
+        index = pd.date_range(
+            pd.Timestamp(start).floor(offset),
+            (pd.Timestamp(end) - pd.Timedelta(microseconds=1)).floor(offset),
+            freq=offset,
+        )
+        wide = wide.reindex(index)
+        if fill == "ffill":
+            wide = wide.ffill()
+        wide.index.name = "timestamp"
+    METRICS.add_rows("pivot", len(rows))
+
+    logging.info(f"Fetched {len(rows)} {freq} buckets for {len(metals)} metals.")
+    return wide["close"] if how == "last" else wide
+
+
+def iter_price_chunks(
+    metals: Iterable[str],
+    start: datetime.datetime,
+    end: Optional[datetime.datetime] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[PriceChunk]:
+    """
+    Streams prices through a server-side cursor as typed per-metal chunks.
+
+    Rows arrive ordered by metal and timestamp and are fetched chunk_size at
+    a time, so peak memory is bounded by one fetched batch regardless of the
+    window: chunk_size row tuples (roughly 200 bytes each) plus their arrays
+    (16 bytes per row). A batch spanning two metals is split at the boundary,
+    so every chunk holds a single metal and chunks never exceed chunk_size.
+
+    Args:
+        metals (Iterable[str]): The metal codes to fetch.
+        start (datetime.datetime): Inclusive lower timestamp bound.
+        end (Optional[datetime.datetime]): Exclusive upper bound; unbounded if None.
+        chunk_size (int): The number of rows fetched per round trip.
+
+    Yields:
+        PriceChunk: The next run of prices, in (metal, timestamp) order.
+
+    Raises:
+        ValueError: If chunk_size is not positive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    end_filter = "AND timestamp < :end" if end is not None else ""
+    query = (
+        text(
+            f"""
+            SELECT metal, price, timestamp
+            FROM precious_metals_prices_view
+            WHERE metal IN :metals AND timestamp >= :start {end_filter}
+            ORDER BY metal, timestamp
+            """
+        )
+        .columns(metal=String, price=Float, timestamp=DateTime)
+        .bindparams(bindparam("metals", expanding=True))
+    )
+    params = {"metals": list(metals), "start": start}
+    if end is not None:
+        params["end"] = end
+
+    with connection_scope() as connection:
+        started = time.perf_counter()
+        result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(query, params)
+        partitions = result.partitions()
+        while (rows := next(partitions, None)) is not None:
+            # Each round trip counts as one query; time spent by the consumer is excluded
+            METRICS.observe("query", time.perf_counter() - started)
+            METRICS.add_rows("query", len(rows))
+            names = np.array([row[0] for row in rows], dtype=object)
+            prices = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+            timestamps = np.array([row[2] for row in rows], dtype="datetime64[us]")
+            del rows
+            # Rows are sorted by metal, so each metal occupies one contiguous run
+            boundaries = np.flatnonzero(names[1:] != names[:-1]) + 1
+            for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(names)]):
+                yield PriceChunk(names[lo], timestamps[lo:hi], prices[lo:hi])
+            started = time.perf_counter()
+
+
+def iter_price_series(
+    metals: Iterable[str],
+    start: datetime.datetime,
+    end: Optional[datetime.datetime] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[PriceChunk]:
+    """
+    Streams each metal's complete series, assembled from iter_price_chunks().
+
+    Only one metal is held at a time: peak memory is one fetched batch plus
+    the largest single series, about 32 bytes per row of it while its chunks
+    are concatenated, instead of the whole window across all metals.
+
+    Args:
+        metals (Iterable[str]): The metal codes to fetch.
+        start (datetime.datetime): Inclusive lower timestamp bound.
+        end (Optional[datetime.datetime]): Exclusive upper bound; unbounded if None.
+        chunk_size (int): The number of rows fetched per round trip.
+
+    Yields:
+        PriceChunk: One chunk per metal that has prices in the window, in metal order.
+    """
+    pending: list[PriceChunk] = []
+
+    def assemble() -> PriceChunk:
+        if len(pending) == 1:
+            return pending[0]
+        return PriceChunk(
+            pending[0].metal,
+            np.concatenate([chunk.timestamps for chunk in pending]),
+            np.concatenate([chunk.prices for chunk in pending]),
+        )
+
+    for chunk in iter_price_chunks(metals, start, end, chunk_size):
+        if pending and chunk.metal != pending[0].metal:
+            series = assemble()
+            pending.clear()
+            yield series
+        pending.append(chunk)
+    if pending:
+        yield assemble()
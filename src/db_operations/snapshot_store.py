@@ -0,0 +1,242 @@
+import json
+import shutil
+import logging
+import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from pyarrow import fs
+from sqlalchemy import or_, select
+
+from src.db_operations.db_connection import connection_scope, read_id_horizon, settle_id
+from src.db_operations.models import PreciousMetalPrice
+
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("metal", pa.string()),
+        ("price", pa.float64()),
+        ("timestamp", pa.timestamp("us")),
+        ("date", pa.string()),
+    ]
+)
+PARTITIONING = ds.partitioning(
+    pa.schema([("metal", pa.string()), ("date", pa.string())]), flavor="hive"
+)
+WATERMARK_FILE = "_watermark.json"
+
+
+class ParquetSnapshotStore:
+    """Columnar copy of 'precious_metals_prices', partitioned by metal and day.
+
+    Files live under ``<root>/metal=<code>/date=<YYYY-MM-DD>/``. sync()
+    appends only rows with an id above the stored watermark, and reads
+    memory-map the files and prune partitions by metal and date.
+    """
+
+    def __init__(self, root: str | Path = "snapshots") -> None:
+        """
+        Initializes the ParquetSnapshotStore.
+
+        Args:
+            root (str | Path): The directory the partitions are written to.
+        """
+        self.root: Path = Path(root)
+        self.filesystem = fs.LocalFileSystem(use_mmap=True)
+
+    def _read_state(self) -> dict:
+        """Reads the watermark file: the exported id, the newest id seen and the xid it waits for."""
+        path = self.root / WATERMARK_FILE
+        state = json.loads(path.read_text()) if path.exists() else {}
+        last_id = int(state.get("last_id", 0))
+        return {
+            "last_id": last_id,
+            "seen_id": int(state.get("seen_id", last_id)),
+            "pending_xid": state.get("pending_xid"),
+        }
+
+    @property
+    def watermark(self) -> int:
+        """The highest 'precious_metals_prices' id already exported (0 before the first sync)."""
+        return self._read_state()["last_id"]
+
+    def _store_watermark(self, last_id: int, seen_id: int, pending_xid: Optional[int]) -> None:
+        """Persists the watermark atomically so an interrupted sync is re-done, not skipped."""
+        path = self.root / WATERMARK_FILE
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"last_id": last_id, "seen_id": seen_id, "pending_xid": pending_xid}))
+        tmp_path.replace(path)
+
+    def _drop_days(self, first_day: str) -> int:
+        """Deletes the partitions of every metal from a day ('YYYY-MM-DD') on, returning how many were removed."""
+        dropped = 0
+        for partition in self.root.glob("metal=*/date=*"):
+            if partition.name.split("=", 1)[1] >= first_day:
+                shutil.rmtree(partition)
+                dropped += 1
+        return dropped
+
+    def sync(self, batch_size: int = 100_000, since: Optional[datetime.datetime] = None) -> int:
+        """
+        Appends rows added to 'precious_metals_prices' since the last sync.
+
+        Rows are streamed from the database in batches of batch_size, so
+        exporting a large table never holds it in memory at once. Ids only
+        become visible at commit, so the export stops below any id another
+        transaction may still commit (see settle_id()); those rows follow in a
+        later sync. Prices changed in place (bulk_load_prices with
+        on_conflict='update') or deleted keep their id and are only picked up
+        by passing `since`, which rewrites the partitions of every day from
+        its date on.
+
+        Args:
+            batch_size (int): The number of rows fetched and written per batch.
+            since (Optional[datetime.datetime]): Also re-export every day at or after
+                this time, e.g. after correcting prices.
+
+        Returns:
+            int: The number of rows exported.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        state = self._read_state()
+        exported = 0
+
+        with connection_scope() as connection:
+            max_id, horizon = read_id_horizon(connection, PreciousMetalPrice.id)
+            if max_id < state["seen_id"]:
+                logging.warning(
+                    f"Price ids restarted below the snapshot watermark {state['seen_id']}; "
+                    f"rebuild the snapshot at {self.root} to export them."
+                )
+            settled_id, pending_xid = settle_id(
+                max_id, horizon, state["seen_id"], state["last_id"], state["pending_xid"]
+            )
+            last_id = state["last_id"]
+
+            new_rows = PreciousMetalPrice.id > last_id
+            if since is not None:
+                first_day = since.date()
+                dropped = self._drop_days(first_day.isoformat())
+                logging.info(f"Re-exporting {dropped} snapshot partitions from {first_day} on.")
+                new_rows = or_(
+                    new_rows, PreciousMetalPrice.timestamp >= datetime.datetime.combine(first_day, datetime.time())
+                )
+            query = (
+                select(
+                    PreciousMetalPrice.id,
+                    PreciousMetalPrice.metal,
+                    PreciousMetalPrice.price,
+                    PreciousMetalPrice.timestamp,
+                )
+                .where(new_rows, PreciousMetalPrice.id <= settled_id)
+                .order_by(PreciousMetalPrice.id)
+            )
+
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            for rows in result.partitions():
+                ids, metals, prices, timestamps = zip(*rows)
+                timestamp_array = pa.array(timestamps, type=pa.timestamp("us"))
+                table = pa.Table.from_arrays(
+                    [
+                        pa.array(ids, type=pa.int64()),
+                        pa.array(metals, type=pa.string()),
+                        pa.array(prices, type=pa.float64()),
+                        timestamp_array,
+                        pc.strftime(timestamp_array, format="%Y-%m-%d"),
+                    ],
+                    schema=SNAPSHOT_SCHEMA,
+                )
+                ds.write_dataset(
+                    table,
+                    self.root,
+                    format="parquet",
+                    partitioning=PARTITIONING,
+                    # Ids make file names unique, so later batches append instead of overwriting
+                    basename_template=f"part-{ids[0]}-{ids[-1]}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                )
+                last_id = max(last_id, ids[-1])
+                self._store_watermark(last_id, state["seen_id"], state["pending_xid"])
+                exported += len(rows)
+
+        self._store_watermark(max(last_id, settled_id), max_id, pending_xid)
+        logging.info(f"Exported {exported} rows to snapshot store at {self.root}.")
+        return exported
+
+    def dataset(self) -> ds.Dataset:
+        """Opens the partitioned files as a memory-mapped Arrow dataset."""
+        return ds.dataset(
+            str(self.root),
+            format="parquet",
+            partitioning=PARTITIONING,
+            filesystem=self.filesystem,
+            exclude_invalid_files=True,
+        )
+
+    def read(
+        self,
+        metals: Optional[Iterable[str]] = None,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        columns: Iterable[str] = ("metal", "price", "timestamp"),
+    ) -> pa.Table:
+        """
+        Reads snapshot rows, scanning only the partitions that can match.
+
+        Args:
+            metals (Optional[Iterable[str]]): The metals to read; all if None.
+            start (Optional[datetime.datetime]): Inclusive lower timestamp bound.
+            end (Optional[datetime.datetime]): Exclusive upper timestamp bound.
+            columns (Iterable[str]): The columns to return.
+
+        Returns:
+            pa.Table: The matching rows sorted by metal and timestamp.
+        """
+        if not self.root.exists():
+            return pa.table({name: pa.array([], type=SNAPSHOT_SCHEMA.field(name).type) for name in columns})
+
+        condition = None
+
+        def add(expression):
+            nonlocal condition
+            condition = expression if condition is None else condition & expression
+
+        if metals is not None:
+            add(ds.field("metal").isin(list(metals)))
+        if start is not None:
+            add(ds.field("date") >= start.date().isoformat())
+            add(ds.field("timestamp") >= pa.scalar(start, type=pa.timestamp("us")))
+        if end is not None:
+            add(ds.field("date") <= end.date().isoformat())
+            add(ds.field("timestamp") < pa.scalar(end, type=pa.timestamp("us")))
+
+        table = self.dataset().to_table(columns=list(columns), filter=condition)
+        sort_keys = [(name, "ascending") for name in ("metal", "timestamp") if name in table.column_names]
+        return table.sort_by(sort_keys) if sort_keys else table
+
+    def read_frame(
+        self,
+        metals: Optional[Iterable[str]] = None,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Reads snapshot rows as a wide frame, one column per metal, indexed by timestamp.
+
+        Args:
+            metals (Optional[Iterable[str]]): The metals to read; all if None.
+            start (Optional[datetime.datetime]): Inclusive lower timestamp bound.
+            end (Optional[datetime.datetime]): Exclusive upper timestamp bound.
+
+        Returns:
+            pd.DataFrame: Prices indexed by timestamp, the same shape Model.fetch_data() returns.
+        """
+        table = self.read(metals, start, end)
+        if table.num_rows == 0:
+            return pd.DataFrame()
+        frame = table.to_pandas(split_blocks=True, self_destruct=True)
+        return frame.pivot_table(index="timestamp", columns="metal", values="price", aggfunc="last")
@@ -0,0 +1,682 @@
+import os
+import csv
+import gzip
+import logging
+import datetime
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Connection, DateTime, Engine, bindparam, text
+
+from src.db_operations.db_connection import create_view, get_engine
+from src.db_operations.models import PreciousMetalPrice, PriceRollupDaily, PriceRollupHourly
+
+PRICE_TABLE = PreciousMetalPrice.__tablename__
+DEFAULT_PARTITION = f"{PRICE_TABLE}_default"
+DEFAULT_MONTHS_AHEAD = 3
+ARCHIVE_BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    """How one aggregate table is computed from the table below it.
+
+    The expressions are evaluated per source row: raw ticks contribute their
+    price to every field and count as one sample, while hourly rows carry
+    their own open/high/low/close and sample counts up to the daily tier.
+    """
+
+    table: str
+    unit: str  # 'hour' or 'day'
+    source: str
+    time_column: str
+    open: str
+    high: str
+    low: str
+    close: str
+    total: str  # Sum of the prices summarized, so means combine exactly
+    samples: str
+
+
+ROLLUP_TIERS: Dict[str, RollupTier] = {
+    "hourly": RollupTier(
+        table=PriceRollupHourly.__tablename__,
+        unit="hour",
+        source=PRICE_TABLE,
+        time_column="timestamp",
+        open="price",
+        high="price",
+        low="price",
+        close="price",
+        total="price",
+        samples="1",
+    ),
+    "daily": RollupTier(
+        table=PriceRollupDaily.__tablename__,
+        unit="day",
+        source=PriceRollupHourly.__tablename__,
+        time_column="bucket",
+        open="open",
+        high="high",
+        low="low",
+        close="close",
+        total="mean * samples",
+        samples="samples",
+    ),
+}
+
+
+@dataclass
+class RetentionPolicy:
+    """How long each storage tier is kept; None keeps a tier forever.
+
+    Attributes:
+        raw_months: Whole months of raw ticks kept before the current month.
+        hourly_days: Days of hourly aggregates kept.
+        daily_days: Days of daily aggregates kept.
+        archive_dir: Expired rows are written here as gzipped CSV before they
+            are dropped; None drops them without an archive.
+    """
+
+    raw_months: Optional[int] = None
+    hourly_days: Optional[int] = None
+    daily_days: Optional[int] = None
+    archive_dir: Optional[str | Path] = None
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """
+        Reads the policy from ``RETENTION_RAW_MONTHS``, ``RETENTION_HOURLY_DAYS``,
+        ``RETENTION_DAILY_DAYS`` and ``RETENTION_ARCHIVE_DIR``; unset tiers are kept forever.
+
+        Returns:
+            RetentionPolicy: The configured policy.
+        """
+
+        def optional_int(name: str) -> Optional[int]:
+            value = os.getenv(name)
+            return int(value) if value else None
+
+        return cls(
+            raw_months=optional_int("RETENTION_RAW_MONTHS"),
+            hourly_days=optional_int("RETENTION_HOURLY_DAYS"),
+            daily_days=optional_int("RETENTION_DAILY_DAYS"),
+            archive_dir=os.getenv("RETENTION_ARCHIVE_DIR") or None,
+        )
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    """Returns the first day of the month containing value."""
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month: datetime.date, months: int) -> datetime.date:
+    """Returns the first day of the month that is the given number of months after month."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    """Returns the name of the partition holding the given month, e.g. 'precious_metals_prices_y2024m01'."""
+    return f"{PRICE_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """
+    Checks whether 'precious_metals_prices' is a partitioned table.
+
+    Args:
+        connection (Connection): The connection to inspect.
+
+    Returns:
+        bool: True on PostgreSQL once the table has been converted; always False elsewhere.
+    """
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.execute(
+            text(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_partitioned_table p
+                    JOIN pg_class c ON c.oid = p.partrelid
+                    WHERE c.relname = :table AND pg_table_is_visible(c.oid)
+                )
+                """
+            ),
+            {"table": PRICE_TABLE},
+        ).scalar()
+    )
+
+
+def list_partitions(connection: Connection) -> Dict[datetime.date, str]:
+    """
+    Lists the monthly partitions of 'precious_metals_prices'.
+
+    Args:
+        connection (Connection): A connection to a partitioned PostgreSQL database.
+
+    Returns:
+        Dict[datetime.date, str]: Partition names keyed by the first day of their month.
+    """
+    names = connection.execute(
+        text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :table
+            """
+        ),
+        {"table": PRICE_TABLE},
+    ).scalars()
+    partitions = {}
+    for name in names:
+        suffix = name[len(PRICE_TABLE) + 1:]
+        if name.startswith(f"{PRICE_TABLE}_y") and len(suffix) == 8 and suffix[5] == "m":
+            partitions[datetime.date(int(suffix[1:5]), int(suffix[6:8]), 1)] = name
+    return partitions
+
+
+def create_month_partition(connection: Connection, month: datetime.date) -> str:
+    """
+    Creates the partition for one month, moving any of its rows out of the default partition.
+
+    Rows that arrived before their month had a partition (e.g. from a
+    historical backfill) sit in the default partition, which would make a
+    plain CREATE ... PARTITION OF fail; the partition is therefore built as a
+    standalone table, filled from the default partition and then attached.
+
+    Args:
+        connection (Connection): A connection to a partitioned PostgreSQL database.
+        month (datetime.date): The first day of the month.
+
+    Returns:
+        str: The name of the new partition.
+    """
+    name = partition_name(month)
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PRICE_TABLE} INCLUDING DEFAULTS)"))
+    connection.execute(
+        text(
+            f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE timestamp >= '{lower}' AND timestamp < '{upper}'
+                RETURNING id, metal, price, timestamp, base_currency
+            )
+            INSERT INTO {name} (id, metal, price, timestamp, base_currency) SELECT * FROM moved
+            """
+        )
+    )
+    connection.execute(
+        text(f"ALTER TABLE {PRICE_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')")
+    )
+    logging.info(f"Created partition {name}.")
+    return name
+
+
+def convert_prices_to_partitioned(engine: Engine = None) -> bool:
+    """
+    Rebuilds 'precious_metals_prices' as a table range-partitioned by month on PostgreSQL.
+
+    The existing rows are copied into monthly partitions, plus a default
+    partition for months that have none yet, and the indexes are rebuilt
+    per partition. The primary key becomes (id, timestamp), since every
+    unique key of a partitioned table must contain the partition column.
+    Runs in one transaction, so a failure leaves the original table intact.
+    Other dialects and already partitioned tables are left untouched.
+
+    Args:
+        engine (Engine): The engine to migrate. Defaults to the shared engine.
+
+    Returns:
+        bool: True if the table was converted.
+
+    Raises:
+        Exception: If the conversion fails.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "postgresql":
+        return False
+
+    legacy = f"{PRICE_TABLE}_unpartitioned"
+    with engine.begin() as connection:
+        if is_partitioned(connection):
+            return False
+
+        logging.info(f"Converting '{PRICE_TABLE}' to monthly range partitions.")
+        try:
+            sequence = connection.execute(
+                text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": PRICE_TABLE}
+            ).scalar()
+            months = connection.execute(
+                text(f"SELECT DISTINCT date_trunc('month', timestamp)::date FROM {PRICE_TABLE}")
+            ).scalars().all()
+
+            # The view pins the old table; create_view() restores it afterwards
+            connection.execute(text("DROP VIEW IF EXISTS precious_metals_prices_view"))
+            connection.execute(text(f"ALTER TABLE {PRICE_TABLE} RENAME TO {legacy}"))
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+            connection.execute(
+                text(
+                    f"""
+                    CREATE TABLE {PRICE_TABLE} (
+                        id INTEGER NOT NULL DEFAULT nextval('{sequence}'),
+                        metal VARCHAR(10) NOT NULL,
+                        price DOUBLE PRECISION NOT NULL,
+                        timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                        base_currency VARCHAR(3) NOT NULL DEFAULT 'EUR'
+                    ) PARTITION BY RANGE (timestamp)
+                    """
+                )
+            )
+            connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PRICE_TABLE} DEFAULT"))
+            for month in sorted(months):
+                create_month_partition(connection, month)
+
+            connection.execute(
+                text(
+                    f"INSERT INTO {PRICE_TABLE} (id, metal, price, timestamp, base_currency) "
+                    f"SELECT id, metal, price, timestamp, base_currency FROM {legacy}"
+                )
+            )
+            connection.execute(text(f"DROP TABLE {legacy}"))
+
+            # Indexes are built after the copy, and cascade to every partition
+            connection.execute(text(f"ALTER TABLE {PRICE_TABLE} ADD PRIMARY KEY (id, timestamp)"))
+            connection.execute(text(f"CREATE INDEX ix_{PRICE_TABLE}_metal ON {PRICE_TABLE} (metal)"))
+            connection.execute(text(f"CREATE INDEX ix_{PRICE_TABLE}_timestamp ON {PRICE_TABLE} (timestamp)"))
+            connection.execute(
+                text(f"CREATE UNIQUE INDEX uq_{PRICE_TABLE}_metal_timestamp ON {PRICE_TABLE} (metal, timestamp)")
+            )
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PRICE_TABLE}.id"))
+        except Exception as e:
+            logging.error(f"Failed to partition '{PRICE_TABLE}': {e}")
+            raise
+
+    create_view(engine)
+    logging.info(f"'{PRICE_TABLE}' partitioned into {len(months)} months.")
+    return True
+
+
+def ensure_partitions(
+    engine: Engine = None,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+    now: Optional[datetime.datetime] = None,
+) -> List[str]:
+    """
+    Creates the partitions for the current and upcoming months, and for any
+    month whose rows landed in the default partition.
+
+    Args:
+        engine (Engine): The engine to use. Defaults to the shared engine.
+        months_ahead (int): How many months beyond the current one to prepare.
+        now (Optional[datetime.datetime]): The reference time; defaults to now (UTC).
+
+    Returns:
+        List[str]: The partitions that were created; empty when the table is not partitioned.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "postgresql":
+        return []
+
+    current = month_start((now or datetime.datetime.utcnow()).date())
+    created = []
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            return []
+        months = {add_months(current, offset) for offset in range(months_ahead + 1)}
+        months.update(
+            connection.execute(
+                text(f"SELECT DISTINCT date_trunc('month', timestamp)::date FROM {DEFAULT_PARTITION}")
+            ).scalars()
+        )
+        existing = list_partitions(connection)
+        for month in sorted(months - set(existing)):
+            created.append(create_month_partition(connection, month))
+    return created
+
+
+def truncate_expression(dialect: str, column: str, unit: str) -> str:
+    """
+    Returns SQL that truncates a timestamp column to the start of its hour or day.
+
+    On SQLite the result is formatted the way SQLAlchemy stores DateTime
+    values, so truncated buckets compare and round-trip like stored ones.
+
+    Args:
+        dialect (str): The SQLAlchemy dialect name.
+        column (str): The column to truncate.
+        unit (str): 'hour' or 'day'.
+
+    Returns:
+        str: The SQL expression.
+
+    Raises:
+        NotImplementedError: For dialects other than PostgreSQL and SQLite.
+    """
+    if dialect == "postgresql":
+        return f"date_trunc('{unit}', {column})"
+    if dialect == "sqlite":
+        time_format = "%H:00:00.000000" if unit == "hour" else "00:00:00.000000"
+        return f"strftime('%Y-%m-%d {time_format}', {column})"
+    raise NotImplementedError(f"Rollups are not supported on '{dialect}'")
+
+
+def truncate(value: datetime.datetime, unit: str) -> datetime.datetime:
+    """Truncates a datetime to the start of its hour or day."""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if unit == "day" else value
+
+
+def rollup_prices(
+    tier: str = "hourly",
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    engine: Engine = None,
+    metals: Optional[List[str]] = None,
+    complete_only: bool = True,
+    connection: Optional[Connection] = None,
+) -> int:
+    """
+    Aggregates the tier's source rows into open/high/low/close buckets.
+
+    The hourly tier summarizes raw ticks and the daily tier summarizes the
+    hourly one, so daily aggregates survive the expiry of raw data. Buckets
+    are upserted, which makes re-running a range idempotent.
+
+    Args:
+        tier (str): 'hourly' or 'daily'.
+        start (Optional[datetime.datetime]): Source rows from here on are aggregated;
+            defaults to the newest bucket already stored, so each run recomputes
+            that bucket and continues. Pass an earlier start after a backfill.
+        end (Optional[datetime.datetime]): Exclusive upper bound; defaults to the
+            start of the current hour or day, so only complete buckets are written.
+        engine (Engine): The engine to use. Defaults to the shared engine.
+        metals (Optional[List[str]]): Only aggregate these metals; all if None.
+        complete_only (bool): With no end, stop at the current bucket; False also
+            writes the current, still filling bucket, which later runs update.
+        connection (Optional[Connection]): Run inside this transaction instead of a new one.
+
+    Returns:
+        int: The number of buckets written.
+
+    Raises:
+        ValueError: If the tier is unknown.
+    """
+    if tier not in ROLLUP_TIERS:
+        raise ValueError(f"tier must be one of {tuple(ROLLUP_TIERS)}")
+    if connection is None:
+        with (engine or get_engine()).begin() as connection:
+            return rollup_prices(tier, start, end, metals=metals, complete_only=complete_only, connection=connection)
+
+    spec = ROLLUP_TIERS[tier]
+    if end is None and complete_only:
+        end = truncate(datetime.datetime.utcnow(), spec.unit)
+    if start is None:
+        start = connection.execute(
+            text(f"SELECT MAX(bucket) AS bucket FROM {spec.table}").columns(bucket=DateTime)
+        ).scalar()
+
+    bucket = truncate_expression(connection.dialect.name, spec.time_column, spec.unit)
+    conditions = ["true"]
+    params: Dict[str, Any] = {}
+    if end is not None:
+        conditions.append(f"{spec.time_column} < :end")
+        params["end"] = end
+    if start is not None:
+        conditions.append(f"{spec.time_column} >= :start")
+        params["start"] = start
+    if metals is not None:
+        conditions.append("metal IN :metals")
+        params["metals"] = list(metals)
+
+    query = text(
+        f"""
+        INSERT INTO {spec.table} (metal, bucket, open, high, low, close, mean, samples)
+        SELECT metal, bucket,
+            MAX(CASE WHEN first_rank = 1 THEN open END),
+            MAX(high),
+            MIN(low),
+            MAX(CASE WHEN last_rank = 1 THEN close END),
+            SUM(total) / SUM(samples),
+            SUM(samples)
+        FROM (
+            SELECT metal, {bucket} AS bucket,
+                {spec.open} AS open, {spec.high} AS high, {spec.low} AS low, {spec.close} AS close,
+                {spec.total} AS total, {spec.samples} AS samples,
+                ROW_NUMBER() OVER (PARTITION BY metal, {bucket} ORDER BY {spec.time_column}) AS first_rank,
+                ROW_NUMBER() OVER (PARTITION BY metal, {bucket} ORDER BY {spec.time_column} DESC) AS last_rank
+            FROM {spec.source}
+            WHERE {" AND ".join(conditions)}
+        ) ranked
+        WHERE true
+        GROUP BY metal, bucket
+        ON CONFLICT (metal, bucket) DO UPDATE SET
+            open = excluded.open, high = excluded.high, low = excluded.low,
+            close = excluded.close, mean = excluded.mean, samples = excluded.samples
+        """
+    ).bindparams(
+        *(bindparam(name, type_=DateTime) for name in params if name != "metals"),
+        *([bindparam("metals", expanding=True)] if metals is not None else []),
+    )
+    written = connection.execute(query, params).rowcount
+
+    logging.info(f"Rolled up {written} {tier} buckets" + (f" before {end}." if end is not None else "."))
+    return written
+
+
+def archive_rows(
+    connection: Connection,
+    table: str,
+    time_column: str,
+    before: datetime.datetime,
+    path: Path,
+) -> int:
+    """
+    Streams the rows of a table older than a cutoff into a gzipped CSV file.
+
+    Args:
+        connection (Connection): The connection to read through.
+        table (str): The table (or partition) to archive.
+        time_column (str): The column compared with the cutoff.
+        before (datetime.datetime): Rows strictly older than this are archived.
+        path (Path): The file to write; nothing is written if no rows match.
+
+    Returns:
+        int: The number of rows archived.
+    """
+    # Options are passed per statement; Connection.execution_options() would stream the later DDL too
+    result = connection.execute(
+        text(f"SELECT * FROM {table} WHERE {time_column} < :before ORDER BY {time_column}").bindparams(
+            bindparam("before", type_=DateTime)
+        ),
+        {"before": before},
+        execution_options={"stream_results": True, "yield_per": ARCHIVE_BATCH_SIZE},
+    )
+    archived = 0
+    tmp_path = path.with_suffix(".tmp")
+    with gzip.open(tmp_path, "wt", newline="") as archive:
+        writer = csv.writer(archive)
+        writer.writerow(result.keys())
+        for rows in result.partitions():
+            writer.writerows(rows)
+            archived += len(rows)
+
+    if archived:
+        tmp_path.replace(path)
+        logging.info(f"Archived {archived} rows of '{table}' to {path}.")
+    else:
+        tmp_path.unlink()
+    return archived
+
+
+def expire_rows(
+    table: str,
+    time_column: str,
+    before: datetime.datetime,
+    archive_dir: Optional[str | Path] = None,
+    engine: Engine = None,
+) -> int:
+    """
+    Deletes the rows of a table older than a cutoff, archiving them first if requested.
+
+    On a partitioned 'precious_metals_prices', whole monthly partitions that
+    end before the cutoff are dropped instead of deleted row by row, and only
+    the default partition is filtered.
+
+    Args:
+        table (str): The table to expire rows from.
+        time_column (str): The column compared with the cutoff.
+        before (datetime.datetime): Rows strictly older than this are removed.
+        archive_dir (Optional[str | Path]): Where to write gzipped CSV archives.
+        engine (Engine): The engine to use. Defaults to the shared engine.
+
+    Returns:
+        int: The number of rows removed.
+
+    Raises:
+        Exception: If archiving or deleting fails; nothing is removed then.
+    """
+    engine = engine or get_engine()
+    archive_path = Path(archive_dir) if archive_dir is not None else None
+    if archive_path is not None:
+        archive_path.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    removed = 0
+
+    try:
+        with engine.begin() as connection:
+            if table == PRICE_TABLE and is_partitioned(connection):
+                for month, name in sorted(list_partitions(connection).items()):
+                    if datetime.datetime.combine(add_months(month, 1), datetime.time()) > before:
+                        continue
+                    if archive_path is not None:
+                        rows = archive_rows(connection, name, time_column, before, archive_path / f"{name}.csv.gz")
+                    else:
+                        rows = connection.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar()
+                    connection.execute(text(f"DROP TABLE {name}"))
+                    logging.info(f"Dropped expired partition {name} ({rows} rows).")
+                    removed += rows
+                table = DEFAULT_PARTITION
+
+            if archive_path is not None:
+                archive_rows(
+                    connection,
+                    table,
+                    time_column,
+                    before,
+                    archive_path / f"{table}_before_{before:%Y%m%d}_{stamp}.csv.gz",
+                )
+            removed += connection.execute(
+                text(f"DELETE FROM {table} WHERE {time_column} < :before").bindparams(
+                    bindparam("before", type_=DateTime)
+                ),
+                {"before": before},
+            ).rowcount
+    except Exception as e:
+        logging.error(f"Failed to expire rows of '{table}' before {before}: {e}")
+        raise
+
+    logging.info(f"Expired {removed} rows of '{table}' older than {before}.")
+    return removed
+
+
+def _oldest_before(tier: str, before: datetime.datetime, engine: Engine) -> Optional[datetime.datetime]:
+    """Returns the time of the oldest source row of a rollup tier older than a cutoff, if any."""
+    spec = ROLLUP_TIERS[tier]
+    with engine.connect() as connection:
+        return connection.execute(
+            text(f"SELECT MIN({spec.time_column}) AS oldest FROM {spec.source} WHERE {spec.time_column} < :before")
+            .bindparams(bindparam("before", type_=DateTime))
+            .columns(oldest=DateTime),
+            {"before": before},
+        ).scalar()
+
+
+def apply_retention(
+    policy: RetentionPolicy,
+    now: Optional[datetime.datetime] = None,
+    engine: Engine = None,
+) -> Dict[str, int]:
+    """
+    Rolls up complete buckets, then expires each tier according to the policy.
+
+    The incremental rollups only move forward from the newest bucket, so
+    rows written into older buckets (late backfills) are not covered by them.
+    Before a tier expires, the tiers built from it are therefore recomputed
+    over the whole range being expired, from its oldest row to the cutoff,
+    so raw ticks and hourly buckets are always summarized before they go.
+
+    Args:
+        policy (RetentionPolicy): How long each tier is kept.
+        now (Optional[datetime.datetime]): The reference time; defaults to now (UTC).
+        engine (Engine): The engine to use. Defaults to the shared engine.
+
+    Returns:
+        Dict[str, int]: Buckets written per rollup tier, buckets recomputed before
+            an expiry and rows removed per expired tier, e.g. {'hourly': 24,
+            'daily': 1, 'hourly_resummarized': 720, 'daily_resummarized': 30,
+            'raw_expired': 5000}.
+    """
+    now = now or datetime.datetime.utcnow()
+    summary = {
+        tier: rollup_prices(tier, end=truncate(now, spec.unit), engine=engine)
+        for tier, spec in ROLLUP_TIERS.items()
+    }
+
+    engine = engine or get_engine()
+
+    if policy.raw_months is not None:
+        cutoff = datetime.datetime.combine(add_months(month_start(now.date()), -policy.raw_months), datetime.time())
+        oldest = _oldest_before("hourly", cutoff, engine)
+        if oldest is not None:
+            summary["hourly_resummarized"] = rollup_prices("hourly", truncate(oldest, "hour"), cutoff, engine)
+            summary["daily_resummarized"] = rollup_prices("daily", truncate(oldest, "day"), cutoff, engine)
+        summary["raw_expired"] = expire_rows(PRICE_TABLE, "timestamp", cutoff, policy.archive_dir, engine)
+    if policy.hourly_days is not None:
+        cutoff = truncate(now - datetime.timedelta(days=policy.hourly_days), "day")
+        oldest = _oldest_before("daily", cutoff, engine)
+        if oldest is not None:
+            resummarized = rollup_prices("daily", truncate(oldest, "day"), cutoff, engine)
+            summary["daily_resummarized"] = summary.get("daily_resummarized", 0) + resummarized
+        summary["hourly_expired"] = expire_rows(
+            ROLLUP_TIERS["hourly"].table, "bucket", cutoff, policy.archive_dir, engine
+        )
+    if policy.daily_days is not None:
+        summary["daily_expired"] = expire_rows(
+            ROLLUP_TIERS["daily"].table,
+            "bucket",
+            truncate(now - datetime.timedelta(days=policy.daily_days), "day"),
+            policy.archive_dir,
+            engine,
+        )
+    return summary
+
+
+def maintain_storage(
+    policy: Optional[RetentionPolicy] = None,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+    now: Optional[datetime.datetime] = None,
+    engine: Engine = None,
+) -> Dict[str, Any]:
+    """
+    Runs the periodic storage tasks: upcoming partitions, rollups and retention.
+
+    Args:
+        policy (Optional[RetentionPolicy]): The retention policy; defaults to RetentionPolicy.from_env().
+        months_ahead (int): How many months of partitions to keep ready.
+        now (Optional[datetime.datetime]): The reference time; defaults to now (UTC).
+        engine (Engine): The engine to use. Defaults to the shared engine.
+
+    Returns:
+        Dict[str, Any]: The created partitions under 'partitions', plus the apply_retention() summary.
+    """
+    policy = policy or RetentionPolicy.from_env()
+    summary: Dict[str, Any] = {"partitions": ensure_partitions(engine, months_ahead, now)}
+    summary.update(apply_retention(policy, now, engine))
+    logging.info(f"Storage maintenance finished: {summary}")
+    return summary
@@ -3,12 +3,38 @@ import logging
 import sys
 from datetime import datetime
 
-def setup_logging() -> None:
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_configured = False
+
+
+def setup_logging(level: str | int | None = None) -> None:
     """Sets up the logging configuration for the application.
-    
+
     The log messages include timestamps, log levels, and the actual log message.
+    They go to an hourly file under ``LOG_DIR`` (default ``logs``) and to stdout.
+
+    Only entry points call this (cli.main, main.py and the daemon and server
+    scripts); library modules just log, so importing them leaves an
+    embedding application's logging alone. The first call installs the
+    handlers; later calls only change the level when one is passed explicitly.
+
+    Args:
+        level (str | int | None): The root log level, e.g. 'DEBUG' or logging.DEBUG;
+            defaults to the ``LOG_LEVEL`` environment variable, or INFO.
     """
-    log_dir = "logs"
+    global _configured
+    root_logger = logging.getLogger()
+
+    if _configured:
+        if level is not None:
+            root_logger.setLevel(level.upper() if isinstance(level, str) else level)
+        return
+    _configured = True
+
+    level = level if level is not None else os.getenv("LOG_LEVEL", "INFO")
+    log_dir = os.getenv("LOG_DIR", "logs")
     current_datetime = datetime.now()
     log_file_name = f"app_log_{current_datetime.strftime('%Y-%m-%d_%H')}.log"
     log_file_path = os.path.join(log_dir, log_file_name)
@@ -16,16 +42,9 @@ def setup_logging() -> None:
     # Create the log directory if it doesn't exist
     os.makedirs(log_dir, exist_ok=True)
 
-    logging.basicConfig(
-        filename=log_file_path,
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    logging.basicConfig(filename=log_file_path, format=LOG_FORMAT, datefmt=DATE_FORMAT)
+    root_logger.setLevel(level.upper() if isinstance(level, str) else level)
 
     stdout_handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
-    stdout_handler.setFormatter(formatter)
-
-    root_logger = logging.getLogger()
+    stdout_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
     root_logger.addHandler(stdout_handler)
@@ -0,0 +1,250 @@
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+PREFIX = "metalytics"
+
+
+class _StageTimer:
+    """Duration statistics of one stage."""
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.count: int = 0
+        self.errors: int = 0
+        self.total_seconds: float = 0.0
+        self.max_seconds: float = 0.0
+        self.rows: int = 0
+        self.bucket_counts: list[int] = [0] * len(buckets)
+
+
+class Metrics:
+    """Process-wide timers and counters for the pipeline's stages.
+
+    Stages are timed with ``with METRICS.timer("db_write"):`` and report
+    how many rows they processed with add_rows(). Everything is kept in
+    memory; snapshot() gives the structured per-run summary and
+    prometheus() the same numbers in the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """
+        Initializes the Metrics registry.
+
+        Args:
+            buckets (Tuple[float, ...]): Upper bounds of the duration histogram buckets, in seconds.
+        """
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears all timers and counters and restarts the run clock."""
+        with self._lock:
+            self.started_at: datetime = datetime.utcnow()
+            self._started: float = time.perf_counter()
+            self._stages: Dict[str, _StageTimer] = {}
+            self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def _stage(self, stage: str) -> _StageTimer:
+        timer = self._stages.get(stage)
+        if timer is None:
+            timer = self._stages[stage] = _StageTimer(self.buckets)
+        return timer
+
+    def observe(self, stage: str, seconds: float, error: bool = False) -> None:
+        """
+        Records one execution of a stage.
+
+        Args:
+            stage (str): The stage name, e.g. 'http_fetch'.
+            seconds (float): How long it took.
+            error (bool): Whether it failed.
+        """
+        with self._lock:
+            timer = self._stage(stage)
+            timer.count += 1
+            timer.errors += error
+            timer.total_seconds += seconds
+            timer.max_seconds = max(timer.max_seconds, seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    timer.bucket_counts[i] += 1
+                    break
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """
+        Times the enclosed block as one execution of a stage; exceptions are counted and re-raised.
+
+        Args:
+            stage (str): The stage name.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - started, error=True)
+            raise
+        self.observe(stage, time.perf_counter() - started)
+
+    def add_rows(self, stage: str, rows: int) -> None:
+        """Adds to the number of rows a stage has processed."""
+        with self._lock:
+            self._stage(stage).rows += rows
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """
+        Increments a free-form counter, e.g. inc('fits', status='failed').
+
+        Args:
+            name (str): The counter name, without prefix or '_total' suffix.
+            value (float): The amount to add.
+            **labels (str): Label names and values.
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the structured summary of the run so far.
+
+        Returns:
+            Dict[str, Any]: The run's start time and duration, per-stage counts,
+                errors, rows and mean/max durations, and the counters.
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": timer.count,
+                    "errors": timer.errors,
+                    "rows": timer.rows,
+                    "total_seconds": timer.total_seconds,
+                    "mean_seconds": timer.total_seconds / timer.count if timer.count else 0.0,
+                    "max_seconds": timer.max_seconds,
+                }
+                for stage, timer in self._stages.items()
+            }
+            counters = {_series_name(name, labels): value for (name, labels), value in self._counters.items()}
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "duration_seconds": time.perf_counter() - self._started,
+                "stages": stages,
+                "counters": counters,
+            }
+
+    def prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Args:
+            gauges (Optional[Dict[str, float]]): Point-in-time values to export
+                alongside, e.g. connection pool statistics.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        with self._lock:
+            stages = sorted(self._stages.items())
+            counters = sorted(self._counters.items())
+
+            lines += [
+                f"# HELP {PREFIX}_stage_seconds Time spent in each pipeline stage.",
+                f"# TYPE {PREFIX}_stage_seconds histogram",
+            ]
+            for stage, timer in stages:
+                cumulative = 0
+                for bound, count in zip(self.buckets, timer.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {timer.count}')
+                lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {timer.total_seconds:.6f}')
+                lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {timer.count}')
+
+            for name, help_text, attribute in (
+                ("stage_errors", "Failed executions of each pipeline stage.", "errors"),
+                ("rows", "Rows processed by each pipeline stage.", "rows"),
+            ):
+                lines += [f"# HELP {PREFIX}_{name}_total {help_text}", f"# TYPE {PREFIX}_{name}_total counter"]
+                lines += [
+                    f'{PREFIX}_{name}_total{{stage="{stage}"}} {getattr(timer, attribute)}' for stage, timer in stages
+                ]
+
+            seen = set()
+            for (name, labels), value in counters:
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+                lines.append(f"{PREFIX}_{_series_name(f'{name}_total', labels)} {value:g}")
+
+        for name, value in sorted((gauges or {}).items()):
+            lines += [f"# TYPE {PREFIX}_{name} gauge", f"{PREFIX}_{name} {float(value):g}"]
+        return "\n".join(lines) + "\n"
+
+
+def _series_name(name: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Formats a counter key as name{label="value",...}."""
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+METRICS = Metrics()
+
+
+def pool_gauges() -> Dict[str, float]:
+    """Returns the numeric connection pool statistics as gauges named db_pool_<stat>."""
+    # Imported here so that modules without a database (the CLI, tests) can use metrics
+    from src.db_operations.db_connection import pool_stats
+
+    return {
+        f"db_pool_{key}": value
+        for key, value in pool_stats().items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def run_summary() -> Dict[str, Any]:
+    """
+    Returns the structured summary of this run: stage timings, counters and pool statistics.
+
+    Returns:
+        Dict[str, Any]: METRICS.snapshot() plus a 'db_pool' section.
+    """
+    summary = METRICS.snapshot()
+    summary["db_pool"] = pool_gauges()
+    return summary
+
+
+def prometheus_text() -> str:
+    """Returns all metrics, including pool statistics, in the Prometheus text format."""
+    return METRICS.prometheus(pool_gauges())
+
+
+def write_metrics(json_path: Optional[str | Path] = None, prometheus_path: Optional[str | Path] = None) -> None:
+    """
+    Writes the run summary as JSON and/or the Prometheus text file, e.g. for node_exporter's textfile collector.
+
+    Files are replaced atomically so a scraper never reads a partial file.
+
+    Args:
+        json_path (Optional[str | Path]): Where to write the JSON summary.
+        prometheus_path (Optional[str | Path]): Where to write the Prometheus text.
+    """
+    for path, render in ((json_path, lambda: json.dumps(run_summary(), indent=2)), (prometheus_path, prometheus_text)):
+        if path is None:
+            continue
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(render())
+        tmp_path.replace(path)
+        logging.info(f"Metrics written to {path}.")
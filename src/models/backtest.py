@@ -0,0 +1,437 @@
+import json
+import time
+import hashlib
+import logging
+import multiprocessing
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from statistics import NormalDist
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sktime.forecasting.arima import ARIMA
+
+from src.db_operations.db_connection import session_scope
+from src.db_operations.models import BacktestScore
+from src.db_operations.queries import fetch_resampled_prices, iter_price_series
+from src.metrics import METRICS
+from src.models.statespace import ArimaState
+
+Order = tuple[int, int, int]
+WINDOWS = ("expanding", "rolling")
+METRIC_NAMES = ("mae", "rmse", "mape", "coverage")
+
+
+@dataclass(frozen=True)
+class BacktestConfig:
+    """A model configuration and the walk-forward scheme it is evaluated with.
+
+    Forecasts are made from every `step`-th origin after the first `initial`
+    observations, each for horizons 1..`horizon`. The ARIMA parameters are
+    refitted every `refit_every` origins, on all observations so far
+    ('expanding') or the last `window_size` ('rolling'); in between, the fitted
+    state is filtered forward through the new observations with the
+    parameters held fixed, as Model's incremental mode does.
+    """
+
+    order: Order = (1, 1, 0)
+    with_intercept: bool = True
+    horizon: int = 12
+    initial: int = 200
+    step: int = 1
+    window: str = "expanding"
+    window_size: int | None = None  # Observations per rolling fit; defaults to initial
+    refit_every: int = 50  # Origins per parameter refit; 1 refits at every origin
+    coverage: float = 0.9  # Nominal coverage of the scored prediction interval
+    freq: str | None = None  # Resample to this frequency first; None uses the raw ticks
+
+    def __post_init__(self) -> None:
+        """Validates the configuration.
+
+        Raises:
+            ValueError: If a size is not positive, the window is unknown or coverage is not in (0, 1).
+        """
+        object.__setattr__(self, "order", tuple(int(value) for value in self.order))
+        if min(self.horizon, self.initial, self.step, self.refit_every) < 1:
+            raise ValueError("horizon, initial, step and refit_every must be positive")
+        if self.window not in WINDOWS:
+            raise ValueError(f"window must be one of {WINDOWS}")
+        if self.window_size is not None and self.window_size < 1:
+            raise ValueError("window_size must be positive")
+        if not 0 < self.coverage < 1:
+            raise ValueError("coverage must be between 0 and 1")
+
+    @property
+    def key(self) -> str:
+        """The SHA-256 of the configuration, identifying it across runs."""
+        return hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class BacktestResult:
+    """Forecasts, actuals and errors of one configuration on one series."""
+
+    ticker: str
+    config: BacktestConfig
+    origins: np.ndarray  # Observations seen before each forecast, shape (folds,)
+    forecasts: np.ndarray  # Shape (folds, horizon); NaN where the refit failed
+    lower: np.ndarray
+    upper: np.ndarray
+    actuals: np.ndarray  # NaN past the end of the series
+    observations: int
+    refits: int = 0
+    failed_refits: int = 0
+    seconds: float = 0.0
+    data_start: datetime | None = None
+    data_end: datetime | None = None
+    metrics: dict[str, float | None] = field(default_factory=dict)
+    by_horizon: dict[str, list[float | None]] = field(default_factory=dict)
+
+    @property
+    def folds(self) -> int:
+        """The number of forecast origins."""
+        return len(self.origins)
+
+
+def error_metrics(
+    actuals: np.ndarray, forecasts: np.ndarray, lower: np.ndarray, upper: np.ndarray
+) -> tuple[dict[str, float | None], dict[str, list[float | None]]]:
+    """Scores forecasts against actuals, overall and per horizon.
+
+    Every metric is a masked reduction over the (folds, horizon) arrays, so
+    scoring thousands of folds costs a few array operations. Cells whose
+    actual or forecast is NaN are ignored, as are zero actuals for MAPE.
+
+    Args:
+        actuals (np.ndarray): Observed values, shape (folds, horizon).
+        forecasts (np.ndarray): Point forecasts, same shape.
+        lower (np.ndarray): Lower prediction interval bounds, same shape.
+        upper (np.ndarray): Upper prediction interval bounds, same shape.
+
+    Returns:
+        tuple[dict[str, float | None], dict[str, list[float | None]]]: MAE, RMSE,
+            MAPE (percent) and interval coverage overall, and the same per horizon;
+            None where nothing could be scored.
+    """
+    errors = actuals - forecasts
+    valid = ~np.isnan(errors)
+    absolute = np.where(valid, np.abs(errors), 0.0)
+    relevant = valid & (actuals != 0)
+    percent = np.divide(absolute, np.abs(actuals), out=np.zeros_like(absolute), where=relevant)
+    inside = valid & (actuals >= lower) & (actuals <= upper)
+
+    def reduce(values: np.ndarray, mask: np.ndarray, axis: int | None) -> np.ndarray:
+        counts = mask.sum(axis=axis)
+        return np.divide(values.sum(axis=axis), counts, out=np.full(np.shape(counts), np.nan), where=counts > 0)
+
+    def summarize(axis: int | None) -> dict[str, np.ndarray]:
+        return {
+            "mae": reduce(absolute, valid, axis),
+            "rmse": np.sqrt(reduce(absolute ** 2, valid, axis)),
+            "mape": 100 * reduce(percent, relevant, axis),
+            "coverage": reduce(inside.astype(float), valid, axis),
+        }
+
+    def plain(value: float) -> float | None:
+        return None if np.isnan(value) else float(value)
+
+    overall = {name: plain(value) for name, value in summarize(None).items()}
+    by_horizon = {name: [plain(v) for v in values] for name, values in summarize(0).items()}
+    return overall, by_horizon
+
+
+def forecast_origins(
+    state: ArimaState, states: np.ndarray, state_covs: np.ndarray, horizon: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Forecasts from many filtered states of one model at once.
+
+    Args:
+        state (ArimaState): The model whose system matrices are used.
+        states (np.ndarray): The state at each origin, shape (origins, k).
+        state_covs (np.ndarray): Their covariances, shape (origins, k, k).
+        horizon (int): The number of steps to forecast.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Means and variances, each of shape (origins, horizon).
+    """
+    Z, T = state.design, state.transition
+    noise = state.selection @ state.innovation_cov @ state.selection.T
+    a, P = states, state_covs
+    means = np.empty((len(a), horizon))
+    variances = np.empty((len(a), horizon))
+    for h in range(horizon):
+        means[:, h] = a @ Z + state.obs_intercept
+        variances[:, h] = np.einsum("i,nij,j->n", Z, P, Z) + state.obs_cov
+        a = a @ T.T + state.state_intercept
+        P = T @ P @ T.T + noise
+    return means, variances
+
+
+def backtest_segment(
+    values: np.ndarray, origins: np.ndarray, config: BacktestConfig
+) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """Fits one model at the first origin and forecasts from it at every origin given.
+
+    Runs in a worker process when folds are evaluated in parallel. Errors are
+    returned rather than raised so one failed fit only blanks its own folds.
+
+    Args:
+        values (np.ndarray): The series, at least up to the last origin.
+        origins (np.ndarray): Ascending origins sharing one parameter fit.
+        config (BacktestConfig): The configuration.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, str | None]: Means and variances of shape
+            (len(origins), horizon), and the error message if the fit failed.
+    """
+    first = int(origins[0])
+    window_start = 0 if config.window == "expanding" else max(first - (config.window_size or config.initial), 0)
+    try:
+        model = ARIMA(order=config.order, with_intercept=config.with_intercept, suppress_warnings=True)
+        model.fit(values[window_start:first])
+        state = ArimaState.from_model(model)
+    except Exception as e:
+        blank = np.full((len(origins), config.horizon), np.nan)
+        return blank, blank.copy(), str(e)
+
+    states = np.empty((len(origins), len(state.state)))
+    state_covs = np.empty((len(origins), *state.state_cov.shape))
+    filtered, seen = state, first
+    for i, origin in enumerate(origins):
+        filtered = filtered.filter(values[seen:origin])
+        seen = int(origin)
+        states[i], state_covs[i] = filtered.state, filtered.state_cov
+    means, variances = forecast_origins(state, states, state_covs, config.horizon)
+    return means, variances, None
+
+
+def fold_origins(observations: int, config: BacktestConfig) -> np.ndarray:
+    """Returns the walk-forward origins for a series of the given length.
+
+    Args:
+        observations (int): The length of the series.
+        config (BacktestConfig): The configuration.
+
+    Returns:
+        np.ndarray: Every origin that leaves at least one observation to score.
+    """
+    return np.arange(config.initial, observations, config.step)
+
+
+def backtest_series(
+    values: np.ndarray, config: BacktestConfig, ticker: str = "", n_jobs: int = 1
+) -> BacktestResult:
+    """Runs a walk-forward backtest of one configuration on one series.
+
+    The origins are split into segments of refit_every; each segment fits
+    its parameters once and reuses them for all its origins, and segments
+    run on a process pool when n_jobs > 1.
+
+    Args:
+        values (np.ndarray): The 1-D series, oldest first.
+        config (BacktestConfig): The configuration.
+        ticker (str): The series name, for the result and logs.
+        n_jobs (int): Worker processes; 1 runs in-process and -1 uses every CPU.
+
+    Returns:
+        BacktestResult: The forecasts, actuals and metrics.
+
+    Raises:
+        ValueError: If the series is too short for a single fold.
+    """
+    started = time.perf_counter()
+    values = np.asarray(values, dtype=float)
+    origins = fold_origins(len(values), config)
+    if origins.size == 0:
+        raise ValueError(f"{len(values)} observations of {ticker}; the backtest needs more than {config.initial}")
+
+    segments = [origins[start:start + config.refit_every] for start in range(0, len(origins), config.refit_every)]
+    n_jobs = (multiprocessing.cpu_count() or 1) if n_jobs == -1 else max(n_jobs, 1)
+    if n_jobs == 1 or len(segments) == 1:
+        results = [backtest_segment(values, segment, config) for segment in segments]
+    else:
+        with multiprocessing.Pool(processes=min(n_jobs, len(segments))) as pool:
+            # Each worker only needs the observations up to its segment's last origin
+            pending = [
+                pool.apply_async(backtest_segment, (values[:segment[-1]], segment, config)) for segment in segments
+            ]
+            results = [async_result.get() for async_result in pending]
+
+    errors = [error for _, _, error in results if error is not None]
+    for error in errors:
+        logging.error(f"Backtest refit failed for {ticker}: {error}")
+    forecasts = np.concatenate([means for means, _, _ in results])
+    spread = NormalDist().inv_cdf(0.5 + config.coverage / 2) * np.sqrt(
+        np.concatenate([variances for _, variances, _ in results])
+    )
+
+    # Actual value h steps after each origin, NaN past the end of the series
+    positions = origins[:, None] + np.arange(config.horizon)
+    actuals = np.where(positions < len(values), values[np.minimum(positions, len(values) - 1)], np.nan)
+
+    result = BacktestResult(
+        ticker=ticker,
+        config=config,
+        origins=origins,
+        forecasts=forecasts,
+        lower=forecasts - spread,
+        upper=forecasts + spread,
+        actuals=actuals,
+        observations=len(values),
+        refits=len(segments),
+        failed_refits=len(errors),
+    )
+    result.metrics, result.by_horizon = error_metrics(actuals, result.forecasts, result.lower, result.upper)
+    result.seconds = time.perf_counter() - started
+    METRICS.observe("backtest", result.seconds, error=bool(errors))
+    METRICS.add_rows("backtest", len(values))
+    logging.info(
+        f"Backtested {ticker} {config.order} over {result.folds} folds with {result.refits} refits "
+        f"in {result.seconds:.2f}s: RMSE {result.metrics['rmse']}, coverage {result.metrics['coverage']}."
+    )
+    return result
+
+
+def iter_history(
+    tickers: Iterable[str], freq: str | None = None, start: datetime | None = None, end: datetime | None = None
+) -> Iterator[tuple[str, np.ndarray, datetime, datetime]]:
+    """Reads each ticker's stored price history, one ticker at a time.
+
+    Args:
+        tickers (Iterable[str]): The ticker symbols.
+        freq (str | None): Resample to this frequency in the database; None reads raw ticks.
+        start (datetime | None): Inclusive lower bound; defaults to all history.
+        end (datetime | None): Exclusive upper bound; defaults to now.
+
+    Yields:
+        tuple[str, np.ndarray, datetime, datetime]: The ticker, its prices and the
+            timestamps of its first and last observation.
+    """
+    start = start or datetime(1970, 1, 1)
+    if freq is None:
+        for chunk in iter_price_series(tickers, start, end):
+            yield (
+                chunk.metal, chunk.prices,
+                pd.Timestamp(chunk.timestamps[0]).to_pydatetime(), pd.Timestamp(chunk.timestamps[-1]).to_pydatetime(),
+            )
+        return
+    frame = fetch_resampled_prices(tickers, start, end, freq=freq)
+    for ticker in tickers:
+        series = frame[ticker].dropna() if ticker in frame.columns else pd.Series(dtype=float)
+        if not series.empty:
+            yield ticker, series.to_numpy(), series.index[0].to_pydatetime(), series.index[-1].to_pydatetime()
+
+
+def save_result(result: BacktestResult) -> int:
+    """Stores a result's metrics in the 'backtest_scores' table.
+
+    Args:
+        result (BacktestResult): The result to store.
+
+    Returns:
+        int: The id of the new row.
+    """
+    with session_scope() as session:
+        row = BacktestScore(
+            metal=result.ticker,
+            config_key=result.config.key,
+            config=asdict(result.config),
+            data_start=result.data_start,
+            data_end=result.data_end,
+            observations=result.observations,
+            folds=result.folds,
+            refits=result.refits,
+            failed_refits=result.failed_refits,
+            by_horizon=result.by_horizon,
+            seconds=result.seconds,
+            created_at=datetime.utcnow(),
+            **result.metrics,
+        )
+        session.add(row)
+        session.flush()
+        return row.id
+
+
+def run_backtests(
+    tickers: Iterable[str],
+    configs: Iterable[BacktestConfig],
+    start: datetime | None = None,
+    end: datetime | None = None,
+    n_jobs: int = 1,
+    save: bool = True,
+) -> list[BacktestResult]:
+    """Backtests every configuration on the stored history of every ticker.
+
+    Each ticker's history is read once per resampling frequency and shared
+    by the configurations that use it.
+
+    Args:
+        tickers (Iterable[str]): The ticker symbols.
+        configs (Iterable[BacktestConfig]): The configurations to compare.
+        start (datetime | None): Only use history from this time on.
+        end (datetime | None): Only use history before this time.
+        n_jobs (int): Worker processes per backtest.
+        save (bool): Store each result's metrics in 'backtest_scores'.
+
+    Returns:
+        list[BacktestResult]: One result per ticker and configuration that could be run.
+    """
+    tickers, configs = list(tickers), list(configs)
+    results = []
+    for freq in dict.fromkeys(config.freq for config in configs):
+        for ticker, values, data_start, data_end in iter_history(tickers, freq, start, end):
+            for config in (config for config in configs if config.freq == freq):
+                try:
+                    result = backtest_series(values, config, ticker, n_jobs)
+                except ValueError as e:
+                    logging.warning(f"Skipped backtest of {ticker}: {e}")
+                    continue
+                result.data_start, result.data_end = data_start, data_end
+                if save:
+                    save_result(result)
+                results.append(result)
+    return results
+
+
+def best_scores(ticker: str, metric: str = "rmse", limit: int = 10) -> list[dict]:
+    """Lists the stored configurations with the lowest error for a ticker.
+
+    Only the newest score of each configuration is considered.
+
+    Args:
+        ticker (str): The ticker symbol.
+        metric (str): 'mae', 'rmse' or 'mape'.
+        limit (int): The most configurations to return.
+
+    Returns:
+        list[dict]: 'config', the metrics, 'folds', 'data_end' and 'created_at', best first.
+
+    Raises:
+        ValueError: If metric is not an error metric.
+    """
+    if metric not in ("mae", "rmse", "mape"):
+        raise ValueError("metric must be 'mae', 'rmse' or 'mape'")
+    with session_scope() as session:
+        rows = session.scalars(
+            select(BacktestScore)
+            .where(BacktestScore.metal == ticker)
+            .order_by(BacktestScore.created_at.desc(), BacktestScore.id.desc())
+        ).all()
+        newest = {}
+        for row in rows:
+            newest.setdefault(row.config_key, row)
+        ranked = sorted(
+            (row for row in newest.values() if getattr(row, metric) is not None), key=lambda row: getattr(row, metric)
+        )
+        return [
+            {
+                "config": row.config,
+                **{name: getattr(row, name) for name in METRIC_NAMES},
+                "folds": row.folds,
+                "data_end": row.data_end,
+                "created_at": row.created_at,
+            }
+            for row in ranked[:limit]
+        ]
@@ -1,68 +1,222 @@
-import pandas as pd
+import os
+import math
+import time
+import queue
+import itertools
 import logging
+import multiprocessing
+import numpy as np
+import pandas as pd
 
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from pathlib import Path
-from sqlalchemy import text
+from typing import Iterable, Iterator
+from sqlalchemy import bindparam, select, text
 
-from src.db_operations.db_connection import create_db_engine
+from src.db_operations.db_connection import session_scope
+from src.data_ingestion.symbols import SymbolRegistry
+from src.db_operations.queries import DEFAULT_CHUNK_SIZE, fetch_resampled_prices, iter_price_series
 from sktime.forecasting.arima import ARIMA
-from src.log_info import setup_logging
+from src.metrics import METRICS
 from src.db_operations.models import ModelMetadata
+from src.db_operations.price_cache import get_price_cache
+from src.db_operations.snapshot_store import ParquetSnapshotStore
+from src.models.order_search import search_order
+from src.models.registry import ModelRegistry, ModelVersion
+from src.models.statespace import ArimaState
+
+
+def fit_arima(
+    ticker: str, dataset: np.ndarray, order: tuple[int, int, int]
+) -> tuple[str, ARIMA | None, str | None]:
+    """Fits one ARIMA model; runs in a worker process when training in parallel.
+
+    Errors are returned rather than raised so one failed fit cannot abort the batch.
+
+    Args:
+        ticker (str): The ticker symbol the series belongs to.
+        dataset (np.ndarray): The 1-D price series.
+        order (tuple[int, int, int]): The ARIMA order (p, d, q).
 
-setup_logging()
+    Returns:
+        tuple[str, ARIMA | None, str | None]: The ticker, the fitted model or None,
+            and the error message or None.
+    """
+    try:
+        model = ARIMA(order=order, with_intercept=True, suppress_warnings=True)
+        model.fit(dataset)
+        return ticker, model, None
+    except Exception as e:
+        return ticker, None, str(e)
 
 
 class Model:
     """Class to manage and train ARIMA models for precious metal prices."""
     
-    def __init__(self, tickers: list[str]) -> None:
+    def __init__(
+        self,
+        tickers: list[str] | None = None,
+        n_jobs: int = 1,
+        fit_timeout: float | None = None,
+        incremental: bool = False,
+        model_dir: str | Path = "trained_models",
+        full_refit_interval: timedelta = timedelta(hours=24),
+        drift_threshold: float = 3.0,
+        order_search: bool = False,
+        order_grid: list[tuple[int, int, int]] | None = None,
+        order_criterion: str = "aic",
+        search_budget: float = 60.0,
+        snapshot_dir: str | Path | None = None,
+        freq: str | None = None,
+        lookback: timedelta = timedelta(hours=12),
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
         """
         Initializes the Model instance.
 
         Args:
-            tickers (list[str]): A list of ticker symbols for precious metals.
+            tickers (list[str] | None): The series to model; defaults to those of
+                SymbolRegistry.load().
+            n_jobs (int): Worker processes used to fit tickers in parallel; 1 fits
+                serially in-process and -1 uses every CPU.
+            fit_timeout (float | None): Seconds each ticker's fit may run before it
+                is killed and skipped. With n_jobs=1 a timeout moves the fits into
+                one worker process, since a fit in-process cannot be interrupted.
+            incremental (bool): Update the models saved in model_dir with new
+                observations instead of refitting from scratch.
+            model_dir (str | Path): The model registry saved models are loaded from in
+                incremental mode.
+            full_refit_interval (timedelta): Maximum age of the last full fit before
+                an incremental run refits from scratch anyway.
+            drift_threshold (float): Mean horizon-scaled forecast error, in standard
+                deviations, on the new observations above which a model is refitted.
+            order_search (bool): Pick each ticker's (p, d, q) from order_grid instead
+                of using arima_order for every ticker.
+            order_grid (list[tuple[int, int, int]] | None): Candidate orders; defaults
+                to order_search.DEFAULT_ORDER_GRID.
+            order_criterion (str): 'aic' or 'bic', the criterion the search minimizes.
+            search_budget (float): Seconds the search may spend per ticker.
+            snapshot_dir (str | Path | None): Read training data from this Parquet
+                snapshot store instead of querying the database.
+            freq (str | None): Resample prices to this regular frequency (e.g. '5min')
+                in the database and fit on the time-indexed series; None fits the
+                raw ticks by position.
+            lookback (timedelta): How far back from now training data reaches.
+            chunk_size (int): Rows fetched per round trip when streaming raw ticks.
         """
-        self.tickers: list[str] = tickers
+        self.tickers: list[str] = tickers if tickers is not None else SymbolRegistry.load().tickers
         self.models: dict[str, ARIMA] = {}
         self.arima_order: tuple[int, int, int] = (1, 1, 0)  # ARIMA order (p, d, q)
+        self.n_jobs: int = (os.cpu_count() or 1) if n_jobs == -1 else max(n_jobs, 1)
+        self.fit_timeout: float | None = fit_timeout
+        self.incremental: bool = incremental
+        self.model_dir: Path = Path(model_dir)
+        self.registry: ModelRegistry = ModelRegistry(model_dir)
+        self.metadata_ids: dict[str, int] = {}  # Training record written by train() per ticker
+        self.versions: dict[str, ModelVersion] = {}  # Registered by save()
+        self.full_refit_interval: timedelta = full_refit_interval
+        self.drift_threshold: float = drift_threshold
+        self.cutoffs: dict[str, datetime] = {}  # Newest observation per ticker
+        self.fit_modes: dict[str, str] = {}  # 'full' or 'update' per ticker
+        self.last_full_fits: dict[str, datetime] = {}
+        self.order_search: bool = order_search
+        self.order_grid: list[tuple[int, int, int]] | None = order_grid
+        self.order_criterion: str = order_criterion
+        self.search_budget: float = search_budget
+        self.orders: dict[str, tuple[int, int, int]] = {}  # Per-ticker order chosen by the search
+        self.snapshot_store: ParquetSnapshotStore | None = (
+            ParquetSnapshotStore(snapshot_dir) if snapshot_dir is not None else None
+        )
+        self.freq: str | None = freq
+        self.lookback: timedelta = lookback
+        self.chunk_size: int = chunk_size
+
+    def fetch_data(self, since: datetime | None = None) -> pd.DataFrame:
+        """Fetches the lookback window of data for the specified tickers from the database view.
+
+        The whole window is materialized as one wide frame; training streams
+        raw ticks through iter_datasets() instead. Raw ticks are served from
+        the in-process price cache when it holds the window of every ticker.
 
-    def fetch_data(self) -> pd.DataFrame:
-        """Fetches the last 12 hours of data for the specified tickers from the database view.
+        Args:
+            since (datetime | None): Fetch only rows newer than this instead of the
+                lookback window; used to pick up where a saved model left off.
 
         Returns:
             pd.DataFrame: DataFrame containing metal prices indexed by timestamp.
         """
-        engine = create_db_engine()
-        Session = sessionmaker(bind=engine)
-        session = Session()
-
         try:
-            twelve_hours_ago = datetime.utcnow() - timedelta(hours=12)
+            window_start = datetime.utcnow() - self.lookback
+
+            if self.freq is not None:
+                data = fetch_resampled_prices(
+                    self.tickers,
+                    start=since if since is not None else window_start,
+                    freq=self.freq,
+                )
+                if since is not None and not data.empty:
+                    data = data[data.index > since]
+                return data
+
+            if self.snapshot_store is not None:
+                data = self.snapshot_store.read_frame(
+                    self.tickers, start=since if since is not None else window_start
+                )
+                if since is not None and not data.empty:
+                    data = data[data.index > since]
+                logging.info("Data fetched successfully from the snapshot store.")
+                return data
+
+            cache = get_price_cache()
+            cached = {
+                ticker: cache.series(ticker, since if since is not None else window_start)
+                for ticker in self.tickers
+            } if cache is not None else {}
+            if cached and all(series is not None for series in cached.values()):
+                data = pd.concat(
+                    {
+                        ticker: pd.Series(prices, index=pd.DatetimeIndex(timestamps, name="timestamp"))
+                        for ticker, (timestamps, prices) in sorted(cached.items())
+                    },
+                    axis=1,
+                )
+                if since is not None:
+                    data = data[data.index > since]
+                data.columns.name = "metal"
+                logging.info("Data fetched successfully from the price cache.")
+                return data
 
             query = text(
-                """
+                f"""
                 SELECT metal, price, timestamp
                 FROM precious_metals_prices_view
-                WHERE timestamp >= :twelve_hours_ago
+                WHERE timestamp {">" if since is not None else ">="} :window_start
                 AND metal IN :tickers
                 """
-            )
-
-            results = session.execute(
-                query,
-                {"twelve_hours_ago": twelve_hours_ago, "tickers": tuple(self.tickers)},
-            ).fetchall()
+            ).bindparams(bindparam("tickers", expanding=True))
+
+            with METRICS.timer("query"), session_scope() as session:
+                results = session.execute(
+                    query,
+                    {
+                        "window_start": since if since is not None else window_start,
+                        "tickers": list(self.tickers),
+                    },
+                ).fetchall()
+            METRICS.add_rows("query", len(results))
 
             if not results:
                 logging.warning("No data fetched from the view.")
                 return pd.DataFrame()  # Return empty DataFrame if no results
 
-            data = pd.DataFrame(results, columns=["metal", "price", "timestamp"])
-            data["timestamp"] = pd.to_datetime(data["timestamp"])
-            data.set_index("timestamp", inplace=True)
-            data = data.pivot(columns="metal", values="price")
+            with METRICS.timer("pivot"):
+                data = pd.DataFrame(results, columns=["metal", "price", "timestamp"])
+                data["timestamp"] = pd.to_datetime(data["timestamp"])
+                data.set_index("timestamp", inplace=True)
+                # pivot_table tolerates two ticks sharing a timestamp, where pivot would raise
+                data = data.pivot_table(index="timestamp", columns="metal", values="price", aggfunc="last")
+            METRICS.add_rows("pivot", len(results))
 
             logging.info("Data fetched successfully from the view.")
             return data
@@ -71,33 +225,38 @@ class Model:
             logging.error(f"Error fetching data: {e}")
             return pd.DataFrame()  # Return empty DataFrame in case of an error
 
-        finally:
-            session.close()
-
-    def save_model_metadata(self, session: sessionmaker, ticker: str, model: ARIMA) -> None:
-        """Saves model hyperparameters and parameters into the database.
+    def save_model_metadata(self, session: Session, ticker: str, model: ARIMA) -> ModelMetadata | None:
+        """Saves model hyperparameters, parameters and fit metrics into the database.
 
         Args:
-            session (sessionmaker): The database session to use.
+            session (Session): The database session to use.
             ticker (str): The ticker symbol of the metal.
             model (ARIMA): The trained ARIMA model.
+
+        Returns:
+            ModelMetadata | None: The new row, or None if it could not be created.
         """
         try:
             fitted_params = model.get_fitted_params()
             logging.info(f"Fitted parameters for {ticker}: {fitted_params}")
 
-            order = self.arima_order  # This holds the order you used, e.g., (1, 1, 0)
+            order = tuple(model.get_params()["order"])  # The order this model was fitted with
 
-            # Extract parameters
+            # Keep every scalar parameter (intercept, ar.L*, ma.L*, sigma2 and the criteria)
             parameters = {
-                "intercept": fitted_params.get("intercept"),
-                "ar.L1": fitted_params.get("ar.L1"),
-                "sigma2": fitted_params.get("sigma2"),
-                "aic": fitted_params.get("aic"),
-                "bic": fitted_params.get("bic"),
-                "hqic": fitted_params.get("hqic"),
-                # Add other relevant keys here
+                name: float(value)
+                for name, value in fitted_params.items()
+                if np.ndim(value) == 0 and isinstance(value, (int, float, np.number))
             }
+            metrics = {name: parameters[name] for name in ("aic", "bic", "sigma2") if name in parameters}
+            metrics["n_obs"] = len(model._y) if getattr(model, "_y", None) is not None else None
+
+            try:
+                # Lets Predictor forecast from this row alone, without unpickling the artifact
+                forecast_state = ArimaState.from_model(model).to_dict()
+            except Exception as e:
+                logging.warning(f"Could not export the forecast state for {ticker}: {e}")
+                forecast_state = None
 
             # Create a new ModelMetadata entry
             new_metadata = ModelMetadata(
@@ -105,71 +264,437 @@ class Model:
                 hyperparameters={"p": order[0], "d": order[1], "q": order[2]},
                 parameters=parameters,
                 timestamp=datetime.utcnow(),
+                data_cutoff=self.cutoffs.get(ticker),
+                fit_mode=self.fit_modes.get(ticker, "full"),
+                last_full_fit=self.last_full_fits.get(ticker),
+                metrics=metrics,
+                forecast_state=forecast_state,
             )
 
             session.add(new_metadata)
             logging.info(f"Model metadata for {ticker} added to session.")
+            return new_metadata
 
         except Exception as e:
             logging.error(f"Error while saving model metadata for {ticker}: {e}")
+            return None
 
-    def train(self) -> None:
-        """Trains ARIMA models for each ticker using data from the last 12 hours."""
-        engine = create_db_engine()
-        Session = sessionmaker(bind=engine)
-        session = Session()
+    def prepare_datasets(
+        self, data: pd.DataFrame, tickers: list[str] | None = None
+    ) -> dict[str, np.ndarray | pd.Series]:
+        """Extracts a clean 1-D series per ticker from the fetched data.
 
-        data = self.fetch_data()
+        Args:
+            data (pd.DataFrame): Wide frame of prices with one column per ticker.
+            tickers (list[str] | None): The tickers to extract; defaults to all.
 
-        for ticker in self.tickers:
+        Returns:
+            dict[str, np.ndarray | pd.Series]: The non-empty series, keyed by ticker;
+                time-indexed Series when freq is set, plain arrays otherwise.
+        """
+        datasets: dict[str, np.ndarray | pd.Series] = {}
+        for ticker in tickers if tickers is not None else self.tickers:
             if ticker in data.columns:
-                dataset = data[ticker].dropna().values
+                if self.freq is not None:
+                    # Keep the regular DatetimeIndex of resampled data; slicing preserves its freq
+                    series = data[ticker]
+                    first_valid = series.first_valid_index()
+                    dataset = series.loc[first_valid:].ffill() if first_valid is not None else series.iloc[:0]
+                else:
+                    # Raw ticks are fitted by position
+                    dataset = data[ticker].dropna().values
 
                 if dataset.size > 0 and dataset.ndim == 1:
                     logging.info(f"Dataset for {ticker}: {dataset}")
-
-                    try:
-                        model = ARIMA(
-                            order=self.arima_order,
-                            with_intercept=True,
-                            suppress_warnings=True,
-                        )
-                        model.fit(dataset)
-                        self.models[ticker] = model
-                        logging.info(f"Trained model for {ticker}.")
-
-                        # Save model metadata (order and parameters)
-                        self.save_model_metadata(session, ticker, model)
-
-                    except Exception as e:
-                        logging.error(f"Error training model for {ticker}: {e}")
-
+                    datasets[ticker] = dataset
                 else:
                     logging.warning(
                         f"No available data to train model for {ticker}. Dataset is empty or incorrectly shaped."
                     )
             else:
                 logging.warning(f"{ticker} not found in the fetched data.")
+        return datasets
+
+    def iter_datasets(self, tickers: list[str] | None = None) -> Iterator[tuple[str, np.ndarray | pd.Series]]:
+        """Yields the training series of each ticker, one at a time.
+
+        Raw ticks come from the in-process price cache where it holds the
+        whole lookback; the rest are streamed from the database with
+        iter_price_series(), so only one ticker's series plus one fetched chunk
+        is in memory at once, however long the lookback, and are then cached. Resampled and snapshot data come from
+        fetch_data() and prepare_datasets(). Each ticker's newest timestamp is
+        recorded in self.cutoffs as it is yielded.
 
+        Args:
+            tickers (list[str] | None): The tickers to read; defaults to all.
+
+        Yields:
+            tuple[str, np.ndarray | pd.Series]: A ticker and its non-empty series.
+        """
+        tickers = list(tickers if tickers is not None else self.tickers)
+
+        if self.freq is not None or self.snapshot_store is not None:
+            data = self.fetch_data()
+            for ticker, dataset in self.prepare_datasets(data, tickers).items():
+                self.cutoffs[ticker] = data[ticker].dropna().index.max().to_pydatetime()
+                yield ticker, dataset
+            return
+
+        found = 0
+        start = datetime.utcnow() - self.lookback
+        cache = get_price_cache()
+        missed = []
+        for ticker in tickers:
+            cached = cache.series(ticker, start) if cache is not None else None
+            if cached is None:
+                missed.append(ticker)
+            elif len(cached[1]):
+                found += 1
+                self.cutoffs[ticker] = pd.Timestamp(cached[0][-1]).to_pydatetime()
+                yield ticker, cached[1]
         try:
-            # Commit the session
-            session.commit()
-            logging.info("Session committed successfully. Model metadata should be saved.")
+            for series in iter_price_series(missed, start, chunk_size=self.chunk_size):
+                if cache is not None:
+                    cache.store(series.metal, series.timestamps, series.prices, start)
+                found += 1
+                self.cutoffs[series.metal] = pd.Timestamp(series.timestamps[-1]).to_pydatetime()
+                yield series.metal, series.prices
         except Exception as e:
-            logging.error(f"Failed to commit the session: {e}")
-            session.rollback()
+            logging.error(f"Error streaming data: {e}")
+            return
+        if found < len(tickers):
+            logging.warning(f"No data streamed for {len(tickers) - found} of {len(tickers)} tickers.")
 
+    def select_orders(self, datasets: dict[str, np.ndarray]) -> None:
+        """Searches the best ARIMA order for each series and stores it in self.orders.
+
+        Tickers whose search yields no valid candidate keep arima_order.
+
+        Args:
+            datasets (dict[str, np.ndarray]): The series to search, keyed by ticker.
+        """
+        for ticker, dataset in datasets.items():
+            result = search_order(
+                dataset,
+                grid=self.order_grid,
+                criterion=self.order_criterion,
+                time_budget=self.search_budget,
+                n_jobs=self.n_jobs,
+            )
+            if result.best_order is not None:
+                self.orders[ticker] = result.best_order
+            logging.info(f"Order for {ticker}: {self.orders.get(ticker, self.arima_order)}")
+
+    def _fit_in_pool(
+        self, items: Iterator[tuple[str, np.ndarray, tuple[int, int, int]]], processes: int
+    ) -> list[tuple[str, ARIMA | None, str | None]]:
+        """Fits the series in worker processes, each fit against its own deadline.
+
+        No more fits are submitted than there are workers, so a fit starts
+        when it is submitted, its fit_timeout counts from then, and series are
+        read from items only as workers free up. A pool cannot stop a single
+        task, so when a fit passes its deadline the workers are killed and the
+        fits that were still running beside it are restarted in a fresh pool.
+
+        Args:
+            items (Iterator[tuple[str, np.ndarray, tuple[int, int, int]]]): The
+                (ticker, series, order) arguments of fit_arima().
+            processes (int): The number of worker processes.
+
+        Returns:
+            list[tuple[str, ARIMA | None, str | None]]: The fit_arima() result of every
+                ticker, timed-out ones with an error, in completion order.
+        """
+        results = []
+        finished: queue.SimpleQueue = queue.SimpleQueue()
+        in_flight: dict[str, tuple[tuple, float]] = {}  # Ticker -> (fit_arima args, deadline)
+        pool = multiprocessing.Pool(processes=processes)
+
+        def submit(source: Iterator[tuple], count: int) -> None:
+            for args in itertools.islice(source, count):
+                timeout = self.fit_timeout if self.fit_timeout is not None else math.inf
+                in_flight[args[0]] = (args, time.monotonic() + timeout)
+                pool.apply_async(
+                    fit_arima, args, callback=finished.put,
+                    error_callback=lambda e, ticker=args[0]: finished.put((ticker, None, str(e))),
+                )
+
+        try:
+            submit(items, processes)
+            while in_flight:
+                wait = min(deadline for _, deadline in in_flight.values()) - time.monotonic()
+                try:
+                    result = finished.get(timeout=None if wait == math.inf else max(wait, 0))
+                except queue.Empty:
+                    result = None
+                if result is not None:
+                    # A fit restarted after a timeout may also report from the killed pool
+                    if in_flight.pop(result[0], None) is not None:
+                        results.append(result)
+                        submit(items, 1)
+                    continue
+
+                now = time.monotonic()
+                expired = [ticker for ticker, (_, deadline) in in_flight.items() if deadline <= now]
+                for ticker in expired:
+                    del in_flight[ticker]
+                    results.append((ticker, None, f"fit exceeded {self.fit_timeout}s timeout"))
+                # Hung fits are killed rather than waited for
+                pool.terminate()
+                pool.join()
+                pool = multiprocessing.Pool(processes=processes)
+                restarted = [args for args, _ in in_flight.values()]
+                submit(iter(restarted), len(restarted))
+                submit(items, len(expired))
         finally:
-            session.close()
+            if in_flight:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+        return results
+
+    def fit_models(
+        self, datasets: dict[str, np.ndarray] | Iterable[tuple[str, np.ndarray]]
+    ) -> dict[str, str]:
+        """Fits one ARIMA model per ticker, in parallel when n_jobs > 1.
+
+        Successful fits are stored in self.models; a failing or timed-out
+        ticker is logged and reported without affecting the others. Series
+        are consumed one at a time, so a generator such as iter_datasets()
+        is never materialized: each series is fitted, or handed to a free
+        worker, and released before the next one is read. The exception is
+        order search in a worker pool: every series is searched, and so held,
+        before the first fit starts. See _fit_in_pool() for how fit_timeout
+        applies.
+
+        Args:
+            datasets (dict[str, np.ndarray] | Iterable[tuple[str, np.ndarray]]): The
+                series to fit, keyed by ticker or as (ticker, series) pairs.
+
+        Returns:
+            dict[str, str]: Error messages for the tickers that could not be fitted.
+        """
+        errors: dict[str, str] = {}
+        started = time.perf_counter()
+
+        items = datasets.items() if isinstance(datasets, dict) else datasets
+
+        def with_orders() -> Iterator[tuple[str, np.ndarray, tuple[int, int, int]]]:
+            for ticker, dataset in items:
+                METRICS.add_rows("fit", len(dataset))
+                if self.order_search:
+                    self.select_orders({ticker: dataset})
+                yield ticker, dataset, self.orders.get(ticker, self.arima_order)
+
+        serial = self.n_jobs == 1 or (isinstance(datasets, dict) and len(datasets) <= 1)
+        if serial and self.fit_timeout is None:
+            results = [fit_arima(*item) for item in with_orders()]
+        else:
+            # A timeout can only be enforced on a fit running in another process
+            processes = self.n_jobs
+            if serial:
+                processes = 1
+            elif isinstance(datasets, dict):
+                processes = min(self.n_jobs, len(datasets))
+            queued = with_orders()
+            if self.order_search:
+                # Searches use their own process pool and take up to search_budget each, so they all
+                # finish before the fit pool starts rather than running beside it and delaying its deadlines
+                queued = iter(list(queued))
+            results = self._fit_in_pool(queued, processes)
+
+        for ticker, model, error in results:
+            if model is not None:
+                self.models[ticker] = model
+                logging.info(f"Trained model for {ticker}.")
+            else:
+                errors[ticker] = error
+                logging.error(f"Error training model for {ticker}: {error}")
+        METRICS.observe("fit", time.perf_counter() - started, error=bool(errors))
+        METRICS.inc("fits", len(results) - len(errors), status="ok")
+        METRICS.inc("fits", len(errors), status="failed")
+
+        logging.info(
+            f"Fitted {len(results) - len(errors)}/{len(results)} models with "
+            f"n_jobs={self.n_jobs} in {time.perf_counter() - started:.2f}s."
+        )
+        return errors
 
-    def save(self, path_to_dir: str | Path) -> None:
-        """Saves the trained models to the specified directory.
+    def latest_metadata(self, ticker: str) -> dict | None:
+        """Looks up the most recent training record for a ticker.
 
         Args:
-            path_to_dir (str | Path): The directory path where models will be saved.
+            ticker (str): The ticker symbol of the metal.
+
+        Returns:
+            dict | None: The record's 'data_cutoff' and 'last_full_fit', or None if
+                the ticker has never been trained.
         """
-        path_to_dir = Path(path_to_dir)
-        path_to_dir.mkdir(parents=True, exist_ok=True)
+        with session_scope() as session:
+            row = session.execute(
+                select(
+                    ModelMetadata.data_cutoff,
+                    ModelMetadata.last_full_fit,
+                    ModelMetadata.timestamp,
+                )
+                .where(ModelMetadata.metal == ticker)
+                .order_by(ModelMetadata.timestamp.desc(), ModelMetadata.id.desc())
+                .limit(1)
+            ).first()
+
+        if row is None:
+            return None
+        return {"data_cutoff": row.data_cutoff, "last_full_fit": row.last_full_fit or row.timestamp}
+
+    def has_drifted(self, model: ARIMA, new_values: np.ndarray) -> bool:
+        """Checks whether new observations stray too far from the model's forecast.
+
+        Each error is scaled by sigma * sqrt(h), the growth of forecast spread
+        with horizon h for an integrated series, so long gaps are not mistaken
+        for drift.
+
+        Args:
+            model (ARIMA): The saved model, before it sees the new values.
+            new_values (np.ndarray): The observations that arrived since its cutoff.
+
+        Returns:
+            bool: True if the mean scaled error exceeds drift_threshold.
+        """
+        horizons = np.arange(1, len(new_values) + 1)
+        forecast = np.asarray(model.predict(fh=horizons), dtype=float).ravel()
+        sigma = np.sqrt(model.get_fitted_params().get("sigma2") or 0.0)
+        if sigma == 0.0:
+            return False
+        scaled_errors = np.abs(new_values - forecast) / (sigma * np.sqrt(horizons))
+        return float(scaled_errors.mean()) > self.drift_threshold
+
+    def update_models(self) -> list[str]:
+        """Warm-starts saved models with the observations that arrived since their cutoff.
+
+        Returns:
+            list[str]: Tickers that need a full refit instead: no saved model or
+                cutoff, a full fit older than full_refit_interval, or drift.
+        """
+        now = datetime.utcnow()
+        refit: list[str] = []
+        saved: dict[str, tuple[ARIMA, ModelVersion]] = {}
+        # The cutoff and last full fit come from the registered version, i.e. the artifact being updated
+        registered = self.registry.latest_many(self.tickers)
+
         for ticker in self.tickers:
-            full_path = path_to_dir / ticker
-            self.models[ticker].save(full_path)
+            version = registered.get(ticker)
+            if version is None or version.data_cutoff is None:
+                refit.append(ticker)
+            elif now - version.last_full_fit >= self.full_refit_interval:
+                logging.info(f"Scheduled full refit for {ticker}.")
+                refit.append(ticker)
+            else:
+                try:
+                    saved[ticker] = (self.registry.read(version), version)
+                except Exception as e:
+                    logging.error(f"Could not load saved model for {ticker}: {e}")
+                    refit.append(ticker)
+
+        if not saved:
+            return refit
+
+        data = self.fetch_data(since=min(version.data_cutoff for _, version in saved.values()))
+
+        for ticker, (model, version) in saved.items():
+            cutoff = version.data_cutoff
+            new_data = data[ticker].dropna() if ticker in data.columns else pd.Series(dtype=float)
+            new_data = new_data[new_data.index > cutoff]
+
+            if not new_data.empty:
+                if self.has_drifted(model, new_data.values):
+                    logging.warning(f"Drift detected for {ticker}; refitting from scratch.")
+                    refit.append(ticker)
+                    continue
+                try:
+                    if isinstance(model.cutoff, pd.DatetimeIndex):
+                        model.update(new_data.asfreq(model.cutoff.freq or self.freq))
+                    else:
+                        # Saved models are indexed by position; continue that index for the new points
+                        start = int(model.cutoff[0]) + 1
+                        model.update(pd.Series(new_data.values, index=pd.RangeIndex(start, start + len(new_data))))
+                    cutoff = new_data.index.max().to_pydatetime()
+                except Exception as e:
+                    logging.error(f"Error updating model for {ticker}: {e}")
+                    refit.append(ticker)
+                    continue
+
+            self.models[ticker] = model
+            self.cutoffs[ticker] = cutoff
+            self.fit_modes[ticker] = "update"
+            self.last_full_fits[ticker] = version.last_full_fit
+            logging.info(f"Updated model for {ticker} with {len(new_data)} new observations.")
+
+        return refit
+
+    def train(self) -> None:
+        """Trains ARIMA models for each ticker using data from the lookback window.
+
+        In incremental mode, saved models are updated with new observations
+        and only the tickers that need it are refitted from scratch.
+        """
+        to_fit = self.update_models() if self.incremental else list(self.tickers)
+
+        for ticker in to_fit:
+            self.cutoffs.pop(ticker, None)
+        errors = self.fit_models(self.iter_datasets(to_fit)) if to_fit else {}
+
+        # iter_datasets() records a cutoff for every ticker it yielded a series for
+        fitted = [ticker for ticker in to_fit if ticker in self.cutoffs and ticker not in errors]
+        fitted_at = datetime.utcnow()
+        for ticker in fitted:
+            self.fit_modes[ticker] = "full"
+            self.last_full_fits[ticker] = fitted_at
+        trained = [ticker for ticker in self.tickers if ticker not in to_fit or ticker in fitted]
+
+        try:
+            # Save model metadata (order and parameters) in one pooled transaction
+            with session_scope() as session:
+                rows = {ticker: self.save_model_metadata(session, ticker, self.models[ticker]) for ticker in trained}
+                session.flush()
+                # save() attaches each registered artifact to the record written here
+                self.metadata_ids.update({ticker: row.id for ticker, row in rows.items() if row is not None})
+            logging.info("Session committed successfully. Model metadata should be saved.")
+        except Exception as e:
+            logging.error(f"Failed to commit the session: {e}")
+
+    def save(self, path_to_dir: str | Path, keep_versions: int | None = 5) -> dict[str, ModelVersion]:
+        """Registers the trained models as new versions in the model registry at the specified directory.
+
+        Each artifact is attached to the training record train() wrote for its
+        ticker; models fitted without train() get a new record. Tickers without
+        a trained model, because they had no data or their fit failed, are
+        skipped and logged.
+
+        Args:
+            path_to_dir (str | Path): The registry directory the models will be saved to.
+            keep_versions (int | None): Versions to keep per ticker; older artifacts are
+                garbage-collected. None keeps everything.
+
+        Returns:
+            dict[str, ModelVersion]: The registered version per ticker.
+        """
+        registry = self.registry if Path(path_to_dir).resolve() == self.registry.root else ModelRegistry(path_to_dir)
+        with METRICS.timer("save"):
+            skipped = [ticker for ticker in self.tickers if ticker not in self.models]
+            if skipped:
+                logging.warning(f"No trained model to save for {', '.join(skipped)}.")
+            for ticker in self.tickers:
+                if ticker in skipped:
+                    continue
+                model = self.models[ticker]
+                metadata_id = self.metadata_ids.pop(ticker, None)
+                if metadata_id is None:
+                    with session_scope() as session:
+                        row = self.save_model_metadata(session, ticker, model)
+                        session.flush()
+                        metadata_id = row.id if row is not None else None
+                self.versions[ticker] = registry.register(ticker, model, metadata_id=metadata_id)
+            if keep_versions is not None:
+                registry.gc(keep_versions)
+        return dict(self.versions)
@@ -0,0 +1,261 @@
+import time
+import hashlib
+import logging
+import itertools
+import multiprocessing
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from pmdarima.arima import ndiffs
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sktime.forecasting.arima import ARIMA
+
+from src.db_operations.db_connection import session_scope
+from src.db_operations.models import ArimaCandidateScore
+
+Order = tuple[int, int, int]
+
+# Candidates are evaluated simplest first, so a time budget cuts the most expensive ones.
+# d is picked per series by a unit-root test; only the candidates with that d are fitted.
+DEFAULT_ORDER_GRID: list[Order] = sorted(
+    itertools.product(range(3), range(2), range(3)), key=lambda order: (order[0] + order[2], order)
+)
+CRITERIA = ("aic", "bic")
+UNIT_ROOT_TESTS = ("kpss", "adf", "pp")
+
+
+@dataclass
+class OrderSearchResult:
+    """Outcome of an order search for one series."""
+
+    best_order: Order | None
+    d: int | None = None  # Differencing chosen by the unit-root test; candidates were limited to it
+    scores: dict[Order, dict] = field(default_factory=dict)
+    evaluated: int = 0  # Candidates fitted in this search
+    cached: int = 0  # Candidates answered from the score cache
+    timed_out: bool = False
+
+
+def data_fingerprint(values: np.ndarray) -> str:
+    """Hashes a series so identical data maps to the same cached scores.
+
+    Args:
+        values (np.ndarray): The 1-D series.
+
+    Returns:
+        str: The hex SHA-256 digest of the float64 values.
+    """
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
+
+
+def evaluate_candidate(values: np.ndarray, order: Order) -> tuple[Order, float | None, float | None, str | None]:
+    """Fits one candidate order and returns its information criteria.
+
+    Runs in a worker process when the search is parallel; errors are returned
+    rather than raised so one bad candidate cannot abort the search.
+
+    Args:
+        values (np.ndarray): The 1-D series.
+        order (Order): The (p, d, q) order to fit.
+
+    Returns:
+        tuple[Order, float | None, float | None, str | None]: The order, its AIC
+            and BIC, and the error message if the fit failed.
+    """
+    try:
+        model = ARIMA(order=order, with_intercept=True, suppress_warnings=True)
+        model.fit(values)
+        params = model.get_fitted_params()
+        return order, float(params["aic"]), float(params["bic"]), None
+    except Exception as e:
+        return order, None, None, str(e)
+
+
+def load_cached_scores(fingerprint: str) -> dict[Order, dict]:
+    """Loads previously computed candidate scores for a series.
+
+    Args:
+        fingerprint (str): The series fingerprint from data_fingerprint().
+
+    Returns:
+        dict[Order, dict]: 'aic', 'bic' and 'error' per cached order. Failed fits
+            stored by older versions are left out, so they are tried again.
+    """
+    with session_scope() as session:
+        rows = session.execute(
+            select(
+                ArimaCandidateScore.p,
+                ArimaCandidateScore.d,
+                ArimaCandidateScore.q,
+                ArimaCandidateScore.aic,
+                ArimaCandidateScore.bic,
+                ArimaCandidateScore.error,
+            ).where(ArimaCandidateScore.fingerprint == fingerprint, ArimaCandidateScore.error.is_(None))
+        ).all()
+    return {(row.p, row.d, row.q): {"aic": row.aic, "bic": row.bic, "error": row.error} for row in rows}
+
+
+def store_scores(fingerprint: str, scores: dict[Order, dict]) -> None:
+    """Persists newly computed candidate scores.
+
+    Only completed fits are cached: a failure may be transient (e.g. a
+    worker running out of memory), so a failed candidate is fitted again
+    by the next search. Scores another search stored for the same series
+    in the meantime are kept; the insert skips them instead of failing on
+    the unique key, and only replaces a failure cached by an older version.
+
+    Args:
+        fingerprint (str): The series fingerprint from data_fingerprint().
+        scores (dict[Order, dict]): 'aic', 'bic' and 'error' per order.
+    """
+    scores = {order: score for order, score in scores.items() if score["error"] is None}
+    if not scores:
+        return
+    created_at = datetime.utcnow()
+    rows = [
+        {
+            "fingerprint": fingerprint,
+            "p": p,
+            "d": d,
+            "q": q,
+            "aic": score["aic"],
+            "bic": score["bic"],
+            "error": score["error"],
+            "created_at": created_at,
+        }
+        for (p, d, q), score in scores.items()
+    ]
+    with session_scope() as session:
+        insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+        statement = insert(ArimaCandidateScore).values(rows)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["fingerprint", "p", "d", "q"],
+                set_={name: statement.excluded[name] for name in ("aic", "bic", "error", "created_at")},
+                where=ArimaCandidateScore.error.is_not(None),
+            )
+        )
+
+
+def choose_differencing(values: np.ndarray, candidates: list[int], test: str = "kpss") -> int:
+    """Picks the order of differencing with a unit-root test.
+
+    Information criteria of models fitted with different d are computed on
+    differently differenced data and cannot be compared, so d is settled
+    first and the criteria only rank candidates that share it.
+
+    Args:
+        values (np.ndarray): The 1-D series.
+        candidates (list[int]): The d values the grid offers.
+        test (str): 'kpss', 'adf' or 'pp', see pmdarima.arima.ndiffs.
+
+    Returns:
+        int: The candidate closest to the number of differences the test asks for.
+    """
+    wanted = ndiffs(values, test=test, max_d=max(candidates))
+    return min(candidates, key=lambda d: (abs(d - wanted), d))
+
+
+def _evaluate(
+    values: np.ndarray, orders: list[Order], n_jobs: int, deadline: float
+) -> tuple[dict[Order, dict], bool]:
+    """Evaluates candidates serially or on a process pool until the deadline passes."""
+    scores: dict[Order, dict] = {}
+
+    if n_jobs == 1 or len(orders) <= 1:
+        for order in orders:
+            if time.monotonic() >= deadline:
+                return scores, True
+            _, aic, bic, error = evaluate_candidate(values, order)
+            scores[order] = {"aic": aic, "bic": bic, "error": error}
+        return scores, False
+
+    timed_out = False
+    pool = multiprocessing.Pool(processes=min(n_jobs, len(orders)))
+    try:
+        pending = [pool.apply_async(evaluate_candidate, (values, order)) for order in orders]
+        for async_result in pending:
+            try:
+                order, aic, bic, error = async_result.get(timeout=max(deadline - time.monotonic(), 0))
+            except multiprocessing.TimeoutError:
+                timed_out = True
+                break
+            scores[order] = {"aic": aic, "bic": bic, "error": error}
+    finally:
+        # Candidates still running past the budget are killed rather than waited for
+        if timed_out:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+    return scores, timed_out
+
+
+def search_order(
+    values: np.ndarray,
+    grid: list[Order] | None = None,
+    criterion: str = "aic",
+    time_budget: float = 60.0,
+    n_jobs: int = 1,
+    unit_root_test: str = "kpss",
+) -> OrderSearchResult:
+    """Picks the ARIMA order with the lowest information criterion for a series.
+
+    The differencing d is chosen first with a unit-root test, and only the
+    grid's candidates with that d are fitted and compared. Scores are cached
+    per data fingerprint, so re-running on an unchanged series fits nothing.
+    Uncached candidates are fitted in parallel and the search stops at
+    time_budget; the best candidate evaluated so far wins.
+
+    Args:
+        values (np.ndarray): The 1-D series.
+        grid (list[Order] | None): Candidate orders; defaults to DEFAULT_ORDER_GRID.
+        criterion (str): 'aic' or 'bic'.
+        time_budget (float): Seconds allowed for fitting uncached candidates.
+        n_jobs (int): Worker processes for candidate fits.
+        unit_root_test (str): The test choosing d: 'kpss', 'adf' or 'pp'.
+
+    Returns:
+        OrderSearchResult: The winning order (None if every candidate failed) and all scores.
+
+    Raises:
+        ValueError: If criterion or unit_root_test is unknown.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {CRITERIA}")
+    if unit_root_test not in UNIT_ROOT_TESTS:
+        raise ValueError(f"unit_root_test must be one of {UNIT_ROOT_TESTS}")
+
+    grid = grid or DEFAULT_ORDER_GRID
+    d = choose_differencing(values, sorted({order[1] for order in grid}), unit_root_test)
+    grid = [order for order in grid if order[1] == d]
+    fingerprint = data_fingerprint(values)
+    cached = load_cached_scores(fingerprint)
+    missing = [order for order in grid if order not in cached]
+
+    new_scores, timed_out = _evaluate(values, missing, n_jobs, time.monotonic() + time_budget)
+    store_scores(fingerprint, new_scores)
+
+    scores = {order: cached[order] for order in grid if order in cached}
+    scores.update(new_scores)
+    valid = {order: score[criterion] for order, score in scores.items() if score[criterion] is not None}
+    best_order = min(valid, key=valid.get) if valid else None
+
+    if timed_out:
+        logging.warning(
+            f"Order search hit its {time_budget}s budget after {len(new_scores)}/{len(missing)} candidates."
+        )
+    logging.info(
+        f"Order search picked {best_order} by {criterion.upper()} among d={d} candidates "
+        f"({len(new_scores)} fitted, {len(scores) - len(new_scores)} cached)."
+    )
+    return OrderSearchResult(
+        best_order=best_order,
+        d=d,
+        scores=scores,
+        evaluated=len(new_scores),
+        cached=len(scores) - len(new_scores),
+        timed_out=timed_out,
+    )
@@ -0,0 +1,218 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+from src.models.registry import ModelRegistry, ModelVersion
+from src.models.statespace import ArimaState, StateSpaceForecaster
+
+if TYPE_CHECKING:
+    from sktime.forecasting.arima import ARIMA
+
+BACKENDS = ("auto", "state", "artifact")
+
+Forecaster = Union["ARIMA", StateSpaceForecaster]
+
+
+class Predictor:
+    """Serves forecasts from models registered by Model.save(), keeping them loaded between calls.
+
+    By default a model is rebuilt from the forecast state exported to its
+    ModelMetadata row, a NumPy StateSpaceForecaster that needs neither a file
+    read nor sktime; only models without an exported state are unpickled.
+    """
+
+    def __init__(
+        self, model_dir: str | Path = "trained_models", max_models: int = 64, backend: str = "auto"
+    ) -> None:
+        """
+        Initializes the Predictor.
+
+        Args:
+            model_dir (str | Path): The model registry Model.save() wrote the artifacts to.
+            max_models (int): How many deserialized models to keep; the least
+                recently used one is evicted beyond that.
+            backend (str): 'state' forecasts from the exported state only, 'artifact'
+                always unpickles the sktime model, 'auto' prefers the state.
+
+        Raises:
+            ValueError: If the backend is unknown.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'; expected one of {', '.join(BACKENDS)}")
+        self.backend: str = backend
+        self.model_dir: Path = Path(model_dir)
+        self.registry: ModelRegistry = ModelRegistry(model_dir)
+        self.max_models: int = max_models
+        # ticker -> (registry version, model); ordered from least to most recently used
+        self._models: OrderedDict[str, tuple[int, Forecaster]] = OrderedDict()
+        # (ticker, registry version) -> forecast path for horizons 1..len(path)
+        self._forecasts: dict[tuple[str, int], np.ndarray] = {}
+        self._lock = threading.RLock()
+        self._stats: dict[str, float] = {
+            "calls": 0,
+            "loads": 0,
+            "model_hits": 0,
+            "forecast_hits": 0,
+            "total_ms": 0.0,
+            "last_ms": 0.0,
+            "max_ms": 0.0,
+        }
+
+    def artifact_version(self, ticker: str) -> ModelVersion:
+        """
+        Looks up the newest registered version of a ticker.
+
+        Args:
+            ticker (str): The ticker symbol.
+
+        Returns:
+            ModelVersion: The version, including its artifact path and checksum.
+
+        Raises:
+            FileNotFoundError: If no model has been saved for the ticker.
+        """
+        return self.registry.latest(ticker)
+
+    def get_model(self, ticker: str, version: ModelVersion | None = None) -> tuple[int, Forecaster]:
+        """
+        Returns a ticker's model, loading it only if it is not cached or a newer version was registered.
+
+        Args:
+            ticker (str): The ticker symbol.
+            version (ModelVersion | None): The version to serve, if already looked up;
+                defaults to the newest one.
+
+        Returns:
+            tuple[int, Forecaster]: The version number and the loaded model.
+
+        Raises:
+            FileNotFoundError: If no model has been saved for the ticker.
+            ValueError: If the artifact fails its checksum, or the backend is 'state'
+                and the version has no exported state.
+        """
+        version = version or self.artifact_version(ticker)
+        with self._lock:
+            cached = self._models.get(ticker)
+            if cached is not None and cached[0] == version.version:
+                self._models.move_to_end(ticker)
+                self._stats["model_hits"] += 1
+                return cached
+
+        if self.backend != "artifact" and version.forecast_state is not None:
+            model = StateSpaceForecaster(ArimaState.from_dict(version.forecast_state))
+            logging.info(f"Loaded forecast state for {ticker} v{version.version}.")
+        elif self.backend == "state":
+            raise ValueError(f"{ticker} v{version.version} has no exported forecast state")
+        else:
+            model = self.registry.read(version)
+            logging.info(f"Loaded model for {ticker} v{version.version} from {version.path}.")
+
+        with self._lock:
+            self._stats["loads"] += 1
+            if cached is not None:
+                # A newer version was registered, so the old one's memoized forecasts are stale
+                self._forecasts.pop((ticker, cached[0]), None)
+            self._models[ticker] = (version.version, model)
+            self._models.move_to_end(ticker)
+            while len(self._models) > self.max_models:
+                evicted, (evicted_version, _) = self._models.popitem(last=False)
+                self._forecasts.pop((evicted, evicted_version), None)
+        return version.version, model
+
+    def _forecast_path(self, ticker: str, horizon: int, version: ModelVersion | None = None) -> np.ndarray:
+        """Returns forecasts for horizons 1..horizon, computing them in one call when not memoized."""
+        number, model = self.get_model(ticker, version)
+        key = (ticker, number)
+        with self._lock:
+            path = self._forecasts.get(key)
+            if path is not None and len(path) >= horizon:
+                self._stats["forecast_hits"] += 1
+                return path
+
+        path = np.asarray(model.predict(fh=np.arange(1, horizon + 1)), dtype=float).ravel()
+        with self._lock:
+            self._forecasts[key] = path
+        return path
+
+    def predict(self, tickers: Iterable[str], fh: Iterable[int]) -> pd.DataFrame:
+        """
+        Forecasts several tickers and horizons in one call.
+
+        Each ticker is forecast once up to the largest requested horizon and
+        the requested steps are sliced out; the result is memoized until a
+        new version of the ticker is registered, i.e. until a retrain
+        incorporates new data. The newest versions of all tickers are looked
+        up in one registry query.
+
+        Args:
+            tickers (Iterable[str]): The ticker symbols to forecast.
+            fh (Iterable[int]): Positive forecast horizons, in steps after the model's cutoff.
+
+        Returns:
+            pd.DataFrame: Forecasts indexed by horizon, one column per ticker.
+
+        Raises:
+            ValueError: If a horizon is not positive.
+            FileNotFoundError: If a ticker has no saved model.
+        """
+        started = time.perf_counter()
+        horizons = np.asarray(list(fh), dtype=int)
+        if horizons.size == 0 or horizons.min() < 1:
+            raise ValueError("Forecast horizons must be positive integers")
+
+        tickers = list(tickers)
+        versions = self.registry.latest_many(tickers)
+        missing = [ticker for ticker in tickers if ticker not in versions]
+        if missing:
+            raise FileNotFoundError(f"No model registered for {', '.join(missing)} in {self.registry.root}")
+
+        max_horizon = int(horizons.max())
+        forecasts = {
+            ticker: self._forecast_path(ticker, max_horizon, versions[ticker])[horizons - 1] for ticker in tickers
+        }
+        result = pd.DataFrame(forecasts, index=pd.Index(horizons, name="fh"), columns=tickers)
+
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["total_ms"] += elapsed_ms
+            self._stats["last_ms"] = elapsed_ms
+            self._stats["max_ms"] = max(self._stats["max_ms"], elapsed_ms)
+        logging.debug(f"Predicted {len(tickers)} tickers x {horizons.size} horizons in {elapsed_ms:.2f} ms.")
+        return result
+
+    def invalidate(self, ticker: str | None = None) -> None:
+        """
+        Drops cached models and forecasts for one ticker, or for all of them.
+
+        Args:
+            ticker (str | None): The ticker to drop; None clears everything.
+        """
+        with self._lock:
+            if ticker is None:
+                self._models.clear()
+                self._forecasts.clear()
+                return
+            self._models.pop(ticker, None)
+            for key in [key for key in self._forecasts if key[0] == ticker]:
+                del self._forecasts[key]
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns cache and latency statistics.
+
+        Returns:
+            dict[str, float]: Call, load and hit counts, plus last, mean and max
+                predict() latency in milliseconds.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_models"] = len(self._models)
+        stats["mean_ms"] = stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
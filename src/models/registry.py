@@ -0,0 +1,402 @@
+import os
+import bz2
+import gzip
+import lzma
+import pickle
+import hashlib
+import logging
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from src.db_operations.db_connection import session_scope
+from src.db_operations.models import ModelMetadata
+
+MAX_REGISTER_ATTEMPTS = 5
+GC_GRACE_SECONDS = 3600.0  # How long gc() leaves a file no version records yet
+
+# Codec name -> (file suffix, compress, decompress); lzma shrinks a pickled ARIMA about 12x
+CODECS = {
+    "lzma": (".pkl.xz", lzma.compress, lzma.decompress),
+    "gzip": (".pkl.gz", lambda data: gzip.compress(data, mtime=0), gzip.decompress),
+    "bz2": (".pkl.bz2", bz2.compress, bz2.decompress),
+    "none": (".pkl", bytes, bytes),
+}
+
+
+@dataclass
+class ModelVersion:
+    """One registered model artifact and the training record it belongs to."""
+
+    ticker: str
+    version: int
+    path: Path
+    sha256: str
+    size: int
+    timestamp: datetime
+    data_cutoff: datetime | None = None
+    last_full_fit: datetime | None = None
+    fit_mode: str | None = None
+    metrics: dict = field(default_factory=dict)
+    forecast_state: dict | None = None  # ArimaState.to_dict(), when the model could be exported
+
+
+class ModelRegistry:
+    """Versioned, content-addressed store of fitted models.
+
+    Each model is pickled, compressed and written once to
+    '<root>/objects/<aa>/<sha256><suffix>', where the SHA-256 is that of the
+    compressed bytes, so identical artifacts are stored once and a file is
+    never modified after it is written. The version number, artifact path,
+    checksum and size are recorded on the model's ModelMetadata row next to
+    its data cutoff and metrics, so finding the model to load is a single
+    indexed query and loading it is a single file read.
+
+    Rows are scoped to a registry by the absolute artifact path, so several
+    registries (e.g. one per test) can share a database.
+    """
+
+    def __init__(self, root: str | Path = "trained_models", compression: str = "lzma") -> None:
+        """
+        Initializes the ModelRegistry.
+
+        Args:
+            root (str | Path): The directory holding the 'objects' store.
+            compression (str): 'lzma', 'gzip', 'bz2' or 'none', for newly written artifacts;
+                existing artifacts are read with the codec their suffix names.
+
+        Raises:
+            ValueError: If the compression codec is unknown.
+        """
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression '{compression}'; expected one of {', '.join(CODECS)}")
+        self.root: Path = Path(root).resolve()
+        self.objects_dir: Path = self.root / "objects"
+        self.compression: str = compression
+
+    def _in_root(self):
+        """Restricts a query to rows whose artifact lives in this registry."""
+        return ModelMetadata.artifact_path.startswith(f"{self.objects_dir}{os.sep}", autoescape=True)
+
+    def write_artifact(self, model: Any) -> tuple[Path, str, int]:
+        """
+        Serializes and stores a model unless an identical artifact already exists.
+
+        Args:
+            model (Any): The fitted model.
+
+        Returns:
+            tuple[Path, str, int]: The artifact path, its SHA-256 and its size in bytes.
+        """
+        suffix, compress, _ = CODECS[self.compression]
+        data = compress(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.objects_dir / digest[:2] / f"{digest}{suffix}"
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so a reader never sees a partial artifact
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        else:
+            # Reused artifacts count as new for gc() until this run has recorded them
+            os.utime(path)
+        return path, digest, len(data)
+
+    def register(self, ticker: str, model: Any, metadata_id: int | None = None, **fields: Any) -> ModelVersion:
+        """
+        Stores a model as the next version of a ticker.
+
+        The version is the ticker's newest plus one. The (metal, version)
+        index is unique, so when two registrations pick the same number the
+        one that commits second fails and is retried with the next number.
+
+        Args:
+            ticker (str): The ticker symbol the model forecasts.
+            model (Any): The fitted model.
+            metadata_id (int | None): The training record to attach the artifact to;
+                a new ModelMetadata row is created from fields if None.
+            **fields (Any): Further ModelMetadata columns for a new row, e.g.
+                hyperparameters, parameters, data_cutoff or metrics.
+
+        Returns:
+            ModelVersion: The registered version.
+
+        Raises:
+            LookupError: If metadata_id does not exist.
+            IntegrityError: If the version number was taken by concurrent
+                registrations MAX_REGISTER_ATTEMPTS times in a row.
+        """
+        path, digest, size = self.write_artifact(model)
+
+        for attempt in range(1, MAX_REGISTER_ATTEMPTS + 1):
+            try:
+                version = self._record_version(ticker, path, digest, size, metadata_id, dict(fields))
+                break
+            except IntegrityError as e:
+                # A concurrent registration committed the same version first; the unique index rejected this one
+                if attempt == MAX_REGISTER_ATTEMPTS:
+                    logging.error(f"Could not register {ticker} after {attempt} attempts: {e}")
+                    raise
+                logging.warning(f"Version conflict registering {ticker}; retrying.")
+
+        logging.info(f"Registered {ticker} v{version.version} ({size / 1024:.1f} KiB) at {path}.")
+        return version
+
+    @staticmethod
+    def _record_version(
+        ticker: str, path: Path, digest: str, size: int, metadata_id: int | None, fields: dict[str, Any]
+    ) -> ModelVersion:
+        """Records an artifact as the ticker's next version in one transaction; see register()."""
+        with session_scope() as session:
+            if metadata_id is None:
+                row = ModelMetadata(
+                    metal=ticker,
+                    hyperparameters=fields.pop("hyperparameters", {}),
+                    parameters=fields.pop("parameters", {}),
+                    timestamp=fields.pop("timestamp", datetime.utcnow()),
+                    **fields,
+                )
+                session.add(row)
+            else:
+                row = session.get(ModelMetadata, metadata_id)
+                if row is None:
+                    raise LookupError(f"No model metadata with id {metadata_id}")
+            # Versions increase per ticker across every registry sharing the database
+            latest = session.execute(
+                select(func.max(ModelMetadata.version)).where(ModelMetadata.metal == ticker)
+            ).scalar()
+            row.version = (latest or 0) + 1
+            row.artifact_path = str(path)
+            row.artifact_sha256 = digest
+            row.artifact_bytes = size
+            session.flush()
+            return ModelRegistry._to_version(row)
+
+    @staticmethod
+    def _to_version(row: ModelMetadata) -> ModelVersion:
+        return ModelVersion(
+            ticker=row.metal,
+            version=row.version,
+            path=Path(row.artifact_path),
+            sha256=row.artifact_sha256,
+            size=row.artifact_bytes,
+            timestamp=row.timestamp,
+            data_cutoff=row.data_cutoff,
+            last_full_fit=row.last_full_fit or row.timestamp,
+            fit_mode=row.fit_mode,
+            metrics=row.metrics or {},
+            forecast_state=row.forecast_state,
+        )
+
+    def latest_many(self, tickers: Iterable[str]) -> dict[str, ModelVersion]:
+        """
+        Looks up the newest version of several tickers in one query.
+
+        Args:
+            tickers (Iterable[str]): The ticker symbols.
+
+        Returns:
+            dict[str, ModelVersion]: The newest version per ticker; tickers without
+                a registered model are absent.
+        """
+        tickers = list(tickers)
+        newest = (
+            select(ModelMetadata.metal, func.max(ModelMetadata.version).label("version"))
+            .where(ModelMetadata.metal.in_(tickers), self._in_root())
+            .group_by(ModelMetadata.metal)
+            .subquery()
+        )
+        with session_scope() as session:
+            rows = session.scalars(
+                select(ModelMetadata).join(
+                    newest,
+                    and_(ModelMetadata.metal == newest.c.metal, ModelMetadata.version == newest.c.version),
+                )
+            ).all()
+            return {row.metal: self._to_version(row) for row in rows}
+
+    def latest(self, ticker: str) -> ModelVersion:
+        """
+        Looks up the newest version of a ticker.
+
+        Args:
+            ticker (str): The ticker symbol.
+
+        Returns:
+            ModelVersion: The newest registered version.
+
+        Raises:
+            FileNotFoundError: If no model has been registered for the ticker.
+        """
+        version = self.latest_many([ticker]).get(ticker)
+        if version is None:
+            raise FileNotFoundError(f"No model registered for {ticker} in {self.root}")
+        return version
+
+    def get(self, ticker: str, version: int) -> ModelVersion:
+        """
+        Looks up one version of a ticker.
+
+        Args:
+            ticker (str): The ticker symbol.
+            version (int): The version number.
+
+        Returns:
+            ModelVersion: The version.
+
+        Raises:
+            FileNotFoundError: If the version does not exist or was garbage-collected.
+        """
+        with session_scope() as session:
+            row = session.scalars(
+                select(ModelMetadata).where(
+                    ModelMetadata.metal == ticker, ModelMetadata.version == version, self._in_root()
+                )
+            ).first()
+            if row is None:
+                raise FileNotFoundError(f"No version {version} of {ticker} in {self.root}")
+            return self._to_version(row)
+
+    def versions(self, ticker: str) -> list[ModelVersion]:
+        """
+        Lists the stored versions of a ticker, newest first.
+
+        Args:
+            ticker (str): The ticker symbol.
+
+        Returns:
+            list[ModelVersion]: The versions whose artifacts have not been collected.
+        """
+        with session_scope() as session:
+            rows = session.scalars(
+                select(ModelMetadata)
+                .where(ModelMetadata.metal == ticker, self._in_root())
+                .order_by(ModelMetadata.version.desc())
+            ).all()
+            return [self._to_version(row) for row in rows]
+
+    def read(self, version: ModelVersion) -> Any:
+        """
+        Reads, verifies and deserializes an artifact.
+
+        The checksum is verified before unpickling, so a truncated or
+        tampered file is never deserialized.
+
+        Args:
+            version (ModelVersion): The version to read.
+
+        Returns:
+            Any: The fitted model.
+
+        Raises:
+            FileNotFoundError: If the artifact file is missing.
+            ValueError: If the file does not match its recorded checksum.
+        """
+        data = version.path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != version.sha256:
+            logging.error(f"Checksum mismatch for {version.ticker} v{version.version} at {version.path}.")
+            raise ValueError(
+                f"Artifact {version.path} has checksum {digest}, expected {version.sha256}"
+            )
+        codec = next((c for c in CODECS.values() if version.path.name.endswith(c[0])), CODECS["none"])
+        return pickle.loads(codec[2](data))
+
+    def load(self, ticker: str, version: int) -> Any:
+        """
+        Loads one version of a ticker's model.
+
+        Args:
+            ticker (str): The ticker symbol.
+            version (int): The version number.
+
+        Returns:
+            Any: The fitted model.
+        """
+        return self.read(self.get(ticker, version))
+
+    def load_latest(self, ticker: str) -> Any:
+        """
+        Loads the newest version of a ticker's model.
+
+        Args:
+            ticker (str): The ticker symbol.
+
+        Returns:
+            Any: The fitted model.
+
+        Raises:
+            FileNotFoundError: If no model has been registered for the ticker.
+        """
+        return self.read(self.latest(ticker))
+
+    def gc(self, keep: int = 3, grace_period: float = GC_GRACE_SECONDS) -> list[Path]:
+        """
+        Drops all but the newest versions of each ticker and deletes unreferenced artifacts.
+
+        Collected versions keep their ModelMetadata row as training history;
+        only the artifact columns are cleared, and their files are deleted
+        unless another row shares them. Other files under 'objects' that no
+        row references, e.g. left by an interrupted run, are removed once
+        they are older than grace_period: a training run in another process
+        writes its artifact before it records it, so a newer file may be
+        about to be registered.
+
+        Args:
+            keep (int): Versions to keep per ticker, at least 1.
+            grace_period (float): Seconds an unrecorded file is left alone.
+
+        Returns:
+            list[Path]: The files that were deleted.
+
+        Raises:
+            ValueError: If keep is less than 1.
+        """
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+
+        with session_scope() as session:
+            rank = (
+                func.row_number()
+                .over(partition_by=ModelMetadata.metal, order_by=ModelMetadata.version.desc())
+                .label("rank")
+            )
+            ranked = select(ModelMetadata.id, rank).where(self._in_root()).subquery()
+            expired = select(ranked.c.id).where(ranked.c.rank > keep)
+            expired_paths = set(
+                session.scalars(select(ModelMetadata.artifact_path).where(ModelMetadata.id.in_(expired)))
+            )
+            collected = session.execute(
+                update(ModelMetadata)
+                .where(ModelMetadata.id.in_(expired))
+                .values(artifact_path=None, artifact_sha256=None, artifact_bytes=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            referenced = set(session.scalars(select(ModelMetadata.artifact_path).where(self._in_root())))
+
+        cutoff = time.time() - grace_period
+        removed = []
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob("*/*"):
+                if not path.is_file() or str(path) in referenced:
+                    continue
+                if str(path) in expired_paths or path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed.append(path)
+        logging.info(
+            f"Collected {collected} old model versions and {len(removed)} artifacts in {self.root}."
+        )
+        return removed
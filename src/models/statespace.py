@@ -0,0 +1,219 @@
+from dataclasses import asdict, dataclass, replace
+from statistics import NormalDist
+from typing import Any, Iterable
+
+import numpy as np
+
+
+@dataclass
+class ArimaState:
+    """Everything needed to forecast from a fitted ARIMA, as plain arrays.
+
+    statsmodels fits the ARIMA behind sktime's ARIMA as a linear Gaussian
+    state-space model:
+
+        y[t]   = design @ a[t] + obs_intercept + e[t],            e ~ N(0, obs_cov)
+        a[t+1] = transition @ a[t] + state_intercept + selection @ u[t],  u ~ N(0, innovation_cov)
+
+    The state a holds the trailing levels (one per order of differencing)
+    and the ARMA terms, so `state` and `state_cov`, the Kalman filter's
+    prediction for the step after the last observation, replace the
+    observations themselves. Forecasts and their variances follow exactly from
+    iterating the transition, which takes a few small matrix products.
+    """
+
+    order: tuple[int, int, int]
+    coefficients: dict[str, float]
+    sigma2: float
+    nobs: int
+    design: np.ndarray
+    obs_intercept: float
+    obs_cov: float
+    transition: np.ndarray
+    state_intercept: np.ndarray
+    selection: np.ndarray
+    innovation_cov: np.ndarray
+    state: np.ndarray
+    state_cov: np.ndarray
+
+    @classmethod
+    def from_model(cls, model: Any) -> "ArimaState":
+        """
+        Exports the state of a fitted sktime ARIMA.
+
+        Args:
+            model (Any): A fitted sktime ARIMA (or pmdarima ARIMA).
+
+        Returns:
+            ArimaState: The exported state.
+
+        Raises:
+            ValueError: If the model is seasonal or has a time-varying trend, which
+                a constant state intercept cannot represent.
+        """
+        estimator = getattr(model, "_forecaster", model)
+        results = estimator.arima_res_
+        ssm = results.model.ssm
+
+        if any(results.model.seasonal_order):
+            raise ValueError("Seasonal ARIMA models cannot be exported")
+        state_intercept = np.asarray(ssm["state_intercept"], dtype=float)
+        if state_intercept.ndim == 2:
+            if np.ptp(state_intercept, axis=1).any():
+                raise ValueError("Models with a time-varying trend cannot be exported")
+            state_intercept = state_intercept[:, -1]
+
+        coefficients = {
+            str(name): float(value) for name, value in zip(results.model.param_names, np.asarray(results.params))
+        }
+        return cls(
+            order=tuple(int(value) for value in results.model.order),
+            coefficients=coefficients,
+            sigma2=coefficients.get("sigma2", float("nan")),
+            nobs=int(results.nobs),
+            design=_constant(ssm["design"])[0],
+            obs_intercept=float(np.ravel(ssm["obs_intercept"])[-1]),
+            obs_cov=float(np.ravel(ssm["obs_cov"])[-1]),
+            transition=_constant(ssm["transition"]),
+            state_intercept=state_intercept,
+            selection=_constant(ssm["selection"]),
+            innovation_cov=_constant(ssm["state_cov"]),
+            state=np.asarray(results.predicted_state, dtype=float)[:, -1],
+            state_cov=np.asarray(results.predicted_state_cov, dtype=float)[:, :, -1],
+        )
+
+    def filter(self, values: Iterable[float]) -> "ArimaState":
+        """
+        Advances the state past new observations, keeping the parameters.
+
+        Runs the Kalman filter over the values, so the result forecasts
+        exactly as the fitted model would after statsmodels' append() without
+        refitting. Missing (NaN) values advance time without an update.
+
+        Args:
+            values (Iterable[float]): The observations following the current state.
+
+        Returns:
+            ArimaState: A new state; this one is not modified.
+        """
+        a, P = self.state.copy(), self.state_cov.copy()
+        Z, T, c = self.design, self.transition, self.state_intercept
+        noise = self.selection @ self.innovation_cov @ self.selection.T
+        for value in np.asarray(list(np.ravel(values)), dtype=float):
+            if not np.isnan(value):
+                PZ = P @ Z
+                variance = Z @ PZ + self.obs_cov
+                a = a + PZ * (value - Z @ a - self.obs_intercept) / variance
+                P = P - np.outer(PZ, PZ) / variance
+            a = T @ a + c
+            P = T @ P @ T.T + noise
+        return replace(self, state=a, state_cov=P, nobs=self.nobs + int(np.size(values)))
+
+    def to_dict(self) -> dict:
+        """
+        Converts the state into JSON-serializable types.
+
+        Returns:
+            dict: Lists and floats, suitable for a JSON column.
+        """
+        return {
+            name: value.tolist() if isinstance(value, np.ndarray) else value
+            for name, value in asdict(self).items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ArimaState":
+        """
+        Rebuilds a state written by to_dict().
+
+        Args:
+            data (dict): The serialized state.
+
+        Returns:
+            ArimaState: The state, with NumPy arrays.
+        """
+        arrays = {"design", "transition", "state_intercept", "selection", "innovation_cov", "state", "state_cov"}
+        values = {name: np.asarray(value, dtype=float) if name in arrays else value for name, value in data.items()}
+        values["order"] = tuple(values["order"])
+        return cls(**values)
+
+
+def _constant(matrix: Any) -> np.ndarray:
+    """Returns a system matrix, taking the last period of a time-varying one."""
+    matrix = np.asarray(matrix, dtype=float)
+    return matrix[:, :, -1] if matrix.ndim == 3 else matrix
+
+
+class StateSpaceForecaster:
+    """Forecasts from an exported ArimaState with NumPy alone.
+
+    Exposes the predict(fh=...) and predict_interval(fh=..., coverage=...)
+    calls Predictor makes on sktime models, so it can serve in their place
+    without importing sktime, pmdarima or statsmodels.
+    """
+
+    def __init__(self, state: ArimaState) -> None:
+        """
+        Initializes the StateSpaceForecaster.
+
+        Args:
+            state (ArimaState): The exported model.
+        """
+        self.state: ArimaState = state
+
+    def _path(self, fh: Iterable[int]) -> tuple[np.ndarray, np.ndarray]:
+        """Iterates the state equations up to the largest horizon; returns means and variances per requested step."""
+        steps = np.asarray(list(np.ravel(fh)), dtype=int)
+        if steps.size == 0 or steps.min() < 1:
+            raise ValueError("Forecast horizons must be positive integers")
+
+        s = self.state
+        a, P = s.state, s.state_cov
+        noise = s.selection @ s.innovation_cov @ s.selection.T
+        horizon = int(steps.max())
+        means, variances = np.empty(horizon), np.empty(horizon)
+        for h in range(horizon):
+            means[h] = s.design @ a + s.obs_intercept
+            variances[h] = s.design @ P @ s.design + s.obs_cov
+            a = s.transition @ a + s.state_intercept
+            P = s.transition @ P @ s.transition.T + noise
+        return means[steps - 1], variances[steps - 1]
+
+    def predict(self, fh: Iterable[int]) -> np.ndarray:
+        """
+        Forecasts the given steps after the last observation.
+
+        Args:
+            fh (Iterable[int]): Positive forecast horizons.
+
+        Returns:
+            np.ndarray: The point forecasts, one per horizon.
+        """
+        return self._path(fh)[0]
+
+    def predict_var(self, fh: Iterable[int]) -> np.ndarray:
+        """
+        Returns the forecast error variance of the given steps.
+
+        Args:
+            fh (Iterable[int]): Positive forecast horizons.
+
+        Returns:
+            np.ndarray: The variances, one per horizon.
+        """
+        return self._path(fh)[1]
+
+    def predict_interval(self, fh: Iterable[int], coverage: float = 0.9) -> np.ndarray:
+        """
+        Returns central prediction intervals of the given steps.
+
+        Args:
+            fh (Iterable[int]): Positive forecast horizons.
+            coverage (float): The nominal coverage, between 0 and 1.
+
+        Returns:
+            np.ndarray: An array of shape (len(fh), 2) with lower and upper bounds.
+        """
+        means, variances = self._path(fh)
+        spread = NormalDist().inv_cdf(0.5 + coverage / 2) * np.sqrt(variances)
+        return np.column_stack([means - spread, means + spread])
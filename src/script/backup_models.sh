@@ -1,14 +1,25 @@
 #!/bin/bash
 
-# Define backup directory
-BACKUP_DIR="/d/Turing/python_begineer/Projects/Metalytics/backup/trained_models"
-SOURCE_DIR="/d/Turing/python_begineer/Projects/Metalytics/trained_models/"  # Directory where .zip models are stored
+# Configuration
+BACKUP_DIR="${MODEL_BACKUP_DIR:-/d/Turing/python_begineer/Projects/Metalytics/backup/trained_models}"
+SOURCE_DIR="${MODEL_DIR:-/d/Turing/python_begineer/Projects/Metalytics/trained_models}"  # The model registry root
 TIMESTAMP=$(date +"%Y%m%d_%H%M")
 
-# Copy zipped models to backup directory with timestamp
-mkdir -p "$BACKUP_DIR"
-for model in $SOURCE_DIR/*.zip; do
-    cp "$model" "$BACKUP_DIR/$(basename $model .zip)_$TIMESTAMP.zip"
-done
+if [ ! -d "$SOURCE_DIR/objects" ]; then
+    echo "No model registry found at $SOURCE_DIR"
+    exit 1
+fi
 
-echo "Model backups completed at $TIMESTAMP"
+# Artifacts are content-addressed and never modified after they are written,
+# so only files the backup does not have yet need copying. Which artifact is
+# which ticker and version is recorded in model_training_metadata, which
+# backup_db.sh saves.
+mkdir -p "$BACKUP_DIR/objects"
+cp -R -n "$SOURCE_DIR/objects/." "$BACKUP_DIR/objects/"
+
+if [ $? -eq 0 ]; then
+    echo "Model backups completed at $TIMESTAMP"
+else
+    echo "Model backup failed"
+    exit 1
+fi
@@ -0,0 +1,3 @@
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
\ No newline at end of file
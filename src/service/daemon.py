@@ -0,0 +1,446 @@
+import os
+import time
+import queue
+import signal
+import logging
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from src.data_ingestion.bulk_loader import PriceRow, bulk_load_prices, notify_written
+from src.data_ingestion.sources import MetalPriceAPISource, ReplaySource, SyntheticSource
+from src.data_ingestion.symbols import SymbolRegistry
+from src.db_operations.aggregates import refresh_after_write
+from src.db_operations.db_connection import dispose_engine, init_db, pool_stats
+from src.db_operations.price_cache import get_price_cache
+from src.config import load_config
+from src.log_info import setup_logging
+from src.metrics import write_metrics
+
+_STOP = object()  # Tells the writer thread that no more batches will come
+
+
+class Clock:
+    """Wall-clock time source for the daemon's scheduler; tests substitute a fake one."""
+
+    def monotonic(self) -> float:
+        """Returns seconds from an arbitrary, never-decreasing origin."""
+        return time.monotonic()
+
+    def sleep(self, seconds: float, stop: threading.Event) -> None:
+        """Waits for the given time, returning early once stop is set."""
+        stop.wait(seconds)
+
+
+@dataclass
+class DaemonStats:
+    """Counters describing a daemon run."""
+
+    polls: int = 0
+    polls_failed: int = 0
+    polls_skipped: int = 0  # Skipped because the buffer was full
+    rows_received: int = 0
+    rows_duplicate: int = 0  # Quotes already seen in an earlier poll
+    rows_written: int = 0
+    rows_dropped: int = 0  # Lost after exhausting write retries
+    batches_written: int = 0
+    write_failures: int = 0
+    backpressure_events: int = 0  # Writer queue full, rows kept in the buffer
+    max_write_seconds: float = 0.0
+    trainings_started: int = 0
+    trainings_skipped: int = 0  # Previous training still running
+    trainings_failed: int = 0
+
+
+def write_prices(batch: List[PriceRow]) -> Any:
+    """
+    Writes one batch of prices, passes it to the write listeners and refreshes the aggregates over it.
+
+    Args:
+        batch (List[PriceRow]): The rows to write.
+
+    Returns:
+        Any: The bulk_load_prices() statistics.
+    """
+    stats = bulk_load_prices(batch)
+    notify_written(batch)
+    if stats.inserted:
+        refresh_after_write()
+    return stats
+
+
+def train_and_save(tickers: List[str], model_dir: str = "trained_models", **model_options: Any) -> None:
+    """
+    Trains models for the tickers and saves them, as main.py does once per run.
+
+    Args:
+        tickers (List[str]): The ticker symbols to train.
+        model_dir (str): Where the models are saved and, in incremental mode, loaded from.
+        **model_options (Any): Further keyword arguments for Model.
+    """
+    # Imported on first use so that the daemon starts polling without waiting for sktime
+    from src.models.model import Model
+
+    model = Model(tickers, model_dir=model_dir, **model_options)
+    model.train()
+    model.save(model_dir)
+
+
+class IngestionDaemon:
+    """Long-running process that polls prices, writes them in batches and retrains on a schedule.
+
+    One scheduler loop polls the source every `interval` seconds into an
+    in-memory buffer and hands full batches (or whatever is buffered once
+    `flush_interval` has passed) to a writer thread through a bounded queue.
+    When the database falls behind, the queue fills up, rows stay in the
+    buffer and, once the buffer holds `max_buffer_rows`, polls are skipped
+    until the writer catches up. Training runs in its own worker every
+    `train_interval` seconds and never overlaps itself, so a long fit never
+    delays polling.
+    """
+
+    def __init__(
+        self,
+        source: Optional[Callable[[], List[PriceRow]]] = None,
+        sink: Callable[[List[PriceRow]], Any] = write_prices,
+        train_fn: Optional[Callable[[], Any]] = None,
+        interval: float = 60.0,
+        batch_size: int = 500,
+        flush_interval: float = 300.0,
+        max_buffer_rows: int = 10_000,
+        max_pending_batches: int = 4,
+        train_interval: Optional[float] = 3600.0,
+        max_write_retries: int = 5,
+        retry_backoff: float = 1.0,
+        clock: Optional[Clock] = None,
+    ) -> None:
+        """
+        Initializes the IngestionDaemon.
+
+        Args:
+            source (Optional[Callable[[], List[PriceRow]]]): Returns the rows of one
+                poll, usually a PriceSource; defaults to MetalPriceAPISource. A
+                source with a close() method is closed on shutdown.
+            sink (Callable[[List[PriceRow]], Any]): Writes one batch; defaults to write_prices.
+            train_fn (Optional[Callable[[], Any]]): Retrains and saves the models;
+                None disables training.
+            interval (float): Seconds between polls.
+            batch_size (int): Rows per write.
+            flush_interval (float): Longest time rows wait in the buffer before a partial batch is written.
+            max_buffer_rows (int): Buffered rows at which polling pauses.
+            max_pending_batches (int): Batches that may wait for the writer before the buffer holds them.
+            train_interval (Optional[float]): Seconds between training runs.
+            max_write_retries (int): Attempts per batch before its rows are dropped.
+            retry_backoff (float): The initial delay between write attempts, doubled on each retry.
+            clock (Optional[Clock]): The time source; defaults to the wall clock.
+        """
+        self.source = source or MetalPriceAPISource()
+        self.sink = sink
+        self.train_fn = train_fn
+        self.interval = interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer_rows = max_buffer_rows
+        self.train_interval = train_interval
+        self.max_write_retries = max_write_retries
+        self.retry_backoff = retry_backoff
+        self.clock = clock or Clock()
+        self.stats = DaemonStats()
+
+        self._buffer: Deque[PriceRow] = deque()
+        self._last_seen: Dict[str, Any] = {}  # Newest quote time per metal
+        self._batches: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending_batches)
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._trainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trainer")
+        self._training: Optional[Future] = None
+        self._next_poll = self._next_flush = self._next_train = 0.0
+
+    def start(self) -> None:
+        """Starts the writer thread and schedules the first poll now and the first training one train_interval out."""
+        now = self.clock.monotonic()
+        self._next_poll = now
+        self._next_flush = now + self.flush_interval
+        self._next_train = now + self.train_interval if self.train_interval is not None else float("inf")
+        self._writer = threading.Thread(target=self._write_batches, name="writer", daemon=True)
+        self._writer.start()
+        logging.info(
+            f"Ingestion daemon started: polling every {self.interval}s, "
+            f"batches of {self.batch_size}, training every {self.train_interval}s."
+        )
+
+    def stop(self) -> None:
+        """Asks the scheduler loop to finish; safe to call from signal handlers and other threads."""
+        self._stop.set()
+
+    @property
+    def buffered(self) -> int:
+        """The number of rows waiting to be handed to the writer."""
+        return len(self._buffer)
+
+    def poll(self) -> int:
+        """
+        Polls the source once and buffers the rows not seen before.
+
+        Returns:
+            int: The number of rows buffered.
+        """
+        if len(self._buffer) >= self.max_buffer_rows:
+            self.stats.polls_skipped += 1
+            logging.warning(f"Skipping poll: {len(self._buffer)} rows are waiting for the database.")
+            return 0
+
+        self.stats.polls += 1
+        try:
+            rows = self.source()
+        except Exception as e:
+            self.stats.polls_failed += 1
+            logging.error(f"Poll failed: {e}")
+            return 0
+
+        self.stats.rows_received += len(rows)
+        buffered = 0
+        for row in rows:
+            metal, timestamp = row[0], row[2]
+            # The API repeats its last quote until it publishes a new one
+            last = self._last_seen.get(metal)
+            if last is not None and timestamp <= last:
+                self.stats.rows_duplicate += 1
+                continue
+            self._last_seen[metal] = timestamp
+            self._buffer.append(row)
+            buffered += 1
+        return buffered
+
+    def dispatch(self, block: bool = False) -> int:
+        """
+        Moves buffered rows to the writer in batches of at most batch_size.
+
+        Args:
+            block (bool): Wait for room in the writer queue instead of leaving
+                the rest in the buffer; used when shutting down.
+
+        Returns:
+            int: The number of rows handed to the writer.
+        """
+        dispatched = 0
+        while self._buffer:
+            batch = list(islice(self._buffer, self.batch_size))
+            try:
+                self._batches.put(batch, block=block)
+            except queue.Full:
+                self.stats.backpressure_events += 1
+                logging.warning(f"Database is behind; keeping {len(self._buffer)} rows buffered.")
+                break
+            for _ in batch:
+                self._buffer.popleft()
+            dispatched += len(batch)
+        return dispatched
+
+    def _write_batches(self) -> None:
+        """Writer thread: writes batches until told to stop, retrying failed writes with backoff."""
+        while True:
+            batch = self._batches.get()
+            try:
+                if batch is _STOP:
+                    return
+                self._write(batch)
+            finally:
+                self._batches.task_done()
+
+    def _write(self, batch: List[PriceRow]) -> None:
+        """Writes one batch, retrying up to max_write_retries times."""
+        delay = self.retry_backoff
+        for attempt in range(1, self.max_write_retries + 1):
+            started = self.clock.monotonic()
+            try:
+                self.sink(batch)
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats.write_failures += 1
+                if attempt == self.max_write_retries:
+                    break
+                logging.warning(f"Writing {len(batch)} rows failed ({e}); retrying in {delay:.1f}s.")
+                # Retries continue during shutdown so buffered rows are not given up early
+                self.clock.sleep(delay, threading.Event())
+                delay *= 2
+                continue
+
+            elapsed = self.clock.monotonic() - started
+            with self._stats_lock:
+                self.stats.rows_written += len(batch)
+                self.stats.batches_written += 1
+                self.stats.max_write_seconds = max(self.stats.max_write_seconds, elapsed)
+            return
+
+        with self._stats_lock:
+            self.stats.rows_dropped += len(batch)
+        logging.error(f"Dropped {len(batch)} rows after {self.max_write_retries} failed writes.")
+
+    def start_training(self) -> bool:
+        """
+        Starts a training run in the training worker unless one is still running.
+
+        Returns:
+            bool: True if a run was started.
+        """
+        if self.train_fn is None:
+            return False
+        if self._training is not None and not self._training.done():
+            self.stats.trainings_skipped += 1
+            logging.warning("Previous training run is still in progress; skipping this one.")
+            return False
+
+        self.stats.trainings_started += 1
+        self._training = self._trainer.submit(self.train_fn)
+        self._training.add_done_callback(self._training_done)
+        return True
+
+    def _training_done(self, future: Future) -> None:
+        """Logs the outcome of a training run."""
+        error = future.exception()
+        if error is not None:
+            with self._stats_lock:
+                self.stats.trainings_failed += 1
+            logging.error(f"Training run failed: {error}")
+        else:
+            logging.info("Training run finished.")
+
+    def step(self) -> float:
+        """
+        Runs whatever is due: a poll, a flush, a training run.
+
+        Returns:
+            float: Seconds until the next task is due.
+        """
+        now = self.clock.monotonic()
+
+        if now >= self._next_poll:
+            self.poll()
+            self._next_poll += self.interval
+            if self._next_poll <= now:
+                # Fell behind (slow source or long pause): skip the missed slots instead of bursting
+                self._next_poll = now + self.interval
+
+        if self._buffer and (len(self._buffer) >= self.batch_size or now >= self._next_flush):
+            self.dispatch()
+        if now >= self._next_flush:
+            self._next_flush = now + self.flush_interval
+
+        if now >= self._next_train:
+            self.start_training()
+            self._next_train = now + self.train_interval
+
+        return max(min(self._next_poll, self._next_flush, self._next_train) - now, 0.0)
+
+    def shutdown(self, timeout: Optional[float] = None) -> DaemonStats:
+        """
+        Writes everything still buffered, then stops the writer and training workers.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the writer to finish.
+
+        Returns:
+            DaemonStats: The final counters.
+        """
+        self._stop.set()
+        if self._writer is not None:
+            self.dispatch(block=True)
+            self._batches.put(_STOP)
+            self._writer.join(timeout)
+            self._writer = None
+        self._trainer.shutdown(wait=True)
+        close = getattr(self.source, "close", None)
+        if close is not None:
+            close()
+        logging.info(f"Ingestion daemon stopped: {asdict(self.stats)}")
+        return self.stats
+
+    def run(self) -> DaemonStats:
+        """
+        Runs the scheduler loop until stop() is called, then shuts down gracefully.
+
+        Returns:
+            DaemonStats: The final counters.
+        """
+        self.start()
+        try:
+            while not self._stop.is_set():
+                delay = self.step()
+                self.clock.sleep(delay, self._stop)
+        finally:
+            stats = self.shutdown()
+        return stats
+
+
+def run(
+    interval: float = 60.0,
+    train_interval: float = 3600.0,
+    batch_size: int = 500,
+    tickers: Optional[List[str]] = None,
+    model_dir: str = "trained_models",
+    source: Optional[Callable[[], List[PriceRow]]] = None,
+) -> DaemonStats:
+    """
+    Runs the ingestion daemon until SIGINT or SIGTERM.
+
+    Args:
+        interval (float): Seconds between polls.
+        train_interval (float): Seconds between training runs.
+        batch_size (int): Rows per database write.
+        tickers (Optional[List[str]]): The tickers to train; defaults to the symbol registry.
+        model_dir (str): Where trained models are saved.
+        source (Optional[Callable[[], List[PriceRow]]]): The price source; defaults to the MetalPrice API.
+
+    Returns:
+        DaemonStats: The final counters.
+    """
+    init_db()
+    tickers = tickers or SymbolRegistry.load().tickers
+    cache = get_price_cache()
+    if cache is not None:
+        cache.warm(tickers)
+    daemon = IngestionDaemon(
+        source=source,
+        train_fn=partial(train_and_save, tickers, model_dir, incremental=True),
+        interval=interval,
+        batch_size=batch_size,
+        train_interval=train_interval,
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop())
+    try:
+        return daemon.run()
+    finally:
+        logging.info(f"Connection pool stats: {pool_stats()}")
+        write_metrics(os.getenv("METRICS_JSON"), os.getenv("METRICS_PROM"))
+        dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Continuously ingest prices and retrain models.")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between polls.")
+    parser.add_argument("--train-interval", type=float, default=3600.0, help="Seconds between training runs.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--tickers", help="Comma-separated series; defaults to the symbol registry.")
+    parser.add_argument("--model-dir", default="trained_models")
+    parser.add_argument("--replay", metavar="PATH", help="Replay prices from a CSV or Parquet file instead of the API.")
+    parser.add_argument("--synthetic", action="store_true", help="Generate random-walk prices instead of calling the API.")
+    parser.add_argument("--rows-per-poll", type=int, default=1000, help="Rows per poll for --replay and --synthetic.")
+    args = parser.parse_args()
+    load_config()
+    setup_logging(os.getenv("LOG_LEVEL"))
+
+    source = None
+    tickers = args.tickers.split(",") if args.tickers else SymbolRegistry.load().tickers
+    if args.replay:
+        source = ReplaySource(args.replay, batch_size=args.rows_per_poll)
+    elif args.synthetic:
+        source = SyntheticSource(tickers, ticks_per_fetch=max(args.rows_per_poll // len(tickers), 1))
+    run(args.interval, args.train_interval, args.batch_size, tickers, args.model_dir, source)
@@ -0,0 +1,363 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from src.data_ingestion.symbols import SymbolRegistry
+from src.db_operations.db_connection import pool_stats
+from src.db_operations.price_cache import get_price_cache
+from src.db_operations.queries import fetch_latest_prices, fetch_rolling_stats
+from src.config import load_config
+from src.log_info import setup_logging
+from src.metrics import METRICS, pool_gauges
+from src.models.predictor import Predictor
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024  # Larger request bodies are not read; the connection is closed instead
+MAX_HORIZON = 1000
+
+
+class TextBody(str):
+    """A response body sent as plain text instead of JSON."""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HTTPError(Exception):
+    """An error that is reported to the client with the given status code."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        """
+        Initializes the HTTPError.
+
+        Args:
+            status (HTTPStatus): The response status.
+            message (str): The error message returned to the client.
+        """
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value: Any) -> Any:
+    """Serializes the datetime and NumPy values found in query and forecast results."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ForecastService:
+    """Asyncio HTTP service for latest prices and forecasts.
+
+    Routes:
+        GET /health                               liveness check
+        GET /metrics                              request, predictor, price cache, pool and stage statistics
+        GET /metrics/prometheus                   the same in the Prometheus text format
+        GET /prices/latest?metals=XAU,XAG         latest stored price per metal
+        GET /prices/stats?metals=XAU,XAG          newest rolling mean and volatility per metal
+        GET /forecast?tickers=XAU,XAG&fh=1,2,3    forecasts per ticker and horizon
+
+    Identical requests that arrive while one is being computed share its
+    result, and blocking work runs on a bounded thread pool so the event loop
+    only handles I/O.
+    """
+
+    def __init__(
+        self,
+        predictor: Predictor | None = None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        workers: int = 4,
+    ) -> None:
+        """
+        Initializes the ForecastService.
+
+        Args:
+            predictor (Predictor | None): The model cache to serve forecasts from.
+            host (str): The interface to bind.
+            port (int): The port to bind; 0 picks a free one.
+            workers (int): Threads available for database queries and predictions.
+        """
+        self.predictor: Predictor = predictor or Predictor()
+        self.host: str = host
+        self.port: int = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forecast-worker")
+        self.server: asyncio.Server | None = None
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._routes: dict[str, Callable[[dict], Awaitable[Any]]] = {
+            "/health": self.health,
+            "/metrics": self.metrics,
+            "/metrics/prometheus": self.prometheus_metrics,
+            "/prices/latest": self.latest_prices,
+            "/prices/stats": self.rolling_stats,
+            "/forecast": self.forecast,
+        }
+        self._metrics: dict[str, Any] = {
+            "requests": 0,
+            "errors": 0,
+            "coalesced": 0,
+            "in_flight": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "by_route": {},
+        }
+
+    async def start(self) -> None:
+        """Binds the listening socket; the bound port is stored in self.port."""
+        self.server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        logging.info(f"Forecast service listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self) -> None:
+        """Starts the server if needed and serves until cancelled."""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """Stops accepting connections and shuts the worker pool down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _coalesce(self, key: tuple, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs func on the worker pool, sharing one execution among identical concurrent calls."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self._metrics["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, func, *args)
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def health(self, params: dict) -> dict:
+        """Reports that the service is up."""
+        return {"status": "ok"}
+
+    async def metrics(self, params: dict) -> dict:
+        """Reports request counts and latencies, predictor and price cache and DB pool statistics."""
+        metrics = dict(self._metrics)
+        metrics["mean_ms"] = metrics["total_ms"] / metrics["requests"] if metrics["requests"] else 0.0
+        metrics["predictor"] = self.predictor.stats()
+        cache = get_price_cache()
+        metrics["price_cache"] = cache.stats() if cache is not None else None
+        metrics["db_pool"] = pool_stats()
+        metrics["pipeline"] = METRICS.snapshot()
+        return metrics
+
+    async def prometheus_metrics(self, params: dict) -> TextBody:
+        """Reports request, stage and pool metrics for a Prometheus scraper."""
+        gauges = {
+            "http_requests": self._metrics["requests"],
+            "http_errors": self._metrics["errors"],
+            "http_coalesced": self._metrics["coalesced"],
+            "http_in_flight": self._metrics["in_flight"],
+            "http_request_seconds_max": self._metrics["max_ms"] / 1000,
+            **{f"predictor_{key}": value for key, value in self.predictor.stats().items()},
+        }
+        cache = get_price_cache()
+        if cache is not None:
+            gauges.update({f"price_cache_{key}": value for key, value in cache.stats().items()})
+        return TextBody(METRICS.prometheus({**gauges, **pool_gauges()}))
+
+    async def latest_prices(self, params: dict) -> dict:
+        """Returns the latest stored price of the requested metals (all if none given)."""
+        metals = _split(params.get("metals"))
+        key = ("latest", tuple(sorted(metals)) if metals else None)
+        prices = await self._coalesce(key, _latest_prices, metals or None)
+        return {"prices": prices}
+
+    async def rolling_stats(self, params: dict) -> dict:
+        """Returns the newest rolling statistics of the requested metals (all if none given)."""
+        metals = _split(params.get("metals"))
+        key = ("stats", tuple(sorted(metals)) if metals else None)
+        stats = await self._coalesce(key, fetch_rolling_stats, metals or None)
+        return {"stats": stats}
+
+    async def forecast(self, params: dict) -> dict:
+        """Returns forecasts for the requested tickers and horizons."""
+        tickers = _split(params.get("tickers"))
+        if not tickers:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Query parameter 'tickers' is required")
+        try:
+            horizons = [int(h) for h in _split(params.get("fh")) or ["1"]]
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Query parameter 'fh' must be integers")
+        if min(horizons) < 1 or max(horizons) > MAX_HORIZON:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Horizons must be between 1 and {MAX_HORIZON}")
+
+        key = ("forecast", tuple(tickers), tuple(horizons))
+        try:
+            frame = await self._coalesce(key, self.predictor.predict, tickers, horizons)
+        except FileNotFoundError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(e))
+        return {
+            "fh": horizons,
+            "forecasts": {ticker: frame[ticker].tolist() for ticker in frame.columns},
+        }
+
+    async def dispatch(self, method: str, target: str) -> tuple[HTTPStatus, Any]:
+        """Routes one request and returns the status and JSON-serializable body."""
+        url = urlsplit(target)
+        handler = self._routes.get(url.path)
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown path {url.path}"}
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET is supported"}
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            return HTTPStatus.OK, await handler(params)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            logging.error(f"Error handling {target}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves HTTP/1.1 requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {"error": "Headers too large"}, False)
+                    return
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                    return
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in lines[1:] if line)
+                }
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                )
+
+                # No route reads a body, but it must leave the stream before the next request is parsed
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed Content-Length"}, False)
+                    return
+                if "transfer-encoding" in headers or length > MAX_BODY_BYTES:
+                    keep_alive = False
+                elif length:
+                    try:
+                        await reader.readexactly(length)
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        return
+
+                started = time.perf_counter()
+                self._metrics["in_flight"] += 1
+                try:
+                    status, body = await self.dispatch(method, target)
+                finally:
+                    self._metrics["in_flight"] -= 1
+                self._record(urlsplit(target).path, status, 1000 * (time.perf_counter() - started))
+
+                await self._write(writer, status, body, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def _write(self, writer: asyncio.StreamWriter, status: HTTPStatus, body: Any, keep_alive: bool) -> None:
+        """Writes one JSON (or, for a TextBody, plain-text) response."""
+        if isinstance(body, TextBody):
+            payload, content_type = body.encode(), body.content_type
+        else:
+            payload, content_type = json.dumps(body, default=_json_default).encode(), "application/json"
+        writer.write(
+            (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            ).encode()
+            + payload
+        )
+        await writer.drain()
+
+    def _record(self, path: str, status: HTTPStatus, elapsed_ms: float) -> None:
+        """Adds one finished request to the service metrics."""
+        metrics = self._metrics
+        metrics["requests"] += 1
+        metrics["total_ms"] += elapsed_ms
+        metrics["max_ms"] = max(metrics["max_ms"], elapsed_ms)
+        if status >= 500:
+            metrics["errors"] += 1
+        route = metrics["by_route"].setdefault(path, {"requests": 0, "total_ms": 0.0})
+        route["requests"] += 1
+        route["total_ms"] += elapsed_ms
+
+
+def _latest_prices(metals: list[str] | None) -> list[dict]:
+    """Reads the latest prices from the price cache, falling back to the database on a miss."""
+    cache = get_price_cache()
+    prices = cache.latest(metals) if cache is not None and metals else None
+    return prices if prices is not None else fetch_latest_prices(metals)
+
+
+def _split(value: str | None) -> list[str]:
+    """Splits a comma-separated query parameter, dropping empty items."""
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+
+def run(host: str = "127.0.0.1", port: int = 8080, model_dir: str = "trained_models", workers: int = 4) -> None:
+    """
+    Runs the forecast service until interrupted.
+
+    Args:
+        host (str): The interface to bind.
+        port (int): The port to bind.
+        model_dir (str): The directory holding the trained models.
+        workers (int): Threads available for database queries and predictions.
+    """
+    cache = get_price_cache()
+    if cache is not None:
+        cache.warm(SymbolRegistry.load().tickers)
+    service = ForecastService(Predictor(model_dir), host=host, port=port, workers=workers)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        logging.info("Forecast service stopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve latest prices and forecasts over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model-dir", default="trained_models")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    load_config()
+    setup_logging(os.getenv("LOG_LEVEL"))
+    run(args.host, args.port, args.model_dir, args.workers)
@@ -1,17 +1,13 @@
-import zipfile
-import joblib  # or import pickle, depending on how you saved the model
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
+from src.models.predictor import Predictor
 
-extraction_path = 'D:/Turing/python_begineer/Projects/Metalytics/trained_models/XAG'
 
-# Load the model from the extracted files
-model_path = f"{extraction_path}/_obj"  # Adjust path if necessary
-
-# Load the model
-model = joblib.load(model_path)  # or use pickle.load() if applicable
+# Load the model saved by main.py (Model.save("trained_models"))
+predictor = Predictor("trained_models")
+_, model = predictor.get_model("XAG")
 print("Model loaded successfully!")
 print("Model parameters:", model)
 
@@ -34,7 +30,7 @@ test_data = pd.concat([historical_data, test_data])
 
 # Step 3: Make Predictions
 # Example: Make predictions for the next 5 time steps
-predictions = model.predict(fh=[1, 2, 3, 4, 5])  # Forecasting horizon
+predictions = predictor.predict(["XAG"], fh=[1, 2, 3, 4, 5])["XAG"]  # Forecasting horizon
 print("Predictions for the next 5 time steps:")
 print(predictions)
 
@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+import pytest
+
+# Run the suite against a throwaway SQLite file unless a database is configured explicitly
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='metalytics_'), 'test.db')}",
+)
+
+# Tests delete the rows they insert, which a process-wide price cache would keep serving
+os.environ.setdefault("PRICE_CACHE_DEPTH", "0")
+
+from src.db_operations.db_connection import dispose_engine, init_db
+
+
+@pytest.fixture(scope="session", autouse=True)
+def engine():
+    """Release the shared connection pool at the end of the test session."""
+    yield
+    dispose_engine()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database(engine):
+    """Create the schema for each test module; some modules drop all tables on teardown."""
+    init_db()
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations import aggregates
+from src.db_operations.aggregates import refresh_aggregates, rolling_statistics
+from src.db_operations.db_connection import connection_scope, read_id_horizon, settle_id
+from src.db_operations.models import PreciousMetalPrice
+from src.db_operations.queries import fetch_latest_prices, fetch_resampled_prices, fetch_rolling_stats
+
+START = datetime(2024, 3, 1)
+TABLES = (
+    "precious_metals_prices",
+    "precious_metals_prices_latest",
+    "precious_metals_prices_hourly",
+    "precious_metals_prices_daily",
+    "precious_metals_prices_rolling",
+)
+
+
+@pytest.fixture
+def metals():
+    """Bring the aggregates up to date, then remove the AGA/AGB rows of every table afterwards."""
+    refresh_aggregates()
+    yield ["AGA", "AGB"]
+    with connection_scope() as connection:
+        for table in TABLES:
+            connection.execute(text(f"DELETE FROM {table} WHERE metal IN ('AGA', 'AGB')"))
+
+
+def hourly_closes(metal):
+    """Return the stored hourly (bucket, close) pairs of a metal."""
+    with connection_scope() as connection:
+        rows = connection.execute(
+            text("SELECT bucket, close FROM precious_metals_prices_hourly WHERE metal = :metal ORDER BY bucket"),
+            {"metal": metal},
+        ).all()
+    return [(str(bucket)[:19], close) for bucket, close in rows]
+
+
+def test_refresh_is_incremental(metals):
+    """Test that only rows written since the last run are processed and a second run is a no-op."""
+    bulk_load_prices([("AGA", 10.0 + i, START + timedelta(minutes=30 * i)) for i in range(4)])
+    first = refresh_aggregates()
+    assert first.rows == 4 and first.metals == 1 and first.hourly == 2
+
+    assert refresh_aggregates().rows == 0
+
+    bulk_load_prices([("AGA", 20.0, START + timedelta(hours=2)), ("AGB", 5.0, START)])
+    second = refresh_aggregates()
+    assert second.rows == 2 and second.metals == 2 and second.last_id > first.last_id
+
+    latest = {row["metal"]: row["price"] for row in fetch_latest_prices(metals)}
+    assert latest == {"AGA": 20.0, "AGB": 5.0}
+    assert [close for _, close in hourly_closes("AGA")] == [11.0, 13.0, 20.0]
+
+
+def test_ids_committed_late_below_the_mark_are_refreshed(metals, monkeypatch):
+    """Test that a writer committing lower ids after another writer's refresh is still rolled up.
+
+    SQLite serializes writers, so PostgreSQL's snapshot horizon is simulated:
+    transaction 7 holds id M + 1 open while id M + 2 commits and is refreshed.
+    """
+    horizons = [(7, 9), (9, 10), (10, 10)]
+    monkeypatch.setattr(
+        aggregates, "read_id_horizon", lambda connection, column: (read_id_horizon(connection, column)[0], horizons.pop(0))
+    )
+    with connection_scope() as connection:
+        first_id = (connection.execute(text("SELECT MAX(id) FROM precious_metals_prices")).scalar() or 0) + 1
+
+    def insert(row_id, price, timestamp):
+        with connection_scope() as connection:
+            connection.execute(
+                PreciousMetalPrice.__table__.insert().values(
+                    id=row_id, metal="AGA", price=price, timestamp=timestamp, base_currency="EUR"
+                )
+            )
+
+    insert(first_id + 1, 12.0, START + timedelta(hours=1))
+    assert refresh_aggregates().rows == 1
+
+    insert(first_id, 30.0, START)  # The long transaction commits
+    late = refresh_aggregates()
+    assert late.rows == 2 and late.last_id == first_id + 1
+    assert [close for _, close in hourly_closes("AGA")] == [30.0, 12.0]
+
+    assert refresh_aggregates().rows == 0  # Settled: nothing is read again
+    assert settle_id(5, None, 3, 0, None) == (5, None)
+    assert settle_id(5, (4, 6), 3, 0, 2) == (3, 6)
+
+
+def test_late_rows_update_past_buckets_but_not_latest(metals):
+    """Test that a backfilled older row is rolled into its bucket without replacing the newer latest price."""
+    bulk_load_prices([("AGA", 10.0, START), ("AGA", 12.0, START + timedelta(hours=1, minutes=10))])
+    refresh_aggregates()
+
+    bulk_load_prices([("AGA", 30.0, START + timedelta(minutes=50))])
+    assert refresh_aggregates().rows == 1
+
+    assert fetch_latest_prices(["AGA"])[0]["price"] == 12.0
+    assert [close for _, close in hourly_closes("AGA")] == [30.0, 12.0]
+    data = fetch_resampled_prices(["AGA"], START, START + timedelta(hours=2), freq="1h", how="ohlc")
+    assert data[("high", "AGA")].tolist() == [30.0, 12.0]
+
+
+def test_since_picks_up_prices_changed_in_place(metals):
+    """Test that corrected prices keep their id and are only refreshed when `since` covers them."""
+    bulk_load_prices([("AGA", 10.0, START), ("AGA", 11.0, START + timedelta(hours=1))])
+    refresh_aggregates()
+
+    bulk_load_prices([("AGA", 15.0, START + timedelta(hours=1))], on_conflict="update")
+    assert refresh_aggregates().rows == 0
+    assert fetch_latest_prices(["AGA"])[0]["price"] == 11.0
+
+    assert refresh_aggregates(since=START + timedelta(hours=1)).rows >= 1
+    assert fetch_latest_prices(["AGA"])[0]["price"] == 15.0
+
+
+def test_rolling_statistics_match_a_direct_computation(metals):
+    """Test the stored rolling mean and volatility against the window's closes."""
+    closes = [100.0, 102.0, 101.0, 105.0, 104.0, 108.0]
+    bulk_load_prices([("AGB", close, START + timedelta(hours=i)) for i, close in enumerate(closes)])
+    refresh_aggregates(window=3)
+
+    stats = fetch_rolling_stats(["AGB"])
+    assert len(stats) == 1
+    assert stats[0]["samples"] == 3 and stats[0]["close"] == 108.0
+    assert stats[0]["mean"] == pytest.approx(sum(closes[-3:]) / 3)
+    returns = [closes[i] / closes[i - 1] - 1 for i in (4, 5)]
+    mean = sum(returns) / 2
+    assert stats[0]["volatility"] == pytest.approx((sum((r - mean) ** 2 for r in returns)) ** 0.5)
+
+
+def test_rolling_statistics_fill_the_first_windows():
+    """Test that windows are partial at the start and volatility needs two returns."""
+    statistics = rolling_statistics([1.0, 2.0, 4.0, 8.0], window=3)
+
+    assert [samples for _, _, samples in statistics] == [1, 2, 3, 3]
+    assert statistics[1] == (1.5, None, 2)
+    assert statistics[3][0] == pytest.approx(14 / 3) and statistics[3][1] == pytest.approx(0.0)
+    assert rolling_statistics([1.0, 2.0, 4.0, 8.0], window=3, first=2) == statistics[2:]
@@ -0,0 +1,128 @@
+import json
+import time
+import asyncio
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.data_ingestion import async_ingest
+from src.data_ingestion.async_ingest import HTTPStatusError, get_json, ingest_async
+from src.data_ingestion.bulk_loader import IngestStats
+
+
+class StubJSON(BaseHTTPRequestHandler):
+    """Answers /chunked with a chunked body, /eof with a body ended by closing the connection,
+    /slow after a delay, /missing with 404 and anything else plainly."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/slow"):
+            time.sleep(1.0)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if self.path.startswith("/eof"):
+            self.end_headers()
+            for start in range(0, len(body), 7):
+                self.wfile.write(body[start:start + 7])
+                self.wfile.flush()
+                time.sleep(0.01)
+            self.close_connection = True
+        elif self.path.startswith("/chunked"):
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), 7):
+                piece = body[start:start + 7]
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    """Serve StubJSON on a free local port for the duration of a test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubJSON)
+    server.handle_error = lambda request, client_address: None  # The timed-out client hangs up on /slow
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_get_json_reads_every_framing_and_errors(stub_url):
+    """Test Content-Length, chunked and read-to-close bodies, query strings, error statuses and the timeout."""
+    async def scenario():
+        plain = await get_json(f"{stub_url}/plain", {"a": "1"})
+        chunked = await get_json(f"{stub_url}/chunked?x=y", {"b": "2 3"})
+        assert await get_json(f"{stub_url}/eof") == {"path": "/eof"}
+        with pytest.raises(HTTPStatusError) as missing:
+            await get_json(f"{stub_url}/missing")
+        with pytest.raises(asyncio.TimeoutError):
+            await get_json(f"{stub_url}/slow", timeout=0.2)
+        return plain, chunked, missing.value.status
+
+    plain, chunked, status = asyncio.run(scenario())
+    assert plain == {"path": "/plain?a=1"}
+    assert chunked == {"path": "/chunked?x=y&b=2+3"}
+    assert status == 404
+
+
+def test_response_size_is_capped(stub_url, monkeypatch):
+    """Test that bodies larger than MAX_RESPONSE_BYTES are rejected however they are framed."""
+    monkeypatch.setattr(async_ingest, "MAX_RESPONSE_BYTES", 10)
+    for path in ("/plain", "/chunked", "/eof"):
+        with pytest.raises(ValueError):
+            asyncio.run(get_json(f"{stub_url}{path}"))
+
+
+def test_fetches_overlap_with_writes():
+    """Test that fetches run concurrently, writes happen in batches while fetching continues and failures are counted."""
+    written = []
+
+    def fetcher(i):
+        async def fetch():
+            await asyncio.sleep(0.05)
+            if i == 3:
+                raise ConnectionError("unreachable")
+            return [(f"M{i}", float(i), datetime.datetime(2024, 1, 1))] * 10
+
+        return fetch
+
+    def write(batch):
+        time.sleep(0.05)
+        written.append(len(batch))
+        return IngestStats(rows=len(batch), inserted=0)
+
+    started = time.perf_counter()
+    stats = asyncio.run(ingest_async([fetcher(i) for i in range(20)], concurrency=10, batch_size=30, write=write))
+    elapsed = time.perf_counter() - started
+
+    assert (stats.requests, stats.requests_failed, stats.rows) == (20, 1, 190)
+    assert sum(written) == 190 and max(written) < 190 and stats.batches == len(written)
+    assert elapsed < 20 * 0.05 + len(written) * 0.05  # Well below fetching and writing one after another
+
+
+def test_write_failure_stops_the_run():
+    """Test that a failed write is raised instead of leaving the fetches waiting on a full queue."""
+    async def fetch():
+        return [("M0", 1.0, datetime.datetime(2024, 1, 1))]
+
+    def write(batch):
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ingest_async([fetch] * 50, batch_size=1, max_pending=1, write=write))
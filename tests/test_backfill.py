@@ -0,0 +1,192 @@
+import json
+import asyncio
+import threading
+import datetime
+
+import pytest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from sqlalchemy import text
+
+from src.data_ingestion.backfill import Backfiller, RateLimiter, split_date_range
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations.db_connection import connection_scope
+
+
+class StubMetalPriceAPI(BaseHTTPRequestHandler):
+    """Mimics the MetalPrice API /v1/timeframe endpoint."""
+
+    calls = []
+    failures_before_success = 0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        StubMetalPriceAPI.calls.append(params)
+
+        if StubMetalPriceAPI.failures_before_success > 0:
+            StubMetalPriceAPI.failures_before_success -= 1
+            self.send_response(429)
+            self.end_headers()
+            return
+
+        start = datetime.date.fromisoformat(params["start_date"])
+        end = datetime.date.fromisoformat(params["end_date"])
+        base = params["base"]
+        rates = {}
+        day = start
+        while day <= end:
+            rates[day.isoformat()] = {
+                f"{base}{metal}": 1000.0 + day.toordinal() % 100
+                for metal in params["currencies"].split(",")
+            }
+            day += datetime.timedelta(days=1)
+
+        body = json.dumps({"success": True, "base": base, "rates": rates}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api():
+    """Serve the stub API on a free local port and reset the tables it feeds."""
+    StubMetalPriceAPI.calls = []
+    StubMetalPriceAPI.failures_before_success = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubMetalPriceAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+        connection.execute(text("DELETE FROM backfill_checkpoints"))
+
+
+def make_backfiller(base_url, **kwargs):
+    """Build a Backfiller pointed at the stub with fast retries."""
+    options = dict(
+        api_key="test",
+        base_url=base_url,
+        currencies="XAU,XAG",
+        chunk_days=10,
+        max_workers=3,
+        requests_per_second=0,
+        backoff_seconds=0.01,
+    )
+    options.update(kwargs)
+    return Backfiller(**options)
+
+
+def test_split_date_range():
+    """Test that a range is split into inclusive, contiguous chunks."""
+    chunks = split_date_range(datetime.date(2024, 1, 1), datetime.date(2024, 1, 25), 10)
+    assert chunks == [
+        (datetime.date(2024, 1, 1), datetime.date(2024, 1, 10)),
+        (datetime.date(2024, 1, 11), datetime.date(2024, 1, 20)),
+        (datetime.date(2024, 1, 21), datetime.date(2024, 1, 25)),
+    ]
+
+
+def test_backfill_loads_range_and_rerun_is_free(stub_api):
+    """Test a concurrent backfill and that a re-run makes no API calls."""
+    start, end = datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+
+    result = make_backfiller(stub_api).run(start, end)
+
+    assert result.chunks_fetched == 4
+    assert result.rows == 31 * 2
+    assert result.api_calls == 4
+    assert not result.failed
+
+    rerun = make_backfiller(stub_api).run(start, end)
+    assert rerun.api_calls == 0
+    assert rerun.chunks_skipped == 4
+    assert len(StubMetalPriceAPI.calls) == 4
+
+
+def test_backfill_skips_days_already_stored(stub_api):
+    """Test that chunks whose days are already in the table are not fetched."""
+    first = make_backfiller(stub_api)
+    first.run(datetime.date(2024, 1, 1), datetime.date(2024, 1, 10))
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM backfill_checkpoints"))
+
+    result = make_backfiller(stub_api).run(datetime.date(2024, 1, 1), datetime.date(2024, 1, 20))
+
+    assert result.chunks_skipped == 1
+    assert result.api_calls == 1
+
+
+
+def test_stored_days_counts_metals_not_rows(stub_api):
+    """Test that a day counts as stored once every metal has a price, however many intraday rows it has."""
+    day = datetime.datetime(2024, 3, 1)
+    bulk_load_prices(
+        [("XAU", 1.0 + i, day + datetime.timedelta(hours=i)) for i in range(24)]
+        + [("XAG", 2.0, day + datetime.timedelta(hours=23, minutes=59))]
+        + [("XAU", 1.0, day + datetime.timedelta(days=1, hours=i)) for i in range(3)]
+        + [("XAG", 2.0, day + datetime.timedelta(days=3))]
+    )
+
+    stored = make_backfiller(stub_api).stored_days(datetime.date(2024, 3, 1), datetime.date(2024, 3, 3))
+
+    assert stored == {datetime.date(2024, 3, 1)}
+
+def test_backfill_retries_rate_limited_requests(stub_api):
+    """Test that 429 responses are retried with backoff."""
+    StubMetalPriceAPI.failures_before_success = 2
+
+    result = make_backfiller(stub_api, max_workers=1).run(
+        datetime.date(2024, 2, 1), datetime.date(2024, 2, 5)
+    )
+
+    assert result.chunks_fetched == 1
+    assert result.api_calls == 3
+
+
+def test_async_backfill_retries_and_checkpoints(stub_api):
+    """Test that run_async() loads and checkpoints the same chunks, retrying rate-limited requests."""
+    StubMetalPriceAPI.failures_before_success = 1
+    start, end = datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+
+    result = asyncio.run(make_backfiller(stub_api).run_async(start, end))
+
+    assert result.chunks_fetched == 4
+    assert result.rows == 31 * 2
+    assert result.api_calls == 5
+    assert not result.failed
+
+    rerun = make_backfiller(stub_api).run(start, end)
+    assert rerun.api_calls == 0 and rerun.chunks_skipped == 4
+
+
+def test_async_backfill_reports_failed_chunks(stub_api):
+    """Test that chunks whose retries run out are reported as failed and not checkpointed."""
+    StubMetalPriceAPI.failures_before_success = 100
+
+    result = asyncio.run(
+        make_backfiller(stub_api, max_retries=1).run_async(datetime.date(2024, 2, 1), datetime.date(2024, 2, 15))
+    )
+
+    assert result.chunks_fetched == 0
+    assert result.failed == [
+        (datetime.date(2024, 2, 1), datetime.date(2024, 2, 10)),
+        (datetime.date(2024, 2, 11), datetime.date(2024, 2, 15)),
+    ]
+
+
+def test_rate_limiter_spaces_calls():
+    """Test that the limiter enforces the configured request rate."""
+    limiter = RateLimiter(rate=50)
+    started = datetime.datetime.now()
+    for _ in range(6):
+        limiter.acquire()
+    elapsed = (datetime.datetime.now() - started).total_seconds()
+    assert elapsed >= 5 / 50 * 0.9
@@ -0,0 +1,106 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sktime.forecasting.arima import ARIMA
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations.db_connection import connection_scope
+from src.models.backtest import (
+    BacktestConfig,
+    backtest_series,
+    best_scores,
+    error_metrics,
+    run_backtests,
+)
+
+START = datetime(2021, 1, 1)
+
+
+def random_walk(n=260, seed=0):
+    """Return a random-walk price series."""
+    return 100 + np.random.default_rng(seed).normal(0, 1, n).cumsum()
+
+
+@pytest.fixture
+def clean_backtests():
+    """Remove the prices and scores the database tests write."""
+    yield
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices WHERE metal = 'BTA'"))
+        connection.execute(text("DELETE FROM backtest_scores WHERE metal = 'BTA'"))
+
+
+def test_error_metrics_are_masked_per_horizon():
+    """Test MAE, RMSE, MAPE and coverage on a small grid with a missing actual."""
+    actuals = np.array([[10.0, 20.0], [10.0, np.nan]])
+    forecasts = np.array([[11.0, 18.0], [7.0, 5.0]])
+
+    overall, by_horizon = error_metrics(actuals, forecasts, forecasts - 1.5, forecasts + 1.5)
+
+    assert overall["mae"] == pytest.approx(2.0)
+    assert overall["rmse"] == pytest.approx(np.sqrt((1 + 4 + 9) / 3))
+    assert overall["mape"] == pytest.approx(100 * (0.1 + 0.1 + 0.3) / 3)
+    assert overall["coverage"] == pytest.approx(1 / 3)
+    assert by_horizon["mae"] == pytest.approx([2.0, 2.0])
+    assert by_horizon["coverage"] == pytest.approx([0.5, 0.0])
+
+
+def test_refitting_every_origin_matches_sktime():
+    """Test that with a refit at every origin the forecasts equal fitting sktime's ARIMA on each window."""
+    values = random_walk(130)
+    config = BacktestConfig(
+        order=(1, 1, 0), horizon=3, initial=120, step=4, refit_every=1, window="rolling", window_size=100
+    )
+
+    result = backtest_series(values, config, "XAU")
+
+    assert list(result.origins) == [120, 124, 128]
+    for origin, forecasts in zip(result.origins, result.forecasts):
+        model = ARIMA(order=(1, 1, 0), with_intercept=True, suppress_warnings=True).fit(values[origin - 100:origin])
+        np.testing.assert_allclose(forecasts, np.asarray(model.predict(fh=[1, 2, 3])).ravel())
+    # Horizons past the end of the series are not scored
+    assert np.isnan(result.actuals[-1, 2]) and result.actuals[-1, 1] == values[129]
+
+
+def test_reused_fits_and_workers_give_the_same_forecasts():
+    """Test that filtering between refits stays close to refitting, and parallel segments match serial ones."""
+    values = random_walk()
+    config = BacktestConfig(horizon=5, initial=150, step=2, refit_every=20)
+
+    serial = backtest_series(values, config, "XAU")
+    parallel = backtest_series(values, config, "XAU", n_jobs=2)
+    refitted = backtest_series(values, replace(config, refit_every=1), "XAU")
+
+    assert serial.refits == 3 and refitted.refits == serial.folds == 55
+    np.testing.assert_allclose(parallel.forecasts, serial.forecasts)
+    assert serial.metrics["rmse"] == pytest.approx(refitted.metrics["rmse"], rel=0.05)
+    assert 0.6 < serial.metrics["coverage"] <= 1.0
+
+
+def test_invalid_configs_and_short_series():
+    """Test that bad configurations and series without a single fold are rejected."""
+    with pytest.raises(ValueError):
+        BacktestConfig(window="sliding")
+    with pytest.raises(ValueError):
+        BacktestConfig(coverage=1.5)
+    with pytest.raises(ValueError):
+        backtest_series(random_walk(50), BacktestConfig(initial=50))
+
+
+def test_run_backtests_stores_and_ranks_configs(clean_backtests):
+    """Test that stored history is backtested per configuration and ranked by error."""
+    values = random_walk(240, seed=3)
+    bulk_load_prices([("BTA", float(price), START + timedelta(hours=i)) for i, price in enumerate(values)])
+    good = BacktestConfig(order=(0, 1, 0), horizon=4, initial=200, step=5)
+    poor = BacktestConfig(order=(0, 0, 0), horizon=4, initial=200, step=5)
+
+    results = run_backtests(["BTA"], [good, poor])
+
+    assert [(result.ticker, result.folds) for result in results] == [("BTA", 8), ("BTA", 8)]
+    assert results[0].data_start == START and results[0].data_end == START + timedelta(hours=239)
+    ranking = best_scores("BTA")
+    assert [tuple(score["config"]["order"]) for score in ranking] == [(0, 1, 0), (0, 0, 0)]
+    assert ranking[0]["rmse"] == pytest.approx(results[0].metrics["rmse"])
@@ -0,0 +1,48 @@
+import json
+from argparse import Namespace
+
+from sqlalchemy import select, func
+
+from benchmarks.suite import STAGES, compare, parse_size, run_size
+from src.db_operations.db_connection import session_scope
+from src.db_operations.models import PreciousMetalPrice
+
+
+def test_parse_size():
+    """Test that presets and ROWSxTICKERS sizes are understood."""
+    assert parse_size("10m") == (10_000_000, 200)
+    assert parse_size("5000x10") == (5000, 10)
+
+
+def test_suite_runs_every_stage(tmp_path):
+    """Test that a tiny run reports every stage and leaves no benchmark rows behind."""
+    results = run_size(200, 2, repeats=2, polls=3, workdir=tmp_path)
+
+    assert [result.stage for result in results] == list(STAGES)
+    summaries = {result.stage: result.summary() for result in results}
+    assert len(summaries["ingest_poll"]["samples_ms"]) == 3
+    assert summaries["ingest"]["items"] == 200
+    assert summaries["predict"]["unit"] == "forecasts"
+    for summary in summaries.values():
+        assert summary["throughput"] > 0
+        assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+        assert summary["peak_memory_mb"] is not None
+
+    with session_scope() as session:
+        leftover = session.scalar(
+            select(func.count()).select_from(PreciousMetalPrice).where(PreciousMetalPrice.metal.in_(["B000", "B001"]))
+        )
+    assert leftover == 0
+
+
+def test_compare_flags_regressions(tmp_path):
+    """Test that compare fails only when a stage slowed down beyond the threshold."""
+    def write(name, p50):
+        result = {"stage": "fetch", "rows": 1000, "tickers": 4, "p50_ms": p50, "peak_memory_mb": 1.0}
+        path = tmp_path / name
+        path.write_text(json.dumps({"results": [result]}))
+        return str(path)
+
+    baseline = write("base.json", 10.0)
+    assert compare(Namespace(baseline=baseline, current=write("same.json", 10.5), threshold=0.1)) == 0
+    assert compare(Namespace(baseline=baseline, current=write("slow.json", 12.0), threshold=0.1)) == 1
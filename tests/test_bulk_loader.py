@@ -0,0 +1,116 @@
+import io
+
+import pandas as pd
+import pytest
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices, iter_batches, rows_to_csv
+from src.db_operations.db_connection import connection_scope
+
+
+@pytest.fixture
+def clean_prices():
+    """Empty the prices table before and after each test."""
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+    yield
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+
+
+def test_bulk_load_from_generator(clean_prices):
+    """Test that a lazy row stream is written in bounded batches."""
+    start = datetime(2024, 1, 1)
+    rows = (("XAU", 2000.0 + i, start + timedelta(minutes=i)) for i in range(2_500))
+
+    stats = bulk_load_prices(rows, batch_size=1_000)
+
+    assert stats.rows == 2_500
+    assert stats.batches == 3
+    assert stats.rows_per_second > 0
+
+    with connection_scope() as connection:
+        count = connection.execute(text("SELECT COUNT(*) FROM precious_metals_prices")).scalar()
+    assert count == 2_500
+
+
+def test_bulk_load_from_dataframe(clean_prices):
+    """Test that a DataFrame with metal/price/timestamp columns is accepted."""
+    frame = pd.DataFrame(
+        {
+            "metal": ["XAU", "XAG"],
+            "price": [2463.06, 29.22],
+            "timestamp": pd.to_datetime(["2024-10-18 10:00", "2024-10-18 10:00"]),
+        }
+    )
+
+    stats = bulk_load_prices(frame)
+
+    assert stats.rows == 2
+    with connection_scope() as connection:
+        prices = connection.execute(
+            text("SELECT price FROM precious_metals_prices WHERE metal = 'XAG'")
+        ).scalars().all()
+    assert prices == [29.22]
+
+
+def test_rows_to_csv_reuses_buffer():
+    """Test that CSV batches for COPY are serialized into a single reused buffer."""
+    buffer = io.StringIO()
+    rows_to_csv([("XAU", 1.5, datetime(2024, 1, 1, 12))], buffer)
+    rows_to_csv([("XAG", 2.5, datetime(2024, 1, 2, 12))], buffer)
+
+    assert buffer.read() == "XAG,2.5,2024-01-02 12:00:00,EUR\r\n"
+
+
+def test_iter_batches_and_invalid_batch_size():
+    """Test batch splitting and that a non-positive batch size is rejected."""
+    assert [len(batch) for batch in iter_batches(range(5), 2)] == [2, 2, 1]
+    with pytest.raises(ValueError):
+        bulk_load_prices([], batch_size=0)
+
+
+def test_bulk_load_is_idempotent(clean_prices):
+    """Test that re-loading the same rows skips them, and 'update' overwrites changed prices."""
+    rows = [("XAU", 2000.0, datetime(2024, 1, 1)), ("XAU", 2001.0, datetime(2024, 1, 2))]
+
+    first = bulk_load_prices(rows)
+    second = bulk_load_prices(rows + [("XAU", 2002.0, datetime(2024, 1, 3))])
+    updated = bulk_load_prices(
+        [("XAU", 1999.0, datetime(2024, 1, 1)), ("XAU", 2003.0, datetime(2024, 1, 4))], on_conflict="update"
+    )
+
+    assert (first.inserted, first.skipped) == (2, 0)
+    assert (second.inserted, second.skipped) == (1, 2)
+    assert (updated.inserted, updated.updated, updated.skipped) == (1, 1, 0)
+
+    with connection_scope() as connection:
+        prices = connection.execute(
+            text("SELECT price FROM precious_metals_prices ORDER BY timestamp")
+        ).scalars().all()
+    assert prices == [1999.0, 2001.0, 2002.0, 2003.0]
+
+
+def test_aware_timestamps_and_duplicates_in_a_batch(clean_prices):
+    """Test that aware timestamps are stored as UTC, and that within a batch the first duplicate is inserted
+    and the last one is the update."""
+    plus_two = timezone(timedelta(hours=2))
+    rows = [
+        ("XAU", 1.0, datetime(2024, 1, 1, 12, tzinfo=plus_two)),
+        ("XAU", 2.0, datetime(2024, 1, 1, 10, tzinfo=timezone.utc)),
+        ("XAG", 3.0, datetime(2024, 1, 1, 10)),
+    ]
+
+    first = bulk_load_prices(rows)
+    updated = bulk_load_prices(rows, on_conflict="update")
+
+    assert (first.inserted, first.skipped) == (2, 1)
+    assert (updated.inserted, updated.updated) == (0, 1)
+    with connection_scope() as connection:
+        stored = connection.execute(
+            text("SELECT metal, price, timestamp FROM precious_metals_prices ORDER BY metal")
+        ).all()
+    assert [(metal, price) for metal, price, _ in stored] == [("XAG", 3.0), ("XAU", 2.0)]
+    assert {str(timestamp)[:19] for _, _, timestamp in stored} == {"2024-01-01 10:00:00"}
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import datetime
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from src.cli import main
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations.db_connection import connection_scope
+from src.models.model import Model
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("pandas", "numpy", "sktime", "pyarrow", "statsmodels")
+MODELLING_MODULES = ("sktime", "pmdarima", "statsmodels", "scipy", "sklearn")
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """Answers every GET with a fixed latest-prices payload."""
+
+    def do_GET(self):
+        body = json.dumps(
+            {"success": True, "timestamp": 1704067200, "rates": {"EURXAU": 1870.0, "EURXAG": 21.5}}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def log_dir(tmp_path, monkeypatch):
+    """Keep the log file of commands run in-process by main() out of the checkout."""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+
+
+@pytest.fixture
+def stub_api():
+    """Serve StubAPI on a free local port for the duration of a test."""
+    server = HTTPServer(("127.0.0.1", 0), StubAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/latest"
+    server.shutdown()
+
+
+def test_ingest_starts_fast_without_heavy_imports(stub_api, tmp_path):
+    """Test that `ingest` imports no data-science stack and its imports take under a second."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'cli.db'}",
+        "LOG_DIR": str(tmp_path / "logs"),
+        "PYTHONPATH": str(ROOT),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "src.cli", "--log-level", "WARNING",
+         "ingest", "--api-url", stub_api, "--currencies", "XAU,XAG"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    assert "2 rows inserted" in completed.stdout
+
+    # -X importtime lines look like "import time:  self_us |  cumulative_us | <indent>module"
+    imports = [line.split("|") for line in completed.stderr.splitlines() if line.startswith("import time:")]
+    modules = {fields[2].strip() for fields in imports[1:]}
+    assert not [m for m in modules if m.split(".")[0] in HEAVY_MODULES]
+
+    top_level_us = sum(int(fields[1]) for fields in imports[1:] if not fields[2].startswith("  "))
+    # About 0.55s here, half of it SQLAlchemy; the bound catches regressions such as an eager pandas import
+    assert top_level_us < 1_000_000
+
+
+def imported_modules(stderr):
+    """Return the top-level packages listed by -X importtime."""
+    # -X importtime lines look like "import time:  self_us |  cumulative_us | <indent>module"
+    imports = [line.split("|") for line in stderr.splitlines() if line.startswith("import time:")]
+    return {fields[2].strip().split(".")[0] for fields in imports[1:]}
+
+
+def test_predict_runs_without_the_modelling_stack(tmp_path):
+    """Test that `predict` forecasts from the exported state without importing sktime or statsmodels."""
+    model = Model(tickers=["XAU"])
+    model.fit_models({"XAU": 100 + np.random.default_rng(0).normal(0, 1, 40).cumsum()})
+    model.save(tmp_path)
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "src.cli", "--log-level", "WARNING",
+             "predict", "--tickers", "XAU", "--fh", "1,2", "--model-dir", str(tmp_path), "--json"],
+            cwd=tmp_path, env={**os.environ, "LOG_DIR": str(tmp_path / "logs"), "PYTHONPATH": str(ROOT)},
+            capture_output=True, text=True, timeout=60,
+        )
+    finally:
+        with connection_scope() as connection:
+            connection.execute(text("DELETE FROM model_training_metadata WHERE metal = 'XAU'"))
+
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    forecasts = json.loads(completed.stdout)["XAU"]
+    np.testing.assert_allclose(forecasts, np.asarray(model.models["XAU"].predict(fh=[1, 2])).ravel())
+    assert not imported_modules(completed.stderr) & set(MODELLING_MODULES)
+
+
+def test_ingest_synthetic_rows():
+    """Test that `ingest --synthetic` loads the requested number of generated rows."""
+    try:
+        assert main(["ingest", "--synthetic", "--rows", "12", "--currencies", "CLA,CLB"]) == 0
+        with connection_scope() as connection:
+            count = connection.execute(
+                text("SELECT COUNT(*) FROM precious_metals_prices WHERE metal IN ('CLA', 'CLB')")
+            ).scalar()
+    finally:
+        with connection_scope() as connection:
+            connection.execute(text("DELETE FROM precious_metals_prices WHERE metal IN ('CLA', 'CLB')"))
+    assert count == 12
+
+
+def test_failing_command_returns_error_status(tmp_path):
+    """Test that a command error is logged and turned into exit status 1 instead of a traceback."""
+    assert main(["predict", "--tickers", "XAU", "--model-dir", str(tmp_path)]) == 1
+
+
+def test_missing_env_file_is_an_error(tmp_path):
+    """Test that an explicit --env-file must exist."""
+    with pytest.raises(FileNotFoundError):
+        main(["--env-file", str(tmp_path / "missing.env"), "predict"])
+
+
+
+def test_n_jobs_defaults_to_the_env_file(tmp_path, monkeypatch):
+    """Test that MODEL_N_JOBS set in the --env-file is the default of --n-jobs."""
+    env_file = tmp_path / "test.env"
+    env_file.write_text("MODEL_N_JOBS=3\n")
+    monkeypatch.setenv("MODEL_N_JOBS", "")
+    monkeypatch.delenv("MODEL_N_JOBS")
+    seen = []
+    monkeypatch.setattr("src.cli.train", lambda args: seen.append(args.n_jobs) or 0)
+
+    assert main(["--env-file", str(env_file), "train"]) == 0
+    assert main(["train", "--n-jobs", "2"]) == 0
+    assert seen == [3, 2]
+
+def test_backtest_compares_orders(capsys):
+    """Test that `backtest` scores each --order on stored history and lists them best first."""
+    values = 100 + np.random.default_rng(5).normal(0, 1, 230).cumsum()
+    start = datetime.datetime(2022, 1, 1)
+    bulk_load_prices([("CLBT", float(price), start + datetime.timedelta(hours=i)) for i, price in enumerate(values)])
+    try:
+        status = main(["backtest", "--tickers", "CLBT", "--order", "0,0,0", "--order", "0,1,0",
+                       "--horizon", "3", "--step", "5", "--no-save", "--json"])
+    finally:
+        with connection_scope() as connection:
+            connection.execute(text("DELETE FROM precious_metals_prices WHERE metal = 'CLBT'"))
+
+    assert status == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert [row["order"] for row in rows] == [[0, 1, 0], [0, 0, 0]]
+    assert rows[0]["folds"] == 6 and rows[0]["rmse"] < rows[1]["rmse"]
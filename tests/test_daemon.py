@@ -0,0 +1,164 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from src.db_operations.db_connection import connection_scope
+from src.service.daemon import Clock, IngestionDaemon
+
+START = datetime(2024, 1, 1)
+
+
+class FakeClock(Clock):
+    """Clock whose time only moves when something sleeps on it."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds: float, stop: threading.Event) -> None:
+        with self._lock:
+            self.now += seconds
+
+
+class StubSource:
+    """Quotes two metals with a new timestamp on every call, or the same one if frozen."""
+
+    def __init__(self, frozen: bool = False) -> None:
+        self.calls = 0
+        self.frozen = frozen
+
+    def __call__(self):
+        timestamp = START if self.frozen else START + timedelta(minutes=self.calls)
+        self.calls += 1
+        return [("XAU", 2000.0 + self.calls, timestamp), ("XAG", 25.0 + self.calls, timestamp)]
+
+
+def drive(daemon, clock, seconds):
+    """Run the scheduler on the fake clock for the given number of seconds."""
+    end = clock.now + seconds
+    while clock.now < end:
+        clock.sleep(min(daemon.step(), end - clock.now) or 1e-9, None)
+
+
+def test_polls_are_written_in_batches():
+    """Test that polls accumulate into full batches and a partial batch is flushed on its interval."""
+    clock, written = FakeClock(), []
+    daemon = IngestionDaemon(
+        StubSource(), sink=written.append, interval=10, batch_size=4, flush_interval=100, clock=clock
+    )
+    daemon.start()
+    drive(daemon, clock, 50)  # Polls at 0, 10, 20, 30, 40
+    daemon.shutdown()
+
+    assert daemon.stats.polls == 5
+    assert [len(batch) for batch in written] == [4, 4, 2]
+    assert daemon.stats.rows_written == 10
+
+
+def test_repeated_quotes_are_not_buffered():
+    """Test that a quote seen in an earlier poll is not written again."""
+    clock, written = FakeClock(), []
+    daemon = IngestionDaemon(StubSource(frozen=True), sink=written.append, interval=10, clock=clock)
+    daemon.start()
+    drive(daemon, clock, 30)
+    daemon.shutdown()
+
+    assert daemon.stats.rows_duplicate == 4
+    assert sum(len(batch) for batch in written) == 2
+
+
+def test_slow_database_applies_backpressure():
+    """Test that a stalled writer pauses polling instead of growing the buffer, and catches up afterwards."""
+    clock, written, release = FakeClock(), [], threading.Event()
+
+    def slow_sink(batch):
+        release.wait()
+        written.append(batch)
+
+    daemon = IngestionDaemon(
+        StubSource(),
+        sink=slow_sink,
+        interval=10,
+        batch_size=2,
+        max_buffer_rows=4,
+        max_pending_batches=1,
+        clock=clock,
+    )
+    daemon.start()
+    drive(daemon, clock, 100)
+
+    assert daemon.stats.polls_skipped > 0
+    assert daemon.stats.backpressure_events > 0
+    assert daemon.buffered <= 4 + 2  # One poll may land on a buffer just below the limit
+
+    release.set()
+    daemon.shutdown()
+    assert daemon.stats.rows_written == 2 * daemon.stats.polls
+    assert daemon.stats.rows_dropped == 0
+
+
+def test_failed_writes_are_retried():
+    """Test that a batch is retried with backoff until the database accepts it."""
+    clock, written, failures = FakeClock(), [], [2]
+
+    def flaky_sink(batch):
+        if failures[0]:
+            failures[0] -= 1
+            raise ConnectionError("database unavailable")
+        written.append(batch)
+
+    daemon = IngestionDaemon(StubSource(), sink=flaky_sink, interval=10, batch_size=2, clock=clock)
+    daemon.start()
+    drive(daemon, clock, 10)
+    daemon.shutdown()
+
+    assert daemon.stats.write_failures == 2
+    assert len(written) == 1
+
+
+def test_training_runs_on_its_own_cadence_without_overlap():
+    """Test that training starts every train_interval and is skipped while a run is in progress."""
+    clock, started, release = FakeClock(), [], threading.Event()
+
+    def train():
+        started.append(clock.now)
+        release.wait()
+
+    daemon = IngestionDaemon(
+        StubSource(), sink=lambda batch: None, train_fn=train, interval=10, train_interval=30, clock=clock
+    )
+    daemon.start()
+    drive(daemon, clock, 100)  # Training due at 30, 60 and 90; the first never finishes
+
+    assert daemon.stats.trainings_started == 1
+    assert daemon.stats.trainings_skipped == 2
+    assert daemon.stats.polls == 10  # Polling was never held up by training
+    release.set()
+    daemon.shutdown()
+
+
+def test_run_writes_to_database_and_stops_gracefully():
+    """Test the real loop against the database: stop() ends it and buffered rows are still written."""
+    source = StubSource()
+    daemon = IngestionDaemon(source, interval=0.01, batch_size=100, flush_interval=60, train_interval=None)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    while source.calls < 5:
+        threading.Event().wait(0.01)
+    daemon.stop()
+    thread.join(timeout=10)
+
+    try:
+        with connection_scope() as connection:
+            stored = connection.execute(text("SELECT COUNT(*) FROM precious_metals_prices")).scalar()
+    finally:
+        with connection_scope() as connection:
+            connection.execute(text("DELETE FROM precious_metals_prices"))
+
+    assert not thread.is_alive()
+    assert stored == daemon.stats.rows_written == 2 * source.calls
@@ -1,9 +1,10 @@
 import pytest
 
-from unittest.mock import patch
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
 from sqlalchemy.orm import sessionmaker
 
-from src.db_operations.models import Base
+from src.db_operations.models import Base, PreciousMetalPrice
 from src.data_ingestion.data_loader import fetch_metal_prices, load_data_into_db
 from src.db_operations.db_connection import create_db_engine
 
@@ -18,13 +19,12 @@ def setup_database():
     session.close()
 
 
-@patch("requests.get")
+@patch("src.data_ingestion.data_loader.get_json", new_callable=AsyncMock)
 def test_fetch_metal_prices(mock_get):
     """Test that fetch_metal_prices correctly processes the mocked API response."""
 
     # Define mock API response
-    mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = {
+    mock_get.return_value = {
         "success": True,
         "base": "EUR",
         "timestamp": 1729209599,
@@ -39,6 +39,29 @@ def test_fetch_metal_prices(mock_get):
     assert data["XAG"] == 0.0342170837, "The XAG price should match the mocked data"
 
 
-def test_load_data_into_db(setup_database):
-    """Test that we can load data into the database."""
-    load_data_into_db()  # You can mock the API response if needed
+@patch("src.data_ingestion.data_loader.get_json", new_callable=AsyncMock)
+def test_load_data_into_db(mock_get, setup_database):
+    """Test that we can load data into the database, and that a re-run inserts nothing."""
+    mock_get.return_value = {
+        "success": True,
+        "base": "EUR",
+        "timestamp": 1729209599,
+        "rates": {
+            "EURXAU": 2463.06,
+            "EURXAG": 29.22,
+            "EURXPT": 915.40,
+            "EURXPD": 1010.87,
+        },
+    }
+
+    first = load_data_into_db()
+    second = load_data_into_db()
+
+    assert first.inserted == 4
+    assert second.inserted == 0
+    assert second.skipped == 4
+
+    stored = setup_database.query(PreciousMetalPrice).filter_by(metal="XAU").all()
+    assert [price.timestamp for price in stored] == [datetime(2024, 10, 17, 23, 59, 59)]
+    setup_database.query(PreciousMetalPrice).delete()
+    setup_database.commit()
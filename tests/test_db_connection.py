@@ -1,7 +1,17 @@
 import pytest
 
+from datetime import datetime
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
-from src.db_operations.db_connection import create_db_engine
+from src.db_operations.db_connection import (
+    connection_scope,
+    create_db_engine,
+    get_engine,
+    get_engine_options,
+    pool_stats,
+    session_scope,
+)
+from src.db_operations.models import PreciousMetalPrice
 
 
 def test_database_connection():
@@ -14,3 +24,71 @@ def test_database_connection():
         pytest.fail(f"Database connection failed: {e}")
     finally:
         connection.close()
+
+
+def test_engine_is_shared():
+    """Test that every caller receives the same pooled engine."""
+    assert create_db_engine() is get_engine()
+
+
+def test_session_scope_commits_and_rolls_back():
+    """Test that session_scope commits on success and rolls back on error."""
+    with session_scope() as session:
+        session.add(PreciousMetalPrice(metal="TST", price=1.0, timestamp=datetime(2024, 1, 1)))
+
+    with pytest.raises(RuntimeError):
+        with session_scope() as session:
+            session.add(PreciousMetalPrice(metal="TST", price=2.0, timestamp=datetime(2024, 1, 2)))
+            session.flush()
+            raise RuntimeError("boom")
+
+    with connection_scope() as connection:
+        prices = connection.execute(
+            text("SELECT price FROM precious_metals_prices WHERE metal = 'TST'")
+        ).scalars().all()
+        connection.execute(text("DELETE FROM precious_metals_prices WHERE metal = 'TST'"))
+
+    assert prices == [1.0]
+
+
+def test_pool_stats_track_checkouts():
+    """Test that checkouts and checkins are counted by the pool listeners."""
+    before = pool_stats()
+    with connection_scope() as connection:
+        connection.execute(text("SELECT 1"))
+        assert pool_stats()["checked_out"] == before["checked_out"] + 1
+    after = pool_stats()
+
+    assert after["checkouts"] == before["checkouts"] + 1
+    assert after["checkins"] == before["checkins"] + 1
+    assert after["max_hold_ms"] >= 0
+
+
+def test_engine_options_from_environment(monkeypatch):
+    """Test that pool settings are read from the environment and echo is off by default."""
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "7")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "60")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.delenv("DB_ECHO", raising=False)
+
+    options = get_engine_options("postgresql+psycopg2://user:pw@localhost:5432/metals")
+
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 7
+    assert options["pool_recycle"] == 60
+    assert options["pool_pre_ping"] is False
+    assert options["echo"] is False
+
+
+def test_both_scopes_record_acquire_latency():
+    """Test that session_scope reports pool acquire time like connection_scope."""
+    before = pool_stats()
+    with session_scope() as session:
+        session.execute(text("SELECT 1"))
+    with connection_scope() as connection:
+        connection.execute(text("SELECT 1"))
+    after = pool_stats()
+
+    assert after["acquires"] == before["acquires"] + 2
+    assert after["max_acquire_ms"] >= 0
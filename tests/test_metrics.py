@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import logging
+import subprocess
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.data_ingestion.data_loader import fetch_latest_snapshot
+from src.db_operations.db_connection import connection_scope
+from src.log_info import setup_logging
+from src.metrics import METRICS, Metrics, write_metrics
+
+
+def test_timer_records_counts_errors_and_rows():
+    """Test that timed blocks, failures and row counts end up in the snapshot."""
+    metrics = Metrics()
+    with metrics.timer("fit"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.timer("fit"):
+            raise ValueError("boom")
+    metrics.add_rows("fit", 120)
+    metrics.inc("fits", 2, status="ok")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["fit"]["count"] == 2
+    assert snapshot["stages"]["fit"]["errors"] == 1
+    assert snapshot["stages"]["fit"]["rows"] == 120
+    assert snapshot["counters"] == {'fits{status="ok"}': 2.0}
+
+
+def test_prometheus_exposition():
+    """Test that histograms are cumulative and counters and gauges are rendered."""
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.observe("query", 0.05)
+    metrics.observe("query", 0.5)
+    metrics.observe("query", 5.0)
+    metrics.inc("fits", status="failed")
+
+    text = metrics.prometheus({"db_pool_checked_out": 2})
+    assert 'metalytics_stage_seconds_bucket{stage="query",le="0.1"} 1' in text
+    assert 'metalytics_stage_seconds_bucket{stage="query",le="1"} 2' in text
+    assert 'metalytics_stage_seconds_bucket{stage="query",le="+Inf"} 3' in text
+    assert 'metalytics_stage_seconds_count{stage="query"} 3' in text
+    assert 'metalytics_fits_total{status="failed"} 1' in text
+    assert "metalytics_db_pool_checked_out 2" in text
+
+
+def test_pipeline_stages_are_instrumented(tmp_path):
+    """Test that a database write is timed and counted, and that the run summary is written as JSON."""
+    METRICS.reset()
+    bulk_load_prices([("MTX", 1.0, datetime(2024, 1, 1)), ("MTX", 2.0, datetime(2024, 1, 2))])
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices WHERE metal = 'MTX'"))
+
+    write_metrics(json_path=tmp_path / "run.json", prometheus_path=tmp_path / "run.prom")
+
+    summary = json.loads((tmp_path / "run.json").read_text())
+    assert summary["stages"]["db_write"]["count"] == 1
+    assert summary["stages"]["db_write"]["rows"] == 2
+    assert "db_pool_checkouts" in summary["db_pool"]
+    assert 'metalytics_rows_total{stage="db_write"} 2' in (tmp_path / "run.prom").read_text()
+
+
+def test_api_payload_and_key_are_not_logged(caplog):
+    """Test that INFO logging shows neither the API key nor the response payload."""
+    payload = {
+        "success": True,
+        "timestamp": 1704067200,
+        "rates": {"EURXAU": 1870.123456},
+    }
+
+    with caplog.at_level(logging.INFO), patch(
+        "src.data_ingestion.data_loader.get_json", new=AsyncMock(return_value=payload)
+    ):
+        fetch_latest_snapshot(api_key="secret-key")
+
+    assert "secret-key" not in caplog.text
+    assert "1870.123456" not in caplog.text
+
+
+def test_setup_logging_is_idempotent(tmp_path, monkeypatch):
+    """Test that repeated setup calls add no handlers and only an explicit level changes the level."""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+    root = logging.getLogger()
+    setup_logging()
+    level = root.level
+    handlers = list(root.handlers)
+
+    setup_logging()
+    setup_logging()
+    assert root.handlers == handlers
+    assert root.level == level
+
+    try:
+        setup_logging("warning")
+        assert root.level == logging.WARNING
+    finally:
+        root.setLevel(level)
+
+
+def test_importing_the_library_leaves_logging_alone(tmp_path):
+    """Test that only entry points configure logging, not importing the modules that log."""
+    modules = [
+        "src.data_ingestion.data_loader", "src.db_operations.aggregates", "src.models.model",
+        "src.models.predictor", "src.service.daemon", "src.service.server",
+    ]
+    script = f"import logging, {', '.join(modules)}; print(len(logging.getLogger().handlers))"
+    completed = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+        env={**os.environ, "LOG_DIR": str(tmp_path / "logs")},
+    )
+
+    assert completed.stdout.strip() == "0"
+    assert not (tmp_path / "logs").exists()
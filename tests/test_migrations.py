@@ -0,0 +1,118 @@
+from sqlalchemy import create_engine, inspect, text
+
+from src.db_operations.migrations import (
+    MODEL_VERSION_UNIQUE_INDEX,
+    add_missing_columns,
+    ensure_model_version_unique_key,
+    ensure_price_unique_key,
+    has_price_unique_key,
+)
+
+
+def test_unique_key_migration_deduplicates_legacy_table(tmp_path):
+    """Test that a pre-existing table without the unique key is deduplicated and migrated."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE precious_metals_prices ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, metal VARCHAR(10) NOT NULL, "
+                "price FLOAT NOT NULL, timestamp DATETIME NOT NULL)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO precious_metals_prices (metal, price, timestamp) VALUES "
+                "('XAU', 1.0, '2024-01-01 00:00:00'), "
+                "('XAU', 2.0, '2024-01-01 00:00:00'), "
+                "('XAG', 3.0, '2024-01-01 00:00:00')"
+            )
+        )
+
+    assert not has_price_unique_key(engine)
+    ensure_price_unique_key(engine)
+    assert has_price_unique_key(engine)
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT metal, price FROM precious_metals_prices ORDER BY id")
+        ).all()
+    assert rows == [("XAU", 1.0), ("XAG", 3.0)]
+    engine.dispose()
+
+
+def test_add_missing_columns_extends_legacy_table(tmp_path):
+    """Test that columns added to a model later are added to an existing table."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE model_training_metadata ("
+                "id INTEGER PRIMARY KEY, metal VARCHAR NOT NULL, hyperparameters JSON NOT NULL, "
+                "parameters JSON NOT NULL, timestamp DATETIME NOT NULL)"
+            )
+        )
+
+    added = add_missing_columns(engine)
+
+    assert "model_training_metadata.data_cutoff" in added
+    assert "model_training_metadata.fit_mode" in added
+    assert add_missing_columns(engine) == []
+    engine.dispose()
+
+
+def test_added_column_keeps_its_server_default(tmp_path):
+    """Test that base_currency is added to a legacy prices table as NOT NULL DEFAULT 'EUR'."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE precious_metals_prices ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, metal VARCHAR(10) NOT NULL, "
+                "price FLOAT NOT NULL, timestamp DATETIME NOT NULL)"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO precious_metals_prices (metal, price, timestamp) VALUES ('XAU', 1.0, '2024-01-01')")
+        )
+
+    assert "precious_metals_prices.base_currency" in add_missing_columns(engine)
+
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO precious_metals_prices (metal, price, timestamp) VALUES ('XAG', 2.0, '2024-01-01')")
+        )
+        rows = connection.execute(text("SELECT metal, base_currency FROM precious_metals_prices ORDER BY id")).all()
+    assert rows == [("XAU", "EUR"), ("XAG", "EUR")]
+    engine.dispose()
+
+
+def test_model_version_migration_renumbers_duplicates(tmp_path):
+    """Test that versions registered twice before the unique key are renumbered and the key is added."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE model_training_metadata ("
+                "id INTEGER PRIMARY KEY, metal VARCHAR NOT NULL, version INTEGER)"
+            )
+        )
+        connection.execute(
+            text("CREATE INDEX ix_model_training_metadata_metal_version ON model_training_metadata (metal, version)")
+        )
+        connection.execute(
+            text(
+                "INSERT INTO model_training_metadata (id, metal, version) VALUES "
+                "(1, 'XAU', 1), (2, 'XAU', 2), (3, 'XAU', 2), (4, 'XAG', 1), (5, 'XAU', NULL), (6, 'XAU', NULL)"
+            )
+        )
+
+    ensure_model_version_unique_key(engine)
+    ensure_model_version_unique_key(engine)
+
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("model_training_metadata")}
+    assert set(indexes) == {MODEL_VERSION_UNIQUE_INDEX} and indexes[MODEL_VERSION_UNIQUE_INDEX]["unique"]
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT id, version FROM model_training_metadata ORDER BY id")).all()
+    assert rows == [(1, 1), (2, 2), (3, 3), (4, 1), (5, None), (6, None)]
+    engine.dispose()
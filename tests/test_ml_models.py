@@ -1,17 +1,205 @@
+import time
+import multiprocessing
+import numpy as np
 import pandas as pd
+import pytest
 
-from src.models.model import Model
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations.db_connection import connection_scope
+from src.models import model as model_module
+from src.models.model import Model, fit_arima
 
 
 def test_model_training():
     """Test that the model can be trained on sample data."""
     model = Model(tickers=["XAU", "XAG"])
 
-    # Mock the fetch_data method to return sample data
-    model.fetch_data = lambda: pd.DataFrame(
-        {"XAU": [2463.06, 2465.07, 2462.34], "XAG": [29.22, 29.30, 29.25]},
-        index=pd.date_range(start="2024-10-18", periods=3, freq="h"),
+    # Sample data inside the lookback window; training streams it from the database
+    start = datetime.utcnow() - timedelta(hours=3)
+    bulk_load_prices(
+        [("XAU", price, start + timedelta(hours=i)) for i, price in enumerate([2463.06, 2465.07, 2462.34])]
+        + [("XAG", price, start + timedelta(hours=i)) for i, price in enumerate([29.22, 29.30, 29.25])]
     )
 
-    model.train()
+    try:
+        model.train()
+    finally:
+        with connection_scope() as connection:
+            connection.execute(text("DELETE FROM precious_metals_prices"))
     assert len(model.models) == 2  # Ensure models for both tickers are trained
+
+
+def sample_prices(tickers, periods=30):
+    """Build a wide frame of random-walk prices for the given tickers."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {ticker: 100 + rng.normal(0, 1, periods).cumsum() for ticker in tickers},
+        index=pd.date_range(start="2024-10-18", periods=periods, freq="h"),
+    )
+
+
+def test_parallel_training_matches_serial():
+    """Test that fitting across worker processes yields the same models as serial fitting."""
+    tickers = ["XAU", "XAG", "XPT"]
+    data = sample_prices(tickers)
+
+    serial = Model(tickers=tickers)
+    serial.fit_models(serial.prepare_datasets(data))
+    parallel = Model(tickers=tickers, n_jobs=2, fit_timeout=60)
+    errors = parallel.fit_models(parallel.prepare_datasets(data))
+
+    assert errors == {}
+    assert set(parallel.models) == set(tickers)
+    for ticker in tickers:
+        np.testing.assert_allclose(
+            parallel.models[ticker].predict(fh=[1, 2]),
+            serial.models[ticker].predict(fh=[1, 2]),
+        )
+
+
+def test_failed_fit_is_isolated():
+    """Test that one ticker failing to fit does not prevent the others from training."""
+    model = Model(tickers=["XAU", "XAG"], n_jobs=2)
+    datasets = {"XAU": sample_prices(["XAU"])["XAU"].values, "XAG": np.array(["bad", "data"])}
+
+    errors = model.fit_models(datasets)
+
+    assert list(model.models) == ["XAU"]
+    assert "XAG" in errors
+
+
+def hang_on_gold_and_silver(ticker, dataset, order):
+    """Stand-in for fit_arima() whose XAU and XAG fits never finish."""
+    if ticker in ("XAU", "XAG"):
+        time.sleep(60)
+    return fit_arima(ticker, dataset, order)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_fit_timeout_applies_per_ticker(monkeypatch, n_jobs):
+    """Test that each ticker gets its own fit_timeout, also when fitting serially."""
+    monkeypatch.setattr(model_module, "fit_arima", hang_on_gold_and_silver)
+    tickers = ["XAU", "XAG", "XPT", "XPD"]
+    data = sample_prices(tickers)
+    model = Model(tickers=tickers, n_jobs=n_jobs, fit_timeout=2)
+
+    started = time.perf_counter()
+    errors = model.fit_models(iter(model.prepare_datasets(data).items()))
+    elapsed = time.perf_counter() - started
+
+    assert set(errors) == {"XAU", "XAG"} and "timeout" in errors["XAU"]
+    assert set(model.models) == {"XPT", "XPD"}
+    # In parallel both hung fits time out together rather than one after the other
+    assert elapsed < (3 if n_jobs == 2 else 5) * 2
+
+
+
+def test_order_search_finishes_before_the_fit_pool_starts(monkeypatch):
+    """Test that no order search runs while fit workers are alive."""
+    tickers = ["XAU", "XAG", "XPT"]
+    model = Model(tickers=tickers, n_jobs=2, fit_timeout=60, order_search=True)
+    workers_during_search = []
+
+    def select_orders(datasets):
+        workers_during_search.append(len(multiprocessing.active_children()))
+        model.orders.update({ticker: (1, 1, 0) for ticker in datasets})
+
+    monkeypatch.setattr(model, "select_orders", select_orders)
+    errors = model.fit_models(iter(model.prepare_datasets(sample_prices(tickers)).items()))
+
+    assert errors == {} and set(model.models) == set(tickers)
+    assert workers_during_search == [0, 0, 0]
+
+@pytest.fixture
+def price_history():
+    """Insert 50 ten-minute XAU prices ending two hours ago, and clean up afterwards."""
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(hours=10)
+    rng = np.random.default_rng(1)
+    prices = 2000 + rng.normal(0, 1, 60).cumsum()
+    rows = [("XAU", price, start + timedelta(minutes=10 * i)) for i, price in enumerate(prices)]
+    bulk_load_prices(rows[:50])
+    yield rows
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+        connection.execute(text("DELETE FROM model_training_metadata"))
+
+
+def test_save_skips_tickers_without_a_model(price_history, tmp_path):
+    """Test that a ticker with no data is skipped by save() while the others are registered."""
+    model = Model(tickers=["XAG", "XAU"], model_dir=tmp_path)
+    model.train()
+
+    versions = model.save(tmp_path)
+
+    assert list(versions) == ["XAU"]
+    assert model.registry.latest_many(["XAU", "XAG"]).keys() == {"XAU"}
+
+
+def test_incremental_training_updates_saved_model(price_history, tmp_path):
+    """Test that an incremental run updates the saved model with only the new rows."""
+    full = Model(tickers=["XAU"], model_dir=tmp_path)
+    full.train()
+    full.save(tmp_path)
+    assert full.fit_modes["XAU"] == "full"
+    assert full.cutoffs["XAU"] == price_history[49][2]
+
+    bulk_load_prices(price_history[50:])
+    incremental = Model(tickers=["XAU"], incremental=True, model_dir=tmp_path, drift_threshold=50)
+    incremental.train()
+
+    assert incremental.fit_modes["XAU"] == "update"
+    assert incremental.cutoffs["XAU"] == price_history[-1][2]
+    assert int(incremental.models["XAU"].cutoff[0]) == len(price_history) - 1
+    assert incremental.latest_metadata("XAU")["data_cutoff"] == price_history[-1][2]
+
+
+def test_incremental_training_refits_on_schedule(price_history, tmp_path):
+    """Test that a full refit is forced once the last full fit is older than the interval."""
+    full = Model(tickers=["XAU"], model_dir=tmp_path)
+    full.train()
+    full.save(tmp_path)
+
+    scheduled = Model(
+        tickers=["XAU"], incremental=True, model_dir=tmp_path, full_refit_interval=timedelta(0)
+    )
+    scheduled.train()
+
+    assert scheduled.fit_modes["XAU"] == "full"
+
+
+def test_drift_detection():
+    """Test that a level shift far outside the forecast spread is reported as drift."""
+    model = Model(tickers=["XAU"])
+    series = sample_prices(["XAU"], periods=60)["XAU"].values
+    model.fit_models({"XAU": series})
+
+    assert not model.has_drifted(model.models["XAU"], series[-3:])
+    assert model.has_drifted(model.models["XAU"], series[-3:] + 100)
+
+
+def test_training_on_resampled_series(tmp_path):
+    """Test that with freq set the model is fitted on a regular, time-indexed series."""
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    rng = np.random.default_rng(3)
+    # Irregular ticks, including two sharing a timestamp
+    offsets = np.sort(rng.uniform(0, 600, 120))
+    rows = [("XAU", 2000 + i * 0.1 + rng.normal(), now - timedelta(minutes=float(m))) for i, m in enumerate(offsets)]
+    rows.append(("XAG", 29.0, rows[0][2]))
+    bulk_load_prices(rows)
+
+    try:
+        model = Model(tickers=["XAU"], freq="15min")
+        data = model.fetch_data()
+        datasets = model.prepare_datasets(data)
+        model.fit_models(datasets)
+    finally:
+        with connection_scope() as connection:
+            connection.execute(text("DELETE FROM precious_metals_prices"))
+
+    assert data.index.freq == "15min"
+    assert not data.index.has_duplicates
+    assert isinstance(datasets["XAU"].index, pd.DatetimeIndex)
+    assert isinstance(model.models["XAU"].cutoff, pd.DatetimeIndex)
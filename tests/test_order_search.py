@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from sqlalchemy import text
+
+from src.db_operations.db_connection import connection_scope, session_scope
+from src.db_operations.models import ModelMetadata
+from src.models.model import Model
+from src.models import order_search
+from src.models.order_search import data_fingerprint, search_order, store_scores
+
+GRID = [(0, 1, 0), (1, 1, 0), (0, 1, 1)]
+
+
+@pytest.fixture
+def series():
+    """A random walk, and an empty score cache and metadata table around each test."""
+    yield 100 + np.random.default_rng(2).normal(0, 1, 80).cumsum()
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM arima_candidate_scores"))
+        connection.execute(text("DELETE FROM model_training_metadata"))
+
+
+def test_search_caches_scores_by_fingerprint(series):
+    """Test that a second search over identical data is answered from the cache."""
+    first = search_order(series, grid=GRID)
+    second = search_order(series, grid=GRID)
+
+    assert first.best_order in GRID
+    assert (first.evaluated, first.cached) == (3, 0)
+    assert (second.evaluated, second.cached) == (0, 3)
+    assert second.best_order == first.best_order
+
+    changed = search_order(series[:-1], grid=GRID)
+    assert changed.evaluated == 3
+    assert data_fingerprint(series) != data_fingerprint(series[:-1])
+
+
+def test_search_compares_only_candidates_with_the_tested_d(series):
+    """Test that d comes from the unit-root test and AIC only ranks candidates that share it."""
+    grid = [(1, 0, 0), (0, 1, 0), (1, 1, 0)]
+
+    walk = search_order(series, grid=grid)
+    noise = search_order(np.random.default_rng(3).normal(0, 1, 80), grid=grid)
+
+    assert walk.d == 1 and set(walk.scores) == {(0, 1, 0), (1, 1, 0)}
+    assert noise.d == 0 and noise.best_order == (1, 0, 0)
+
+
+def test_concurrent_searches_store_scores_once(series):
+    """Test that storing scores another search already stored is a no-op instead of a unique-key error."""
+    scores = {(0, 1, 0): {"aic": 1.0, "bic": 2.0, "error": None}}
+    store_scores("f" * 64, scores)
+    store_scores("f" * 64, {**scores, (1, 1, 0): {"aic": 3.0, "bic": 4.0, "error": None}})
+
+    with connection_scope() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM arima_candidate_scores")).scalar() == 2
+
+
+
+def test_failed_candidates_are_not_cached(series, monkeypatch):
+    """Test that a candidate whose fit failed is fitted again by the next search, and its score then cached."""
+    fit = order_search.evaluate_candidate
+    failures = iter([True])
+
+    def flaky(values, order):
+        if order == (1, 1, 0) and next(failures, False):
+            return order, None, None, "worker ran out of memory"
+        return fit(values, order)
+
+    monkeypatch.setattr(order_search, "evaluate_candidate", flaky)
+    first = search_order(series, grid=GRID)
+    second = search_order(series, grid=GRID)
+    third = search_order(series, grid=GRID)
+
+    assert first.scores[(1, 1, 0)]["error"] and (first.evaluated, first.cached) == (3, 0)
+    assert second.scores[(1, 1, 0)]["error"] is None and (second.evaluated, second.cached) == (1, 2)
+    assert (third.evaluated, third.cached) == (0, 3)
+
+
+def test_cached_failure_from_an_older_version_is_replaced(series):
+    """Test that an error row stored before failures stopped being cached is retried and overwritten."""
+    fingerprint = data_fingerprint(series)
+    store_scores(fingerprint, {(0, 1, 0): {"aic": 1.0, "bic": 2.0, "error": None}})
+    with connection_scope() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO arima_candidate_scores (fingerprint, p, d, q, error, created_at) "
+                "VALUES (:fingerprint, 1, 1, 0, 'killed', CURRENT_TIMESTAMP)"
+            ),
+            {"fingerprint": fingerprint},
+        )
+
+    result = search_order(series, grid=[(0, 1, 0), (1, 1, 0)])
+
+    assert (result.evaluated, result.cached) == (1, 1)
+    with connection_scope() as connection:
+        errors = connection.execute(text("SELECT error FROM arima_candidate_scores")).scalars().all()
+    assert errors == [None, None]
+
+def test_search_respects_time_budget(series):
+    """Test that candidates beyond the time budget are not fitted."""
+    result = search_order(series, grid=GRID, time_budget=0)
+
+    assert result.timed_out
+    assert result.evaluated == 0
+    assert result.best_order is None
+
+
+def test_search_rejects_unknown_criterion(series):
+    """Test that only AIC and BIC are accepted."""
+    with pytest.raises(ValueError):
+        search_order(series, grid=GRID, criterion="mse")
+
+
+def test_model_persists_parameters_of_searched_order(series):
+    """Test that training with order search stores the chosen order and all its coefficients."""
+    model = Model(tickers=["XAU"], order_search=True, order_grid=[(0, 1, 1)])
+    model.fit_models({"XAU": series})
+    model.cutoffs["XAU"] = None
+
+    with session_scope() as session:
+        model.save_model_metadata(session, "XAU", model.models["XAU"])
+
+    with session_scope() as session:
+        metadata = session.query(ModelMetadata).filter_by(metal="XAU").one()
+        assert metadata.hyperparameters == {"p": 0, "d": 1, "q": 1}
+        assert "ma.L1" in metadata.parameters
+        assert "ar.L1" not in metadata.parameters
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from src.db_operations.db_connection import connection_scope
+from src.models.model import Model
+from src.models.predictor import Predictor
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Remove the model versions each test registers."""
+    yield
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM model_training_metadata"))
+
+
+def train_and_save(path, seed=0, tickers=("XAU", "XAG")):
+    """Fit random-walk models for the tickers and save them to path."""
+    rng = np.random.default_rng(seed)
+    model = Model(tickers=list(tickers))
+    model.fit_models({ticker: 100 + rng.normal(0, 1, 40).cumsum() for ticker in tickers})
+    model.save(path)
+    return model
+
+
+def test_predict_many_tickers_and_horizons(tmp_path):
+    """Test that one call returns every ticker/horizon pair, matching the models' own forecasts."""
+    model = train_and_save(tmp_path)
+    predictor = Predictor(tmp_path)
+
+    forecasts = predictor.predict(["XAU", "XAG"], fh=[1, 3, 5])
+
+    assert list(forecasts.columns) == ["XAU", "XAG"]
+    assert list(forecasts.index) == [1, 3, 5]
+    expected = np.asarray(model.models["XAG"].predict(fh=[1, 3, 5])).ravel()
+    np.testing.assert_allclose(forecasts["XAG"].values, expected)
+
+
+def test_models_and_forecasts_are_cached(tmp_path):
+    """Test that repeated calls neither reload artifacts nor recompute forecasts."""
+    train_and_save(tmp_path)
+    predictor = Predictor(tmp_path)
+
+    predictor.predict(["XAU", "XAG"], fh=[1, 2, 3])
+    predictor.predict(["XAU"], fh=[2])
+    stats = predictor.stats()
+
+    assert stats["loads"] == 2
+    assert stats["forecast_hits"] == 1
+    assert stats["calls"] == 2
+    assert stats["last_ms"] > 0
+
+
+def test_new_version_is_reloaded(tmp_path):
+    """Test that registering a new version invalidates the cached model and forecasts."""
+    train_and_save(tmp_path)
+    predictor = Predictor(tmp_path)
+    before = predictor.predict(["XAU"], fh=[1])
+
+    train_and_save(tmp_path, seed=5)
+    after = predictor.predict(["XAU"], fh=[1])
+
+    assert predictor.stats()["loads"] == 2
+    assert not before.equals(after)
+
+
+def test_least_recently_used_model_is_evicted(tmp_path):
+    """Test that the cache never holds more than max_models models."""
+    train_and_save(tmp_path)
+    predictor = Predictor(tmp_path, max_models=1)
+
+    predictor.predict(["XAU"], fh=[1])
+    predictor.predict(["XAG"], fh=[1])
+    predictor.predict(["XAU"], fh=[1])
+
+    assert predictor.stats()["cached_models"] == 1
+    assert predictor.stats()["loads"] == 3
+
+
+def test_invalid_requests(tmp_path):
+    """Test that unknown tickers and non-positive horizons are rejected."""
+    train_and_save(tmp_path)
+    predictor = Predictor(tmp_path)
+
+    with pytest.raises(FileNotFoundError):
+        predictor.predict(["XPT"], fh=[1])
+    with pytest.raises(ValueError):
+        predictor.predict(["XAU"], fh=[0])
+
+
+def test_state_and_artifact_backends_agree(tmp_path):
+    """Test that forecasting from the exported state matches unpickling the sktime model."""
+    train_and_save(tmp_path)
+
+    from_state = Predictor(tmp_path, backend="state").predict(["XAU", "XAG"], fh=[1, 4])
+    from_artifact = Predictor(tmp_path, backend="artifact").predict(["XAU", "XAG"], fh=[1, 4])
+
+    np.testing.assert_allclose(from_state.values, from_artifact.values)
+    with pytest.raises(ValueError):
+        Predictor(tmp_path, backend="onnx")
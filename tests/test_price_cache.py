@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from sqlalchemy import text
+
+from src.data_ingestion import bulk_loader
+from src.data_ingestion.bulk_loader import bulk_load_prices, notify_written
+from src.db_operations import price_cache
+from src.db_operations.db_connection import connection_scope
+from src.db_operations.price_cache import PriceCache, RingBuffer, get_price_cache
+from src.models.model import Model
+
+
+def stamps(*hours):
+    """Return datetime64[us] timestamps at the given hours of 2024-01-01."""
+    return np.array([datetime(2024, 1, 1) + timedelta(hours=h) for h in hours], dtype="datetime64[us]")
+
+
+@pytest.fixture
+def recent_prices():
+    """Store ten recent CHA prices and remove them afterwards."""
+    now = datetime.utcnow().replace(microsecond=0)
+    rows = [("CHA", 100.0 + i, now - timedelta(minutes=10 * (10 - i))) for i in range(10)]
+    bulk_load_prices(rows)
+    yield rows
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices WHERE metal = 'CHA'"))
+
+
+def test_ring_buffer_wraps_around_keeping_the_newest():
+    """Test that appends beyond capacity overwrite the oldest prices and arrays come back in order."""
+    buffer = RingBuffer(4)
+    assert buffer.extend(stamps(0, 1, 2), np.array([0.0, 1.0, 2.0])) == 0
+    assert buffer.extend(stamps(3, 4, 5), np.array([3.0, 4.0, 5.0])) == 2
+
+    timestamps, prices = buffer.arrays()
+    assert prices.tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert (timestamps == stamps(2, 3, 4, 5)).all()
+    assert buffer.oldest == stamps(2)[0] and buffer.newest == (stamps(5)[0], 5.0)
+    assert buffer.arrays(stamps(4)[0])[1].tolist() == [4.0, 5.0]
+    assert buffer.nbytes == 4 * 16
+
+
+def test_ring_buffer_merges_late_prices():
+    """Test that out-of-order prices are merged by timestamp, the last one written winning."""
+    buffer = RingBuffer(3)
+    buffer.extend(stamps(0, 2, 4), np.array([0.0, 2.0, 4.0]))
+    assert buffer.extend(stamps(3, 2), np.array([3.0, 20.0])) == 1
+
+    timestamps, prices = buffer.arrays()
+    assert prices.tolist() == [20.0, 3.0, 4.0]
+    assert (timestamps == stamps(2, 3, 4)).all()
+    buffer.extend(stamps(5), np.array([5.0]))
+    assert buffer.arrays()[1].tolist() == [3.0, 4.0, 5.0]
+
+
+def test_series_hits_only_where_the_cache_is_complete():
+    """Test misses for unloaded metals and windows before the loaded one, and hits with recorded writes."""
+    cache = PriceCache(depth=8, ttl=None)
+    start = datetime(2024, 1, 1)
+    assert cache.series("CHA", start) is None
+
+    cache.store("CHA", stamps(0, 1), np.array([1.0, 2.0]), start)
+    cache.record([("CHA", 3.0, datetime(2024, 1, 1, 2)), ("CHB", 9.0, datetime(2024, 1, 1, 2), "USD")])
+
+    assert cache.series("CHA", start)[1].tolist() == [1.0, 2.0, 3.0]
+    assert cache.series("CHA", start - timedelta(hours=1)) is None
+    assert cache.series("CHB", start) is None  # Recorded, but earlier prices were never loaded
+    assert cache.latest(["CHA"]) == [{"metal": "CHA", "price": 3.0, "timestamp": datetime(2024, 1, 1, 2)}]
+    assert cache.latest(["CHA", "CHB"]) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["prices"]) == (2, 4, 4)
+    assert stats["bytes"] == 2 * 8 * 16
+
+
+def test_warm_and_sync_with_other_writers(recent_prices):
+    """Test that warm() loads the window and an expired metal picks up rows written elsewhere."""
+    cache = PriceCache(depth=32, ttl=0.0)
+    assert cache.warm(["CHA", "CHZ"], lookback=timedelta(hours=3)) == 10
+    start = datetime.utcnow() - timedelta(hours=2)
+    assert cache.series("CHZ", start)[1].size == 0
+
+    bulk_load_prices([("CHA", 500.0, datetime.utcnow())])
+    assert cache.series("CHA", start)[1][-1] == 500.0
+    assert cache.stats()["syncs"] >= 1
+
+
+def test_model_trains_from_the_cache(recent_prices, monkeypatch):
+    """Test that a miss loads the window from the database into the cache and the next read hits."""
+    cache = PriceCache(depth=32, ttl=None)
+    monkeypatch.setattr(price_cache, "_cache", cache)
+    model = Model(tickers=["CHA"], lookback=timedelta(hours=3))
+
+    first = dict(model.iter_datasets())
+    notify_written([("CHA", 999.0, datetime.utcnow())])  # Not subscribed, so the cache does not see it
+    second = dict(model.iter_datasets())
+
+    assert first["CHA"].tolist() == [price for _, price, _ in recent_prices]
+    np.testing.assert_array_equal(second["CHA"], first["CHA"])
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+    assert model.fetch_data()["CHA"].tolist() == first["CHA"].tolist()
+
+
+def test_process_cache_subscribes_to_writes(monkeypatch):
+    """Test that the process-wide cache is configured from the environment and sees notified writes."""
+    monkeypatch.setattr(price_cache, "_cache", None)
+    monkeypatch.setattr(bulk_loader, "_write_listeners", [])
+    monkeypatch.setenv("PRICE_CACHE_DEPTH", "0")
+    assert get_price_cache() is None
+
+    monkeypatch.setenv("PRICE_CACHE_DEPTH", "16")
+    monkeypatch.setenv("PRICE_CACHE_TTL", "none")
+    cache = get_price_cache()
+    assert cache is get_price_cache() and (cache.depth, cache.ttl) == (16, None)
+
+    notify_written([("CHA", 1.0, datetime(2024, 1, 1))])
+    assert cache.stats()["prices"] == 1
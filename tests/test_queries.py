@@ -0,0 +1,126 @@
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations.aggregates import clear_aggregates, refresh_aggregates
+from src.db_operations.db_connection import connection_scope
+from src.db_operations.queries import (
+    fetch_latest_prices,
+    fetch_resampled_prices,
+    iter_price_chunks,
+    iter_price_series,
+)
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def ticks():
+    """XAU every 20 minutes for 200 minutes and three XAG ticks 50 minutes apart."""
+    bulk_load_prices(
+        [("XAU", float(i), START + timedelta(minutes=20 * i)) for i in range(10)]
+        + [("XAG", 100.0 + i, START + timedelta(minutes=50 * i)) for i in range(3)]
+    )
+    refresh_aggregates()
+    yield
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+    clear_aggregates()
+
+
+def test_resample_last_value_is_regular_and_gap_filled(ticks):
+    """Test last-value resampling onto a full hourly grid with forward fill."""
+    data = fetch_resampled_prices(["XAU", "XAG"], START, START + timedelta(hours=5), freq="1h")
+
+    assert list(data.index) == [START + timedelta(hours=h) for h in range(5)]
+    assert data.index.freq == "1h"
+    assert data["XAU"].tolist() == [2.0, 5.0, 8.0, 9.0, 9.0]
+    assert data["XAG"].tolist() == [101.0, 102.0, 102.0, 102.0, 102.0]
+
+
+def test_resample_ohlc_without_fill(ticks):
+    """Test OHLC buckets and that empty buckets stay empty when fill is None."""
+    data = fetch_resampled_prices(["XAU", "XAG"], START, START + timedelta(hours=4), how="ohlc", fill=None)
+
+    assert data.loc[START + timedelta(hours=1), ("open", "XAU")] == 3.0
+    assert data.loc[START + timedelta(hours=1), ("high", "XAU")] == 5.0
+    assert data.loc[START + timedelta(hours=1), ("low", "XAU")] == 3.0
+    assert data.loc[START + timedelta(hours=1), ("close", "XAU")] == 5.0
+    assert data[("close", "XAG")].isna().sum() == 2
+
+
+def test_resample_rejects_calendar_frequencies():
+    """Test that non-fixed frequencies such as month ends are rejected."""
+    with pytest.raises(ValueError):
+        fetch_resampled_prices(["XAU"], START, freq="ME")
+
+
+def test_latest_prices(ticks):
+    """Test that the newest price per metal is returned."""
+    latest = {row["metal"]: row["price"] for row in fetch_latest_prices()}
+    assert latest == {"XAU": 9.0, "XAG": 102.0}
+
+
+def test_price_chunks_are_typed_and_split_by_metal(ticks):
+    """Test that chunks hold one metal each, never exceed chunk_size and keep row order."""
+    chunks = list(iter_price_chunks(["XAU", "XAG"], START, chunk_size=4))
+
+    assert all(0 < len(chunk) <= 4 for chunk in chunks)
+    assert [len(chunk) for chunk in chunks] == [3, 1, 4, 4, 1]
+    assert [chunk.metal for chunk in chunks] == ["XAG"] + ["XAU"] * 4
+    assert chunks[0].prices.dtype == np.float64
+    assert chunks[0].timestamps.dtype == np.dtype("datetime64[us]")
+    assert np.concatenate([chunk.prices for chunk in chunks[1:]]).tolist() == [float(i) for i in range(10)]
+
+
+def test_price_series_assembles_each_metal(ticks):
+    """Test that chunks are reassembled into one complete series per metal."""
+    series = {chunk.metal: chunk for chunk in iter_price_series(["XAU", "XAG"], START, chunk_size=3)}
+
+    assert series["XAU"].prices.tolist() == [float(i) for i in range(10)]
+    assert series["XAG"].timestamps[-1] == np.datetime64(START + timedelta(minutes=100))
+
+
+def test_streaming_peak_memory_is_bounded():
+    """Test the documented peak-memory bound of streaming reads on a large table.
+
+    Chunked reads must stay within chunk_size rows (budgeted at 1 KiB each)
+    and per-metal series may add 48 bytes per row of the largest series,
+    whereas fetching the same window at once grows with the whole table.
+    """
+    metals, rows_per_metal, chunk_size = ["XAU", "XAG", "XPT", "XPD"], 12_500, 500
+    bulk_load_prices(
+        (metal, 1000.0 + i, START + timedelta(seconds=i)) for metal in metals for i in range(rows_per_metal)
+    )
+
+    def traced_peak(read):
+        tracemalloc.start()
+        try:
+            rows = read()
+            return rows, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    try:
+        chunk_rows, chunk_peak = traced_peak(
+            lambda: sum(len(chunk) for chunk in iter_price_chunks(metals, START, chunk_size=chunk_size))
+        )
+        series_rows, series_peak = traced_peak(
+            lambda: sum(len(chunk) for chunk in iter_price_series(metals, START, chunk_size=chunk_size))
+        )
+        with connection_scope() as connection:
+            query = text("SELECT metal, price, timestamp FROM precious_metals_prices_view")
+            all_rows, fetchall_peak = traced_peak(lambda: len(connection.execute(query).fetchall()))
+    finally:
+        with connection_scope() as connection:
+            connection.execute(text("DELETE FROM precious_metals_prices"))
+
+    assert chunk_rows == series_rows == all_rows == len(metals) * rows_per_metal
+    assert chunk_peak < chunk_size * 1024
+    assert series_peak < chunk_size * 1024 + 48 * rows_per_metal
+    assert chunk_peak * 10 < fetchall_peak
@@ -0,0 +1,144 @@
+import os
+import time
+
+import numpy as np
+import pytest
+from datetime import datetime
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from src.db_operations.db_connection import connection_scope, session_scope
+from src.db_operations.models import ModelMetadata
+from src.models.model import Model
+from src.models.registry import GC_GRACE_SECONDS, ModelRegistry
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Remove the model versions each test registers."""
+    yield
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM model_training_metadata"))
+
+
+def fitted_model(seed=0, ticker="XAU"):
+    """Fit a random-walk model for one ticker."""
+    model = Model(tickers=[ticker])
+    model.fit_models({ticker: 100 + np.random.default_rng(seed).normal(0, 1, 40).cumsum()})
+    return model
+
+
+def test_save_registers_compressed_versions_with_metadata(tmp_path):
+    """Test that each save adds a version whose artifact, checksum and metrics are recorded."""
+    first = fitted_model().save(tmp_path)["XAU"]
+    second = fitted_model(seed=1).save(tmp_path)["XAU"]
+    registry = ModelRegistry(tmp_path)
+
+    assert second.version == first.version + 1
+    assert registry.latest("XAU").version == second.version
+    assert first.path.parent.parent == tmp_path.resolve() / "objects"
+    assert first.path.name.startswith(first.sha256) and first.path.suffix == ".xz"
+    assert first.size == first.path.stat().st_size
+    assert set(first.metrics) == {"aic", "bic", "sigma2", "n_obs"} and first.metrics["n_obs"] == 40
+
+    with session_scope() as session:
+        row = session.query(ModelMetadata).filter_by(metal="XAU", version=first.version).one()
+        assert row.artifact_sha256 == first.sha256 and row.hyperparameters == {"p": 1, "d": 1, "q": 0}
+
+
+def test_load_returns_the_requested_version(tmp_path):
+    """Test that load() and load_latest() return models that forecast like the saved ones."""
+    old = fitted_model()
+    new = fitted_model(seed=1)
+    version = old.save(tmp_path)["XAU"].version
+    new.save(tmp_path)
+    registry = ModelRegistry(tmp_path)
+
+    np.testing.assert_allclose(
+        registry.load("XAU", version).predict(fh=[1, 2]), old.models["XAU"].predict(fh=[1, 2])
+    )
+    np.testing.assert_allclose(
+        registry.load_latest("XAU").predict(fh=[1, 2]), new.models["XAU"].predict(fh=[1, 2])
+    )
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry(tmp_path / "other").load_latest("XAU")
+
+
+def test_identical_models_share_one_artifact(tmp_path):
+    """Test that content addressing stores an unchanged model once."""
+    model = fitted_model()
+    first = model.save(tmp_path)["XAU"]
+    second = model.save(tmp_path)["XAU"]
+
+    assert second.version == first.version + 1
+    assert second.path == first.path
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 1
+
+
+def test_corrupt_artifact_is_rejected(tmp_path):
+    """Test that an artifact that no longer matches its checksum is never unpickled."""
+    version = fitted_model().save(tmp_path)["XAU"]
+    version.path.write_bytes(version.path.read_bytes()[:-1] + b"\0")
+
+    with pytest.raises(ValueError, match="checksum"):
+        ModelRegistry(tmp_path).load_latest("XAU")
+
+
+def test_gc_keeps_the_newest_versions(tmp_path):
+    """Test that garbage collection deletes old artifacts and orphans but keeps the training history."""
+    saved = [fitted_model(seed).save(tmp_path, keep_versions=None)["XAU"] for seed in range(4)]
+    orphan = tmp_path / "objects" / "00" / "orphan.pkl.xz"
+    orphan.parent.mkdir()
+    orphan.write_bytes(b"left by a crash")
+    os.utime(orphan, (time.time() - 2 * GC_GRACE_SECONDS,) * 2)
+    # Written by a concurrent save that has not recorded them yet
+    unrecorded = [orphan.parent / "unrecorded.pkl.xz", orphan.parent / "tmpabc.tmp"]
+    for path in unrecorded:
+        path.write_bytes(b"being registered")
+    registry = ModelRegistry(tmp_path)
+
+    removed = registry.gc(keep=2)
+
+    assert len(removed) == 3 and orphan in removed
+    assert all(path.exists() for path in unrecorded)
+    assert [version.version for version in registry.versions("XAU")] == [saved[3].version, saved[2].version]
+    assert all(version.path.exists() for version in registry.versions("XAU"))
+    with session_scope() as session:
+        assert session.query(ModelMetadata).filter_by(metal="XAU").count() == 4
+
+
+def test_register_retries_a_version_taken_concurrently(tmp_path):
+    """Test that a version committed by another writer between lookup and insert is skipped, not duplicated."""
+    registry = ModelRegistry(tmp_path)
+    model = fitted_model().models["XAU"]
+    first = registry.register("XAU", model)
+    with session_scope() as session:
+        metadata = ModelMetadata(metal="XAU", hyperparameters={}, parameters={}, timestamp=datetime.utcnow())
+        session.add(metadata)
+        session.flush()
+        metadata_id = metadata.id
+
+    taken = []
+
+    def take_next_version(session, flush_context, instances):
+        # Runs once, after register() has read the newest version
+        if taken:
+            return
+        taken.append(first.version + 1)
+        with connection_scope() as connection:
+            connection.execute(
+                ModelMetadata.__table__.insert().values(
+                    metal="XAU", hyperparameters={}, parameters={}, timestamp=datetime.utcnow(),
+                    version=first.version + 1,
+                )
+            )
+
+    event.listen(Session, "before_flush", take_next_version)
+    try:
+        second = registry.register("XAU", model, metadata_id=metadata_id)
+    finally:
+        event.remove(Session, "before_flush", take_next_version)
+
+    assert second.version == first.version + 2
+    with session_scope() as session:
+        assert session.get(ModelMetadata, metadata_id).version == second.version
@@ -0,0 +1,192 @@
+import json
+import time
+import asyncio
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations.aggregates import clear_aggregates, refresh_aggregates
+from src.db_operations.db_connection import connection_scope
+from src.models.predictor import Predictor
+from src.service.server import ForecastService
+
+
+class SlowPredictor:
+    """Stands in for Predictor, counting calls and taking long enough for requests to overlap."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, tickers, fh):
+        self.calls += 1
+        time.sleep(0.2)
+        return pd.DataFrame({ticker: np.arange(len(fh), dtype=float) for ticker in tickers}, index=fh)
+
+    def stats(self):
+        return {"calls": self.calls}
+
+
+@pytest.fixture
+def prices():
+    """Store two prices per metal and remove them afterwards."""
+    bulk_load_prices(
+        [
+            ("XAU", 2400.0, datetime(2024, 10, 18, 10)),
+            ("XAU", 2410.0, datetime(2024, 10, 18, 11)),
+            ("XAG", 29.0, datetime(2024, 10, 18, 10)),
+            ("XAG", 29.5, datetime(2024, 10, 18, 11)),
+        ]
+    )
+    refresh_aggregates()
+    yield
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+    clear_aggregates()
+
+
+def get(port, path):
+    """Perform a blocking GET and return the status and decoded JSON body."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}") as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_identical_concurrent_requests_are_coalesced():
+    """Test that concurrent identical forecast requests share one prediction."""
+    predictor = SlowPredictor()
+    service = ForecastService(predictor, workers=4)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *[service.dispatch("GET", "/forecast?tickers=XAU&fh=1,2") for _ in range(5)],
+            service.dispatch("GET", "/forecast?tickers=XAG&fh=1,2"),
+        )
+        await service.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert all(status == 200 for status, _ in results)
+    assert results[0][1] == {"fh": [1, 2], "forecasts": {"XAU": [0.0, 1.0]}}
+    assert predictor.calls == 2
+    assert service._metrics["coalesced"] == 4
+
+
+def test_forecast_without_a_model_is_404(tmp_path):
+    """Test that a ticker with no registered model is reported as not found, naming the ticker."""
+    service = ForecastService(Predictor(tmp_path))
+
+    async def scenario():
+        result = await service.dispatch("GET", "/forecast?tickers=XAU&fh=1")
+        await service.close()
+        return result
+
+    status, body = asyncio.run(scenario())
+
+    assert status == 404
+    assert body == {"error": f"No model registered for XAU in {tmp_path.resolve()}"}
+
+
+def test_http_endpoints(prices):
+    """Test the HTTP round trip for health, latest prices, rolling statistics, forecasts and metrics."""
+    service = ForecastService(SlowPredictor(), port=0)
+
+    async def scenario():
+        await service.start()
+        loop = asyncio.get_running_loop()
+        calls = [
+            "/health",
+            "/prices/latest?metals=XAU,XAG",
+            "/prices/stats?metals=XAU",
+            "/forecast?tickers=XAU&fh=3",
+            "/forecast?fh=1",
+            "/nope",
+            "/metrics",
+        ]
+        responses = [await loop.run_in_executor(None, get, service.port, path) for path in calls]
+        await service.close()
+        return responses
+
+    health, latest, stats, forecast, missing_tickers, unknown, metrics = asyncio.run(scenario())
+
+    assert health == (200, {"status": "ok"})
+    assert latest[0] == 200
+    assert latest[1]["prices"] == [
+        {"metal": "XAG", "price": 29.5, "timestamp": "2024-10-18T11:00:00"},
+        {"metal": "XAU", "price": 2410.0, "timestamp": "2024-10-18T11:00:00"},
+    ]
+    assert stats[0] == 200
+    assert stats[1]["stats"][0]["bucket"] == "2024-10-18T11:00:00"
+    assert stats[1]["stats"][0]["mean"] == 2405.0 and stats[1]["stats"][0]["samples"] == 2
+    assert forecast == (200, {"fh": [3], "forecasts": {"XAU": [0.0]}})
+    assert missing_tickers[0] == 400
+    assert unknown[0] == 404
+    assert metrics[0] == 200
+    assert metrics[1]["requests"] == 6
+    assert "db_pool" in metrics[1]
+
+
+def test_prometheus_metrics_endpoint():
+    """Test that /metrics/prometheus serves plain-text exposition with service, predictor and stage metrics."""
+    service = ForecastService(SlowPredictor(), port=0)
+
+    async def scenario():
+        await service.start()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, get, service.port, "/health")
+
+        def fetch():
+            with urllib.request.urlopen(f"http://127.0.0.1:{service.port}/metrics/prometheus") as response:
+                return response.headers["Content-Type"], response.read().decode()
+
+        result = await loop.run_in_executor(None, fetch)
+        await service.close()
+        return result
+
+    content_type, body = asyncio.run(scenario())
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "metalytics_http_requests 1" in body
+    assert "metalytics_predictor_calls 0" in body
+    assert "# TYPE metalytics_stage_seconds histogram" in body
+
+
+def test_request_bodies_are_not_parsed_as_requests():
+    """Test that a body sent on a keep-alive connection is skipped, and an unframed one closes the connection."""
+    service = ForecastService(SlowPredictor(), port=0)
+    smuggled = b"GET /health HTTP/1.1\r\n\r\n"
+
+    async def exchange(request):
+        reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+        writer.write(request)
+        writer.write_eof()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def scenario():
+        await service.start()
+        sized = await exchange(
+            b"POST /health HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(smuggled) + smuggled
+            + b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n"
+        )
+        chunked = await exchange(
+            b"POST /health HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+            + b"%x\r\n" % len(smuggled) + smuggled + b"\r\n0\r\n\r\n"
+        )
+        await service.close()
+        return sized, chunked
+
+    sized, chunked = asyncio.run(scenario())
+
+    assert sized.count(b"HTTP/1.1 ") == 2
+    assert sized.startswith(b"HTTP/1.1 405 ") and b"HTTP/1.1 200 " in sized
+    assert chunked.count(b"HTTP/1.1 ") == 1 and b"Connection: close" in chunked
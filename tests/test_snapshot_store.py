@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations import snapshot_store
+from src.db_operations.db_connection import connection_scope, read_id_horizon
+from src.db_operations.models import PreciousMetalPrice
+from src.db_operations.snapshot_store import ParquetSnapshotStore
+from src.models.model import Model
+
+
+@pytest.fixture
+def prices():
+    """Two days of hourly prices for two metals, removed afterwards."""
+    start = datetime(2024, 10, 17)
+    rows = [
+        (metal, base + i, start + timedelta(hours=i))
+        for metal, base in (("XAU", 2400.0), ("XAG", 29.0))
+        for i in range(48)
+    ]
+    bulk_load_prices(rows)
+    yield rows
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+
+
+def test_sync_partitions_by_metal_and_day(prices, tmp_path):
+    """Test that a sync writes hive partitions and a re-sync only appends new rows."""
+    store = ParquetSnapshotStore(tmp_path)
+
+    assert store.sync(batch_size=30) == 96
+    assert sorted(p.name for p in (tmp_path / "metal=XAU").iterdir()) == [
+        "date=2024-10-17",
+        "date=2024-10-18",
+    ]
+    assert store.sync() == 0
+
+    bulk_load_prices([("XAU", 9999.0, datetime(2024, 10, 19, 1))])
+    assert store.sync() == 1
+    assert store.read().num_rows == 97
+
+
+def test_sync_waits_for_ids_still_in_flight(prices, tmp_path, monkeypatch):
+    """Test that ids above one a running transaction may still commit are exported only once it has ended.
+
+    SQLite serializes writers, so PostgreSQL's snapshot horizon is simulated:
+    transaction 7 holds id M + 1 open while id M + 2 commits.
+    """
+    store = ParquetSnapshotStore(tmp_path)
+    store.sync()
+    horizons = [(7, 9), (9, 10)]
+    monkeypatch.setattr(
+        snapshot_store,
+        "read_id_horizon",
+        lambda connection, column: (read_id_horizon(connection, column)[0], horizons.pop(0)),
+    )
+
+    def insert(row_id, price, timestamp):
+        with connection_scope() as connection:
+            connection.execute(
+                PreciousMetalPrice.__table__.insert().values(
+                    id=row_id, metal="XAU", price=price, timestamp=timestamp, base_currency="EUR"
+                )
+            )
+
+    last_id = store.watermark
+    insert(last_id + 2, 2.0, datetime(2024, 10, 19, 2))
+    assert store.sync() == 0
+
+    insert(last_id + 1, 1.0, datetime(2024, 10, 19, 1))  # The long transaction commits
+    assert store.sync() == 2
+    assert store.read(["XAU"], start=datetime(2024, 10, 19))["price"].to_pylist() == [1.0, 2.0]
+
+
+def test_sync_since_rewrites_prices_changed_in_place(prices, tmp_path):
+    """Test that updated prices keep their id and are re-exported, not duplicated, by sync(since=...)."""
+    store = ParquetSnapshotStore(tmp_path)
+    store.sync()
+
+    bulk_load_prices([("XAU", 1.0, datetime(2024, 10, 18, 5))], on_conflict="update")
+    assert store.sync() == 0
+
+    assert store.sync(since=datetime(2024, 10, 18, 5)) == 48
+    day = store.read(["XAU"], start=datetime(2024, 10, 18), end=datetime(2024, 10, 19))
+    assert day.num_rows == 24
+    assert day["price"].to_pylist()[5] == 1.0
+    assert store.read().num_rows == 96
+
+
+def test_read_prunes_by_metal_and_time(prices, tmp_path):
+    """Test that reads filter by metal and timestamp and return a wide frame."""
+    store = ParquetSnapshotStore(tmp_path)
+    store.sync()
+
+    table = store.read(["XAG"], start=datetime(2024, 10, 18, 12), end=datetime(2024, 10, 18, 15))
+    assert table.column("price").to_pylist() == [29.0 + 36, 29.0 + 37, 29.0 + 38]
+
+    frame = store.read_frame(start=datetime(2024, 10, 18, 22))
+    assert list(frame.columns) == ["XAG", "XAU"]
+    assert frame["XAU"].tolist() == [2400.0 + 46, 2400.0 + 47]
+
+
+def test_model_reads_training_data_from_snapshots(tmp_path):
+    """Test that Model.fetch_data can be served from the snapshot store."""
+    now = datetime.utcnow().replace(microsecond=0)
+    bulk_load_prices([("XAU", 2400.0 + i, now - timedelta(hours=20 - i, minutes=30)) for i in range(20)])
+    ParquetSnapshotStore(tmp_path).sync()
+    with connection_scope() as connection:
+        connection.execute(text("DELETE FROM precious_metals_prices"))
+
+    data = Model(tickers=["XAU"], snapshot_dir=tmp_path).fetch_data()
+
+    assert len(data) == 11
+    assert data.index.min() >= now - timedelta(hours=12)
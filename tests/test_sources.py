@@ -0,0 +1,95 @@
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.data_ingestion.sources import (
+    MetalPriceAPISource,
+    ReplaySource,
+    SyntheticSource,
+    write_replay_file,
+)
+
+START = datetime(2024, 1, 1)
+
+
+def test_api_source_parses_any_base_currency():
+    """Test that the API source requests and parses the configured base currency and metals."""
+    payload = {
+        "success": True,
+        "base": "USD",
+        "timestamp": 1704067200,
+        "rates": {"USDXAU": 2063.5, "USDXAG": 23.8, "EURXAU": 1870.0},
+    }
+
+    source = MetalPriceAPISource(api_key="key", url="http://localhost/latest", base_currency="USD",
+                                 currencies="XAU,XAG", timeout=5.0)
+    with patch("src.data_ingestion.data_loader.get_json", new=AsyncMock(return_value=payload)) as get_json:
+        rows = source()
+
+    assert rows == [("USDXAU", 2063.5, START, "USD"), ("USDXAG", 23.8, START, "USD")]
+    get_json.assert_awaited_once_with(
+        "http://localhost/latest", {"api_key": "key", "base": "USD", "currencies": "XAU,XAG"}, 5.0
+    )
+
+
+def test_synthetic_source_is_reproducible_and_ordered():
+    """Test that synthetic ticks cover every symbol and base, advance in time and stop at total_ticks."""
+    def make():
+        return SyntheticSource(["XAU", "XAG"], base_currencies=["EUR", "USD"], start=START,
+                               step=timedelta(minutes=1), ticks_per_fetch=3, total_ticks=5, seed=7)
+
+    source = make()
+    first, second, third = source.fetch(), source.fetch(), source.fetch()
+
+    assert source.series == ["XAU", "XAG", "USDXAU", "USDXAG"]
+    assert len(first) == 12 and len(second) == 8 and third == []
+    assert first[:4] == [
+        (series, first[i][1], START, base)
+        for i, (series, base) in enumerate(zip(source.series, ["EUR", "EUR", "USD", "USD"]))
+    ]
+    assert second[-1][2] == START + timedelta(minutes=4)
+    assert all(price > 0 for _, price, _, _ in first + second)
+    assert list(make().iter_rows()) == first + second
+
+
+def test_synthetic_source_rate_limit():
+    """Test that the rate caps emitted rows per second."""
+    source = SyntheticSource(["XAU"], start=START, ticks_per_fetch=50, total_ticks=150, rate=1000)
+
+    started = time.perf_counter()
+    rows = sum(1 for _ in source.iter_rows())
+    elapsed = time.perf_counter() - started
+
+    assert rows == 150
+    assert elapsed >= 0.14  # 150 rows at 1000 rows/s
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_replay_round_trip(tmp_path, suffix):
+    """Test that recorded ticks replay in order, in batches, and optionally loop."""
+    rows = list(SyntheticSource(["XAU", "XPT"], start=START, ticks_per_fetch=10, total_ticks=25).iter_rows())
+    path = tmp_path / f"ticks{suffix}"
+    assert write_replay_file(iter(rows), path, batch_size=7) == 50
+
+    source = ReplaySource(path, batch_size=20)
+    batches = []
+    while batch := source.fetch():
+        batches.append(batch)
+
+    assert [len(batch) for batch in batches] == [20, 20, 10]
+    replayed = [row for batch in batches for row in batch]
+    assert [(metal, timestamp, base) for metal, _, timestamp, base in replayed] == [
+        (m, t, b) for m, _, t, b in rows
+    ]
+    assert [price for _, price, _, _ in replayed] == pytest.approx([price for _, price, _, _ in rows])
+
+    looping = ReplaySource(path, batch_size=40, loop=True)
+    assert [len(looping.fetch()) for _ in range(3)] == [40, 40, 40]
+
+
+def test_replay_rejects_unknown_files(tmp_path):
+    """Test that only CSV and Parquet files are accepted."""
+    with pytest.raises(ValueError):
+        ReplaySource(tmp_path / "ticks.json")
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sktime.forecasting.arima import ARIMA
+
+from src.models.statespace import ArimaState, StateSpaceForecaster
+
+HORIZONS = [1, 2, 5, 20]
+
+
+def random_walk(n=200, seed=0):
+    """Return a random-walk price series."""
+    return 100 + np.random.default_rng(seed).normal(0, 1, n).cumsum()
+
+
+def exported(model):
+    """Export a model's state through JSON, as it is stored in ModelMetadata."""
+    return StateSpaceForecaster(ArimaState.from_dict(json.loads(json.dumps(ArimaState.from_model(model).to_dict()))))
+
+
+@pytest.mark.parametrize(
+    "order, with_intercept",
+    [((1, 1, 0), True), ((2, 1, 1), True), ((0, 1, 0), False), ((1, 0, 1), True), ((0, 2, 2), True)],
+)
+def test_forecasts_and_intervals_match_sktime(order, with_intercept):
+    """Test that the NumPy forecaster reproduces sktime's forecasts and prediction intervals."""
+    model = ARIMA(order=order, with_intercept=with_intercept, suppress_warnings=True).fit(random_walk())
+    forecaster = exported(model)
+
+    np.testing.assert_allclose(forecaster.predict(HORIZONS), np.asarray(model.predict(fh=HORIZONS)).ravel())
+    np.testing.assert_allclose(
+        forecaster.predict_interval(HORIZONS, coverage=0.8),
+        model.predict_interval(fh=HORIZONS, coverage=0.8).values,
+    )
+
+
+def test_time_indexed_and_updated_models():
+    """Test that a resampled model and one updated with new observations export the state they forecast from."""
+    prices = pd.Series(random_walk(120), index=pd.date_range("2024-01-01", periods=120, freq="5min"))
+    model = ARIMA(order=(1, 1, 0), with_intercept=True, suppress_warnings=True).fit(prices[:100])
+    model.update(prices[100:])
+
+    np.testing.assert_allclose(exported(model).predict(HORIZONS), np.asarray(model.predict(fh=HORIZONS)).ravel())
+    assert ArimaState.from_model(model).nobs == 120
+
+
+def test_filter_matches_appending_observations():
+    """Test that filtering new observations forecasts like statsmodels' append() with fixed parameters."""
+    prices = random_walk(150)
+    model = ARIMA(order=(2, 1, 1), with_intercept=True, suppress_warnings=True).fit(prices[:100])
+    state = ArimaState.from_model(model)
+
+    appended = model._forecaster.arima_res_.append(prices[100:])
+    filtered = state.filter(prices[100:])
+
+    expected = np.asarray(appended.forecast(20))[np.subtract(HORIZONS, 1)]
+    np.testing.assert_allclose(StateSpaceForecaster(filtered).predict(HORIZONS), expected)
+    np.testing.assert_allclose(filtered.state_cov, appended.predicted_state_cov[:, :, -1], atol=1e-10)
+    assert filtered.nobs == 150 and state.nobs == 100
+
+
+def test_invalid_horizons():
+    """Test that non-positive horizons are rejected."""
+    forecaster = exported(ARIMA(order=(1, 1, 0), suppress_warnings=True).fit(random_walk()))
+
+    with pytest.raises(ValueError):
+        forecaster.predict([0])
@@ -0,0 +1,112 @@
+import csv
+import gzip
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from sqlalchemy import text
+
+from src.data_ingestion.bulk_loader import bulk_load_prices
+from src.db_operations.db_connection import connection_scope, get_engine
+from src.db_operations.storage import (
+    RetentionPolicy,
+    add_months,
+    apply_retention,
+    convert_prices_to_partitioned,
+    ensure_partitions,
+    partition_name,
+    rollup_prices,
+)
+
+START = datetime(2024, 1, 30)
+
+
+@pytest.fixture
+def ticks():
+    """XAU every 20 minutes from Jan 30 to Feb 2, 2024, priced by its index."""
+    bulk_load_prices([("XAU", float(i), START + timedelta(minutes=20 * i)) for i in range(216)])
+    yield
+    with connection_scope() as connection:
+        for table in ("precious_metals_prices", "precious_metals_prices_hourly", "precious_metals_prices_daily"):
+            connection.execute(text(f"DELETE FROM {table}"))
+
+
+def test_month_arithmetic():
+    """Test month offsets across year boundaries and partition naming."""
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_name(date(2024, 3, 1)) == "precious_metals_prices_y2024m03"
+
+
+def test_partitioning_is_postgres_only():
+    """Test that partition management leaves other dialects untouched."""
+    if get_engine().dialect.name == "postgresql":
+        pytest.skip("prices are partitioned on PostgreSQL")
+    assert convert_prices_to_partitioned() is False
+    assert ensure_partitions() == []
+
+
+def test_rollups_summarize_ticks(ticks):
+    """Test hourly buckets from raw ticks and daily buckets from the hourly ones."""
+    assert rollup_prices("hourly", end=datetime(2024, 2, 2)) == 72
+    assert rollup_prices("daily", end=datetime(2024, 2, 2)) == 3
+
+    with connection_scope() as connection:
+        hour = connection.execute(
+            text("SELECT open, high, low, close, mean, samples FROM precious_metals_prices_hourly ORDER BY bucket")
+        ).first()
+        day = connection.execute(
+            text("SELECT open, high, low, close, mean, samples FROM precious_metals_prices_daily ORDER BY bucket")
+        ).first()
+    assert tuple(hour) == (0.0, 2.0, 0.0, 2.0, 1.0, 3)
+    assert tuple(day) == (0.0, 71.0, 0.0, 71.0, 35.5, 72)
+
+
+def test_rollups_are_incremental_and_idempotent(ticks):
+    """Test that a re-run only recomputes from the newest stored bucket."""
+    rollup_prices("hourly", end=datetime(2024, 1, 31))
+    assert rollup_prices("hourly", end=datetime(2024, 1, 31)) == 1
+    assert rollup_prices("hourly", end=datetime(2024, 2, 2)) == 49
+
+    with connection_scope() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM precious_metals_prices_hourly")).scalar() == 72
+
+
+def test_retention_rolls_up_before_expiring(ticks, tmp_path):
+    """Test that expired raw ticks are archived and dropped only after being rolled up."""
+    summary = apply_retention(RetentionPolicy(raw_months=0, archive_dir=tmp_path), now=datetime(2024, 2, 2))
+
+    assert summary == {
+        "hourly": 72, "daily": 3, "hourly_resummarized": 48, "daily_resummarized": 2, "raw_expired": 144
+    }
+    with connection_scope() as connection:
+        oldest = connection.execute(text("SELECT MIN(timestamp) FROM precious_metals_prices")).scalar()
+        assert str(oldest).startswith("2024-02-01")
+        assert connection.execute(text("SELECT COUNT(*) FROM precious_metals_prices_daily")).scalar() == 3
+
+    # One file of deleted rows, or one per dropped partition on PostgreSQL
+    rows = []
+    for archive in sorted(tmp_path.glob("precious_metals_prices_*.csv.gz")):
+        with gzip.open(archive, "rt") as file:
+            rows.extend(csv.DictReader(file))
+    assert len(rows) == 144
+    assert rows[0]["price"] == "0.0"
+
+
+def test_retention_summarizes_backfilled_ticks_before_expiring(ticks):
+    """Test that ticks written below the newest bucket are rolled up before they expire, not dropped."""
+    rollup_prices("hourly", end=datetime(2024, 2, 2))
+    rollup_prices("daily", end=datetime(2024, 2, 2))
+    bulk_load_prices([("XAU", 500.0, datetime(2024, 1, 15, 9, 30)), ("XAU", 700.0, datetime(2024, 1, 15, 9, 45))])
+
+    apply_retention(RetentionPolicy(raw_months=0), now=datetime(2024, 2, 2))
+
+    with connection_scope() as connection:
+        hour = connection.execute(
+            text("SELECT open, close, samples FROM precious_metals_prices_hourly ORDER BY bucket")
+        ).first()
+        day = connection.execute(
+            text("SELECT high, samples FROM precious_metals_prices_daily ORDER BY bucket")
+        ).first()
+    assert tuple(hour) == (500.0, 700.0, 2)
+    assert tuple(day) == (700.0, 2)
@@ -0,0 +1,102 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import delete, select
+
+from src.data_ingestion.data_loader import fetch_registry_rows
+from src.data_ingestion.symbols import Symbol, SymbolRegistry, series_name
+from src.db_operations.db_connection import session_scope
+from src.db_operations.models import TrackedSymbol
+
+
+@pytest.fixture
+def clean_symbols():
+    """Empty the 'tracked_symbols' table before and after a test."""
+    with session_scope() as session:
+        session.execute(delete(TrackedSymbol))
+    yield
+    with session_scope() as session:
+        session.execute(delete(TrackedSymbol))
+
+
+def test_series_names_keep_eur_symbols_bare():
+    """Test that EUR prices keep the bare symbol and other bases are prefixed."""
+    assert series_name("XAU", "EUR") == "XAU"
+    assert series_name("XAU", "USD") == "USDXAU"
+    assert SymbolRegistry([Symbol("xau", "usd"), Symbol("XAU", "USD"), Symbol("XAG")]).tickers == ["USDXAU", "XAG"]
+
+
+def test_invalid_symbols_are_rejected():
+    """Test that malformed codes and series names too long for the prices table raise."""
+    with pytest.raises(ValueError):
+        SymbolRegistry([Symbol("XAU", "EURO")])
+    with pytest.raises(ValueError):
+        SymbolRegistry([Symbol("TOOLONGCODE", "USD")])
+
+
+def test_batches_group_by_base_and_cap_size():
+    """Test that symbols are split into one request per base currency and max_symbols codes."""
+    registry = SymbolRegistry(
+        [Symbol(f"S{i}", "EUR") for i in range(5)] + [Symbol("XAU", "USD"), Symbol("S9", "EUR")]
+    )
+
+    batches = registry.batches(max_symbols=4)
+
+    assert [(base, len(symbols)) for base, symbols in batches] == [("EUR", 4), ("EUR", 2), ("USD", 1)]
+    assert list(registry.by_base()) == ["EUR", "USD"]
+
+
+def test_file_registry_skips_disabled_rows(tmp_path):
+    """Test that a CSV registry defaults the base currency and drops disabled rows."""
+    path = tmp_path / "symbols.csv"
+    path.write_text(
+        "symbol,base_currency,name,enabled\n"
+        "XAU,,Gold,true\n"
+        "XAU,USD,Gold,1\n"
+        "XPD,EUR,Palladium,false\n"
+    )
+
+    registry = SymbolRegistry.load(path)
+
+    assert registry.tickers == ["XAU", "USDXAU"]
+    assert next(iter(registry)).name == "Gold"
+
+
+def test_load_prefers_the_table_over_defaults(clean_symbols, monkeypatch):
+    """Test that load() falls back to the defaults only while 'tracked_symbols' has no enabled rows."""
+    monkeypatch.delenv("SYMBOLS_FILE", raising=False)
+    assert SymbolRegistry.load().tickers == ["XAU", "XAG", "XPT", "XPD"]
+
+    assert SymbolRegistry.from_codes("XAU,XAG", "USD").sync() == 2
+    assert SymbolRegistry.load().tickers == ["USDXAU", "USDXAG"]
+
+    # Dropping a symbol disables its row; re-adding it enables the same row again
+    assert SymbolRegistry.from_codes("XAG", "USD").sync() == 0
+    assert SymbolRegistry.load().tickers == ["USDXAG"]
+    assert SymbolRegistry.from_codes("XAU,XAG", "USD").sync() == 0
+    with session_scope() as session:
+        assert session.scalar(select(TrackedSymbol).where(TrackedSymbol.enabled.is_(False))) is None
+
+
+def test_fetch_registry_rows_batches_requests():
+    """Test that a registry is fetched with one request per base currency, not one per symbol."""
+    async def respond(url, params, timeout):
+        base = params["base"]
+        return {
+            "success": True,
+            "timestamp": 1704067200,
+            "rates": {f"{base}{code}": 10.0 for code in params["currencies"].split(",")},
+        }
+
+    registry = SymbolRegistry(
+        [Symbol(f"S{i}", "EUR") for i in range(150)] + [Symbol("XAU", "USD"), Symbol("XAG", "GBP")]
+    )
+
+    with patch("src.data_ingestion.data_loader.get_json", new=AsyncMock(side_effect=respond)) as get_json:
+        rows = fetch_registry_rows(registry, api_key="key", url="http://localhost/latest")
+
+    assert get_json.await_count == 4  # EUR in two chunks of at most 100, USD, GBP
+    assert len(rows) == 152
+    assert rows[0] == ("S0", 10.0, datetime(2024, 1, 1), "EUR")
+    assert ("GBPXAG", 10.0, datetime(2024, 1, 1), "GBP") in rows
\ No newline at end of file